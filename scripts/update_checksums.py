@@ -4,112 +4,291 @@ Automated checksum updater for Weaver binaries.
 
 This script fetches the latest Weaver release checksums from GitHub
 and updates the checksums.bzl file automatically.
+
+Releases and assets are fetched concurrently over keep-alive connections.
+Responses are cached on disk with their ETag and revalidated with
+`If-None-Match`, so reruns transfer almost nothing when releases have not
+changed. Asset downloads are streamed and only their SHA256 is cached.
+
+Usage:
+    python scripts/update_checksums.py
+    python scripts/update_checksums.py --dry-run --jobs 16
+    python scripts/update_checksums.py --api-base http://127.0.0.1:8000 --no-cache
 """
 
+import argparse
+import difflib
+import hashlib
+import http.client
 import json
+import os
 import re
 import sys
-import urllib.request
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
 
 # GitHub API configuration
 GITHUB_API_BASE = "https://api.github.com"
 WEAVER_REPO = "open-telemetry/weaver"
 
-def fetch_latest_releases(limit: int = 5) -> List[Dict]:
-    """Fetch the latest Weaver releases from GitHub API."""
-    
-    url = f"{GITHUB_API_BASE}/repos/{WEAVER_REPO}/releases"
-    
+# Streaming read size for asset downloads
+CHUNK_SIZE = 1 << 20
+MAX_REDIRECTS = 5
+USER_AGENT = "rules_weaver-update-checksums"
+
+
+def default_cache_dir() -> Path:
+    """Return the default on-disk HTTP cache directory."""
+
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "rules_weaver" / "checksums"
+
+
+class HttpClient:
+    """HTTP client with per-thread keep-alive connections and an ETag cache.
+
+    Each worker thread keeps one open connection per host. Cached responses
+    are stored as one JSON file per URL holding the ETag and either the body
+    (API responses, checksum files) or the SHA256 of the body (binaries).
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, token: Optional[str] = None,
+                 token_host: Optional[str] = None, timeout: float = 60.0):
+        self.cache_dir = cache_dir
+        self.token = token
+        self.token_host = token_host
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "not_modified": 0, "bytes_downloaded": 0}
+        if cache_dir:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def _connection(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+        key = (scheme, netloc)
+        if key not in connections:
+            if scheme == "https":
+                connections[key] = http.client.HTTPSConnection(netloc, timeout=self.timeout)
+            else:
+                connections[key] = http.client.HTTPConnection(netloc, timeout=self.timeout)
+        return connections[key]
+
+    def _drop_connection(self, scheme: str, netloc: str):
+        connection = self._local.connections.pop((scheme, netloc), None)
+        if connection:
+            connection.close()
+
+    def _send(self, url: str, headers: Dict[str, str]) -> http.client.HTTPResponse:
+        """Send a GET request on a kept-alive connection, reconnecting once if it was closed."""
+
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        request_headers = {"User-Agent": USER_AGENT}
+        request_headers.update(headers)
+        if self.token and parts.netloc == self.token_host:
+            request_headers["Authorization"] = "Bearer " + self.token
+
+        for attempt in range(2):
+            connection = self._connection(parts.scheme, parts.netloc)
+            try:
+                connection.request("GET", path, headers=request_headers)
+                response = connection.getresponse()
+                self._count("requests")
+                return response
+            except (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+                    BrokenPipeError, ConnectionResetError):
+                # The server closed an idle keep-alive connection
+                self._drop_connection(parts.scheme, parts.netloc)
+                if attempt:
+                    raise
+        raise AssertionError("unreachable")
+
+    def _open(self, url: str, headers: Dict[str, str]) -> Tuple[http.client.HTTPResponse, str]:
+        """Follow redirects and return the final response and URL."""
+
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._send(url, headers)
+            if response.status in (301, 302, 303, 307, 308):
+                location = response.getheader("Location")
+                # Drain the body so the connection can be reused
+                response.read()
+                if not location:
+                    raise IOError(f"Redirect without location from {url}")
+                url = urljoin(url, location)
+                continue
+            return response, url
+        raise IOError(f"Too many redirects for {url}")
+
+    def _cache_path(self, url: str) -> Optional[Path]:
+        if not self.cache_dir:
+            return None
+        return self.cache_dir / (hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def _load_cache(self, url: str) -> Optional[Dict]:
+        path = self._cache_path(url)
+        if not path or not path.exists():
+            return None
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def _store_cache(self, url: str, entry: Dict):
+        path = self._cache_path(url)
+        if not path:
+            return
+        entry = dict(entry, url=url)
+        temp_path = path.with_suffix(".tmp.{}".format(threading.get_ident()))
+        with open(temp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(temp_path, path)
+
+    def _conditional_headers(self, cached: Optional[Dict], headers: Dict[str, str]) -> Dict[str, str]:
+        headers = dict(headers)
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        elif cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+        return headers
+
+    def fetch_text(self, url: str, accept: str = "*/*") -> str:
+        """Fetch a URL as text, revalidating a cached copy if there is one."""
+
+        cached = self._load_cache(url)
+        response, final_url = self._open(url, self._conditional_headers(cached, {"Accept": accept}))
+        body = response.read()
+        if response.status == 304 and cached and "body" in cached:
+            self._count("not_modified")
+            return cached["body"]
+        if response.status != 200:
+            raise IOError(f"HTTP {response.status} for {final_url}")
+        self._count("bytes_downloaded", len(body))
+        text = body.decode()
+        self._store_cache(url, {
+            "etag": response.getheader("ETag"),
+            "last_modified": response.getheader("Last-Modified"),
+            "body": text,
+        })
+        return text
+
+    def fetch_json(self, url: str):
+        """Fetch and decode a JSON document."""
+
+        return json.loads(self.fetch_text(url, accept="application/vnd.github+json"))
+
+    def _hash_body(self, response: http.client.HTTPResponse, sink=None) -> str:
+        """Stream a response body in chunks, returning its SHA256."""
+
+        sha256_hash = hashlib.sha256()
+        size = 0
+        for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+            sha256_hash.update(chunk)
+            size += len(chunk)
+            if sink:
+                sink(chunk)
+        self._count("bytes_downloaded", size)
+        return sha256_hash.hexdigest()
+
+    def fetch_sha256(self, url: str) -> str:
+        """Stream a URL and return the SHA256 of its body.
+
+        Only the digest is cached, so a revalidated asset costs one
+        conditional request and no download.
+        """
+
+        cached = self._load_cache(url)
+        response, final_url = self._open(url, self._conditional_headers(cached, {"Accept": "application/octet-stream"}))
+        if response.status == 304 and cached and "sha256" in cached:
+            response.read()
+            self._count("not_modified")
+            return cached["sha256"]
+        if response.status != 200:
+            response.read()
+            raise IOError(f"HTTP {response.status} for {final_url}")
+
+        checksum = self._hash_body(response)
+        self._store_cache(url, {
+            "etag": response.getheader("ETag"),
+            "last_modified": response.getheader("Last-Modified"),
+            "sha256": checksum,
+        })
+        return checksum
+
+    def download(self, url: str, destination: Path) -> str:
+        """Stream a URL into a file and return the SHA256 of its body."""
+
+        response, final_url = self._open(url, {"Accept": "application/octet-stream"})
+        if response.status != 200:
+            response.read()
+            raise IOError(f"HTTP {response.status} for {final_url}")
+        with open(destination, "wb") as f:
+            return self._hash_body(response, f.write)
+
+
+def fetch_latest_releases(client: HttpClient, api_base: str, repo: str, limit: int = 5) -> List[Dict]:
+    """Fetch the latest Weaver releases from GitHub API.
+
+    The release list already includes each release's assets, so no
+    per-release request is needed.
+    """
+
+    url = f"{api_base}/repos/{repo}/releases?per_page={limit}"
+
     try:
-        with urllib.request.urlopen(url) as response:
-            releases = json.loads(response.read().decode())
-            return releases[:limit]
+        releases = client.fetch_json(url)
+        return releases[:limit]
     except Exception as e:
         print(f"Error fetching releases: {e}")
         return []
 
-def fetch_release_checksums(release_tag: str) -> Dict[str, str]:
-    """Fetch checksums for a specific release."""
-    
-    # Try to find checksums file in release assets
-    url = f"{GITHUB_API_BASE}/repos/{WEAVER_REPO}/releases/tags/{release_tag}"
-    
-    try:
-        with urllib.request.urlopen(url) as response:
-            release_data = json.loads(response.read().decode())
-            
-            checksums = {}
-            
-            # Look for checksums file in assets
-            for asset in release_data.get("assets", []):
-                asset_name = asset["name"]
-                
-                if "checksums" in asset_name.lower() or "sha256" in asset_name.lower():
-                    # Download and parse checksums file
-                    checksums.update(parse_checksums_file(asset["browser_download_url"]))
-                    break
-            
-            # If no checksums file found, try to compute from individual assets
-            if not checksums:
-                checksums = compute_checksums_from_assets(release_data.get("assets", []))
-            
-            return checksums
-            
-    except Exception as e:
-        print(f"Error fetching release {release_tag}: {e}")
-        return {}
 
-def parse_checksums_file(url: str) -> Dict[str, str]:
+def parse_checksums_file(client: HttpClient, url: str) -> Dict[str, str]:
     """Parse a checksums file from URL."""
-    
+
     checksums = {}
-    
+
     try:
-        with urllib.request.urlopen(url) as response:
-            content = response.read().decode()
-            
-            # Parse common checksum file formats
-            for line in content.splitlines():
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                
-                # Try different formats
-                # Format: checksum filename
-                match = re.match(r'^([a-fA-F0-9]{64})\s+(.+)$', line)
-                if match:
-                    checksum, filename = match.groups()
-                    platform = extract_platform_from_filename(filename)
-                    if platform:
-                        checksums[platform] = checksum
-                        
+        content = client.fetch_text(url)
+
+        # Parse common checksum file formats
+        for line in content.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            # Try different formats
+            # Format: checksum filename
+            match = re.match(r'^([a-fA-F0-9]{64})\s+(.+)$', line)
+            if match:
+                checksum, filename = match.groups()
+                platform = extract_platform_from_filename(filename.lstrip("*"))
+                if platform:
+                    checksums[platform] = checksum
+
     except Exception as e:
         print(f"Error parsing checksums file {url}: {e}")
-    
-    return checksums
 
-def compute_checksums_from_assets(assets: List[Dict]) -> Dict[str, str]:
-    """Compute checksums from individual release assets."""
-    
-    checksums = {}
-    
-    for asset in assets:
-        asset_name = asset["name"]
-        platform = extract_platform_from_filename(asset_name)
-        
-        if platform:
-            # Download and compute checksum
-            checksum = compute_file_checksum(asset["browser_download_url"])
-            if checksum:
-                checksums[platform] = checksum
-    
     return checksums
 
+
 def extract_platform_from_filename(filename: str) -> Optional[str]:
     """Extract platform from Weaver binary filename."""
-    
+
     # Weaver binary naming patterns
     patterns = [
         (r'weaver-(\d+\.\d+\.\d+)-x86_64-unknown-linux-gnu\.tar\.xz', 'linux-x86_64'),
@@ -119,113 +298,197 @@ def extract_platform_from_filename(filename: str) -> Optional[str]:
         (r'weaver-(\d+\.\d+\.\d+)-x86_64-pc-windows-msvc\.zip', 'windows-x86_64'),
         (r'weaver-(\d+\.\d+\.\d+)-aarch64-pc-windows-msvc\.zip', 'windows-aarch64'),
     ]
-    
+
     for pattern, platform in patterns:
         if re.match(pattern, filename):
             return platform
-    
+
     return None
 
-def compute_file_checksum(url: str) -> Optional[str]:
+
+def compute_file_checksum(client: HttpClient, url: str) -> Optional[str]:
     """Compute SHA256 checksum of a file from URL."""
-    
-    import hashlib
-    
+
     try:
-        with urllib.request.urlopen(url) as response:
-            sha256_hash = hashlib.sha256()
-            
-            # Read file in chunks to handle large files
-            for chunk in iter(lambda: response.read(4096), b""):
-                sha256_hash.update(chunk)
-            
-            return sha256_hash.hexdigest()
-            
+        return client.fetch_sha256(url)
     except Exception as e:
         print(f"Error computing checksum for {url}: {e}")
         return None
 
-def update_checksums_file(checksums_data: Dict[str, Dict[str, str]], output_path: str):
-    """Update the checksums.bzl file with new checksums."""
-    
-    checksums_file = Path(output_path)
-    
-    if not checksums_file.exists():
-        print(f"Checksums file not found: {output_path}")
-        return
-    
-    # Read current content
-    with open(checksums_file, 'r') as f:
-        content = f.read()
-    
+
+def find_checksums_asset(assets: List[Dict]) -> Optional[Dict]:
+    """Return the first asset that looks like a checksums file."""
+
+    for asset in assets:
+        asset_name = asset["name"].lower()
+        if "checksums" in asset_name or "sha256" in asset_name:
+            return asset
+    return None
+
+
+def fetch_all_checksums(client: HttpClient, releases: List[Dict], jobs: int) -> Dict[str, Dict[str, str]]:
+    """Fetch checksums for all releases concurrently.
+
+    Releases with a checksums file are resolved from that file. For the
+    others, each platform binary is streamed and hashed. All downloads of all
+    releases share one thread pool.
+
+    Returns:
+        Mapping of version to platform checksums
+    """
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = []
+        for release in releases:
+            version = release["tag_name"].lstrip("v")  # Remove 'v' prefix
+            assets = release.get("assets", [])
+
+            checksums_asset = find_checksums_asset(assets)
+            if checksums_asset:
+                futures.append((version, None, pool.submit(
+                    parse_checksums_file, client, checksums_asset["browser_download_url"])))
+                continue
+
+            # If no checksums file found, compute from individual assets
+            for asset in assets:
+                platform = extract_platform_from_filename(asset["name"])
+                if platform:
+                    futures.append((version, platform, pool.submit(
+                        compute_file_checksum, client, asset["browser_download_url"])))
+
+        checksums_data = {release["tag_name"].lstrip("v"): {} for release in releases}
+        for version, platform, future in futures:
+            result = future.result()
+            if platform is None:
+                checksums_data[version].update(result)
+            elif result:
+                checksums_data[version][platform] = result
+
+    return checksums_data
+
+
+def render_checksums_file(content: str, checksums_data: Dict[str, Dict[str, str]]) -> str:
+    """Return checksums.bzl content with the given checksums applied."""
+
     # Update the WEAVER_CHECKSUMS dictionary
     for version, platform_checksums in checksums_data.items():
-        version_key = version.replace(".", "_")
-        
         # Create the new checksum entries
         checksum_entries = []
-        for platform, checksum in platform_checksums.items():
+        for platform, checksum in sorted(platform_checksums.items()):
             checksum_entries.append(f'        "{platform}": "{checksum}",')
-        
+
         if checksum_entries:
             # Format the new version entry
             version_entry = f'''    "{version}": {{
 {chr(10).join(checksum_entries)}
     }},'''
-            
+
             # Replace or add the version entry
-            pattern = rf'(\s*)"{version}":\s*{{[^}}]+}},'
-            replacement = f'\n    {version_entry}'
-            
+            pattern = rf'(\s*)"{re.escape(version)}":\s*{{[^}}]+}},'
+            replacement = f'\n{version_entry}'
+
             if re.search(pattern, content):
-                content = re.sub(pattern, replacement, content, flags=re.MULTILINE | re.DOTALL)
+                content = re.sub(pattern, lambda _: replacement, content, flags=re.MULTILINE | re.DOTALL)
             else:
                 # Add new version entry before the closing brace
                 content = re.sub(
-                    r'(\s*)(},?\s*# Add more versions as needed\s*)(\s*})',
-                    rf'\1{version_entry}\n\1\2\3',
-                    content
+                    r'(\n)(    # Add more versions as needed)',
+                    lambda match: f'{match.group(1)}{version_entry}\n{match.group(2)}',
+                    content,
+                    count=1,
                 )
-    
+
+    return content
+
+
+def update_checksums_file(checksums_data: Dict[str, Dict[str, str]], output_path: str, dry_run: bool = False) -> bool:
+    """Update the checksums.bzl file with new checksums.
+
+    Returns:
+        True if the file content changed
+    """
+
+    checksums_file = Path(output_path)
+
+    if not checksums_file.exists():
+        print(f"Checksums file not found: {output_path}")
+        return False
+
+    # Read current content
+    with open(checksums_file, 'r') as f:
+        content = f.read()
+
+    updated = render_checksums_file(content, checksums_data)
+    if updated == content:
+        print(f"Checksums file is up to date: {output_path}")
+        return False
+
+    if dry_run:
+        sys.stdout.writelines(difflib.unified_diff(
+            content.splitlines(keepends=True),
+            updated.splitlines(keepends=True),
+            fromfile=output_path,
+            tofile=output_path,
+        ))
+        return True
+
     # Write updated content
     with open(checksums_file, 'w') as f:
-        f.write(content)
-    
+        f.write(updated)
+
     print(f"Updated checksums file: {output_path}")
+    return True
 
-def main():
+
+def main(argv: Optional[List[str]] = None) -> int:
     """Main function to update checksums."""
-    
-    # Configuration
-    output_path = "weaver/checksums.bzl"
-    max_releases = 3  # Number of recent releases to process
-    
+
+    parser = argparse.ArgumentParser(description="Update Weaver binary checksums from GitHub releases")
+    parser.add_argument("--output", default="weaver/checksums.bzl", help="Checksums file to update")
+    parser.add_argument("--max-releases", type=int, default=3, help="Number of recent releases to process")
+    parser.add_argument("--jobs", type=int, default=8, help="Number of concurrent downloads")
+    parser.add_argument("--api-base", default=os.environ.get("GITHUB_API_BASE", GITHUB_API_BASE),
+                        help="GitHub API base URL (default: $GITHUB_API_BASE or %(default)s)")
+    parser.add_argument("--repo", default=WEAVER_REPO, help="Weaver repository (owner/name)")
+    parser.add_argument("--cache-dir", type=Path, default=default_cache_dir(), help="HTTP cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the HTTP cache")
+    parser.add_argument("--dry-run", action="store_true", help="Print the changes instead of writing them")
+    args = parser.parse_args(argv)
+
+    api_base = args.api_base.rstrip("/")
+    client = HttpClient(
+        cache_dir=None if args.no_cache else args.cache_dir,
+        token=os.environ.get("GITHUB_TOKEN"),
+        token_host=urlsplit(api_base).netloc,
+    )
+
     print("Fetching latest Weaver releases...")
-    releases = fetch_latest_releases(max_releases)
-    
+    releases = fetch_latest_releases(client, api_base, args.repo, args.max_releases)
+
     if not releases:
         print("No releases found. Exiting.")
-        sys.exit(1)
-    
+        return 1
+
     checksums_data = {}
-    
-    for release in releases:
-        version = release["tag_name"].lstrip("v")  # Remove 'v' prefix
+    for version, release_checksums in fetch_all_checksums(client, releases, args.jobs).items():
         print(f"Processing release {version}...")
-        
-        release_checksums = fetch_release_checksums(release["tag_name"])
         if release_checksums:
             checksums_data[version] = release_checksums
             print(f"  Found checksums for {len(release_checksums)} platforms")
         else:
             print(f"  No checksums found for {version}")
-    
+
+    print("HTTP requests: {requests}, not modified: {not_modified}, bytes downloaded: {bytes_downloaded}".format(
+        **client.stats))
+
     if checksums_data:
-        update_checksums_file(checksums_data, output_path)
-        print("Checksums updated successfully!")
+        if update_checksums_file(checksums_data, args.output, args.dry_run) and not args.dry_run:
+            print("Checksums updated successfully!")
     else:
         print("No checksums found for any releases.")
-        sys.exit(1)
+        return 1
+    return 0
+
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Weaver action analytics from Bazel execution logs and build events.
+
+This script reads the logs Bazel writes during a build, keeps the Weaver
+actions (WeaverGenerate, WeaverValidate, WeaverDocs, WeaverLibrary and
+WeaverResolve by default) and reports per-target latency percentiles and cache-hit ratios. A report can be saved as
+a baseline, and later builds compared against it to detect regressions.
+
+Supported inputs:
+- `--execution_log_json_file`: one SpawnExec per action, including cache
+  hits and spawn metrics.
+- `--build_event_json_file`: action events (with
+  `--build_event_publish_all_actions`) and per-mnemonic action counts from
+  the build metrics event.
+- Performance metrics sidecars written with `enable_performance_metrics`,
+  adding CPU time and peak RSS of the Weaver process.
+
+Usage:
+    bazel build //... --execution_log_json_file=exec.json
+    python3 scripts/weaver_action_analytics.py --execution-log exec.json --save-baseline baseline.json
+
+    bazel build //... --execution_log_json_file=exec.json
+    python3 scripts/weaver_action_analytics.py --execution-log exec.json --baseline baseline.json --fail-on-regression
+"""
+
+import argparse
+import json
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_MNEMONICS = ["WeaverGenerate", "WeaverValidate", "WeaverDocs", "WeaverLibrary", "WeaverResolve"]
+REPORT_VERSION = 1
+
+# Key of an aggregated action series: (target label, mnemonic)
+SeriesKey = Tuple[str, str]
+
+
+def iter_json_objects(path: str) -> Iterator[Dict]:
+    """Yield JSON objects from a file of concatenated or newline-delimited objects.
+
+    Older Bazel versions write the execution log as pretty-printed objects
+    back to back; newer versions and the build event file write one object
+    per line. Both are decoded incrementally.
+    """
+
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        for chunk in iter(lambda: f.read(1 << 20), ""):
+            buffer += chunk
+            position = 0
+            while True:
+                while position < len(buffer) and buffer[position].isspace():
+                    position += 1
+                if position >= len(buffer):
+                    break
+                try:
+                    obj, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    # Incomplete object, wait for more data
+                    break
+                yield obj
+                position = end
+            buffer = buffer[position:]
+        if buffer.strip():
+            raise ValueError("Trailing data in {} is not valid JSON".format(path))
+
+
+def parse_duration(value) -> Optional[float]:
+    """Parse a protobuf JSON duration such as `"1.500s"` into seconds."""
+
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.fullmatch(r"(-?[0-9.]+)s", str(value))
+    return float(match.group(1)) if match else None
+
+
+def parse_timestamp(value) -> Optional[float]:
+    """Parse a BEP timestamp (RFC 3339 string or epoch millis) into epoch seconds."""
+
+    if value is None:
+        return None
+    if isinstance(value, (int, float)) or str(value).isdigit():
+        return int(value) / 1000.0
+    text = str(value).replace("Z", "+00:00")
+    # Python < 3.11 accepts at most microseconds
+    text = re.sub(r"(\.\d{6})\d+", r"\1", text)
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        return None
+
+
+class ActionSeries:
+    """Samples collected for one target and mnemonic."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.executed_latencies: List[float] = []
+        self.cache_hits = 0
+        self.count = 0
+        self.user_cpu_seconds = 0.0
+        self.system_cpu_seconds = 0.0
+        self.peak_rss_bytes = 0
+
+    def add(self, latency: Optional[float], cache_hit: bool):
+        self.count += 1
+        if cache_hit:
+            self.cache_hits += 1
+        if latency is not None:
+            self.latencies.append(latency)
+            if not cache_hit:
+                self.executed_latencies.append(latency)
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Return a percentile using linear interpolation between closest ranks."""
+
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = fraction * (len(ordered) - 1)
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def collect_execution_log(path: str, mnemonics: List[str], series: Dict[SeriesKey, ActionSeries]):
+    """Collect Weaver spawns from an execution log JSON file."""
+
+    for spawn in iter_json_objects(path):
+        mnemonic = spawn.get("mnemonic", "")
+        if mnemonic not in mnemonics:
+            continue
+        label = spawn.get("targetLabel", "")
+        metrics = spawn.get("metrics", {})
+        latency = parse_duration(metrics.get("totalTime"))
+        if latency is None:
+            latency = parse_duration(spawn.get("walltime"))
+        if latency is None:
+            latency = parse_duration(metrics.get("executionWallTime"))
+        cache_hit = bool(spawn.get("remoteCacheHit")) or "cache hit" in spawn.get("runner", "")
+        series.setdefault((label, mnemonic), ActionSeries()).add(latency, cache_hit)
+
+
+def collect_build_events(path: str, mnemonics: List[str], series: Dict[SeriesKey, ActionSeries]) -> Dict[str, Dict]:
+    """Collect Weaver actions from a build event JSON file.
+
+    Returns:
+        Per-mnemonic action summaries from the build metrics event
+    """
+
+    summaries: Dict[str, Dict] = {}
+    for event in iter_json_objects(path):
+        action = event.get("action")
+        if action is not None:
+            mnemonic = action.get("type", "")
+            if mnemonic not in mnemonics:
+                continue
+            label = action.get("label") or event.get("id", {}).get("actionCompleted", {}).get("label", "")
+            start = parse_timestamp(action.get("startTime"))
+            end = parse_timestamp(action.get("endTime"))
+            latency = end - start if start is not None and end is not None else None
+            # Actions served from a cache are not published as action events
+            series.setdefault((label, mnemonic), ActionSeries()).add(latency, False)
+            continue
+
+        build_metrics = event.get("buildMetrics")
+        if build_metrics is not None:
+            for data in build_metrics.get("actionSummary", {}).get("actionData", []):
+                if data.get("mnemonic") in mnemonics:
+                    summaries[data["mnemonic"]] = {
+                        "actions_executed": int(data.get("actionsExecuted", 0)),
+                        "user_cpu_seconds": parse_duration(data.get("userTime")),
+                        "system_cpu_seconds": parse_duration(data.get("systemTime")),
+                    }
+    return summaries
+
+
+def collect_metrics_sidecars(directory: str, mnemonics: List[str], series: Dict[SeriesKey, ActionSeries]):
+    """Add CPU time and peak RSS from performance metrics sidecars."""
+
+    for path in sorted(Path(directory).rglob("*_performance_metrics.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            metrics = json.load(f)
+        mnemonic = metrics.get("mnemonic", "")
+        if mnemonic not in mnemonics:
+            continue
+        entry = series.setdefault((metrics.get("label", ""), mnemonic), ActionSeries())
+        entry.user_cpu_seconds += metrics.get("user_cpu_seconds") or 0.0
+        entry.system_cpu_seconds += metrics.get("system_cpu_seconds") or 0.0
+        entry.peak_rss_bytes = max(entry.peak_rss_bytes, metrics.get("peak_rss_bytes") or 0)
+
+
+def summarize(series: Dict[SeriesKey, ActionSeries], build_summaries: Optional[Dict[str, Dict]] = None) -> Dict:
+    """Summarize collected series into a report."""
+
+    targets = []
+    for (label, mnemonic), entry in sorted(series.items()):
+        targets.append({
+            "label": label,
+            "mnemonic": mnemonic,
+            "actions": entry.count,
+            "cache_hits": entry.cache_hits,
+            "cache_hit_ratio": round(entry.cache_hits / entry.count, 4) if entry.count else None,
+            "p50_seconds": percentile(entry.latencies, 0.50),
+            "p90_seconds": percentile(entry.latencies, 0.90),
+            "p99_seconds": percentile(entry.latencies, 0.99),
+            "max_seconds": max(entry.latencies) if entry.latencies else None,
+            "executed_p50_seconds": percentile(entry.executed_latencies, 0.50),
+            "executed_p90_seconds": percentile(entry.executed_latencies, 0.90),
+            "user_cpu_seconds": round(entry.user_cpu_seconds, 3),
+            "system_cpu_seconds": round(entry.system_cpu_seconds, 3),
+            "peak_rss_bytes": entry.peak_rss_bytes,
+        })
+
+    total = sum(entry.count for entry in series.values())
+    hits = sum(entry.cache_hits for entry in series.values())
+    return {
+        "version": REPORT_VERSION,
+        "actions": total,
+        "cache_hit_ratio": round(hits / total, 4) if total else None,
+        "targets": targets,
+        "build_metrics": build_summaries or {},
+    }
+
+
+def compare_to_baseline(report: Dict, baseline: Dict, threshold: float, min_delta: float) -> List[Dict]:
+    """Compare a report to a baseline report.
+
+    A target regresses when the p50 or p90 latency of its executed actions
+    grows by more than `threshold` (a fraction) and by more than `min_delta`
+    seconds, or when its cache-hit ratio drops by more than `threshold`.
+    Cache hits are left out of the latencies, so a lower cache-hit ratio is
+    reported as such and not as slower actions.
+
+    Returns:
+        List of regressions
+    """
+
+    baseline_targets = {(t["label"], t["mnemonic"]): t for t in baseline.get("targets", [])}
+    regressions = []
+    for target in report["targets"]:
+        previous = baseline_targets.get((target["label"], target["mnemonic"]))
+        if previous is None:
+            continue
+        for metric in ("executed_p50_seconds", "executed_p90_seconds"):
+            current, before = target.get(metric), previous.get(metric)
+            if current is None or before is None:
+                continue
+            if current > before * (1 + threshold) and current - before > min_delta:
+                regressions.append({
+                    "label": target["label"],
+                    "mnemonic": target["mnemonic"],
+                    "metric": metric,
+                    "baseline": round(before, 3),
+                    "current": round(current, 3),
+                })
+        current, before = target.get("cache_hit_ratio"), previous.get("cache_hit_ratio")
+        if current is not None and before is not None and before - current > threshold:
+            regressions.append({
+                "label": target["label"],
+                "mnemonic": target["mnemonic"],
+                "metric": "cache_hit_ratio",
+                "baseline": before,
+                "current": current,
+            })
+    return regressions
+
+
+def _format_seconds(value: Optional[float]) -> str:
+    return "-" if value is None else "{:.3f}".format(value)
+
+
+def format_report(report: Dict, regressions: Optional[List[Dict]] = None) -> str:
+    """Format a report as a text table."""
+
+    lines = [
+        "Weaver actions: {} (cache hit ratio {})".format(
+            report["actions"],
+            "-" if report["cache_hit_ratio"] is None else "{:.1%}".format(report["cache_hit_ratio"]),
+        ),
+        "",
+        "{:<50} {:<15} {:>7} {:>7} {:>8} {:>8} {:>8} {:>8}".format(
+            "TARGET", "MNEMONIC", "ACTIONS", "HITS", "P50", "P90", "P99", "MAX"),
+    ]
+    ordered = sorted(report["targets"], key=lambda t: -(t["p90_seconds"] or 0))
+    for target in ordered:
+        lines.append("{:<50} {:<15} {:>7} {:>7} {:>8} {:>8} {:>8} {:>8}".format(
+            target["label"][:50],
+            target["mnemonic"],
+            target["actions"],
+            target["cache_hits"],
+            _format_seconds(target["p50_seconds"]),
+            _format_seconds(target["p90_seconds"]),
+            _format_seconds(target["p99_seconds"]),
+            _format_seconds(target["max_seconds"]),
+        ))
+
+    if regressions is not None:
+        lines.append("")
+        if regressions:
+            lines.append("Regressions against baseline:")
+            for regression in regressions:
+                lines.append("  {label} {mnemonic} {metric}: {baseline} -> {current}".format(**regression))
+        else:
+            lines.append("No regressions against baseline")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Analyze Weaver actions from Bazel logs")
+    parser.add_argument("--execution-log", action="append", default=[],
+                        help="File written by --execution_log_json_file")
+    parser.add_argument("--build-events", action="append", default=[],
+                        help="File written by --build_event_json_file")
+    parser.add_argument("--metrics-dir", action="append", default=[],
+                        help="Directory searched for *_performance_metrics.json sidecars")
+    parser.add_argument("--mnemonic", action="append",
+                        help="Mnemonic to include (default: {})".format(", ".join(DEFAULT_MNEMONICS)))
+    parser.add_argument("--baseline", help="Baseline report to compare against")
+    parser.add_argument("--save-baseline", help="Write this report as a baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative latency growth or cache-hit drop counted as a regression")
+    parser.add_argument("--min-delta", type=float, default=0.1,
+                        help="Minimum latency growth in seconds counted as a regression")
+    parser.add_argument("--json", help="Write the report as JSON to this file")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Exit with status 1 if regressions are found")
+    args = parser.parse_args(argv)
+
+    if not args.execution_log and not args.build_events:
+        parser.error("at least one of --execution-log or --build-events is required")
+
+    mnemonics = args.mnemonic or DEFAULT_MNEMONICS
+    series: Dict[SeriesKey, ActionSeries] = {}
+    build_summaries: Dict[str, Dict] = {}
+    for path in args.execution_log:
+        collect_execution_log(path, mnemonics, series)
+    for path in args.build_events:
+        build_summaries.update(collect_build_events(path, mnemonics, series))
+    for directory in args.metrics_dir:
+        collect_metrics_sidecars(directory, mnemonics, series)
+
+    report = summarize(series, build_summaries)
+
+    regressions = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report, baseline, args.threshold, args.min_delta)
+        report["regressions"] = regressions
+
+    print(format_report(report, regressions))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.fail_on_regression and regressions:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
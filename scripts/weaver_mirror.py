@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Content-addressed mirror for Weaver release archives.
+
+This script downloads Weaver release archives, verifies them against the
+published `.sha256` files (or checksums already pinned in the lockfile), and
+stores them in a content-addressed directory:
+
+    <mirror>/sha256/<sha256>      archive content
+    <mirror>/weaver.lock.json     checksums, upstream URLs and archive types
+
+`weaver_repository` reads the lockfile when `mirror` (or `WEAVER_MIRROR`)
+points at the directory, downloads from `<mirror>/sha256/<sha256>` first and
+passes the checksum to Bazel, so repeated fetches hit the repository cache.
+The directory can be used as a `file://` URL or served over HTTP.
+
+Usage:
+    python scripts/weaver_mirror.py --mirror-dir /srv/weaver-mirror --version 0.16.1
+    python scripts/weaver_mirror.py --mirror-dir /srv/weaver-mirror --max-releases 3 \\
+        --update-checksums weaver/checksums.bzl
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from update_checksums import (
+    GITHUB_API_BASE,
+    WEAVER_REPO,
+    HttpClient,
+    default_cache_dir,
+    fetch_latest_releases,
+    update_checksums_file,
+)
+
+DOWNLOAD_BASE = "https://github.com/open-telemetry/weaver/releases/download"
+LOCKFILE_NAME = "weaver.lock.json"
+LOCKFILE_VERSION = 1
+
+# Platform to Rust target triple, as in weaver/repositories.bzl
+WEAVER_TARGET_TRIPLES = {
+    "linux-x86_64": "x86_64-unknown-linux-gnu",
+    "linux-aarch64": "aarch64-unknown-linux-gnu",
+    "darwin-x86_64": "x86_64-apple-darwin",
+    "darwin-aarch64": "aarch64-apple-darwin",
+    "windows-x86_64": "x86_64-pc-windows-msvc",
+    "windows-aarch64": "aarch64-pc-windows-msvc",
+}
+
+
+def archive_type(platform: str) -> str:
+    """Return the release archive type for a platform."""
+
+    return "zip" if platform.startswith("windows") else "tar.xz"
+
+
+def archive_url(download_base: str, version: str, platform: str) -> str:
+    """Return the upstream release archive URL, matching `_get_download_urls`."""
+
+    return "{}/v{}/weaver-{}.{}".format(
+        download_base.rstrip("/"), version, WEAVER_TARGET_TRIPLES[platform], archive_type(platform))
+
+
+def load_lockfile(path: Path) -> Dict[str, Dict[str, Dict]]:
+    """Load the `weaver` section of a lockfile, or an empty one."""
+
+    if not path.exists():
+        return {}
+    with open(path, "r") as f:
+        return json.load(f).get("weaver", {})
+
+
+def write_lockfile(path: Path, entries: Dict[str, Dict[str, Dict]]):
+    """Write a lockfile atomically."""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(".tmp")
+    with open(temp_path, "w") as f:
+        json.dump({"version": LOCKFILE_VERSION, "weaver": entries}, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(temp_path, path)
+
+
+def fetch_published_checksum(client: HttpClient, url: str) -> Optional[str]:
+    """Fetch the `.sha256` file published next to a release archive."""
+
+    try:
+        content = client.fetch_text(url + ".sha256")
+    except Exception:
+        return None
+    fields = content.split()
+    if fields and len(fields[0]) == 64:
+        return fields[0].lower()
+    return None
+
+
+def mirror_archive(client: HttpClient, mirror_dir: Path, download_base: str, version: str,
+                   platform: str, locked: Optional[Dict], require_verified: bool) -> Dict:
+    """Mirror one release archive.
+
+    Returns:
+        Dictionary with the lockfile entry under `entry`, or an `error`
+    """
+
+    url = archive_url(download_base, version, platform)
+    store = mirror_dir / "sha256"
+
+    pinned = locked.get("sha256") if locked else None
+    if pinned and (store / pinned).exists():
+        return {"entry": locked, "status": "present"}
+
+    expected = pinned or fetch_published_checksum(client, url)
+    if not expected and require_verified:
+        return {"error": "no published checksum for {}".format(url)}
+
+    store.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=str(store), prefix=".download-")
+    os.close(fd)
+    temp_path = Path(temp_name)
+    try:
+        try:
+            actual = client.download(url, temp_path)
+        except Exception as e:
+            return {"error": "download failed: {}".format(e)}
+
+        if expected and actual != expected:
+            return {"error": "checksum mismatch for {}: expected {}, got {}".format(url, expected, actual)}
+
+        os.replace(temp_path, store / actual)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+    entry = {
+        "sha256": actual,
+        "type": archive_type(platform),
+        "urls": [url],
+        "verified": bool(expected),
+    }
+    return {"entry": entry, "status": "downloaded" if expected else "downloaded (unverified)"}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Populate a content-addressed Weaver archive mirror")
+    parser.add_argument("--mirror-dir", type=Path, required=True, help="Mirror directory")
+    parser.add_argument("--version", action="append", default=[], help="Weaver version to mirror (repeatable)")
+    parser.add_argument("--max-releases", type=int, default=3,
+                        help="Number of recent releases to mirror when no --version is given")
+    parser.add_argument("--platform", action="append", default=[], choices=sorted(WEAVER_TARGET_TRIPLES),
+                        help="Platform to mirror (repeatable, default: all)")
+    parser.add_argument("--lockfile", type=Path, help="Lockfile path (default: <mirror-dir>/" + LOCKFILE_NAME + ")")
+    parser.add_argument("--update-checksums", metavar="CHECKSUMS_BZL",
+                        help="Also write the mirrored checksums into this checksums.bzl file")
+    parser.add_argument("--require-verified", action="store_true",
+                        help="Fail for archives without a published or pinned checksum")
+    parser.add_argument("--jobs", type=int, default=8, help="Number of concurrent downloads")
+    parser.add_argument("--download-base", default=DOWNLOAD_BASE, help="Release download base URL")
+    parser.add_argument("--api-base", default=os.environ.get("GITHUB_API_BASE", GITHUB_API_BASE),
+                        help="GitHub API base URL")
+    parser.add_argument("--repo", default=WEAVER_REPO, help="Weaver repository (owner/name)")
+    parser.add_argument("--cache-dir", type=Path, default=default_cache_dir(), help="HTTP cache directory")
+    args = parser.parse_args(argv)
+
+    api_base = args.api_base.rstrip("/")
+    client = HttpClient(
+        cache_dir=args.cache_dir,
+        token=os.environ.get("GITHUB_TOKEN"),
+        token_host=urlsplit(api_base).netloc,
+    )
+
+    versions = [version.lstrip("v") for version in args.version]
+    if not versions:
+        versions = [release["tag_name"].lstrip("v")
+                    for release in fetch_latest_releases(client, api_base, args.repo, args.max_releases)]
+    if not versions:
+        print("No releases found. Exiting.")
+        return 1
+
+    platforms = args.platform or sorted(WEAVER_TARGET_TRIPLES)
+    lockfile = args.lockfile or args.mirror_dir / LOCKFILE_NAME
+    lock = load_lockfile(lockfile)
+
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = [
+            (version, platform, pool.submit(
+                mirror_archive, client, args.mirror_dir, args.download_base, version, platform,
+                lock.get(version, {}).get(platform), args.require_verified))
+            for version in versions
+            for platform in platforms
+        ]
+
+        failed = False
+        for version, platform, future in futures:
+            result = future.result()
+            if "error" in result:
+                print(f"  {version} {platform}: {result['error']}")
+                # Platforms missing from a release are expected; mismatches are not
+                failed = failed or "mismatch" in result["error"] or args.require_verified
+                continue
+            lock.setdefault(version, {})[platform] = result["entry"]
+            print(f"  {version} {platform}: {result['status']} {result['entry']['sha256']}")
+
+    write_lockfile(lockfile, lock)
+    print(f"Wrote lockfile: {lockfile}")
+
+    if args.update_checksums:
+        update_checksums_file(
+            {version: {platform: entry["sha256"] for platform, entry in lock[version].items()}
+             for version in versions if lock.get(version)},
+            args.update_checksums,
+        )
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,7 +19,7 @@ def new_user_integration_test():
         # No sha256 provided - will trigger auto-computation
     )
     
-    weaver_register_toolchains()
+    weaver_register_toolchains(name = "weaver_new_user")
     
     # Step 2: Create sample semantic convention schemas
     native.filegroup(
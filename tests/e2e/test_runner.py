@@ -8,8 +8,22 @@ This test simulates a completely new user's experience with rules_weaver:
 3. Real GitHub integration (Weaver binary download)
 4. End-to-end workflow execution
 5. Error handling and recovery
+
+With `--fast`, the runner instead lays the fixture workspace out once with
+every target, builds and tests them in a single Bazel invocation, checks
+them with a single query and builds the error cases in one `--keep_going`
+invocation, checking from its Build Event Protocol output that each error
+case fails as expected. The workspace lives under a cache directory shared
+across runs, together with the disk and repository caches, and its Bazel
+server is left running unless `--shutdown` is passed, so repeated runs keep
+the Bazel server, analysis cache and downloads warm. Per-phase timings are
+reported as JSON:
+
+    python3 tests/e2e/test_runner.py --fast --timings-out timings.json
+    python3 tests/e2e/test_runner.py --fast --mock-weaver  # no network access
 """
 
+import argparse
 import os
 import sys
 import tempfile
@@ -44,6 +58,8 @@ except ImportError:
         result = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, timeout=timeout)
         return result.returncode, result.stdout, result.stderr
 
+from bazel_orchestrator import parse_build_events
+
 
 class NewUserIntegrationTest(unittest.TestCase):
     """End-to-end integration test for new user experience."""
@@ -587,13 +603,252 @@ weaver_schema(
         self.log("Error handling tests completed")
 
 
+REPO_ROOT = Path(__file__).resolve().parents[2]
+FIXTURE_DIR = Path(__file__).resolve().parent / "test_workspace"
+DEFAULT_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "rules_weaver_e2e"
+FAST_WEAVER_VERSION = "0.16.1"
+
+# Targets built, and for tests run, by the single build invocation
+FAST_TARGETS = [
+    "//:generated_typescript",
+    "//:generated_go",
+    "//:generated_python",
+    "//:validation_test",
+    "//:html_docs",
+    "//:markdown_docs",
+]
+
+FAST_BUILD = '''load("@rules_weaver//weaver:defs.bzl", "weaver_docs", "weaver_generate", "weaver_schema", "weaver_validate_test")
+
+weaver_schema(
+    name = "sample_schemas",
+    srcs = ["schemas/sample.yaml"],
+)
+
+weaver_generate(
+    name = "generated_typescript",
+    registries = [":sample_schemas"],
+    target = "typescript",
+)
+
+weaver_generate(
+    name = "generated_go",
+    registries = [":sample_schemas"],
+    target = "go",
+)
+
+weaver_generate(
+    name = "generated_python",
+    registries = [":sample_schemas"],
+    target = "python",
+)
+
+weaver_validate_test(
+    name = "validation_test",
+    registries = [":sample_schemas"],
+)
+
+weaver_docs(
+    name = "html_docs",
+    schemas = [":sample_schemas"],
+    format = "html",
+)
+
+weaver_docs(
+    name = "markdown_docs",
+    schemas = [":sample_schemas"],
+    format = "markdown",
+)
+'''
+
+# Error cases, built together with --keep_going, and the status each must
+# report: the missing source fails the build, while the validation test
+# builds and fails when Weaver rejects the registry
+FAST_ERROR_TARGETS = {
+    "//errors:missing_schemas": "FAILED_TO_BUILD",
+    "//errors:invalid_validation_test": "FAILED",
+}
+
+FAST_ERROR_BUILD = '''load("@rules_weaver//weaver:defs.bzl", "weaver_schema", "weaver_validate_test")
+
+weaver_schema(
+    name = "missing_schemas",
+    srcs = ["missing.yaml"],
+)
+
+weaver_schema(
+    name = "invalid_schemas",
+    srcs = ["invalid.yaml"],
+)
+
+weaver_validate_test(
+    name = "invalid_validation_test",
+    registries = [":invalid_schemas"],
+)
+'''
+
+FAST_INVALID_SCHEMA = """groups:
+  - id: invalid.group
+    type: invalid_type
+    attributes: []
+mock_weaver: fail
+"""
+
+
+def _write_if_changed(path: Path, content: str):
+    """Write a file only if its content differs, keeping Bazel's caches warm."""
+
+    if path.exists() and path.read_text() == content:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def _module_file(mock_weaver: bool) -> str:
+    """Get the MODULE.bazel of the fast mode workspace."""
+
+    content = (
+        'module(name = "new_user_fast_test")\n'
+        'bazel_dep(name = "bazel_skylib", version = "1.4.2")\n'
+        'bazel_dep(name = "rules_weaver", version = "0.1.0")\n'
+        'local_path_override(module_name = "rules_weaver", path = "{}")\n'.format(REPO_ROOT)
+    )
+    if mock_weaver:
+        return content + 'register_toolchains("@rules_weaver//weaver:mock_weaver_toolchain")\n'
+    return content + (
+        'weaver = use_extension("@rules_weaver//weaver:extensions.bzl", "_weaver_repository_extension")\n'
+        'weaver.download(name = "weaver", version = "{}")\n'
+        'use_repo(weaver, "weaver")\n'
+        'register_toolchains("@weaver//:all")\n'.format(FAST_WEAVER_VERSION)
+    )
+
+
+def layout_fast_workspace(workspace: Path, cache_dir: Path, mock_weaver: bool):
+    """Lay the fixture workspace out once, with every target and error case."""
+
+    _write_if_changed(workspace / "MODULE.bazel", _module_file(mock_weaver))
+    _write_if_changed(workspace / "WORKSPACE.bazel", "")
+    _write_if_changed(workspace / ".bazelrc", (
+        "common --disk_cache={0}\n"
+        "common --repository_cache={1}\n"
+        "test --test_output=errors\n".format(cache_dir / "disk", cache_dir / "repository")
+    ))
+    _write_if_changed(workspace / "BUILD.bazel", FAST_BUILD)
+    _write_if_changed(workspace / "schemas" / "sample.yaml", (FIXTURE_DIR / "schemas" / "sample.yaml").read_text())
+    _write_if_changed(workspace / "errors" / "BUILD.bazel", FAST_ERROR_BUILD)
+    _write_if_changed(workspace / "errors" / "invalid.yaml", FAST_INVALID_SCHEMA)
+
+
+def run_fast_mode(args: argparse.Namespace) -> int:
+    """Run the new user workflow with batched Bazel invocations and report timings."""
+
+    cache_dir = Path(args.cache_dir).resolve()
+    workspace = cache_dir / "workspace"
+    timings = {}
+    failures = []
+
+    def bazel(phase: str, bazel_args: List[str]) -> subprocess.CompletedProcess:
+        start = time.monotonic()
+        result = subprocess.run(
+            [args.bazel] + bazel_args,
+            cwd=str(workspace),
+            capture_output=True,
+            text=True,
+            timeout=args.timeout,
+        )
+        timings[phase] = round(time.monotonic() - start, 3)
+        print("[{}] {:.3f}s (exit code {})".format(phase, timings[phase], result.returncode))
+        return result
+
+    total_start = time.monotonic()
+    start = time.monotonic()
+    layout_fast_workspace(workspace, cache_dir, args.mock_weaver)
+    timings["layout"] = round(time.monotonic() - start, 3)
+
+    # Build every target and run the validation test in one invocation
+    result = bazel("build_and_test", ["test"] + FAST_TARGETS)
+    if result.returncode != 0:
+        failures.append("build and test failed:\n{}".format(result.stderr))
+
+    # Check all generated targets with one query
+    result = bazel("query", ["query", "--output=label", "set({})".format(" ".join(FAST_TARGETS))])
+    if result.returncode != 0:
+        failures.append("query failed:\n{}".format(result.stderr))
+    else:
+        found = set(result.stdout.split())
+        missing = [target for target in FAST_TARGETS if target not in found]
+        if missing:
+            failures.append("targets not found: {}".format(", ".join(missing)))
+
+    # Every error case must fail; --keep_going reports all of them at once,
+    # and the Build Event Protocol tells how each of them failed
+    events_file = cache_dir / "error_handling.bep.json"
+    if events_file.exists():
+        events_file.unlink()
+    result = bazel("error_handling", [
+        "test", "--keep_going", "--build_event_json_file={}".format(events_file),
+    ] + sorted(FAST_ERROR_TARGETS))
+    results = parse_build_events(events_file)
+    for target, expected in sorted(FAST_ERROR_TARGETS.items()):
+        status = results[target].status if target in results else "NOT_REPORTED"
+        if status != expected:
+            failures.append("error case {} reported {}, expected {}:\n{}".format(target, status, expected, result.stderr))
+
+    timings["total"] = round(time.monotonic() - total_start, 3)
+
+    report = {
+        "mode": "fast",
+        "mock_weaver": args.mock_weaver,
+        "workspace": str(workspace),
+        "timings_seconds": timings,
+        "failures": failures,
+        "success": not failures,
+    }
+    if args.timings_out:
+        with open(args.timings_out, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    print(json.dumps(timings, indent=2, sort_keys=True))
+    for failure in failures:
+        print("FAIL: {}".format(failure))
+
+    if args.shutdown:
+        subprocess.run([args.bazel, "shutdown"], cwd=str(workspace), capture_output=True)
+    return 1 if failures else 0
+
+
+def _default_timings_out() -> Optional[str]:
+    """Report timings as an undeclared test output when run by `bazel test`."""
+
+    outputs_dir = os.environ.get("TEST_UNDECLARED_OUTPUTS_DIR")
+    return os.path.join(outputs_dir, "e2e_timings.json") if outputs_dir else None
+
+
 def main():
     """Main test runner."""
+    parser = argparse.ArgumentParser(description="End-to-end new user integration test", add_help=False)
+    parser.add_argument("--fast", action="store_true",
+                        default=os.environ.get("E2E_FAST", "0") == "1",
+                        help="Batch all targets into few Bazel invocations over a cached workspace")
+    parser.add_argument("--cache-dir", default=os.environ.get("E2E_CACHE_DIR", str(DEFAULT_CACHE_DIR)),
+                        help="Directory holding the fast mode workspace and the shared disk and repository caches")
+    parser.add_argument("--timings-out", default=_default_timings_out(),
+                        help="Write the fast mode report with per-phase timings as JSON")
+    parser.add_argument("--mock-weaver", action="store_true",
+                        help="Use the hermetic mock Weaver toolchain instead of downloading Weaver")
+    parser.add_argument("--shutdown", action="store_true",
+                        help="Shut the Bazel server of the fast mode workspace down instead of keeping it warm")
+    parser.add_argument("--bazel", default=os.environ.get("BAZEL", "bazel"), help="Bazel binary")
+    parser.add_argument("--timeout", type=int, default=1800, help="Timeout of each Bazel invocation in seconds")
+    args, remaining = parser.parse_known_args()
+
+    if args.fast:
+        sys.exit(run_fast_mode(args))
+    
     # Set up test environment
     os.environ['TEST_TMPDIR'] = tempfile.mkdtemp(prefix="bazel_test_")
     
     # Run the test
-    unittest.main(verbosity=2)
+    unittest.main(argv=[sys.argv[0]] + remaining, verbosity=2)
 
 
 if __name__ == "__main__":
@@ -12,7 +12,7 @@ def direct_weaver_test():
         registries = [
             "//tests/schemas:sample.yaml",
         ],
-        weaver = "@weaver_binary//:weaver-aarch64-apple-darwin/weaver",
+        weaver = "@weaver_binary//:weaver_binary",
         weaver_args = ["--quiet"],
         testonly = True,
         tags = ["real_weaver", "integration"],
@@ -18,10 +18,10 @@ def _weaver_schema_integration_test_impl(ctx):
     schema_info = schema_target[WeaverSchemaInfo]
     
     # Verify schema files are accessible
-    asserts.true(env, len(schema_info.schema_files) > 0)
+    asserts.true(env, len(schema_info.schema_files.to_list()) > 0)
     
     # Verify parsed content is available
-    asserts.true(env, len(schema_info.schema_content) > 0)
+    asserts.true(env, len(schema_info.schema_content.to_list()) > 0)
     
     # Verify metadata is populated
     asserts.true(env, "schema_count" in schema_info.metadata)
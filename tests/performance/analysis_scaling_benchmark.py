@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Analysis-time scaling benchmark for the Weaver dependency aspect.
+
+This script generates synthetic workspaces with increasing numbers of schema
+files, split across a chain of `weaver_schema` targets where each target
+depends on the previous one, and analyzes the top target with
+`weaver_schema_aspect` applied. A chain is the worst case for transitive
+dependency tracking: every target sees every file below it.
+
+For each size it records:
+- Wall time of `bazel build --nobuild` (loading and analysis)
+- Retained heap after analysis (`bazel info used-heap-size-after-gc`)
+- Memory retained by the aspect (`bazel dump --rules`)
+
+It then fits the growth exponent between the smallest and largest size
+(log-log slope) and fails if any metric grows faster than the allowed
+exponent. Linear scaling has an exponent of 1; the previous dict-copying
+implementation grew quadratically.
+
+Usage:
+    python3 tests/performance/analysis_scaling_benchmark.py
+    python3 tests/performance/analysis_scaling_benchmark.py --sizes 500,1000,2000,3000 --output results.json
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+ASPECT = "@rules_weaver//weaver:aspects.bzl%weaver_schema_aspect"
+
+
+def generate_workspace(root: Path, file_count: int, files_per_target: int):
+    """Generate a workspace with a chain of weaver_schema targets."""
+
+    (root / "MODULE.bazel").write_text(
+        'module(name = "weaver_scaling_benchmark")\n'
+        'bazel_dep(name = "bazel_skylib", version = "1.4.2")\n'
+        'bazel_dep(name = "rules_weaver", version = "0.1.0")\n'
+        'local_path_override(module_name = "rules_weaver", path = "{}")\n'.format(REPO_ROOT)
+    )
+
+    target_count = max(1, file_count // files_per_target)
+    build_lines = ['load("@rules_weaver//weaver:defs.bzl", "weaver_schema")', ""]
+    schema_dir = root / "schemas"
+    schema_dir.mkdir(parents=True, exist_ok=True)
+
+    for target in range(target_count):
+        srcs = []
+        for index in range(files_per_target):
+            name = "schemas/t{}_{}.yaml".format(target, index)
+            group_id = "group.t{}.f{}".format(target, index)
+            lines = ["groups:", "  - id: {}".format(group_id), "    type: attribute_group"]
+            if target > 0:
+                lines.append("    extends: group.t{}.f{}".format(target - 1, index))
+            (root / name).write_text("\n".join(lines) + "\n")
+            srcs.append(name)
+
+        build_lines.append("weaver_schema(")
+        build_lines.append('    name = "t{}",'.format(target))
+        build_lines.append("    srcs = {},".format(json.dumps(srcs)))
+        if target > 0:
+            build_lines.append('    deps = [":t{}"],'.format(target - 1))
+        build_lines.append(")")
+        build_lines.append("")
+
+    (root / "BUILD.bazel").write_text("\n".join(build_lines))
+    return "//:t{}".format(target_count - 1)
+
+
+def run_bazel(bazel: str, workspace: Path, args, check: bool = True) -> subprocess.CompletedProcess:
+    """Run a Bazel command in a workspace."""
+
+    result = subprocess.run(
+        [bazel] + args,
+        cwd=str(workspace),
+        capture_output=True,
+        text=True,
+    )
+    if check and result.returncode != 0:
+        raise RuntimeError("bazel {} failed:\n{}".format(" ".join(args), result.stderr))
+    return result
+
+
+def parse_heap_bytes(value: str) -> int:
+    """Parse `used-heap-size-after-gc` output such as `123MB`."""
+
+    match = re.match(r"\s*([0-9.]+)\s*([KMG]?B)", value)
+    if not match:
+        return 0
+    scale = {"B": 1, "KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30}[match.group(2)]
+    return int(float(match.group(1)) * scale)
+
+
+def parse_aspect_bytes(dump: str) -> int:
+    """Extract the bytes retained by the schema aspect from `bazel dump --rules`."""
+
+    for line in dump.splitlines():
+        if "weaver_schema_aspect" in line:
+            numbers = [int(n.replace(",", "")) for n in re.findall(r"\b[0-9][0-9,]*\b", line.split("%", 1)[-1])]
+            # Columns: COUNT, ACTIONS, BYTES, EACH
+            if len(numbers) >= 3:
+                return numbers[2]
+    return 0
+
+
+def measure(bazel: str, file_count: int, files_per_target: int, keep: bool) -> dict:
+    """Measure analysis of a generated workspace of the given size."""
+
+    workspace = Path(tempfile.mkdtemp(prefix="weaver_scaling_{}_".format(file_count)))
+    try:
+        top = generate_workspace(workspace, file_count, files_per_target)
+
+        # Start the server and fetch dependencies outside the measurement
+        run_bazel(bazel, workspace, ["build", "--nobuild", "//:t0"])
+
+        start = time.monotonic()
+        run_bazel(bazel, workspace, ["build", "--nobuild", "--aspects=" + ASPECT, top])
+        wall_time = time.monotonic() - start
+
+        heap = run_bazel(bazel, workspace, ["info", "used-heap-size-after-gc"])
+        dump = run_bazel(bazel, workspace, ["dump", "--rules"], check=False)
+
+        return {
+            "files": file_count,
+            "targets": max(1, file_count // files_per_target),
+            "analysis_seconds": round(wall_time, 3),
+            "heap_bytes": parse_heap_bytes(heap.stdout),
+            "aspect_bytes": parse_aspect_bytes(dump.stdout + dump.stderr),
+        }
+    finally:
+        run_bazel(bazel, workspace, ["shutdown"], check=False)
+        if keep:
+            print("Kept workspace {}".format(workspace))
+        else:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+
+def growth_exponent(results, metric: str):
+    """Return the log-log slope of a metric between the smallest and largest size."""
+
+    first, last = results[0], results[-1]
+    if first[metric] <= 0 or last[metric] <= 0 or first["files"] == last["files"]:
+        return None
+    return math.log(last[metric] / first[metric]) / math.log(last["files"] / first["files"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analysis scaling of weaver_schema_aspect")
+    parser.add_argument("--bazel", default=os.environ.get("BAZEL", "bazel"), help="Bazel binary")
+    parser.add_argument("--sizes", default="500,1000,2000,3000", help="Comma-separated schema file counts")
+    parser.add_argument("--files-per-target", type=int, default=10, help="Schema files per weaver_schema target")
+    parser.add_argument("--max-exponent", type=float, default=1.3, help="Maximum allowed growth exponent")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--keep", action="store_true", help="Keep generated workspaces")
+    args = parser.parse_args()
+
+    if not shutil.which(args.bazel):
+        print("ERROR: Bazel not found: {}".format(args.bazel))
+        return 1
+
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    results = []
+    for size in sizes:
+        print("Analyzing {} schema files...".format(size))
+        result = measure(args.bazel, size, args.files_per_target, args.keep)
+        print("  {analysis_seconds}s, heap {heap_bytes} bytes, aspect {aspect_bytes} bytes".format(**result))
+        results.append(result)
+
+    exponents = {
+        metric: growth_exponent(results, metric)
+        for metric in ("analysis_seconds", "heap_bytes", "aspect_bytes")
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"results": results, "growth_exponents": exponents}, f, indent=2)
+
+    failed = False
+    for metric, exponent in exponents.items():
+        if exponent is None:
+            print("{}: not measured".format(metric))
+            continue
+        status = "OK" if exponent <= args.max_exponent else "FAIL"
+        print("{}: growth exponent {:.2f} ({})".format(metric, exponent, status))
+        failed = failed or exponent > args.max_exponent
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
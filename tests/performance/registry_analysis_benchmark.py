@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Analysis-time regression test for Weaver rules on a large registry.
+
+This script generates a synthetic registry of 10,000 schema files (by
+default), split into `weaver_schema` targets of one directory each, and
+analyzes `weaver_generate`, `weaver_validate_test`, `weaver_docs` and
+`weaver_library` targets consuming the whole registry. Rule implementations
+pass the registry along as depsets, so analysis should not grow with the
+number of consumers times the number of files.
+
+It records:
+- Wall time of `bazel build --nobuild` (loading and analysis)
+- Retained heap after analysis (`bazel info used-heap-size-after-gc`)
+
+and fails if either exceeds its budget, or grows by more than `--threshold`
+over a baseline saved with `--save-baseline`.
+
+Usage:
+    python3 tests/performance/registry_analysis_benchmark.py
+    python3 tests/performance/registry_analysis_benchmark.py --files 10000 --save-baseline baseline.json
+    python3 tests/performance/registry_analysis_benchmark.py --baseline baseline.json --output results.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from analysis_scaling_benchmark import REPO_ROOT, parse_heap_bytes, run_bazel
+
+CONSUMERS = ["generate", "generate_no_digests", "validate", "docs", "library"]
+
+
+def generate_workspace(root: Path, file_count: int, files_per_target: int):
+    """Generate a workspace with a flat registry and rules consuming all of it."""
+
+    (root / "MODULE.bazel").write_text(
+        'module(name = "weaver_registry_benchmark")\n'
+        'bazel_dep(name = "bazel_skylib", version = "1.4.2")\n'
+        'bazel_dep(name = "rules_weaver", version = "0.1.0")\n'
+        'local_path_override(module_name = "rules_weaver", path = "{}")\n'
+        'register_toolchains("@rules_weaver//weaver:mock_weaver_toolchain")\n'.format(REPO_ROOT)
+    )
+
+    target_count = max(1, file_count // files_per_target)
+    registries = []
+    for target in range(target_count):
+        package = root / "registry" / "g{}".format(target)
+        package.mkdir(parents=True, exist_ok=True)
+        srcs = []
+        for index in range(files_per_target):
+            name = "f{}.yaml".format(index)
+            (package / name).write_text(
+                "groups:\n"
+                "  - id: registry.g{0}.f{1}\n"
+                "    type: attribute_group\n"
+                "    brief: Synthetic group {0}.{1}\n".format(target, index)
+            )
+            srcs.append(name)
+        (package / "BUILD.bazel").write_text(
+            'load("@rules_weaver//weaver:defs.bzl", "weaver_schema")\n\n'
+            "weaver_schema(\n"
+            '    name = "schemas",\n'
+            "    srcs = {},\n"
+            '    visibility = ["//visibility:public"],\n'
+            ")\n".format(json.dumps(srcs))
+        )
+        registries.append("//registry/g{}:schemas".format(target))
+
+    registry_list = json.dumps(registries)
+    (root / "BUILD.bazel").write_text(
+        'load("@rules_weaver//weaver:defs.bzl", "weaver_docs", "weaver_generate", '
+        '"weaver_library", "weaver_validate_test")\n\n'
+        'weaver_generate(name = "generate", registries = {0}, target = "markdown")\n\n'
+        'weaver_generate(name = "generate_no_digests", registries = {0}, target = "markdown", '
+        "content_digests = False)\n\n"
+        'weaver_validate_test(name = "validate", registries = {0})\n\n'
+        'weaver_docs(name = "docs", schemas = {0})\n\n'
+        'weaver_library(name = "library", schemas = {0}, validate = True, generate_docs = True)\n'.format(registry_list)
+    )
+
+
+def measure(bazel: str, file_count: int, files_per_target: int, keep: bool) -> dict:
+    """Measure analysis of the generated registry workspace."""
+
+    workspace = Path(tempfile.mkdtemp(prefix="weaver_registry_{}_".format(file_count)))
+    try:
+        generate_workspace(workspace, file_count, files_per_target)
+
+        # Start the server, fetch dependencies and load the registry packages
+        # outside the measurement
+        run_bazel(bazel, workspace, ["build", "--nobuild", "//registry/..."])
+
+        start = time.monotonic()
+        run_bazel(bazel, workspace, ["build", "--nobuild"] + ["//:" + name for name in CONSUMERS])
+        wall_time = time.monotonic() - start
+
+        heap = run_bazel(bazel, workspace, ["info", "used-heap-size-after-gc"])
+
+        return {
+            "files": file_count,
+            "targets": max(1, file_count // files_per_target),
+            "analysis_seconds": round(wall_time, 3),
+            "heap_bytes": parse_heap_bytes(heap.stdout),
+        }
+    finally:
+        run_bazel(bazel, workspace, ["shutdown"], check=False)
+        if keep:
+            print("Kept workspace {}".format(workspace))
+        else:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+
+def check_result(result: dict, baseline, max_seconds: float, max_heap_mib: int, threshold: float):
+    """Return a list of budget and baseline violations."""
+
+    failures = []
+    if result["analysis_seconds"] > max_seconds:
+        failures.append("analysis took {}s, budget {}s".format(result["analysis_seconds"], max_seconds))
+    if result["heap_bytes"] > max_heap_mib << 20:
+        failures.append("heap {} bytes, budget {} MiB".format(result["heap_bytes"], max_heap_mib))
+
+    if baseline:
+        if baseline.get("files") != result["files"]:
+            failures.append("baseline measured {} files, not {}".format(baseline.get("files"), result["files"]))
+            return failures
+        for metric in ("analysis_seconds", "heap_bytes"):
+            before = baseline.get(metric) or 0
+            if before > 0 and result[metric] > before * (1 + threshold):
+                failures.append("{} grew from {} to {} (+{:.0%})".format(
+                    metric, before, result[metric], result[metric] / before - 1))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analysis-time regression test for Weaver rules on a large registry")
+    parser.add_argument("--bazel", default=os.environ.get("BAZEL", "bazel"), help="Bazel binary")
+    parser.add_argument("--files", type=int, default=10000, help="Number of schema files in the registry")
+    parser.add_argument("--files-per-target", type=int, default=100, help="Schema files per weaver_schema target")
+    parser.add_argument("--max-seconds", type=float, default=60.0, help="Analysis wall time budget")
+    parser.add_argument("--max-heap-mib", type=int, default=1024, help="Retained heap budget in MiB")
+    parser.add_argument("--baseline", help="Compare against results saved with --save-baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative growth over the baseline")
+    parser.add_argument("--save-baseline", help="Save the results as a baseline to this file")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated workspace")
+    args = parser.parse_args()
+
+    if not shutil.which(args.bazel):
+        print("ERROR: Bazel not found: {}".format(args.bazel))
+        return 1
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+
+    print("Analyzing {} rules over {} schema files...".format(len(CONSUMERS), args.files))
+    result = measure(args.bazel, args.files, args.files_per_target, args.keep)
+    print("  {analysis_seconds}s, heap {heap_bytes} bytes".format(**result))
+
+    failures = check_result(result, baseline, args.max_seconds, args.max_heap_mib, args.threshold)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(result, f, indent=2, sort_keys=True)
+
+    for failure in failures:
+        print("FAIL: {}".format(failure))
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
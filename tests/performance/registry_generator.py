@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Synthetic semantic convention registry generator.
+
+This script writes a registry shaped like the OpenTelemetry semantic
+conventions: one directory per namespace, holding a `registry.yaml` with the
+`registry.<namespace>` attribute group and a `signals.yaml` with span,
+metric and event groups that reference those attributes. A configurable
+share of the references points into other namespaces, so resolving the
+registry has to follow cross-references as it does for `server.address` or
+`error.type` in the real conventions.
+
+Attributes mix the semantic convention types (string, int, double, boolean,
+arrays and enums with members), stability levels and requirement levels.
+Output is deterministic for a given seed.
+
+Usage:
+    python3 tests/performance/registry_generator.py --attributes 10000 --output /tmp/registry
+    python3 tests/performance/registry_generator.py --attributes 100000 --namespaces 200 --cross-ref-ratio 0.3 \\
+        --output /tmp/registry --build-files
+"""
+
+import argparse
+import json
+import random
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+# Registry shape: total attributes, namespaces, attributes per signal group,
+# share of references into other namespaces, and the random seed
+RegistrySpec = namedtuple(
+    "RegistrySpec",
+    ["attributes", "namespaces", "attributes_per_group", "cross_ref_ratio", "seed"],
+    defaults=(10, 8, 0.2, 0),
+)
+
+ATTRIBUTE_TYPES = ["string", "string", "string", "int", "double", "boolean", "string[]", "int[]", "enum"]
+STABILITY_LEVELS = ["stable", "development", "development", "release_candidate"]
+REQUIREMENT_LEVELS = ["required", "recommended", "recommended", "opt_in", "conditionally_required"]
+SIGNAL_TYPES = ["span", "span", "metric", "event"]
+SPAN_KINDS = ["client", "server", "internal", "producer", "consumer"]
+INSTRUMENTS = ["counter", "histogram", "updowncounter", "gauge"]
+WORDS = [
+    "request", "response", "client", "server", "peer", "message", "operation", "status", "method",
+    "route", "target", "system", "name", "id", "size", "count", "duration", "address", "port",
+    "version", "type", "kind", "state", "region", "zone", "host", "user", "session", "query", "batch",
+]
+
+MIN_ATTRIBUTES = 10
+MAX_ATTRIBUTES = 100000
+
+
+def _quote(value) -> str:
+    """Quote a scalar as YAML, using the JSON subset."""
+
+    return json.dumps(value)
+
+
+def _example(attribute_type: str, rng: random.Random):
+    """Return example values for an attribute type."""
+
+    if attribute_type.startswith("int"):
+        value = [rng.randint(0, 65535)]
+    elif attribute_type == "double":
+        value = [round(rng.uniform(0, 100), 3)]
+    elif attribute_type == "boolean":
+        return None
+    else:
+        value = ["{}-{}".format(rng.choice(WORDS), rng.randint(0, 999))]
+    return [value] if attribute_type.endswith("[]") else value
+
+
+def _attribute_yaml(attribute_id: str, attribute_type: str, rng: random.Random) -> list:
+    """Return the YAML lines of an attribute definition."""
+
+    lines = ["      - id: {}".format(attribute_id)]
+    if attribute_type == "enum":
+        lines.append("        type:")
+        lines.append("          members:")
+        for index in range(rng.randint(2, 6)):
+            member = "{}_{}".format(rng.choice(WORDS), index)
+            lines.append("            - id: {}".format(member))
+            lines.append("              value: {}".format(_quote(member)))
+            lines.append("              brief: {}".format(_quote("The {} value.".format(member))))
+            lines.append("              stability: {}".format(rng.choice(STABILITY_LEVELS)))
+    else:
+        lines.append("        type: {}".format(attribute_type))
+    lines.append("        stability: {}".format(rng.choice(STABILITY_LEVELS)))
+    lines.append("        brief: {}".format(_quote("Synthetic {} attribute {}.".format(attribute_type, attribute_id))))
+    examples = _example(attribute_type, rng)
+    if examples is not None:
+        lines.append("        examples: {}".format(json.dumps(examples)))
+    return lines
+
+
+def _namespace_names(count: int) -> list:
+    """Return distinct, readable namespace names."""
+
+    names = []
+    for index in range(count):
+        word = WORDS[index % len(WORDS)]
+        names.append(word if index < len(WORDS) else "{}{}".format(word, index // len(WORDS)))
+    return names
+
+
+def _split(total: int, parts: int) -> list:
+    """Split a total into near-equal positive parts."""
+
+    base, extra = divmod(total, parts)
+    return [base + (1 if index < extra else 0) for index in range(parts)]
+
+
+def generate_registry(root: Path, spec: RegistrySpec, build_files: bool = False) -> dict:
+    """Write a synthetic registry under root and return a summary of its shape."""
+
+    if not MIN_ATTRIBUTES <= spec.attributes <= MAX_ATTRIBUTES:
+        raise ValueError("attributes must be between {} and {}".format(MIN_ATTRIBUTES, MAX_ATTRIBUTES))
+    namespaces = _namespace_names(max(1, min(spec.namespaces, spec.attributes)))
+    rng = random.Random(spec.seed)
+
+    # Attribute ids per namespace, known up front so references can cross namespaces
+    attributes = {}
+    for namespace, count in zip(namespaces, _split(spec.attributes, len(namespaces))):
+        attributes[namespace] = [
+            "{}.{}.{}".format(namespace, WORDS[index % len(WORDS)], index)
+            for index in range(count)
+        ]
+
+    summary = {"attributes": spec.attributes, "namespaces": len(namespaces), "files": 0, "groups": 0,
+               "references": 0, "cross_references": 0}
+    for namespace in namespaces:
+        package = root / namespace
+        package.mkdir(parents=True, exist_ok=True)
+        types = [rng.choice(ATTRIBUTE_TYPES) for _ in attributes[namespace]]
+
+        registry = [
+            "groups:",
+            "  - id: registry.{}".format(namespace),
+            "    type: attribute_group",
+            "    display_name: {}".format(_quote("{} Attributes".format(namespace.title()))),
+            "    brief: {}".format(_quote("Attributes in the {} namespace.".format(namespace))),
+            "    attributes:",
+        ]
+        for attribute_id, attribute_type in zip(attributes[namespace], types):
+            registry.extend(_attribute_yaml(attribute_id, attribute_type, rng))
+        (package / "registry.yaml").write_text("\n".join(registry) + "\n")
+
+        # Signal groups referencing the namespace's attributes, and some of other namespaces
+        signals = ["groups:"]
+        own = attributes[namespace]
+        others = [other for other in namespaces if other != namespace]
+        for group_index, start in enumerate(range(0, len(own), spec.attributes_per_group)):
+            signal_type = rng.choice(SIGNAL_TYPES)
+            group_id = "{}.{}.{}".format(signal_type, namespace, group_index)
+            signals.append("  - id: {}".format(group_id))
+            signals.append("    type: {}".format(signal_type))
+            signals.append("    stability: {}".format(rng.choice(STABILITY_LEVELS)))
+            signals.append("    brief: {}".format(_quote("Synthetic {} {}.".format(signal_type, group_id))))
+            if signal_type == "span":
+                signals.append("    span_kind: {}".format(rng.choice(SPAN_KINDS)))
+            elif signal_type == "metric":
+                signals.append("    metric_name: {}.{}.duration".format(namespace, group_index))
+                signals.append("    instrument: {}".format(rng.choice(INSTRUMENTS)))
+                signals.append("    unit: s")
+            else:
+                signals.append("    name: {}.{}".format(namespace, group_index))
+
+            refs = own[start:start + spec.attributes_per_group]
+            cross = [
+                rng.choice(attributes[rng.choice(others)])
+                for _ in refs
+                if others and rng.random() < spec.cross_ref_ratio
+            ]
+            signals.append("    attributes:")
+            for ref in refs + sorted(set(cross) - set(refs)):
+                signals.append("      - ref: {}".format(ref))
+                requirement_level = rng.choice(REQUIREMENT_LEVELS)
+                if requirement_level == "conditionally_required":
+                    signals.append("        requirement_level:")
+                    signals.append("          conditionally_required: {}".format(_quote("If {} is available.".format(ref))))
+                else:
+                    signals.append("        requirement_level: {}".format(requirement_level))
+                summary["references"] += 1
+            summary["cross_references"] += len(set(cross) - set(refs))
+            summary["groups"] += 1
+        (package / "signals.yaml").write_text("\n".join(signals) + "\n")
+
+        summary["groups"] += 1
+        summary["files"] += 2
+
+        if build_files:
+            (package / "BUILD.bazel").write_text(
+                'load("@rules_weaver//weaver:defs.bzl", "weaver_schema")\n\n'
+                "weaver_schema(\n"
+                '    name = "schemas",\n'
+                '    srcs = ["registry.yaml", "signals.yaml"],\n'
+                '    visibility = ["//visibility:public"],\n'
+                ")\n"
+            )
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic semantic convention registry")
+    parser.add_argument("--output", required=True, help="Directory to write the registry to")
+    parser.add_argument("--attributes", type=int, default=1000,
+                        help="Total number of attributes ({} to {})".format(MIN_ATTRIBUTES, MAX_ATTRIBUTES))
+    parser.add_argument("--namespaces", type=int, default=10, help="Number of attribute namespaces")
+    parser.add_argument("--attributes-per-group", type=int, default=8, help="Attributes referenced per signal group")
+    parser.add_argument("--cross-ref-ratio", type=float, default=0.2,
+                        help="Share of references into other namespaces")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--build-files", action="store_true",
+                        help="Write a weaver_schema BUILD.bazel file per namespace")
+    args = parser.parse_args()
+
+    spec = RegistrySpec(args.attributes, args.namespaces, args.attributes_per_group, args.cross_ref_ratio, args.seed)
+    try:
+        summary = generate_registry(Path(args.output), spec, args.build_files)
+    except ValueError as e:
+        print("ERROR: {}".format(e))
+        return 1
+    print(json.dumps(summary, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for Weaver rules on synthetic semantic convention registries.
+
+For each size tier this script writes a registry with registry_generator.py
+(one `weaver_schema` target per namespace) and a workspace consuming it
+through `weaver_generate` and `weaver_validate_test` targets. It records:
+
+- Wall time of `bazel build --nobuild` (loading and analysis)
+- Wall time of building and testing the targets with caching disabled
+  (execution, after analysis)
+- Peak heap of the Bazel server (`bazel info peak-heap-size`)
+- Wall time and peak resident memory of the Weaver binary resolving and
+  checking the registry directly, outside Bazel
+- With the mock Weaver, wall time of the same commands served twice by one
+  mock in `--persistent_worker` mode: the first round is cold, the second
+  reuses the schemas the process has seen (the cost model's `warm_factor`)
+
+Results are written as JSON. With `--save-baseline` they become a baseline,
+and with `--baseline` every metric of every tier is compared against it and
+fails if it grew by more than `--threshold`.
+
+The workspace registers the mock Weaver toolchain by default, which measures
+the rules rather than Weaver. `--cost-model` gives the mock a load that
+scales with the registry (see weaver/tools/mock_weaver.py, e.g.
+`--cost-model realistic`); pass `--weaver-version` to download a real Weaver
+release instead, and `--weaver` to measure a real binary directly.
+
+Usage:
+    python3 tests/performance/registry_scaling_benchmark.py --save-baseline scaling_baseline.json
+    python3 tests/performance/registry_scaling_benchmark.py --tiers 1000,10000 --baseline scaling_baseline.json
+    python3 tests/performance/registry_scaling_benchmark.py --weaver-version 0.16.1 --weaver /usr/local/bin/weaver
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from analysis_scaling_benchmark import REPO_ROOT, parse_heap_bytes, run_bazel
+from registry_generator import MAX_ATTRIBUTES, MIN_ATTRIBUTES, RegistrySpec, generate_registry
+
+DEFAULT_TIERS = "10,1000,10000,100000"
+MOCK_WEAVER = REPO_ROOT / "weaver" / "tools" / "mock_weaver.py"
+
+# Metrics compared against a baseline; the worker metrics are only measured
+# with the mock Weaver
+METRICS = [
+    "analysis_seconds", "execution_seconds", "peak_heap_bytes", "weaver_seconds", "weaver_peak_rss_bytes",
+    "weaver_worker_cold_seconds", "weaver_worker_warm_seconds",
+]
+
+# Caching would turn the execution measurement into cache lookups
+NO_CACHE_FLAGS = ["--disk_cache=", "--noremote_accept_cached", "--nocache_test_results"]
+
+
+def _module_file(weaver_version) -> str:
+    """Get the MODULE.bazel of the benchmark workspace."""
+
+    content = (
+        'module(name = "weaver_registry_scaling_benchmark")\n'
+        'bazel_dep(name = "bazel_skylib", version = "1.4.2")\n'
+        'bazel_dep(name = "rules_weaver", version = "0.1.0")\n'
+        'local_path_override(module_name = "rules_weaver", path = "{}")\n'.format(REPO_ROOT)
+    )
+    if not weaver_version:
+        return content + 'register_toolchains("@rules_weaver//weaver:mock_weaver_toolchain")\n'
+    return content + (
+        'weaver = use_extension("@rules_weaver//weaver:extensions.bzl", "_weaver_repository_extension")\n'
+        'weaver.download(name = "weaver", version = "{}")\n'
+        'use_repo(weaver, "weaver")\n'
+        'register_toolchains("@weaver//:all")\n'.format(weaver_version)
+    )
+
+
+def generate_workspace(root: Path, spec: RegistrySpec, weaver_version, cost_model=None) -> dict:
+    """Generate a workspace with a synthetic registry and rules consuming all of it."""
+
+    (root / "MODULE.bazel").write_text(_module_file(weaver_version))
+    summary = generate_registry(root / "registry", spec, build_files=True)
+
+    registries = json.dumps(sorted(
+        "//registry/{}:schemas".format(package.name)
+        for package in (root / "registry").iterdir()
+        if package.is_dir()
+    ))
+    env = json.dumps({"MOCK_WEAVER_COST_MODEL": cost_model} if cost_model else {})
+    (root / "BUILD.bazel").write_text(
+        'load("@rules_weaver//weaver:defs.bzl", "weaver_generate", "weaver_validate_test")\n\n'
+        'weaver_generate(name = "generate", registries = {0}, target = "markdown", env = {1})\n\n'
+        'weaver_validate_test(name = "validate", registries = {0}, env = {1})\n'.format(registries, env)
+    )
+    return summary
+
+
+def _weaver_commands(registry: Path, output_dir: Path) -> list:
+    """Return the Weaver commands measured outside Bazel."""
+
+    return [
+        ["registry", "resolve", "--registry", str(registry), "--format", "json", "--output", str(output_dir / "resolved.json")],
+        ["registry", "check", "--registry", str(registry)],
+    ]
+
+
+def measure_weaver(weaver, registry: Path, output_dir: Path) -> dict:
+    """Time the Weaver binary resolving and checking the registry, and record its peak memory."""
+
+    seconds = 0.0
+    peak_rss = 0
+    for command in _weaver_commands(registry, output_dir):
+        start = time.monotonic()
+        process = subprocess.Popen(weaver + command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        seconds += time.monotonic() - start
+        if process.returncode != 0:
+            raise RuntimeError("weaver {} failed with exit code {}".format(" ".join(command[:2]), process.returncode))
+
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        peak_rss = max(peak_rss, usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024)
+
+    return {"weaver_seconds": round(seconds, 3), "weaver_peak_rss_bytes": peak_rss}
+
+
+def measure_weaver_worker(weaver, registry: Path, output_dir: Path) -> dict:
+    """Time two rounds of the Weaver commands served by one mock Weaver worker process."""
+
+    process = subprocess.Popen(
+        weaver + ["--persistent_worker"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    rounds = []
+    try:
+        for _ in range(2):
+            start = time.monotonic()
+            for command in _weaver_commands(registry, output_dir):
+                process.stdin.write(json.dumps({"arguments": command}) + "\n")
+                process.stdin.flush()
+                response = json.loads(process.stdout.readline() or "null")
+                if response is None or response["exitCode"] != 0:
+                    raise RuntimeError("mock Weaver worker failed {}: {}".format(
+                        " ".join(command[:2]), response and response["output"]))
+            rounds.append(round(time.monotonic() - start, 3))
+    finally:
+        process.stdin.close()
+        process.wait()
+
+    return {"weaver_worker_cold_seconds": rounds[0], "weaver_worker_warm_seconds": rounds[1]}
+
+
+def measure(args: argparse.Namespace, attributes: int) -> dict:
+    """Measure one size tier."""
+
+    spec = RegistrySpec(attributes, args.namespaces, args.attributes_per_group, args.cross_ref_ratio, args.seed)
+    workspace = Path(tempfile.mkdtemp(prefix="weaver_registry_scaling_{}_".format(attributes)))
+    try:
+        summary = generate_workspace(workspace, spec, args.weaver_version, args.cost_model)
+        targets = ["//:generate", "//:validate"]
+
+        # Start the server, fetch dependencies and load the registry packages
+        # outside the measurement
+        run_bazel(args.bazel, workspace, ["build", "--nobuild", "//registry/..."])
+
+        start = time.monotonic()
+        run_bazel(args.bazel, workspace, ["build", "--nobuild"] + targets)
+        analysis_seconds = time.monotonic() - start
+
+        start = time.monotonic()
+        run_bazel(args.bazel, workspace, ["test"] + NO_CACHE_FLAGS + targets)
+        execution_seconds = time.monotonic() - start
+
+        heap = run_bazel(args.bazel, workspace, ["info", "peak-heap-size"])
+
+        result = {
+            "attributes": attributes,
+            "namespaces": summary["namespaces"],
+            "files": summary["files"],
+            "groups": summary["groups"],
+            "references": summary["references"],
+            "analysis_seconds": round(analysis_seconds, 3),
+            "execution_seconds": round(execution_seconds, 3),
+            "peak_heap_bytes": parse_heap_bytes(heap.stdout),
+        }
+        result.update(measure_weaver(args.weaver, workspace / "registry", workspace))
+        if args.mock_weaver:
+            result.update(measure_weaver_worker(args.weaver, workspace / "registry", workspace))
+        return result
+    finally:
+        run_bazel(args.bazel, workspace, ["shutdown"], check=False)
+        if args.keep:
+            print("Kept workspace {}".format(workspace))
+        else:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+
+def compare(report: dict, baseline: dict, threshold: float):
+    """Return a list of metrics that grew over the baseline."""
+
+    for key in ("weaver_version", "cost_model", "registry"):
+        if baseline.get(key) != report[key]:
+            return ["baseline {} is {}, not {}".format(key, baseline.get(key), report[key])]
+
+    failures = []
+    results = report["tiers"]
+    before_tiers = {tier["attributes"]: tier for tier in baseline.get("tiers", [])}
+    for result in results:
+        before = before_tiers.get(result["attributes"])
+        if before is None:
+            print("No baseline for {} attributes".format(result["attributes"]))
+            continue
+        for metric in METRICS:
+            previous = before.get(metric) or 0
+            if previous > 0 and metric in result and result[metric] > previous * (1 + threshold):
+                failures.append("{} attributes: {} grew from {} to {} (+{:.0%})".format(
+                    result["attributes"], metric, previous, result[metric], result[metric] / previous - 1))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmark for Weaver rules on synthetic registries")
+    parser.add_argument("--bazel", default=os.environ.get("BAZEL", "bazel"), help="Bazel binary")
+    parser.add_argument("--tiers", default=DEFAULT_TIERS,
+                        help="Comma-separated attribute counts ({} to {})".format(MIN_ATTRIBUTES, MAX_ATTRIBUTES))
+    parser.add_argument("--namespaces", type=int, default=50, help="Attribute namespaces per registry")
+    parser.add_argument("--attributes-per-group", type=int, default=8, help="Attributes referenced per signal group")
+    parser.add_argument("--cross-ref-ratio", type=float, default=0.2, help="Share of references into other namespaces")
+    parser.add_argument("--seed", type=int, default=0, help="Registry generator seed")
+    parser.add_argument("--weaver-version", help="Download this Weaver release instead of using the mock toolchain")
+    parser.add_argument("--weaver", help="Weaver binary to measure directly (default: the mock Weaver)")
+    parser.add_argument("--cost-model", help="Cost model of the mock Weaver, such as `realistic`")
+    parser.add_argument("--baseline", help="Compare against results saved with --save-baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative growth over the baseline")
+    parser.add_argument("--save-baseline", help="Save the results as a baseline to this file")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--keep", action="store_true", help="Keep generated workspaces")
+    args = parser.parse_args()
+
+    if not shutil.which(args.bazel):
+        print("ERROR: Bazel not found: {}".format(args.bazel))
+        return 1
+    args.mock_weaver = not args.weaver
+    if args.weaver:
+        args.weaver = [args.weaver]
+    else:
+        args.weaver = [sys.executable, str(MOCK_WEAVER)]
+        if args.cost_model:
+            args.weaver += ["--cost-model", args.cost_model]
+
+    tiers = sorted(int(tier) for tier in args.tiers.split(","))
+    if tiers[0] < MIN_ATTRIBUTES or tiers[-1] > MAX_ATTRIBUTES:
+        print("ERROR: tiers must be between {} and {} attributes".format(MIN_ATTRIBUTES, MAX_ATTRIBUTES))
+        return 1
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+
+    results = []
+    for attributes in tiers:
+        print("Benchmarking a registry of {} attributes...".format(attributes))
+        result = measure(args, attributes)
+        print("  analysis {analysis_seconds}s, execution {execution_seconds}s, peak heap {peak_heap_bytes} bytes, "
+              "weaver {weaver_seconds}s / {weaver_peak_rss_bytes} bytes".format(**result))
+        if "weaver_worker_cold_seconds" in result:
+            print("  weaver worker {weaver_worker_cold_seconds}s cold, {weaver_worker_warm_seconds}s warm".format(**result))
+        results.append(result)
+
+    report = {
+        "weaver_version": args.weaver_version or "mock",
+        "cost_model": args.cost_model,
+        "registry": {
+            "namespaces": args.namespaces,
+            "attributes_per_group": args.attributes_per_group,
+            "cross_ref_ratio": args.cross_ref_ratio,
+            "seed": args.seed,
+        },
+        "tiers": results,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+
+    failures = compare(report, baseline, args.threshold) if baseline else []
+    for failure in failures:
+        print("FAIL: {}".format(failure))
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -31,17 +31,18 @@ def _test_execution_requirements(ctx):
     """Test execution requirements for remote execution."""
     env = unittest.begin(ctx)
     
-    # Test default execution requirements
+    # Test default execution requirements; actions stay sandboxed,
+    # cacheable and without network access
     requirements = get_execution_requirements()
-    asserts.true(env, "no-sandbox" in requirements, "Should have no-sandbox requirement")
-    asserts.true(env, "supports-workers" in requirements, "Should have supports-workers requirement")
-    asserts.true(env, "requires-network" in requirements, "Should have requires-network requirement")
+    asserts.false(env, "no-sandbox" in requirements, "Should not disable sandboxing")
+    asserts.false(env, "no-cache" in requirements, "Should not disable caching")
+    asserts.false(env, "requires-network" in requirements, "Should not require network access")
     
     # Test platform-specific requirements
     for platform in get_supported_platforms():
         platform_requirements = get_execution_requirements(platform)
-        asserts.true(env, "no-sandbox" in platform_requirements, 
-                    "Platform {} should have no-sandbox requirement".format(platform))
+        asserts.false(env, "no-sandbox" in platform_requirements, 
+                    "Platform {} should not disable sandboxing".format(platform))
     
     return unittest.end(env)
 
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Cold-fetch benchmark for the weaver_repository rule.
+
+This script builds a local release-style archive (`weaver-<triple>/weaver`
+plus padding), generates a workspace that downloads it through the
+`weaver_repository` extension from a `file://` URL, and times repeated
+forced fetches of the repository with the repository cache disabled. Each
+run therefore downloads, verifies and extracts the archive and looks up the
+binary, as on a fresh CI runner.
+
+Usage:
+    python3 tests/performance/repository_fetch_benchmark.py
+    python3 tests/performance/repository_fetch_benchmark.py --runs 10 --padding-mib 64 --output results.json
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+REPOSITORY_NAME = "weaver_bench"
+
+# Host (system, machine) to Weaver release target triple
+TARGET_TRIPLES = {
+    ("Linux", "x86_64"): "x86_64-unknown-linux-gnu",
+    ("Linux", "aarch64"): "aarch64-unknown-linux-gnu",
+    ("Darwin", "x86_64"): "x86_64-apple-darwin",
+    ("Darwin", "arm64"): "aarch64-apple-darwin",
+}
+
+
+def host_target_triple() -> str:
+    """Return the Weaver release target triple of this host."""
+
+    triple = TARGET_TRIPLES.get((platform.system(), platform.machine()))
+    if not triple:
+        raise RuntimeError("Unsupported host: {} {}".format(platform.system(), platform.machine()))
+    return triple
+
+
+def build_archive(path: Path, triple: str, padding_mib: int) -> str:
+    """Write a release-style tar.xz archive and return its SHA-256."""
+
+    prefix = "weaver-" + triple
+    members = {
+        prefix + "/weaver": (b"#!/bin/sh\necho weaver 0.0.0\n", 0o755),
+        prefix + "/README.md": (b"# Weaver\n", 0o644),
+        prefix + "/LICENSE": (b"Apache-2.0\n", 0o644),
+        # Incompressible payload standing in for the real binary size
+        prefix + "/lib/payload.bin": (os.urandom(padding_mib << 20), 0o644),
+    }
+
+    with tarfile.open(str(path), "w:xz", preset=0) as archive:
+        for name, (data, mode) in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = mode
+            archive.addfile(info, io.BytesIO(data))
+
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def generate_workspace(root: Path, archive: Path, sha256: str, triple: str):
+    """Generate a workspace fetching the archive through weaver_repository."""
+
+    (root / "MODULE.bazel").write_text(
+        'module(name = "weaver_fetch_benchmark")\n'
+        'bazel_dep(name = "bazel_skylib", version = "1.4.2")\n'
+        'bazel_dep(name = "rules_weaver", version = "0.1.0")\n'
+        'local_path_override(module_name = "rules_weaver", path = "{root}")\n'
+        'weaver = use_extension("@rules_weaver//weaver:extensions.bzl", "_weaver_repository_extension")\n'
+        'weaver.download(\n'
+        '    name = "{name}",\n'
+        '    version = "0.0.0",\n'
+        '    sha256 = "{sha256}",\n'
+        '    urls = ["{url}"],\n'
+        '    strip_prefix = "weaver-{triple}",\n'
+        ')\n'
+        'use_repo(weaver, "{name}")\n'.format(
+            root=REPO_ROOT,
+            name=REPOSITORY_NAME,
+            sha256=sha256,
+            url=archive.resolve().as_uri(),
+            triple=triple,
+        )
+    )
+    (root / "BUILD.bazel").write_text("")
+
+
+def run_bazel(bazel: str, workspace: Path, args, check: bool = True) -> subprocess.CompletedProcess:
+    """Run a Bazel command in a workspace."""
+
+    result = subprocess.run(
+        [bazel] + args,
+        cwd=str(workspace),
+        capture_output=True,
+        text=True,
+    )
+    if check and result.returncode != 0:
+        raise RuntimeError("bazel {} failed:\n{}".format(" ".join(args), result.stderr))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold fetches of weaver_repository")
+    parser.add_argument("--bazel", default=os.environ.get("BAZEL", "bazel"), help="Bazel binary")
+    parser.add_argument("--runs", type=int, default=5, help="Number of timed fetches")
+    parser.add_argument("--padding-mib", type=int, default=32, help="Archive payload size in MiB")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated workspace")
+    args = parser.parse_args()
+
+    if not shutil.which(args.bazel):
+        print("ERROR: Bazel not found: {}".format(args.bazel))
+        return 1
+
+    triple = host_target_triple()
+    workspace = Path(tempfile.mkdtemp(prefix="weaver_fetch_"))
+    try:
+        archive = workspace / "weaver-{}.tar.xz".format(triple)
+        sha256 = build_archive(archive, triple, args.padding_mib)
+        generate_workspace(workspace, archive, sha256, triple)
+
+        fetch = ["fetch", "--force", "--repository_cache=", "--repo=@" + REPOSITORY_NAME]
+
+        # Start the server and resolve the module graph outside the measurement
+        run_bazel(args.bazel, workspace, fetch)
+
+        timings = []
+        for run in range(args.runs):
+            start = time.monotonic()
+            run_bazel(args.bazel, workspace, fetch)
+            timings.append(time.monotonic() - start)
+            print("Run {}: {:.3f}s".format(run + 1, timings[-1]))
+
+        results = {
+            "archive_bytes": archive.stat().st_size,
+            "runs": len(timings),
+            "min_seconds": round(min(timings), 3),
+            "median_seconds": round(statistics.median(timings), 3),
+            "max_seconds": round(max(timings), 3),
+        }
+        print("Cold fetch of {archive_bytes} byte archive: min {min_seconds}s, "
+              "median {median_seconds}s, max {max_seconds}s".format(**results))
+
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+    finally:
+        run_bazel(args.bazel, workspace, ["shutdown"], check=False)
+        if args.keep:
+            print("Kept workspace {}".format(workspace))
+        else:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Tests for the test runner orchestrator, tests/utils/bazel_orchestrator.py.
+
+The tests cover the pure parts of the orchestrator, without running Bazel:
+merging groups into invocations, reading target results from Build Event
+Protocol files, attributing results to groups, including tests expanded
+from a `test_suite` and groups expected to fail, and the JUnit XML and JSON
+reports CI reads.
+
+Run with `bazel test //tests/tools:bazel_orchestrator_test` or
+`python3 -m pytest tests/tools`.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).absolute().parents[1] / "utils"))
+
+import bazel_orchestrator  # noqa: E402
+from bazel_orchestrator import (  # noqa: E402
+    EXPECT_ANY,
+    EXPECT_FAIL,
+    InvocationResult,
+    TargetResult,
+)
+
+# Imported under another name, as pytest would collect a Test* class
+Group = bazel_orchestrator.TestGroup
+
+
+def options(*arguments) -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    bazel_orchestrator.add_arguments(parser)
+    return parser.parse_args(list(arguments))
+
+
+class PlanInvocationsTest(unittest.TestCase):
+    """Tests for merging groups into Bazel invocations."""
+
+    def test_groups_with_the_same_key_are_merged(self):
+        groups = [
+            Group("unit", ["//tests/unit:all_unit_tests"]),
+            Group("schemas", ["//tests/schemas:all"], command="build"),
+            Group("verbose", ["//tests/integration:all"], flags=["--test_output=all"]),
+            Group("broken", ["//tests/broken:all"], expect=EXPECT_FAIL),
+            Group("tools", ["//tests/tools:all_tool_tests"]),
+        ]
+
+        invocations = bazel_orchestrator.plan_invocations(groups)
+
+        self.assertEqual(["unit + schemas + tools", "verbose", "broken"], [invocation.name for invocation in invocations])
+        self.assertEqual(["test", "test", "test"], [invocation.command for invocation in invocations])
+        self.assertEqual(("--test_output=all",), invocations[1].flags)
+        self.assertEqual(EXPECT_FAIL, invocations[2].expect)
+
+    def test_queries_are_never_merged(self):
+        groups = [Group("first", ["//..."], command="query"), Group("second", ["//..."], command="query")]
+
+        invocations = bazel_orchestrator.plan_invocations(groups)
+
+        self.assertEqual([["first"], ["second"]], [[group.name for group in invocation.groups] for invocation in invocations])
+        self.assertEqual(["query", "query"], [invocation.command for invocation in invocations])
+
+    def test_no_merge_keeps_one_invocation_per_group(self):
+        groups = [Group("unit", ["//a:test"]), Group("tools", ["//b:test"])]
+
+        invocations = bazel_orchestrator.plan_invocations(groups, merge=False)
+
+        self.assertEqual(["unit", "tools"], [invocation.name for invocation in invocations])
+
+
+class ParseBuildEventsTest(unittest.TestCase):
+    """Tests for reading target results from Build Event Protocol files."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "events.json"
+
+    def parse(self, events: list, trailer: str = "") -> dict:
+        self.path.write_text("".join(json.dumps(event) + "\n" for event in events) + trailer)
+        return bazel_orchestrator.parse_build_events(self.path)
+
+    def test_missing_file(self):
+        self.assertEqual({}, bazel_orchestrator.parse_build_events(self.path))
+
+    def test_target_results(self):
+        results = self.parse([
+            {"id": {"targetCompleted": {"label": "@@//tests/unit:a_test"}}, "completed": {"success": True}},
+            {"id": {"testSummary": {"label": "@@//tests/unit:a_test"}},
+             "testSummary": {"overallStatus": "PASSED", "totalRunDurationMillis": "1500"}},
+            # A late targetCompleted event does not replace the test summary
+            {"id": {"targetCompleted": {"label": "@@//tests/unit:a_test"}}, "completed": {"success": True}},
+            {"id": {"testSummary": {"label": "@//tests/unit:b_test"}},
+             "testSummary": {"overallStatus": "FAILED", "totalRunDuration": "2.250s"}},
+            {"id": {"targetCompleted": {"label": "@@//tests/schemas:all"}}, "completed": {"success": True}},
+            {"id": {"targetCompleted": {"label": "@@//tests/schemas:broken"}}, "completed": {}},
+            {"id": {"pattern": {"pattern": ["//missing/..."]}}, "aborted": {"reason": "LOADING_FAILURE"}},
+            {"id": {"unconfiguredLabel": {"label": "@@//tests/unit:gone"}}, "aborted": {"reason": "ANALYSIS_FAILURE"}},
+            {"id": {"progress": {"opaqueCount": 1}}, "progress": {}},
+        ], trailer='{"id": {"testSummary"')
+
+        self.assertEqual({
+            "//tests/unit:a_test": TargetResult("//tests/unit:a_test", "PASSED", 1.5),
+            "//tests/unit:b_test": TargetResult("//tests/unit:b_test", "FAILED", 2.25),
+            "//tests/schemas:all": TargetResult("//tests/schemas:all", "BUILT", 0.0),
+            "//tests/schemas:broken": TargetResult("//tests/schemas:broken", "FAILED_TO_BUILD", 0.0),
+            "//missing/...": TargetResult("//missing/...", "FAILED_TO_BUILD", 0.0),
+            "//tests/unit:gone": TargetResult("//tests/unit:gone", "FAILED_TO_BUILD", 0.0),
+        }, results)
+
+    def test_external_labels_are_kept(self):
+        results = self.parse([
+            {"id": {"testSummary": {"label": "@@rules_weaver+//tests:x_test"}}, "testSummary": {"overallStatus": "PASSED"}},
+        ])
+
+        self.assertEqual(["@@rules_weaver+//tests:x_test"], list(results))
+
+
+def invocation_result(groups: list, targets: list, exit_code: int = 0, expansions=None, timed_out=False,
+                      command: str = "test") -> InvocationResult:
+    """Build the result of an invocation running groups."""
+
+    invocation = bazel_orchestrator.Invocation(
+        " + ".join(group.name for group in groups), groups, command, (), groups[0].expect)
+    return InvocationResult(
+        invocation=invocation,
+        argv=["bazel", command],
+        output_base=None,
+        exit_code=exit_code,
+        seconds=4.5,
+        timed_out=timed_out,
+        stdout="stdout",
+        stderr="line 1\nERROR: build failed",
+        targets={target.label: target for target in targets},
+        expansions=expansions or {},
+    )
+
+
+class GroupResultsTest(unittest.TestCase):
+    """Tests for attributing target results to groups."""
+
+    def setUp(self):
+        self.orchestrator = bazel_orchestrator.Orchestrator("suite", options(), workspace=tempfile.gettempdir())
+
+    def group_results(self, *args, **kwargs) -> dict:
+        results = self.orchestrator._group_results(invocation_result(*args, **kwargs))
+        return {result.name: result for result in results}
+
+    def test_targets_are_attributed_to_the_groups_listing_them(self):
+        results = self.group_results(
+            [Group("unit", ["//unit:a_test"]), Group("schemas", ["//schemas:all"], command="build")],
+            [TargetResult("//unit:a_test", "PASSED", 1.0), TargetResult("//schemas:all", "BUILT", 0.0)],
+        )
+
+        self.assertEqual(["//unit:a_test"], [target.label for target in results["unit"].targets])
+        self.assertEqual(["//schemas:all"], [target.label for target in results["schemas"].targets])
+        self.assertTrue(results["unit"].passed and results["schemas"].passed)
+        self.assertEqual("unit + schemas", results["unit"].invocation)
+
+    def test_single_test_suite_takes_the_unclaimed_tests(self):
+        results = self.group_results(
+            [Group("unit", ["//unit:a_test"]), Group("suite", ["//suite:all_tests"])],
+            [TargetResult("//unit:a_test", "PASSED", 1.0), TargetResult("//suite:x_test", "FAILED", 2.0),
+             TargetResult("//suite:y_test", "PASSED", 1.0)],
+            exit_code=3,
+        )
+
+        self.assertEqual(["//unit:a_test"], [target.label for target in results["unit"].targets])
+        self.assertEqual(["//suite:x_test", "//suite:y_test"], [target.label for target in results["suite"].targets])
+        self.assertTrue(results["unit"].passed)
+        self.assertFalse(results["suite"].passed)
+        self.assertEqual("//suite:x_test: FAILED", results["suite"].message)
+
+    def test_test_suites_are_split_by_their_expansions(self):
+        results = self.group_results(
+            [Group("first", ["//first:all_tests"]), Group("second", ["//second:all_tests"])],
+            [TargetResult("//first:a_test", "PASSED", 1.0), TargetResult("//second:b_test", "FAILED", 1.0)],
+            exit_code=3,
+            expansions={"first": ["//first:a_test"], "second": ["//second:b_test"]},
+        )
+
+        self.assertEqual(["//first:a_test"], [target.label for target in results["first"].targets])
+        self.assertEqual(["//second:b_test"], [target.label for target in results["second"].targets])
+        self.assertTrue(results["first"].passed)
+        self.assertFalse(results["second"].passed)
+
+    def test_expected_failures(self):
+        failing = Group("failing", ["//broken:a_test"], expect=EXPECT_FAIL)
+        passing = Group("passing", ["//broken:b_test"], expect=EXPECT_FAIL)
+        results = self.group_results(
+            [failing, passing],
+            [TargetResult("//broken:a_test", "FAILED", 1.0), TargetResult("//broken:b_test", "PASSED", 1.0)],
+            exit_code=3,
+        )
+
+        self.assertTrue(results["failing"].passed)
+        self.assertFalse(results["failing"].outcome)
+        self.assertEqual("", results["failing"].message)
+        self.assertFalse(results["passing"].passed)
+        self.assertEqual("Expected failure, but all targets passed", results["passing"].message)
+
+    def test_any_outcome_passes(self):
+        results = self.group_results(
+            [Group("flaky", ["//flaky:a_test"], expect=EXPECT_ANY)],
+            [TargetResult("//flaky:a_test", "FAILED", 1.0)],
+            exit_code=3,
+        )
+
+        self.assertTrue(results["flaky"].passed)
+        self.assertFalse(results["flaky"].outcome)
+
+    def test_groups_without_reported_targets_use_the_exit_code(self):
+        results = self.group_results([Group("query", ["//..."], command="query")], [], exit_code=7, command="query")
+
+        self.assertFalse(results["query"].passed)
+        self.assertEqual("line 1\nERROR: build failed", results["query"].message)
+
+    def test_timeouts_fail(self):
+        results = self.group_results(
+            [Group("slow", ["//slow:a_test"])], [TargetResult("//slow:a_test", "PASSED", 1.0)], timed_out=True,
+        )
+
+        self.assertFalse(results["slow"].passed)
+
+
+class ReportTest(unittest.TestCase):
+    """Tests for the JUnit XML and JSON reports."""
+
+    def setUp(self):
+        self.orchestrator = bazel_orchestrator.Orchestrator("integration", options(), workspace=tempfile.gettempdir())
+        results = self.orchestrator._group_results(invocation_result(
+            [
+                Group("unit", ["//unit:a_test", "//unit:b_test"]),
+                Group("broken", ["//broken:a_test"], expect=EXPECT_FAIL),
+            ],
+            [TargetResult("//unit:a_test", "PASSED", 1.25), TargetResult("//unit:b_test", "FAILED", 2.0),
+             TargetResult("//broken:a_test", "FAILED", 0.5)],
+            exit_code=3,
+        ))
+        self.orchestrator.group_results.extend(results)
+        self.orchestrator.record("docs", True, 0.25)
+
+    def test_junit_xml(self):
+        root = self.orchestrator.junit_xml().getroot()
+
+        self.assertEqual(("integration", "4", "1"), (root.get("name"), root.get("tests"), root.get("failures")))
+        suites = {suite.get("name"): suite for suite in root.findall("testsuite")}
+        self.assertEqual(["unit", "broken", "docs"], list(suites))
+
+        # Targets of a group are test cases, with their failures
+        unit = suites["unit"]
+        self.assertEqual(("2", "1", "4.500"), (unit.get("tests"), unit.get("failures"), unit.get("time")))
+        cases = {case.get("name"): case for case in unit.findall("testcase")}
+        self.assertEqual(["//unit:a_test", "//unit:b_test"], list(cases))
+        self.assertEqual("1.250", cases["//unit:a_test"].get("time"))
+        self.assertIsNone(cases["//unit:a_test"].find("failure"))
+        failure = cases["//unit:b_test"].find("failure")
+        self.assertEqual("FAILED", failure.get("message"))
+        self.assertEqual("//unit:b_test: FAILED", failure.text)
+
+        # A group that fails as expected is one passing test case
+        broken = suites["broken"]
+        self.assertEqual(("1", "0"), (broken.get("tests"), broken.get("failures")))
+        self.assertEqual([("integration", "broken")],
+                         [(case.get("classname"), case.get("name")) for case in broken.findall("testcase")])
+        self.assertIsNone(broken.find("testcase/failure"))
+
+        self.assertEqual(("1", "0"), (suites["docs"].get("tests"), suites["docs"].get("failures")))
+
+    def test_json_report(self):
+        report = json.loads(json.dumps(self.orchestrator.report()))
+
+        self.assertEqual(("integration", 2, 1, 1, True), (
+            report["suite"], report["passed"], report["failed"], report["jobs"], report["merged"]))
+        self.assertEqual({
+            "status": "PASS",
+            "outcome": "FAIL",
+            "invocation": "unit + broken",
+            "seconds": 4.5,
+            "message": "",
+            "targets": {"//broken:a_test": {"status": "FAILED", "seconds": 0.5}},
+        }, report["groups"]["broken"])
+        self.assertEqual("FAIL", report["groups"]["unit"]["status"])
+        self.assertEqual({"status": "PASS", "outcome": "PASS", "invocation": None, "seconds": 0.25, "message": "",
+                          "targets": {}}, report["groups"]["docs"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for the shard merge tool, weaver/tools/merge_shards.py.
+
+The tests cover merging shard output directories, including files generated
+by several shards with the same or different content, and the exit code of
+combined validation reports.
+
+Run with `bazel test //tests/tools:merge_shards_test` or
+`python3 -m pytest tests/tools`.
+"""
+
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).absolute().parents[2] / "weaver" / "tools"))
+
+import merge_shards  # noqa: E402
+
+
+class MergeShardsTestCase(unittest.TestCase):
+    """Base class providing a scratch directory."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+
+    def write(self, relative: str, content: str) -> str:
+        path = self.root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        return str(path)
+
+
+class MergeTreesTest(MergeShardsTestCase):
+    """Tests for merging shard output directories."""
+
+    def test_disjoint_shards_are_copied(self):
+        self.write("shard_0/http/attributes.go", "http")
+        self.write("shard_1/db/attributes.go", "db")
+
+        conflicts = merge_shards.merge_trees(str(self.root / "out"), [str(self.root / "shard_0"), str(self.root / "shard_1")])
+
+        self.assertEqual([], conflicts)
+        self.assertEqual("http", (self.root / "out/http/attributes.go").read_text())
+        self.assertEqual("db", (self.root / "out/db/attributes.go").read_text())
+
+    def test_identical_files_do_not_conflict(self):
+        self.write("shard_0/README.md", "generated")
+        self.write("shard_1/README.md", "generated")
+
+        conflicts = merge_shards.merge_trees(str(self.root / "out"), [str(self.root / "shard_0"), str(self.root / "shard_1")])
+
+        self.assertEqual([], conflicts)
+        self.assertEqual("generated", (self.root / "out/README.md").read_text())
+
+    def test_aggregate_files_conflict(self):
+        # A template writing one index of the whole registry sees only its shard's groups
+        for shard, content in [("shard_0", "http"), ("shard_1", "db"), ("shard_2", "http")]:
+            self.write(shard + "/index.go", content)
+            self.write(shard + "/nested/all.go", content)
+
+        conflicts = merge_shards.merge_trees(
+            str(self.root / "out"), [str(self.root / shard) for shard in ("shard_0", "shard_1", "shard_2")],
+        )
+
+        self.assertEqual(["index.go", "nested/all.go"], conflicts)
+        # The first shard's file is kept
+        self.assertEqual("http", (self.root / "out/index.go").read_text())
+
+    def test_tree_command_fails_on_conflicts(self):
+        self.write("shard_0/index.go", "http")
+        self.write("shard_1/index.go", "db")
+
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            status = merge_shards.main(["tree", "--output", str(self.root / "out"),
+                                        str(self.root / "shard_0"), str(self.root / "shard_1")])
+
+        self.assertEqual(1, status)
+        self.assertIn("  index.go", stderr.getvalue())
+        self.assertIn("registry_shards = 1", stderr.getvalue())
+
+
+class MergeDiagnosticsTest(MergeShardsTestCase):
+    """Tests for combining validation reports."""
+
+    def report(self, name: str, exit_code: int) -> str:
+        return self.write(name, json.dumps({
+            "version": 1,
+            "command": ["weaver", "registry", "check"],
+            "exit_code": exit_code,
+            "diagnostics": [{"shard": name}],
+        }))
+
+    def merge(self, *reports) -> dict:
+        output = self.root / "merged.json"
+        self.assertEqual(0, merge_shards.main(["diagnostics", "--output", str(output)] + list(reports)))
+        return json.loads(output.read_text())
+
+    def test_passing_shards_exit_zero(self):
+        merged = self.merge(self.report("a.json", 0), self.report("b.json", 0))
+
+        self.assertEqual(0, merged["exit_code"])
+        self.assertEqual(["weaver", "registry", "check"], merged["command"])
+        self.assertEqual([[{"shard": "a.json"}], [{"shard": "b.json"}]], [shard["diagnostics"] for shard in merged["shards"]])
+
+    def test_first_failing_exit_code_wins(self):
+        merged = self.merge(self.report("a.json", 0), self.report("b.json", -9), self.report("c.json", 1))
+
+        self.assertEqual(-9, merged["exit_code"])
+        self.assertEqual([0, -9, 1], [shard["exit_code"] for shard in merged["shards"]])
+
+    def test_no_reports(self):
+        merged = self.merge()
+
+        self.assertEqual({"version": 1, "command": [], "exit_code": 0, "shards": []}, merged)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Tests for the mock Weaver, weaver/tools/mock_weaver.py.
+
+The tests cover parsing of cost models, CPU time, memory and output that
+scale with the size of the input schemas, and the persistent worker mode:
+responses to work requests, startup arguments, schemas kept warm across
+requests, and invalid requests that fail without stopping the worker.
+
+Run with `bazel test //tests/tools:mock_weaver_test` or
+`python3 -m pytest tests/tools`.
+"""
+
+import io
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+TOOLS_DIR = Path(__file__).absolute().parents[2] / "weaver" / "tools"
+sys.path.insert(0, str(TOOLS_DIR))
+
+import mock_weaver  # noqa: E402
+
+PASSING_SCHEMA = "groups:\n  - id: passing\n    type: attribute_group\n"
+FAILING_SCHEMA = "groups: []\nmock_weaver: fail\n"
+
+
+def schemas(kib: int, count: int = 4) -> list:
+    """Return schemas of `kib` KiB in total."""
+
+    return [mock_weaver.Schema("schema{}.yaml".format(index), False, kib * 1024 // count) for index in range(count)]
+
+
+def cpu_seconds(model, input_schemas, warm_schemas=None) -> float:
+    start = time.process_time()
+    mock_weaver.spend(model, input_schemas, warm_schemas)
+    return time.process_time() - start
+
+
+class CostModelTest(unittest.TestCase):
+    """Tests for the cost model."""
+
+    def test_no_cost_model(self):
+        self.assertIsNone(mock_weaver.parse_cost_model(None))
+        self.assertIsNone(mock_weaver.parse_cost_model(""))
+        self.assertEqual(0, len(mock_weaver.spend(None, schemas(1024))))
+
+    def test_preset_coefficients_are_overridden(self):
+        model = mock_weaver.parse_cost_model("realistic, cpu_ms_per_kib=4,warm_factor=0")
+
+        self.assertEqual(50.0, model.cpu_base_ms)
+        self.assertEqual(4.0, model.cpu_ms_per_kib)
+        self.assertEqual(0.0, model.warm_factor)
+        self.assertEqual(mock_weaver.CostModel(), mock_weaver.parse_cost_model("none"))
+
+    def test_invalid_cost_models(self):
+        for spec, message in [
+            ("fast", "unknown cost model preset"),
+            ("cpu_ms=1", "unknown cost model coefficient"),
+            ("cpu_base_ms=slow", "invalid value"),
+            ("cpu_base_ms=-1", "must not be negative"),
+        ]:
+            with self.subTest(spec=spec), self.assertRaisesRegex(ValueError, message):
+                mock_weaver.parse_cost_model(spec)
+
+    def test_memory_scales_with_input_size(self):
+        model = mock_weaver.parse_cost_model("memory_base_mib=1,memory_kib_per_kib=2")
+
+        self.assertEqual((1 << 20) + 2 * 100 * 1024, len(mock_weaver.spend(model, schemas(100))))
+        self.assertEqual((1 << 20) + 2 * 1000 * 1024, len(mock_weaver.spend(model, schemas(1000))))
+
+    def test_cpu_time_scales_with_input_size(self):
+        model = mock_weaver.parse_cost_model("cpu_ms_per_kib=2")
+
+        small = cpu_seconds(model, schemas(10))
+        large = cpu_seconds(model, schemas(100))
+
+        self.assertGreaterEqual(large, 0.2)
+        self.assertGreater(large, small * 2)
+
+    def test_warm_schemas_cost_the_warm_factor(self):
+        model = mock_weaver.parse_cost_model("cpu_ms_per_kib=2,warm_factor=0")
+        input_schemas = schemas(100)
+
+        cold = cpu_seconds(model, input_schemas)
+        warm = cpu_seconds(model, input_schemas, set(input_schemas))
+
+        self.assertGreaterEqual(cold, 0.2)
+        self.assertLess(warm, cold / 2)
+
+    def test_output_scales_with_schema_size(self):
+        model = mock_weaver.parse_cost_model("output_bytes_per_kib=100")
+        with tempfile.TemporaryDirectory() as directory:
+            mock_weaver.write_outputs(directory, "go", [
+                mock_weaver.Schema("small.yaml", False, 1024),
+                mock_weaver.Schema("large.yaml", False, 10 * 1024),
+            ], model)
+            header = len("Generated by mock Weaver (go) from small.yaml\n")
+
+            self.assertEqual(header + 100, (Path(directory) / "small.go").stat().st_size)
+            self.assertEqual(header + 1000, (Path(directory) / "large.go").stat().st_size)
+
+
+class PersistentWorkerTest(unittest.TestCase):
+    """Tests driving the mock as a persistent worker."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        for name, content in [("passing", PASSING_SCHEMA), ("failing", FAILING_SCHEMA)]:
+            (self.root / name).mkdir()
+            (self.root / name / "registry.yaml").write_text(content)
+
+    def serve(self, requests: list, *startup_arguments) -> list:
+        """Send work requests to a mock worker process and return its responses."""
+
+        result = subprocess.run(
+            [sys.executable, str(TOOLS_DIR / "mock_weaver.py"), "--persistent_worker"] + list(startup_arguments),
+            input="".join(json.dumps(request) + "\n" for request in requests),
+            capture_output=True,
+            text=True,
+            cwd=self.root,
+            timeout=120,
+        )
+        self.assertEqual(0, result.returncode, result.stderr)
+        return [json.loads(line) for line in result.stdout.splitlines()]
+
+    def test_requests_are_answered(self):
+        responses = self.serve([
+            {"arguments": ["registry", "check", "--registry", "passing"], "requestId": 1},
+            {"arguments": ["registry", "check", "--registry", "failing"], "requestId": 2},
+            {"arguments": ["registry", "generate", "go", "out", "--registry", "passing"], "requestId": 3},
+        ])
+
+        self.assertEqual([(1, 0), (2, 1), (3, 0)], [(response["requestId"], response["exitCode"]) for response in responses])
+        self.assertIn("registry.yaml: Schema marked as failing", responses[1]["output"])
+        self.assertTrue((self.root / "out" / "registry.go").exists())
+
+    def test_invalid_arguments_fail_the_request_only(self):
+        responses = self.serve([
+            {"arguments": ["--bogus"], "requestId": 1},
+            {"arguments": ["registry", "check", "--registry", "passing", "--cost-model", "fast"], "requestId": 2},
+            {"arguments": ["registry", "check", "--registry", "passing"], "requestId": 3},
+        ])
+
+        self.assertEqual([(1, 2), (2, 2), (3, 0)], [(response["requestId"], response["exitCode"]) for response in responses])
+        self.assertIn("the following arguments are required: command", responses[0]["output"])
+        self.assertIn("unknown cost model preset: fast", responses[1]["output"])
+
+    def test_startup_arguments_apply_to_every_request(self):
+        responses = self.serve([
+            {"arguments": ["registry", "check", "--registry", "passing"]},
+            {"arguments": ["registry", "check", "--registry", "passing"]},
+        ], "--cost-model", "fast")
+
+        self.assertEqual([2, 2], [response["exitCode"] for response in responses])
+
+    def test_schemas_seen_by_earlier_requests_are_warm(self):
+        warm_per_request = []
+        spend = mock_weaver.spend
+
+        def record_spend(model, input_schemas, warm_schemas=None):
+            warm_per_request.append(sorted(schema.name for schema in input_schemas if schema in warm_schemas))
+            return spend(model, input_schemas, warm_schemas)
+
+        check = json.dumps({"arguments": ["registry", "check", "--registry", str(self.root / "passing")]})
+        stdin = io.StringIO("{0}\n\n{0}\n".format(check))
+        stdout = io.StringIO()
+        with mock.patch.object(mock_weaver, "spend", side_effect=record_spend):
+            mock_weaver.run_persistent_worker(["--cost-model", "none"], stdin, stdout)
+
+        self.assertEqual([0, 0], [json.loads(line)["exitCode"] for line in stdout.getvalue().splitlines()])
+        self.assertEqual([[], ["registry.yaml"]], warm_per_request)
+
+
+if __name__ == "__main__":
+    unittest.main()
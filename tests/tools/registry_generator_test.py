@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the synthetic registry generator, tests/performance/registry_generator.py.
+
+The tests cover deterministic output for a seed, the attribute, namespace,
+group and reference counts of the returned summary, and that every
+reference, including those across namespaces, resolves to a generated file
+through the reference scanner of weaver/tools/schema_deps.py.
+
+Run with `bazel test //tests/tools:registry_generator_test` or
+`python3 -m pytest tests/tools`.
+"""
+
+import re
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).absolute().parents[1] / "performance"))
+sys.path.insert(0, str(Path(__file__).absolute().parents[2] / "weaver" / "tools"))
+
+import registry_generator  # noqa: E402
+import schema_deps  # noqa: E402
+
+SPEC = registry_generator.RegistrySpec(
+    attributes=120, namespaces=5, attributes_per_group=7, cross_ref_ratio=0.5, seed=42)
+
+
+class RegistryGeneratorTest(unittest.TestCase):
+    """Tests generating small registries into scratch directories."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+
+    def generate(self, name: str, spec=SPEC, build_files: bool = False) -> dict:
+        return registry_generator.generate_registry(self.root / name, spec, build_files)
+
+    def contents(self, name: str) -> dict:
+        root = self.root / name
+        return {str(path.relative_to(root)): path.read_text() for path in sorted(root.rglob("*")) if path.is_file()}
+
+    def schema_files(self, name: str) -> list:
+        return sorted(str(path) for path in (self.root / name).rglob("*.yaml"))
+
+    def test_output_is_deterministic_for_a_seed(self):
+        self.assertEqual(self.generate("first"), self.generate("second"))
+        self.assertEqual(self.contents("first"), self.contents("second"))
+
+        self.generate("other", SPEC._replace(seed=7))
+        self.assertNotEqual(self.contents("first"), self.contents("other"))
+
+    def test_summary_counts(self):
+        summary = self.generate("registry")
+
+        contents = self.contents("registry")
+        registries = {path: text for path, text in contents.items() if path.endswith("registry.yaml")}
+        signals = {path: text for path, text in contents.items() if path.endswith("signals.yaml")}
+        self.assertEqual(5, len(registries))
+        self.assertEqual(5, len(signals))
+
+        attribute_ids = [
+            attribute_id
+            for text in registries.values()
+            for attribute_id in re.findall(r"^      - id: (\S+)$", text, re.MULTILINE)
+        ]
+        references = [
+            (path.split("/")[0], ref)
+            for path, text in signals.items()
+            for ref in re.findall(r"^      - ref: (\S+)$", text, re.MULTILINE)
+        ]
+        groups = sum(len(re.findall(r"^  - id: ", text, re.MULTILINE)) for text in contents.values())
+
+        self.assertEqual({
+            "attributes": 120,
+            "namespaces": 5,
+            "files": 10,
+            "groups": groups,
+            "references": len(references),
+            "cross_references": sum(1 for namespace, ref in references if not ref.startswith(namespace + ".")),
+        }, summary)
+        self.assertEqual(120, len(set(attribute_ids)))
+        self.assertEqual({path.split("/")[0] for path in contents}, {ref.split(".")[0] for ref in attribute_ids})
+        # Each group references at most 7 attributes of its namespace
+        self.assertEqual(5 + sum(-(-count // 7) for count in registry_generator._split(120, 5)), groups)
+        self.assertGreater(summary["cross_references"], 0)
+
+    def test_namespaces_are_capped_by_attributes(self):
+        summary = self.generate("small", registry_generator.RegistrySpec(attributes=10, namespaces=50))
+
+        self.assertEqual(10, summary["namespaces"])
+        self.assertEqual(20, summary["files"])
+
+    def test_attribute_count_is_bounded(self):
+        with self.assertRaises(ValueError):
+            self.generate("empty", registry_generator.RegistrySpec(attributes=9))
+
+    def test_references_resolve_through_the_dependency_index(self):
+        summary = self.generate("registry", build_files=True)
+
+        files = schema_deps.create_index(self.schema_files("registry"))["files"]
+        defined = {defined for entry in files.values() for defined in entry["defines"]}
+        referenced = {reference for entry in files.values() for reference in entry["references"]}
+        self.assertTrue(referenced)
+        self.assertLessEqual(referenced, defined)
+
+        # A namespace's signals reach the registries of the namespaces they reference
+        for path, entry in files.items():
+            if not path.endswith("signals.yaml"):
+                continue
+            namespaces = {reference.split(".")[0] for reference in entry["references"]}
+            closure = schema_deps.compute_closure(files, [path])
+            expected = {str(self.root / "registry" / namespace / "registry.yaml") for namespace in namespaces}
+            self.assertEqual(sorted(expected | {path}), closure)
+
+        self.assertEqual(summary["namespaces"], len(list((self.root / "registry").glob("*/BUILD.bazel"))))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Tests for the schema reference scanner, weaver/tools/schema_deps.py.
+
+The tests cover the ids and references scanned from YAML and JSON schemas,
+the transitive closure of entry points over merged indexes, and entry
+points missing from the indexes.
+
+Run with `bazel test //tests/tools:schema_deps_test` or
+`python3 -m pytest tests/tools`.
+"""
+
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).absolute().parents[2] / "weaver" / "tools"))
+
+import schema_deps  # noqa: E402
+
+HTTP_SCHEMA = """groups:
+  - id: registry.http
+    type: attribute_group
+    brief: >
+      Block scalar text is not structure.
+      - id: not.an.id
+    attributes:
+      - id: http.request.method
+        type: string
+      - ref: server.address  # a comment
+  - id: span.http.client
+    type: span
+    extends: registry.http
+"""
+
+SERVER_SCHEMA = """groups:
+  - id: registry.server
+    type: attribute_group
+    attributes:
+      - id: server.address
+        type: string
+"""
+
+IMPORTS_SCHEMA = """imports:
+  metrics:
+    - "db.*"
+  events:
+    - exception
+groups: []
+"""
+
+
+class ScanTest(unittest.TestCase):
+    """Tests for scanning schemas into index entries."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+
+    def write(self, name: str, content: str) -> str:
+        path = self.root / name
+        path.write_text(content)
+        return str(path)
+
+    def test_yaml_ids_and_references(self):
+        entry = schema_deps.scan_file(self.write("http.yaml", HTTP_SCHEMA))
+
+        self.assertEqual(["http.request.method", "registry.http", "span.http.client"], entry["defines"])
+        self.assertEqual(["registry.http", "server.address"], entry["references"])
+
+    def test_yaml_imports(self):
+        entry = schema_deps.scan_file(self.write("imports.yaml", IMPORTS_SCHEMA))
+
+        self.assertEqual([], entry["defines"])
+        self.assertEqual(["db.*", "exception"], entry["references"])
+
+    def test_json_ids_and_references(self):
+        document = {
+            "groups": [{"id": "span.db", "extends": "registry.db", "attributes": [{"ref": "db.system"}]}],
+            "imports": {"metrics": ["db.client.*"]},
+        }
+        entry = schema_deps.scan_file(self.write("db.json", json.dumps(document)))
+
+        self.assertEqual(["span.db"], entry["defines"])
+        self.assertEqual(["db.client.*", "db.system", "registry.db"], entry["references"])
+
+    def test_index_is_keyed_by_path(self):
+        paths = [self.write("server.yaml", SERVER_SCHEMA), self.write("http.yaml", HTTP_SCHEMA)]
+
+        index = schema_deps.create_index(paths)
+
+        self.assertEqual(schema_deps.INDEX_VERSION, index["version"])
+        self.assertEqual(sorted(paths), list(index["files"]))
+
+
+class ClosureTest(unittest.TestCase):
+    """Tests for the transitive closure of entry points."""
+
+    FILES = {
+        "http.yaml": {"defines": ["registry.http", "span.http"], "references": ["server.address"]},
+        "server.yaml": {"defines": ["server.address"], "references": ["network.*"]},
+        "network.yaml": {"defines": ["network.peer.address", "network.transport"], "references": []},
+        "db.yaml": {"defines": ["registry.db"], "references": ["server.address"]},
+    }
+
+    def test_closure_follows_references_and_patterns(self):
+        self.assertEqual(
+            ["http.yaml", "network.yaml", "server.yaml"],
+            schema_deps.compute_closure(self.FILES, ["http.yaml"]),
+        )
+
+    def test_closure_of_a_leaf_is_itself(self):
+        self.assertEqual(["network.yaml"], schema_deps.compute_closure(self.FILES, ["network.yaml"]))
+
+    def test_cycles_terminate(self):
+        files = {
+            "a.yaml": {"defines": ["a"], "references": ["b"]},
+            "b.yaml": {"defines": ["b"], "references": ["a"]},
+        }
+        self.assertEqual(["a.yaml", "b.yaml"], schema_deps.compute_closure(files, ["b.yaml"]))
+
+    def test_missing_entry_point_is_not_in_the_closure(self):
+        self.assertEqual(["missing.yaml"], schema_deps.missing_entry_points(self.FILES, ["missing.yaml", "db.yaml"]))
+        self.assertEqual([], schema_deps.compute_closure(self.FILES, ["missing.yaml"]))
+
+
+class CommandLineTest(unittest.TestCase):
+    """Tests for the scan and closure commands."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        for name, content in [("http.yaml", HTTP_SCHEMA), ("server.yaml", SERVER_SCHEMA), ("imports.yaml", IMPORTS_SCHEMA)]:
+            (self.root / name).write_text(content)
+        self.index = str(self.root / "index.json")
+        schema_deps.main(["scan", "--output", self.index] + [str(self.root / name) for name in ("http.yaml", "server.yaml", "imports.yaml")])
+
+    def closure(self, *entry_points) -> int:
+        arguments = ["closure", "--output", str(self.root / "closure.txt"), "--index", self.index]
+        for entry_point in entry_points:
+            arguments += ["--entry-point", str(self.root / entry_point)]
+        return schema_deps.main(arguments)
+
+    def test_closure_command_writes_one_path_per_line(self):
+        self.assertFalse(self.closure("http.yaml"))
+
+        self.assertEqual(
+            [str(self.root / "http.yaml"), str(self.root / "server.yaml")],
+            (self.root / "closure.txt").read_text().splitlines(),
+        )
+
+    def test_closure_command_fails_on_missing_entry_point(self):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(1, self.closure("http.yaml", "missing.yaml"))
+
+        self.assertIn("missing.yaml", stderr.getvalue())
+        self.assertFalse((self.root / "closure.txt").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
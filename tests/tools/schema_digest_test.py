@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests for the normalized content digests of weaver/tools/schema_digest.py.
+
+Run with `bazel test //tests/tools:schema_digest_test` or
+`python3 -m pytest tests/tools`.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).absolute().parents[2] / "weaver" / "tools"))
+
+import schema_digest  # noqa: E402
+
+
+def normalize(text: str) -> list:
+    """Normalize a YAML document given as a string."""
+
+    return list(schema_digest.normalize_yaml_lines(text.splitlines(keepends=True)))
+
+
+class NormalizeYamlTest(unittest.TestCase):
+    """Tests for normalize_yaml_lines."""
+
+    def test_comments_are_dropped(self):
+        self.assertEqual(
+            normalize("# Header\ngroups:  # trailing\n  # indented\n  - id: a\n"),
+            ["groups:", "  - id: a"],
+        )
+
+    def test_whitespace_and_line_endings_are_normalized(self):
+        self.assertEqual(
+            normalize("groups:   \r\n  - id: a\r\n\r\n\r\n"),
+            normalize("groups:\n  - id: a\n"),
+        )
+
+    def test_inner_blank_lines_are_kept(self):
+        self.assertEqual(normalize("a: 1\n\nb: 2\n"), ["a: 1", "", "b: 2"])
+
+    def test_hash_in_quoted_scalars_is_content(self):
+        self.assertEqual(normalize('brief: "a # b"\n'), ['brief: "a # b"'])
+        self.assertEqual(normalize("brief: 'a # b' # note\n"), ["brief: 'a # b'"])
+        self.assertEqual(normalize("brief: 'it''s # here'\n"), ["brief: 'it''s # here'"])
+        self.assertEqual(normalize('brief: "say \\" # here"\n'), ['brief: "say \\" # here"'])
+
+    def test_hash_without_leading_space_is_content(self):
+        self.assertEqual(normalize("url: http://example.com/#anchor\n"), ["url: http://example.com/#anchor"])
+
+    def test_multiline_quoted_scalars_are_content(self):
+        self.assertEqual(
+            normalize('brief: "first\n  # not a comment\n  last" # comment\n'),
+            ['brief: "first', "  # not a comment", '  last"'],
+        )
+
+    def test_block_scalars_are_verbatim(self):
+        document = "note: |  # header comment\n  # kept\n    indented   \n\n  end\nnext: 1  # dropped\n"
+        self.assertEqual(
+            normalize(document),
+            ["note: |", "  # kept", "    indented   ", "", "  end", "next: 1"],
+        )
+
+    def test_block_scalar_indicators(self):
+        for header in ("key: >", "key: |-", "key: >+", "key: |2", "- |"):
+            with self.subTest(header=header):
+                self.assertEqual(normalize(header + "\n  # kept\n"), [header, "  # kept"])
+
+    def test_pipe_in_plain_scalar_is_not_a_block(self):
+        self.assertEqual(normalize("a: x|y\n# dropped\n"), ["a: x|y"])
+
+
+class DigestFileTest(unittest.TestCase):
+    """Tests for digest_file and create_manifest."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name: str, content: str) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write(content)
+        return path
+
+    def digest(self, name: str, content: str) -> str:
+        return schema_digest.digest_file(self.write(name, content))
+
+    def test_reformat_only_edits_keep_the_digest(self):
+        self.assertEqual(
+            self.digest("a.yaml", "groups:\n  - id: a\n"),
+            self.digest("b.yaml", "# License header\ngroups:   \r\n  - id: a  # first group\r\n\n"),
+        )
+
+    def test_content_edits_change_the_digest(self):
+        base = self.digest("a.yaml", 'groups:\n  - id: a\n    brief: "x # y"\n')
+        self.assertNotEqual(base, self.digest("b.yaml", 'groups:\n  - id: a\n    brief: "x # z"\n'))
+        self.assertNotEqual(base, self.digest("c.yaml", 'groups:\n  - id: b\n    brief: "x # y"\n'))
+
+    def test_mock_weaver_fail_marker_changes_the_digest(self):
+        # The mock Weaver's failure marker must not be normalized away, or
+        # adding it would not re-run cached actions
+        self.assertNotEqual(
+            self.digest("a.yaml", "groups: []\n"),
+            self.digest("b.yaml", "groups: []\nmock_weaver: fail\n"),
+        )
+
+    def test_json_is_canonicalized(self):
+        self.assertEqual(
+            self.digest("a.json", '{"b": 1, "a": [1, 2]}'),
+            self.digest("b.json", '{\n  "a": [1, 2],\n  "b": 1\n}\n'),
+        )
+
+    def test_manifest_is_independent_of_argument_order(self):
+        first = self.write("a.yaml", "a: 1\n")
+        second = self.write("b.yaml", "b: 2\n")
+        manifest = schema_digest.create_manifest([second, first])
+        self.assertEqual(manifest, schema_digest.create_manifest([first, second]))
+        self.assertEqual(schema_digest.MANIFEST_VERSION, manifest["version"])
+        self.assertEqual([first, second], list(manifest["files"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Tests for the release checksum updater, scripts/update_checksums.py.
+
+Releases are served from a local `http.server` through `--api-base`. The
+tests cover one request per asset across concurrent jobs, revalidation of
+the ETag cache with `If-None-Match` on a second run, and the `--dry-run`
+diff.
+
+Run with `bazel test //tests/tools:update_checksums_test` or
+`python3 -m pytest tests/tools`.
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).absolute().parents[2] / "scripts"))
+
+import update_checksums  # noqa: E402
+
+CHECKSUMS_BZL = '''WEAVER_CHECKSUMS = {
+    "0.1.0": {
+        "linux-x86_64": None,
+    },
+    # Add more versions as needed
+}
+'''
+
+# Binaries of a release without a checksums file, hashed by the updater
+BINARIES = {
+    "weaver-0.1.0-x86_64-unknown-linux-gnu.tar.xz": b"linux binary",
+    "weaver-0.1.0-aarch64-apple-darwin.tar.xz": b"darwin binary",
+    "weaver-0.1.0-x86_64-pc-windows-msvc.zip": b"windows binary",
+}
+
+# Checksums of a release with a checksums file, which is read instead
+LISTED_CHECKSUMS = {
+    "linux-x86_64": "a" * 64,
+    "darwin-aarch64": "b" * 64,
+}
+
+
+def sha256(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+class ReleaseServer(ThreadingHTTPServer):
+    """GitHub stand-in serving two releases and recording every request."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), ReleaseHandler)
+        self.base = "http://127.0.0.1:{}".format(self.server_address[1])
+        self.lock = threading.Lock()
+        self.requests = []
+        self.documents = {}
+
+        # The binary of v0.2.0 is not served, as its checksums file is read instead
+        releases = [
+            {
+                "tag_name": "v0.2.0",
+                "assets": [
+                    {"name": "weaver-0.2.0-x86_64-unknown-linux-gnu.tar.xz",
+                     "browser_download_url": self.base + "/download/v0.2.0/linux"},
+                    {"name": "sha256sums.txt", "browser_download_url": self.base + "/download/v0.2.0/sha256sums.txt"},
+                ],
+            },
+            {
+                "tag_name": "v0.1.0",
+                "assets": [
+                    {"name": name, "browser_download_url": self.base + "/download/v0.1.0/" + name}
+                    for name in sorted(BINARIES)
+                ],
+            },
+        ]
+        self.documents["/repos/open-telemetry/weaver/releases?per_page=3"] = json.dumps(releases).encode()
+        self.documents["/download/v0.2.0/sha256sums.txt"] = "".join(
+            "{}  weaver-0.2.0-{}\n".format(checksum, {
+                "linux-x86_64": "x86_64-unknown-linux-gnu.tar.xz",
+                "darwin-aarch64": "aarch64-apple-darwin.tar.xz",
+            }[platform])
+            for platform, checksum in sorted(LISTED_CHECKSUMS.items())
+        ).encode()
+        for name, content in BINARIES.items():
+            self.documents["/download/v0.1.0/" + name] = content
+
+    def record(self, path: str, etag, status: int):
+        with self.lock:
+            self.requests.append((path, etag, status))
+
+    def take_requests(self) -> list:
+        with self.lock:
+            requests, self.requests = self.requests, []
+        return requests
+
+
+class ReleaseHandler(BaseHTTPRequestHandler):
+    """Serves documents with ETags over keep-alive connections."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = self.server.documents.get(self.path)
+        if body is None:
+            self.server.record(self.path, None, 404)
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        etag = '"{}"'.format(sha256(body)[:16])
+        if_none_match = self.headers.get("If-None-Match")
+        status = 304 if if_none_match == etag else 200
+        self.server.record(self.path, if_none_match, status)
+        self.send_response(status)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", "0" if status == 304 else str(len(body)))
+        self.end_headers()
+        if status == 200:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UpdateChecksumsTest(unittest.TestCase):
+    """Tests running the updater end to end against the release server."""
+
+    def setUp(self):
+        self.server = ReleaseServer()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        self.output = self.root / "checksums.bzl"
+        self.output.write_text(CHECKSUMS_BZL)
+
+        environment = mock.patch.dict(os.environ)
+        environment.start()
+        self.addCleanup(environment.stop)
+        os.environ.pop("GITHUB_TOKEN", None)
+
+    def run_updater(self, *arguments) -> str:
+        """Run the updater against the release server and return its output."""
+
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            status = update_checksums.main([
+                "--api-base", self.server.base,
+                "--output", str(self.output),
+                "--cache-dir", str(self.root / "cache"),
+                "--jobs", "4",
+            ] + list(arguments))
+        self.assertEqual(status, 0, stdout.getvalue())
+        return stdout.getvalue()
+
+    def assert_one_request_per_document(self, requests: list):
+        self.assertEqual(sorted(path for path, _, _ in requests), sorted(self.server.documents))
+
+    def test_first_run_requests_each_asset_once(self):
+        self.run_updater()
+
+        requests = self.server.take_requests()
+        self.assert_one_request_per_document(requests)
+        self.assertTrue(all(etag is None and status == 200 for _, etag, status in requests), requests)
+
+        content = self.output.read_text()
+        for name, binary in BINARIES.items():
+            platform = update_checksums.extract_platform_from_filename(name)
+            self.assertIn('"{}": "{}",'.format(platform, sha256(binary)), content)
+        for platform, checksum in LISTED_CHECKSUMS.items():
+            self.assertIn('"{}": "{}",'.format(platform, checksum), content)
+        self.assertNotIn("None", content)
+
+    def test_second_run_revalidates_with_etags(self):
+        self.run_updater()
+        self.server.take_requests()
+        updated = self.output.read_text()
+
+        output = self.run_updater()
+
+        requests = self.server.take_requests()
+        self.assert_one_request_per_document(requests)
+        for path, etag, status in requests:
+            self.assertIsNotNone(etag, path)
+            self.assertEqual(status, 304, path)
+        self.assertIn("not modified: {}, bytes downloaded: 0".format(len(requests)), output)
+        self.assertIn("Checksums file is up to date", output)
+        self.assertEqual(self.output.read_text(), updated)
+
+    def test_dry_run_prints_diff_without_writing(self):
+        output = self.run_updater("--dry-run", "--no-cache")
+
+        self.assertEqual(self.output.read_text(), CHECKSUMS_BZL)
+        self.assertIn("--- {}".format(self.output), output)
+        self.assertIn('-        "linux-x86_64": None,', output)
+        self.assertIn('+        "linux-x86_64": "{}",'.format(
+            sha256(BINARIES["weaver-0.1.0-x86_64-unknown-linux-gnu.tar.xz"])), output)
+        self.assertIn('+    "0.2.0": {', output)
+        self.assertNotIn("Checksums updated successfully", output)
+        self.assertFalse((self.root / "cache").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Tests for the Weaver action analytics, scripts/weaver_action_analytics.py.
+
+The tests cover decoding of concatenated and newline-delimited JSON logs,
+percentiles, cache hit detection in execution logs, and the comparison of
+reports against a baseline.
+
+Run with `bazel test //tests/tools:weaver_action_analytics_test` or
+`python3 -m pytest tests/tools`.
+"""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).absolute().parents[2] / "scripts"))
+
+import weaver_action_analytics  # noqa: E402
+
+LABEL = "//semconv:go"
+
+
+class LogTestCase(unittest.TestCase):
+    """Base class providing a scratch directory for log files."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+
+    def write(self, name: str, content: str) -> str:
+        path = self.root / name
+        path.write_text(content)
+        return str(path)
+
+
+class IterJsonObjectsTest(LogTestCase):
+    """Tests for decoding log files."""
+
+    def test_newline_delimited_objects(self):
+        path = self.write("events.json", '{"a": 1}\n{"b": 2}\n\n{"c": [3]}\n')
+
+        self.assertEqual([{"a": 1}, {"b": 2}, {"c": [3]}], list(weaver_action_analytics.iter_json_objects(path)))
+
+    def test_concatenated_pretty_printed_objects(self):
+        objects = [{"mnemonic": "WeaverGenerate", "nested": {"list": [1, 2]}}, {"mnemonic": "GoCompile"}]
+        path = self.write("exec.json", "".join(json.dumps(obj, indent=2) for obj in objects))
+
+        self.assertEqual(objects, list(weaver_action_analytics.iter_json_objects(path)))
+
+    def test_objects_larger_than_a_read_chunk(self):
+        objects = [{"padding": "x" * (1 << 20) + str(index)} for index in range(3)]
+        path = self.write("large.json", "\n".join(json.dumps(obj) for obj in objects))
+
+        self.assertEqual(objects, list(weaver_action_analytics.iter_json_objects(path)))
+
+    def test_empty_file(self):
+        self.assertEqual([], list(weaver_action_analytics.iter_json_objects(self.write("empty.json", ""))))
+
+    def test_truncated_object_fails(self):
+        path = self.write("truncated.json", '{"a": 1}\n{"b": ')
+
+        with self.assertRaisesRegex(ValueError, "Trailing data"):
+            list(weaver_action_analytics.iter_json_objects(path))
+
+
+class PercentileTest(unittest.TestCase):
+    """Tests for percentiles by linear interpolation."""
+
+    def test_empty(self):
+        self.assertIsNone(weaver_action_analytics.percentile([], 0.5))
+
+    def test_single_value(self):
+        self.assertEqual(4.0, weaver_action_analytics.percentile([4.0], 0.9))
+
+    def test_interpolates_between_ranks(self):
+        values = [4.0, 1.0, 3.0, 2.0]
+
+        self.assertEqual(1.0, weaver_action_analytics.percentile(values, 0.0))
+        self.assertEqual(2.5, weaver_action_analytics.percentile(values, 0.5))
+        self.assertAlmostEqual(3.7, weaver_action_analytics.percentile(values, 0.9))
+        self.assertEqual(4.0, weaver_action_analytics.percentile(values, 1.0))
+
+
+class ExecutionLogTest(LogTestCase):
+    """Tests for collecting Weaver spawns from execution logs."""
+
+    def collect(self, spawns: list) -> weaver_action_analytics.ActionSeries:
+        path = self.write("exec.json", "\n".join(json.dumps(spawn) for spawn in spawns))
+        series = {}
+        weaver_action_analytics.collect_execution_log(path, weaver_action_analytics.DEFAULT_MNEMONICS, series)
+        self.assertEqual([(LABEL, "WeaverGenerate")], list(series))
+        return series[(LABEL, "WeaverGenerate")]
+
+    def test_remote_cache_hits(self):
+        entry = self.collect([
+            {"targetLabel": LABEL, "mnemonic": "WeaverGenerate", "remoteCacheHit": True, "runner": "remote",
+             "metrics": {"totalTime": "0.100s"}},
+            {"targetLabel": LABEL, "mnemonic": "WeaverGenerate", "runner": "disk cache hit",
+             "metrics": {"totalTime": "0.050s"}},
+            {"targetLabel": LABEL, "mnemonic": "WeaverGenerate", "runner": "linux-sandbox",
+             "metrics": {"totalTime": "2.500s"}},
+            {"targetLabel": LABEL, "mnemonic": "GoCompile", "runner": "linux-sandbox",
+             "metrics": {"totalTime": "9s"}},
+        ])
+
+        self.assertEqual(3, entry.count)
+        self.assertEqual(2, entry.cache_hits)
+        self.assertEqual([0.1, 0.05, 2.5], entry.latencies)
+        self.assertEqual([2.5], entry.executed_latencies)
+
+
+def report(cache_hit_ratio=0.5, **latencies) -> dict:
+    """Build a one-target report with the given latencies."""
+
+    target = {
+        "label": LABEL,
+        "mnemonic": "WeaverGenerate",
+        "cache_hit_ratio": cache_hit_ratio,
+        "p50_seconds": None,
+        "p90_seconds": None,
+        "executed_p50_seconds": None,
+        "executed_p90_seconds": None,
+    }
+    target.update(latencies)
+    return {"targets": [target]}
+
+
+class CompareToBaselineTest(unittest.TestCase):
+    """Tests for regressions against a baseline report."""
+
+    def compare(self, current: dict, baseline: dict) -> list:
+        return weaver_action_analytics.compare_to_baseline(current, baseline, threshold=0.2, min_delta=0.1)
+
+    def test_executed_latency_regression(self):
+        regressions = self.compare(
+            report(executed_p50_seconds=2.0, executed_p90_seconds=3.0),
+            report(executed_p50_seconds=1.0, executed_p90_seconds=2.9),
+        )
+
+        self.assertEqual([{
+            "label": LABEL,
+            "mnemonic": "WeaverGenerate",
+            "metric": "executed_p50_seconds",
+            "baseline": 1.0,
+            "current": 2.0,
+        }], regressions)
+
+    def test_growth_below_min_delta_is_not_a_regression(self):
+        self.assertEqual([], self.compare(report(executed_p50_seconds=0.15), report(executed_p50_seconds=0.1)))
+
+    def test_fewer_cache_hits_are_not_a_latency_regression(self):
+        # Fewer hits raise the overall percentiles, while executed actions keep their speed
+        regressions = self.compare(
+            report(cache_hit_ratio=0.1, p50_seconds=2.0, p90_seconds=2.2, executed_p50_seconds=2.0, executed_p90_seconds=2.2),
+            report(cache_hit_ratio=0.9, p50_seconds=0.05, p90_seconds=2.0, executed_p50_seconds=2.0, executed_p90_seconds=2.2),
+        )
+
+        self.assertEqual(["cache_hit_ratio"], [regression["metric"] for regression in regressions])
+        self.assertEqual((0.9, 0.1), (regressions[0]["baseline"], regressions[0]["current"]))
+
+    def test_missing_baseline_values_are_skipped(self):
+        baseline = report(executed_p50_seconds=1.0)
+        del baseline["targets"][0]["executed_p90_seconds"]
+
+        self.assertEqual([], self.compare(report(executed_p90_seconds=5.0), baseline))
+
+    def test_new_targets_are_skipped(self):
+        self.assertEqual([], self.compare(report(executed_p50_seconds=5.0), {"targets": []}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for the release archive mirror, scripts/weaver_mirror.py.
+
+Archives are served by the local release server of update_checksums_test.
+The tests cover the content-addressed `<mirror>/sha256/<sha256>` layout,
+rejection of archives that do not match a checksum pinned in the lockfile,
+and the lockfile keys that `weaver_repository` reads.
+
+Run with `bazel test //tests/tools:weaver_mirror_test` or
+`python3 -m pytest tests/tools`.
+"""
+
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).absolute().parents[2] / "scripts"))
+sys.path.insert(0, str(Path(__file__).absolute().parent))
+
+import weaver_mirror  # noqa: E402
+from update_checksums_test import ReleaseServer, sha256  # noqa: E402
+
+REPOSITORIES_BZL = Path(__file__).absolute().parents[2] / "weaver" / "repositories.bzl"
+
+ARCHIVES = {
+    "linux-x86_64": b"linux archive",
+    "darwin-aarch64": b"darwin archive",
+    "windows-x86_64": b"windows archive",
+}
+
+
+class WeaverMirrorTest(unittest.TestCase):
+    """Tests running the mirror end to end against the release server."""
+
+    def setUp(self):
+        self.server = ReleaseServer()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        # Release archives under their upstream names, with published checksums
+        self.download_base = self.server.base + "/download"
+        for platform, content in ARCHIVES.items():
+            path = weaver_mirror.archive_url(self.download_base, "0.1.0", platform)[len(self.server.base):]
+            self.server.documents[path] = content
+            self.server.documents[path + ".sha256"] = "{}  {}\n".format(sha256(content), path.rsplit("/", 1)[1]).encode()
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        self.mirror = self.root / "mirror"
+        self.lockfile = self.mirror / weaver_mirror.LOCKFILE_NAME
+
+        environment = mock.patch.dict(os.environ)
+        environment.start()
+        self.addCleanup(environment.stop)
+        os.environ.pop("GITHUB_TOKEN", None)
+
+    def run_mirror(self, *platforms) -> tuple:
+        """Mirror release 0.1.0 for platforms and return the status and output."""
+
+        arguments = [
+            "--mirror-dir", str(self.mirror),
+            "--version", "0.1.0",
+            "--download-base", self.download_base,
+            "--api-base", self.server.base,
+            "--cache-dir", str(self.root / "cache"),
+            "--jobs", "4",
+        ]
+        for platform in platforms:
+            arguments += ["--platform", platform]
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            status = weaver_mirror.main(arguments)
+        return status, stdout.getvalue()
+
+    def lock(self) -> dict:
+        return json.loads(self.lockfile.read_text())
+
+    def test_archives_are_stored_by_content_hash(self):
+        status, output = self.run_mirror(*ARCHIVES)
+
+        self.assertEqual(0, status, output)
+        store = self.mirror / "sha256"
+        self.assertEqual(sorted(sha256(content) for content in ARCHIVES.values()), sorted(os.listdir(store)))
+        for content in ARCHIVES.values():
+            self.assertEqual(content, (store / sha256(content)).read_bytes())
+
+        lock = self.lock()
+        self.assertEqual(weaver_mirror.LOCKFILE_VERSION, lock["version"])
+        for platform, content in ARCHIVES.items():
+            self.assertEqual({
+                "sha256": sha256(content),
+                "type": weaver_mirror.archive_type(platform),
+                "urls": [weaver_mirror.archive_url(self.download_base, "0.1.0", platform)],
+                "verified": True,
+            }, lock["weaver"]["0.1.0"][platform])
+
+    def test_mirrored_archives_are_not_downloaded_again(self):
+        self.run_mirror("linux-x86_64")
+        self.server.take_requests()
+
+        status, output = self.run_mirror("linux-x86_64")
+
+        self.assertEqual(0, status, output)
+        self.assertIn("linux-x86_64: present", output)
+        self.assertEqual([], self.server.take_requests())
+
+    def test_pinned_checksum_mismatch_is_rejected(self):
+        pinned = "0" * 64
+        self.lockfile.parent.mkdir(parents=True)
+        self.lockfile.write_text(json.dumps({
+            "version": weaver_mirror.LOCKFILE_VERSION,
+            "weaver": {"0.1.0": {"linux-x86_64": {"sha256": pinned, "type": "tar.xz", "urls": [], "verified": True}}},
+        }))
+
+        status, output = self.run_mirror("linux-x86_64", "darwin-aarch64")
+
+        self.assertEqual(1, status)
+        self.assertIn("checksum mismatch", output)
+        self.assertEqual([sha256(ARCHIVES["darwin-aarch64"])], os.listdir(self.mirror / "sha256"))
+        # The pinned entry is kept, and the published checksum is not trusted over it
+        self.assertEqual(pinned, self.lock()["weaver"]["0.1.0"]["linux-x86_64"]["sha256"])
+
+    def test_lockfile_keys_match_weaver_repository(self):
+        self.run_mirror("linux-x86_64")
+        source = REPOSITORIES_BZL.read_text()
+
+        # weaver_repository reads lock["weaver"][version][platform], then keys of the entry
+        self.assertIn('lock.get("weaver", {}).get(version, {}).get(platform, {})', source)
+        self.assertIn('_MIRROR_LOCKFILE = "{}"'.format(weaver_mirror.LOCKFILE_NAME), source)
+        read_keys = set(re.findall(r'lock_entry\.get\("(\w+)"\)', source))
+        self.assertEqual({"sha256", "type"}, read_keys)
+
+        entry = self.lock()["weaver"]["0.1.0"]["linux-x86_64"]
+        self.assertLessEqual(read_keys, set(entry))
+        # The mirror URL weaver_repository derives from the checksum holds the archive
+        self.assertIn('"{}/sha256/{}".format(mirror, sha256)', source)
+        self.assertTrue((self.mirror / "sha256" / entry["sha256"]).is_file())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Tests for the Weaver action wrapper, weaver/tools/weaver_worker.py.
+
+The wrapper runs as a persistent worker over stdin and stdout, with the
+mock Weaver as its Weaver binary, and in one-shot mode. The tests cover the
+JSON request and response framing, request ids of multiplex requests, exit
+code propagation, recorded check failures, `--then` command chaining and
+the resolved registries shared through the registry cache.
+
+Run with `bazel test //tests/tools:weaver_worker_test` or
+`python3 -m pytest tests/tools`.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).absolute().parents[2] / "weaver" / "tools"
+WEAVER_WORKER = TOOLS_DIR / "weaver_worker.py"
+MOCK_WEAVER = TOOLS_DIR / "mock_weaver.py"
+
+# The registry check command as the validation actions run it
+CHECK = ["registry", "check", "--diagnostic-format", "json"]
+
+PASSING_SCHEMA = "groups:\n  - id: passing\n    type: attribute_group\n"
+FAILING_SCHEMA = "groups: []\nmock_weaver: fail\n"
+
+
+class WorkerTestCase(unittest.TestCase):
+    """Base class providing a workspace with registries and a Weaver launcher."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+
+        # Run the mock through this interpreter, whatever the mode of its file
+        self.weaver = self.root / "weaver"
+        self.weaver.write_text('#!/bin/sh\nexec "{}" "{}" "$@"\n'.format(sys.executable, MOCK_WEAVER))
+        self.weaver.chmod(0o755)
+
+        self.write("passing/registry.yaml", PASSING_SCHEMA)
+        self.write("failing/registry.yaml", FAILING_SCHEMA)
+
+    def write(self, relative: str, content: str) -> str:
+        path = self.root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        return relative
+
+    def arguments(self, registry: str, *commands, wrapper=()) -> list:
+        """Build wrapper arguments running Weaver commands over a registry."""
+
+        arguments = ["--weaver", str(self.weaver), "--registry-file", registry + "/registry.yaml"]
+        arguments.extend(wrapper)
+        arguments.append("--")
+        for index, command in enumerate(commands):
+            if index:
+                arguments.append("--then")
+            arguments.extend(command)
+        return arguments
+
+    def log_commands(self):
+        """Make the Weaver launcher log the command it runs to `commands.log`."""
+
+        self.weaver.write_text('#!/bin/sh\necho "$1 $2" >> "{}"\nexec "{}" "{}" "$@"\n'.format(
+            self.root / "commands.log", sys.executable, MOCK_WEAVER))
+
+    def commands(self) -> list:
+        path = self.root / "commands.log"
+        return path.read_text().splitlines() if path.exists() else []
+
+    def report(self, name: str) -> dict:
+        with open(self.root / name, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+class PersistentWorkerTest(WorkerTestCase):
+    """Tests driving the wrapper as a persistent worker."""
+
+    def serve(self, requests: list, env=None) -> list:
+        """Send work requests to a worker process and return its responses."""
+
+        stdin = "".join(json.dumps(request) + "\n" for request in requests)
+        result = subprocess.run(
+            [sys.executable, str(WEAVER_WORKER), "--persistent_worker"],
+            input=stdin,
+            capture_output=True,
+            text=True,
+            cwd=self.root,
+            env=dict(os.environ, **(env or {})),
+            timeout=120,
+        )
+        self.assertEqual(0, result.returncode, result.stderr)
+
+        # One JSON response per line, and nothing else on stdout
+        lines = result.stdout.splitlines()
+        self.assertEqual(len(requests), len(lines), result.stdout)
+        return [json.loads(line) for line in lines]
+
+    def test_singleplex_response_framing(self):
+        responses = self.serve([
+            {"arguments": self.arguments("passing", CHECK, wrapper=["--diagnostics-out", "check.json"])},
+        ])
+
+        self.assertEqual([{"exitCode": 0, "output": "[]\n", "requestId": 0}], responses)
+        report = self.report("check.json")
+        self.assertEqual(0, report["exit_code"])
+        self.assertEqual([], report["diagnostics"])
+
+    def test_exit_code_and_output_propagate(self):
+        responses = self.serve([
+            {"arguments": self.arguments("failing", ["registry", "check"])},
+            {"arguments": self.arguments("passing", ["registry", "check"])},
+        ])
+
+        self.assertEqual(1, responses[0]["exitCode"])
+        self.assertIn("Schema marked as failing", responses[0]["output"])
+        self.assertEqual(0, responses[1]["exitCode"])
+
+    def test_recorded_failure_succeeds(self):
+        responses = self.serve([
+            {"arguments": self.arguments(
+                "failing", CHECK,
+                wrapper=["--diagnostics-out", "check.json", "--record-failures"],
+            )},
+        ])
+
+        self.assertEqual(0, responses[0]["exitCode"])
+        report = self.report("check.json")
+        self.assertEqual(1, report["exit_code"])
+        self.assertEqual("registry.yaml", report["diagnostics"][0]["file"])
+
+    def test_recorded_signal_is_a_negative_exit_code(self):
+        # A Weaver killed by a signal, as by the OOM killer
+        self.weaver.write_text("#!/bin/sh\nkill -9 $$\n")
+        responses = self.serve([
+            {"arguments": self.arguments(
+                "passing", CHECK,
+                wrapper=["--diagnostics-out", "check.json", "--record-failures"],
+            )},
+        ])
+
+        self.assertEqual(0, responses[0]["exitCode"])
+        self.assertEqual(-9, self.report("check.json")["exit_code"])
+
+        # The line the validation test script reads the exit code from
+        self.assertIn('\n  "exit_code": -9,\n', (self.root / "check.json").read_text())
+
+    def test_resolved_registry_is_shared_across_requests(self):
+        self.log_commands()
+        requests = [
+            {"arguments": self.arguments(
+                "passing", ["registry", "generate", target, "generated_" + target], wrapper=["--resolve-registry"],
+            ), "requestId": request_id}
+            for request_id, target in enumerate(["go", "python", "markdown"], start=1)
+        ]
+        requests.append(dict(requests[0], requestId=4, verbosity=10))
+
+        responses = self.serve(requests)
+
+        self.assertEqual([0, 0, 0, 0], [response["exitCode"] for response in responses])
+        self.assertEqual(1, self.commands().count("registry resolve"))
+        self.assertEqual(4, self.commands().count("registry generate"))
+        self.assertTrue((self.root / "generated_python" / "registry.py").exists())
+        verbose = [response for response in responses if response["requestId"] == 4][0]
+        self.assertIn('"resolves": 1', verbose["output"])
+
+    def test_resolved_registry_reports_check_failures(self):
+        responses = self.serve([
+            {"arguments": self.arguments(
+                "failing", CHECK, wrapper=["--resolve-registry", "--diagnostics-out", "check.json"],
+            )},
+        ])
+
+        self.assertEqual(1, responses[0]["exitCode"])
+        self.assertEqual("registry.yaml", self.report("check.json")["diagnostics"][0]["file"])
+
+    def test_registry_is_not_resolved_without_the_flag(self):
+        self.log_commands()
+        self.serve([{"arguments": self.arguments("passing", ["registry", "check"])}] * 2)
+
+        self.assertEqual(["registry check", "registry check"], self.commands())
+
+    def test_multiplex_requests_echo_request_ids(self):
+        requests = []
+        for request_id in range(1, 9):
+            registry = "failing" if request_id % 3 == 0 else "passing"
+            requests.append({"arguments": self.arguments(registry, ["registry", "check"]), "requestId": request_id})
+
+        responses = self.serve(requests)
+
+        # Responses may arrive in any order, each with its request's id
+        exit_codes = {response["requestId"]: response["exitCode"] for response in responses}
+        self.assertEqual(
+            {request_id: 1 if request_id % 3 == 0 else 0 for request_id in range(1, 9)},
+            exit_codes,
+        )
+
+    def test_then_runs_commands_in_order(self):
+        responses = self.serve([
+            {"arguments": self.arguments(
+                "passing",
+                ["registry", "check"],
+                ["registry", "generate", "markdown", "generated"],
+                wrapper=["--diagnostics-out", "check.json"],
+            )},
+        ])
+
+        self.assertEqual(0, responses[0]["exitCode"])
+        self.assertEqual(0, self.report("check.json")["exit_code"])
+        self.assertEqual(["registry.md"], os.listdir(self.root / "generated"))
+
+    def test_then_stops_at_the_first_failure(self):
+        responses = self.serve([
+            {"arguments": self.arguments(
+                "failing",
+                ["registry", "check"],
+                ["registry", "generate", "markdown", "generated"],
+            )},
+        ])
+
+        self.assertEqual(1, responses[0]["exitCode"])
+        self.assertFalse((self.root / "generated").exists())
+
+    def test_param_files_are_expanded(self):
+        params = self.write("request.params", "\n".join(self.arguments("failing", ["registry", "check"])) + "\n")
+
+        responses = self.serve([{"arguments": ["@" + params], "requestId": 7}])
+
+        self.assertEqual(7, responses[0]["requestId"])
+        self.assertEqual(1, responses[0]["exitCode"])
+
+    def test_invalid_request_fails_and_worker_keeps_serving(self):
+        responses = self.serve([
+            {"arguments": ["--registry-file", "passing/registry.yaml"], "requestId": 1},
+            {"arguments": self.arguments("passing", ["registry", "check"]), "requestId": 2},
+        ])
+
+        by_id = {response["requestId"]: response for response in responses}
+        self.assertNotEqual(0, by_id[1]["exitCode"])
+        self.assertIn("Invalid Weaver wrapper arguments", by_id[1]["output"])
+        self.assertEqual(0, by_id[2]["exitCode"])
+
+    def test_cache_statistics_are_opt_in(self):
+        request = {"arguments": self.arguments("passing", ["registry", "check"])}
+
+        quiet = subprocess.run(
+            [sys.executable, str(WEAVER_WORKER), "--persistent_worker"],
+            input=json.dumps(request) + "\n", capture_output=True, text=True, cwd=self.root, timeout=120,
+        )
+        self.assertNotIn("registry cache", quiet.stderr)
+
+        verbose = self.serve([dict(request, verbosity=10)])
+        self.assertIn("Weaver worker registry cache", verbose[0]["output"])
+
+
+class OneShotTest(WorkerTestCase):
+    """Tests running the wrapper once per action."""
+
+    def run_wrapper(self, arguments: list) -> subprocess.CompletedProcess:
+        params = self.write("action.params", "\n".join(arguments) + "\n")
+        return subprocess.run(
+            [sys.executable, str(WEAVER_WORKER), "@" + params],
+            capture_output=True,
+            text=True,
+            cwd=self.root,
+            timeout=120,
+        )
+
+    def test_single_command_is_not_resolved(self):
+        self.log_commands()
+        check = self.arguments("passing", ["registry", "check"], wrapper=["--resolve-registry"])
+        self.assertEqual(0, self.run_wrapper(check).returncode)
+        self.assertEqual(["registry check"], self.commands())
+
+        # Several commands of one action share the resolved registry
+        fused = self.arguments(
+            "passing", ["registry", "check"], ["registry", "generate", "go", "generated"], wrapper=["--resolve-registry"],
+        )
+        self.assertEqual(0, self.run_wrapper(fused).returncode)
+        self.assertEqual(["registry check", "registry resolve", "registry check", "registry generate"], self.commands())
+
+    def narrowed(self, *entry_points) -> list:
+        """Build check arguments narrowing the passing registry to entry points."""
+
+        index = self.write("passing.index.json", json.dumps({
+            "version": 1,
+            "files": {"passing/registry.yaml": {"defines": ["passing"], "references": []}},
+        }))
+        wrapper = ["--dependency-index", index, "--unused-inputs-list", "unused.txt"]
+        for entry_point in entry_points:
+            wrapper += ["--entry-point", entry_point]
+        return self.arguments("passing", ["registry", "check"], wrapper=wrapper)
+
+    def test_entry_point_narrows_the_registry(self):
+        result = self.run_wrapper(self.narrowed("passing/registry.yaml"))
+
+        self.assertEqual(0, result.returncode, result.stdout)
+        self.assertEqual("", (self.root / "unused.txt").read_text())
+
+    def test_entry_point_outside_the_registry_fails(self):
+        self.log_commands()
+
+        result = self.run_wrapper(self.narrowed("failing/registry.yaml"))
+
+        self.assertEqual(1, result.returncode)
+        self.assertIn("Failed to narrow the registry: entry points are not registry files: failing/registry.yaml",
+                      result.stdout)
+        self.assertEqual([], self.commands())
+
+    def test_exit_code_propagates(self):
+        self.assertEqual(0, self.run_wrapper(self.arguments("passing", ["registry", "check"])).returncode)
+
+        result = self.run_wrapper(self.arguments("failing", ["registry", "check"]))
+        self.assertEqual(1, result.returncode)
+        self.assertIn("Schema marked as failing", result.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,42 +6,48 @@ and file group optimization functionality.
 """
 
 load("@bazel_skylib//lib:unittest.bzl", "asserts", "unittest")
-load("@rules_weaver//weaver:aspects.bzl", "weaver_schema_aspect", "weaver_file_group_aspect", "weaver_change_detection_aspect")
-load("@rules_weaver//weaver:internal/utils.bzl", "dependency_utils")
+load("//weaver/internal:performance.bzl", "optimize_for_large_registries")
+load("//weaver/internal:utils.bzl", "dependency_utils")
+
+def _mock_dependency_info(label, deps, infos):
+    """Build a mock WeaverDependencyInfo-like struct for a target."""
+    schema_file = struct(path = label + ".yaml", short_path = label + ".yaml", extension = "yaml")
+    graph = dependency_utils.build_transitive_dependency_graph(
+        label,
+        {label: deps},
+        infos,
+        schema_files = [schema_file],
+    )
+    return struct(
+        dependency_graph = {label: deps},
+        transitive_dependencies = graph.transitive_dependencies,
+        transitive_edges = graph.transitive_edges,
+        transitive_schema_files = graph.transitive_schema_files,
+        transitive_dependency_indexes = graph.transitive_dependency_indexes,
+    )
 
 def _test_transitive_dependency_tracking(ctx):
     """Test transitive dependency tracking functionality."""
     env = unittest.begin(ctx)
     
-    # Create mock dependency graph
-    dependency_graph = {
-        "schema1.yaml": {
-            "file": None,  # Mock file artifact
-            "direct_dependencies": ["schema2.yaml"],
-            "transitive_dependencies": [],
-            "content_hash": "hash1",
-        },
-        "schema2.yaml": {
-            "file": None,
-            "direct_dependencies": ["schema3.yaml"],
-            "transitive_dependencies": [],
-            "content_hash": "hash2",
-        },
-        "schema3.yaml": {
-            "file": None,
-            "direct_dependencies": [],
-            "transitive_dependencies": [],
-            "content_hash": "hash3",
-        },
-    }
-    
-    # Test transitive dependency graph building
-    complete_graph = dependency_utils.build_transitive_dependency_graph(dependency_graph, [])
+    # Create mock dependency chain: schema1 -> schema2 -> schema3
+    schema3 = _mock_dependency_info("schema3", [], [])
+    schema2 = _mock_dependency_info("schema2", ["schema3"], [schema3])
+    schema1 = _mock_dependency_info("schema1", ["schema2"], [schema2])
+    
+    # Verify transitive dependencies are collected through depsets
+    asserts.equals(env, ["schema2", "schema3"], sorted(schema1.transitive_dependencies.to_list()))
+    asserts.equals(env, ["schema3"], schema2.transitive_dependencies.to_list())
+    asserts.equals(env, [], schema3.transitive_dependencies.to_list())
+    asserts.equals(env, 3, len(schema1.transitive_schema_files.to_list()))
+    asserts.equals(
+        env,
+        [("schema1", "schema2"), ("schema2", "schema3")],
+        sorted(schema1.transitive_edges.to_list()),
+    )
     
-    # Verify transitive dependencies are computed correctly
-    asserts.equals(env, ["schema2.yaml", "schema3.yaml"], complete_graph["schema1.yaml"]["transitive_dependencies"])
-    asserts.equals(env, ["schema3.yaml"], complete_graph["schema2.yaml"]["transitive_dependencies"])
-    asserts.equals(env, [], complete_graph["schema3.yaml"]["transitive_dependencies"])
+    # Verify each target only materializes its own edges
+    asserts.equals(env, {"schema1": ["schema2"]}, schema1.dependency_graph)
     
     return unittest.end(env)
 
@@ -80,9 +86,8 @@ def _test_circular_dependency_detection(ctx):
     # Verify the detected cycle contains the expected nodes
     if len(circular_deps) > 0:
         cycle = circular_deps[0]
-        expected_nodes = {"schema1.yaml", "schema2.yaml", "schema3.yaml"}
-        cycle_nodes = set(cycle)
-        asserts.true(env, expected_nodes.issubset(cycle_nodes), "Cycle should contain expected nodes")
+        for node in ["schema1.yaml", "schema2.yaml", "schema3.yaml"]:
+            asserts.true(env, node in cycle, "Cycle should contain {}".format(node))
     
     return unittest.end(env)
 
@@ -133,7 +138,7 @@ def _test_file_group_operations(ctx):
     
     # Test group content hash computation
     group_hash = dependency_utils.compute_group_content_hash(schema_groups["dir1"])
-    asserts.true(env, group_hash == None, "Group content hash should be computed")
+    asserts.true(env, group_hash != None, "Group content hash should be computed")
     
     # Test group change detection data creation
     group_change_data = dependency_utils.create_group_change_detection_data(schema_groups)
@@ -145,6 +150,33 @@ def _test_file_group_operations(ctx):
     
     return unittest.end(env)
 
+def _test_registry_sharding(ctx):
+    """Test that registry shards keep schema groups together."""
+    env = unittest.begin(ctx)
+    
+    # Three groups of 3, 2 and 1 files
+    mock_files = [
+        struct(path = "dir1/a.yaml", short_path = "dir1/a.yaml", extension = "yaml"),
+        struct(path = "dir1/b.yaml", short_path = "dir1/b.yaml", extension = "yaml"),
+        struct(path = "dir1/c.yaml", short_path = "dir1/c.yaml", extension = "yaml"),
+        struct(path = "dir2/d.yaml", short_path = "dir2/d.yaml", extension = "yaml"),
+        struct(path = "dir2/e.yaml", short_path = "dir2/e.yaml", extension = "yaml"),
+        struct(path = "dir3/f.yaml", short_path = "dir3/f.yaml", extension = "yaml"),
+    ]
+    
+    shards = optimize_for_large_registries(struct(), mock_files, max_parallel = 2)
+    asserts.equals(env, 2, len(shards), "Groups should be packed into 2 shards")
+    asserts.equals(
+        env,
+        [["dir1/a.yaml", "dir1/b.yaml", "dir1/c.yaml"], ["dir2/d.yaml", "dir2/e.yaml", "dir3/f.yaml"]],
+        [[f.path for f in shard] for shard in shards],
+    )
+    
+    # A single shard keeps the registry unchanged
+    asserts.equals(env, [mock_files], optimize_for_large_registries(struct(), mock_files, max_parallel = 1))
+    
+    return unittest.end(env)
+
 def _test_content_hash_caching(ctx):
     """Test content hash caching functionality."""
     env = unittest.begin(ctx)
@@ -177,7 +209,7 @@ def _test_optimized_change_detection_data(ctx):
         struct(path = "schema1.yaml", short_path = "schema1.yaml", extension = "yaml"),
         struct(path = "schema2.yaml", short_path = "schema2.yaml", extension = "yaml"),
     ]
-    mock_label = struct(name = "test_target")
+    mock_label = "//tests/unit:test_target"
     
     # Test optimized change detection data creation
     change_data = dependency_utils.create_optimized_change_detection_data(
@@ -194,18 +226,29 @@ def _test_optimized_change_detection_data(ctx):
     
     # Verify target metadata
     target_metadata = change_data["target_metadata"]
-    asserts.equals(env, "test_target", target_metadata["label"], "Target label should be recorded")
+    asserts.equals(env, "//tests/unit:test_target", target_metadata["label"], "Target label should be recorded")
     asserts.equals(env, 2, target_metadata["file_count"], "File count should be recorded")
     
     return unittest.end(env)
 
-# Test suite
-dependency_test_suite = unittest.suite(
-    "dependency_optimization_tests",
-    _test_transitive_dependency_tracking,
-    _test_circular_dependency_detection,
-    _test_change_detection_optimization,
-    _test_file_group_operations,
-    _test_content_hash_caching,
-    _test_optimized_change_detection_data,
-) 
\ No newline at end of file
+# Test targets
+dependency_transitive_tracking_test = unittest.make(_test_transitive_dependency_tracking)
+dependency_circular_detection_test = unittest.make(_test_circular_dependency_detection)
+dependency_change_detection_test = unittest.make(_test_change_detection_optimization)
+dependency_file_group_test = unittest.make(_test_file_group_operations)
+dependency_registry_sharding_test = unittest.make(_test_registry_sharding)
+dependency_content_hash_test = unittest.make(_test_content_hash_caching)
+dependency_optimized_change_detection_test = unittest.make(_test_optimized_change_detection_data)
+
+def dependency_test_suite(name):
+    """Create a test suite for dependency optimization features."""
+    unittest.suite(
+        name,
+        dependency_transitive_tracking_test,
+        dependency_circular_detection_test,
+        dependency_change_detection_test,
+        dependency_file_group_test,
+        dependency_registry_sharding_test,
+        dependency_content_hash_test,
+        dependency_optimized_change_detection_test,
+    )
@@ -5,7 +5,7 @@ This module contains tests for the weaver_generate rule implementation,
 including hermeticity verification and action creation tests.
 """
 
-load("@bazel_skylib//lib:unittest.bzl", "asserts", "unittest")
+load("@bazel_skylib//lib:unittest.bzl", "analysistest", "asserts", "unittest")
 load("@bazel_skylib//lib:new_sets.bzl", "sets")
 load("//weaver:defs.bzl", "weaver_generate")
 load("//weaver:providers.bzl", "WeaverGeneratedInfo")
@@ -50,6 +50,15 @@ def _test_weaver_generate_provider_impl(ctx):
     
     return unittest.end(env)
 
+def _entry_point_outside_registry_test_impl(ctx):
+    """Test that entry points must be files of the registries."""
+    env = analysistest.begin(ctx)
+    
+    # Nothing would be staged, and Weaver would use its default registry
+    asserts.expect_failure(env, "are not files of the registries")
+    
+    return analysistest.end(env)
+
 # Test targets
 weaver_generate_basic_test = unittest.make(
     _test_weaver_generate_basic_impl,
@@ -67,12 +76,37 @@ weaver_generate_provider_test = unittest.make(
     _test_weaver_generate_provider_impl,
 )
 
+entry_point_outside_registry_test = analysistest.make(
+    _entry_point_outside_registry_test_impl,
+    expect_failure = True,
+)
+
 def weaver_generate_test_suite(name):
     """Create a test suite for weaver_generate rule."""
+    weaver_generate(
+        name = name + "_entry_point_outside_registry_subject",
+        registries = ["//tests/schemas:test_schemas"],
+        entry_points = ["//tests/schemas:another.yaml"],
+        target = "go",
+        tags = ["manual"],
+    )
+    entry_point_outside_registry_test(
+        name = name + "_entry_point_outside_registry_test",
+        target_under_test = ":" + name + "_entry_point_outside_registry_subject",
+    )
+    
     unittest.suite(
-        name,
+        name + "_unit",
         weaver_generate_basic_test,
         weaver_generate_hermeticity_test,
         weaver_generate_output_files_test,
         weaver_generate_provider_test,
+    )
+    
+    native.test_suite(
+        name = name,
+        tests = [
+            ":" + name + "_unit",
+            ":" + name + "_entry_point_outside_registry_test",
+        ],
     ) 
\ No newline at end of file
@@ -0,0 +1,9 @@
+package before_resolution
+
+# Attribute ids must be lowercase
+deny contains violation if {
+    some group in input.groups
+    some attribute in group.attributes
+    attribute.id != lower(attribute.id)
+    violation := {"id": attribute.id, "type": "semconv_attribute", "category": "naming"}
+}
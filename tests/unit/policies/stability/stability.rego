@@ -0,0 +1,10 @@
+package before_resolution
+
+# Attributes must declare their stability
+deny contains violation if {
+    some group in input.groups
+    some attribute in group.attributes
+    attribute.id
+    not attribute.stability
+    violation := {"id": attribute.id, "type": "semconv_attribute", "category": "stability"}
+}
@@ -0,0 +1,249 @@
+"""
+Unit tests for size-aware scheduling of Weaver actions.
+
+This module tests the registry size classes that choose the local resources
+and execution group of Weaver actions, the tools those actions run in their
+execution group, and the execution requirements that keep the actions
+sandboxed and cacheable.
+"""
+
+load("@bazel_skylib//lib:unittest.bzl", "analysistest", "asserts", "unittest")
+load("//weaver:defs.bzl", "weaver_validate_test")
+load("//weaver:platform_constraints.bzl", "get_execution_requirements", "get_supported_platforms")
+load("//weaver:toolchains.bzl", "optional_weaver_toolchain")
+load("//weaver/internal:actions.bzl", "weaver_scheduling")
+load("//weaver/internal:performance.bzl", "REGISTRY_SIZE_CLASSES", "WEAVER_LARGE_EXEC_GROUP", "registry_size_class")
+
+_SchedulingInfo = provider(
+    doc = "Scheduling of a Weaver action, as resolved by weaver_scheduling",
+    fields = ["exec_group", "resources", "weaver_binary", "worker", "registry_snapshots"],
+)
+
+def _scheduling_subject_impl(ctx):
+    """Resolve the scheduling of an action over a registry of a size class."""
+    scheduling = weaver_scheduling(ctx, ctx.attr.size_class)
+    return [_SchedulingInfo(
+        exec_group = scheduling.exec_group,
+        resources = scheduling.resource_set("linux", 0),
+        weaver_binary = scheduling.weaver_binary,
+        worker = scheduling.worker,
+        registry_snapshots = scheduling.registry_snapshots,
+    )]
+
+# Rule resolving scheduling with the attributes and exec groups of the Weaver
+# rules, since actions do not expose their exec group or resource set
+_scheduling_subject = rule(
+    implementation = _scheduling_subject_impl,
+    attrs = {
+        "size_class": attr.string(),
+        "weaver": attr.label(executable = True, cfg = "exec"),
+        "_weaver_worker": attr.label(
+            default = Label("//weaver/tools:weaver_worker"),
+            executable = True,
+            cfg = "exec",
+        ),
+        "_weaver_worker_large": attr.label(
+            default = Label("//weaver/tools:weaver_worker"),
+            executable = True,
+            cfg = config.exec(WEAVER_LARGE_EXEC_GROUP),
+        ),
+    },
+    toolchains = [optional_weaver_toolchain()],
+    exec_groups = {
+        WEAVER_LARGE_EXEC_GROUP: exec_group(
+            toolchains = [optional_weaver_toolchain()],
+        ),
+    },
+)
+
+def _small_registry_test_impl(ctx):
+    """Test scheduling of small registries."""
+    env = unittest.begin(ctx)
+
+    asserts.equals(env, "small", registry_size_class(0))
+    asserts.equals(env, "small", registry_size_class(10))
+    asserts.equals(env, "small", registry_size_class(199))
+
+    small = REGISTRY_SIZE_CLASSES["small"]
+    asserts.equals(env, {"cpu": 1, "memory": 512}, small.resource_set("linux", 10))
+    asserts.equals(env, None, small.exec_group)
+
+    return unittest.end(env)
+
+def _medium_registry_test_impl(ctx):
+    """Test scheduling of medium registries."""
+    env = unittest.begin(ctx)
+
+    asserts.equals(env, "medium", registry_size_class(200))
+    asserts.equals(env, "medium", registry_size_class(1999))
+
+    medium = REGISTRY_SIZE_CLASSES["medium"]
+    asserts.equals(env, {"cpu": 2, "memory": 2048}, medium.resource_set("linux", 500))
+    asserts.equals(env, None, medium.exec_group)
+
+    return unittest.end(env)
+
+def _large_registry_test_impl(ctx):
+    """Test scheduling of large registries."""
+    env = unittest.begin(ctx)
+
+    asserts.equals(env, "large", registry_size_class(2000))
+    asserts.equals(env, "large", registry_size_class(10000))
+
+    large = REGISTRY_SIZE_CLASSES["large"]
+    asserts.equals(env, {"cpu": 4, "memory": 8192}, large.resource_set("linux", 10000))
+    asserts.equals(env, WEAVER_LARGE_EXEC_GROUP, large.exec_group)
+
+    return unittest.end(env)
+
+def _size_hint_test_impl(ctx):
+    """Test that a declared size hint overrides the file count."""
+    env = unittest.begin(ctx)
+
+    asserts.equals(env, "large", registry_size_class(0, "large"))
+    asserts.equals(env, "small", registry_size_class(10000, "small"))
+    asserts.equals(env, "medium", registry_size_class(10, "medium"))
+    asserts.equals(env, "medium", registry_size_class(500, "auto"))
+
+    # Class thresholds are increasing
+    asserts.true(env, REGISTRY_SIZE_CLASSES["small"].min_files < REGISTRY_SIZE_CLASSES["medium"].min_files)
+    asserts.true(env, REGISTRY_SIZE_CLASSES["medium"].min_files < REGISTRY_SIZE_CLASSES["large"].min_files)
+
+    return unittest.end(env)
+
+def _sandbox_and_cache_test_impl(ctx):
+    """Test that execution requirements keep actions sandboxed and cacheable."""
+    env = unittest.begin(ctx)
+
+    # These tags take effect by their presence, whatever their value
+    disabling_tags = ["no-sandbox", "no-cache", "no-remote-cache", "no-remote", "requires-network", "local"]
+    for platform in [None] + get_supported_platforms():
+        requirements = get_execution_requirements(platform)
+        for tag in disabling_tags:
+            asserts.false(
+                env,
+                tag in requirements,
+                "{} requirements should not contain {}".format(platform or "Default", tag),
+            )
+
+    return unittest.end(env)
+
+def _exec_group_scheduling_test_impl(ctx):
+    """Test the exec group, resources and tools of an action of a size class."""
+    env = analysistest.begin(ctx)
+
+    info = analysistest.target_under_test(env)[_SchedulingInfo]
+    asserts.equals(env, ctx.attr.exec_group or None, info.exec_group)
+    asserts.equals(env, ctx.attr.cpu, info.resources["cpu"])
+    asserts.equals(env, ctx.attr.memory, info.resources["memory"])
+    asserts.true(env, info.worker.basename.startswith("weaver_worker"), "The action should run the Weaver wrapper")
+
+    # Actions in the large exec group run the binary of the group's toolchain
+    if info.exec_group:
+        asserts.true(env, info.weaver_binary != None, "{} actions should run the Weaver toolchain of their exec group".format(info.exec_group))
+    else:
+        asserts.equals(env, None, info.weaver_binary)
+
+    # Only toolchains declaring it get the resolved registry from the wrapper
+    asserts.equals(env, ctx.attr.registry_snapshots, info.registry_snapshots)
+
+    return analysistest.end(env)
+
+def _large_validation_action_test_impl(ctx):
+    """Test that a large validation action runs the Weaver wrapper and the toolchain's Weaver."""
+    env = analysistest.begin(ctx)
+
+    actions = [action for action in analysistest.target_actions(env) if action.mnemonic == "WeaverValidate"]
+    asserts.equals(env, 1, len(actions))
+    action = actions[0]
+    asserts.true(env, action.argv[0].endswith("weaver_worker"), "The action should run the Weaver wrapper, not {}".format(action.argv[0]))
+    inputs = [f.basename for f in action.inputs.to_list()]
+    asserts.true(env, "mock_weaver.py" in inputs, "The toolchain's Weaver should be a tool of the action")
+
+    return analysistest.end(env)
+
+scheduling_small_registry_test = unittest.make(_small_registry_test_impl)
+scheduling_medium_registry_test = unittest.make(_medium_registry_test_impl)
+scheduling_large_registry_test = unittest.make(_large_registry_test_impl)
+scheduling_size_hint_test = unittest.make(_size_hint_test_impl)
+scheduling_sandbox_and_cache_test = unittest.make(_sandbox_and_cache_test_impl)
+
+exec_group_scheduling_test = analysistest.make(
+    _exec_group_scheduling_test_impl,
+    attrs = {
+        "exec_group": attr.string(),
+        "cpu": attr.int(),
+        "memory": attr.int(),
+        "registry_snapshots": attr.bool(),
+    },
+)
+
+large_validation_action_test = analysistest.make(_large_validation_action_test_impl)
+
+def weaver_scheduling_test_suite(name):
+    """Create a test suite for size-aware scheduling."""
+    for size_class, exec_group in [("small", ""), ("medium", ""), ("large", WEAVER_LARGE_EXEC_GROUP)]:
+        resources = REGISTRY_SIZE_CLASSES[size_class].resource_set("linux", 0)
+        _scheduling_subject(
+            name = "{}_{}_subject".format(name, size_class),
+            size_class = size_class,
+            tags = ["manual"],
+        )
+        exec_group_scheduling_test(
+            name = "{}_{}_exec_group_test".format(name, size_class),
+            target_under_test = ":{}_{}_subject".format(name, size_class),
+            exec_group = exec_group,
+            cpu = resources["cpu"],
+            memory = resources["memory"],
+            registry_snapshots = True,
+        )
+
+    # An explicit weaver binary is built for the default execution platform,
+    # so large actions running it stay in the default exec group, and it is
+    # not assumed to read resolved registries
+    _scheduling_subject(
+        name = name + "_explicit_weaver_subject",
+        size_class = "large",
+        weaver = "//weaver:mock_weaver",
+        tags = ["manual"],
+    )
+    exec_group_scheduling_test(
+        name = name + "_explicit_weaver_exec_group_test",
+        target_under_test = ":" + name + "_explicit_weaver_subject",
+        exec_group = "",
+        cpu = 4,
+        memory = 8192,
+        registry_snapshots = False,
+    )
+
+    weaver_validate_test(
+        name = name + "_large_validation_subject",
+        registries = ["//tests/schemas:sample.yaml"],
+        size_hint = "large",
+        tags = ["manual"],
+    )
+    large_validation_action_test(
+        name = name + "_large_validation_action_test",
+        target_under_test = ":" + name + "_large_validation_subject",
+    )
+
+    unittest.suite(
+        name + "_unit",
+        scheduling_small_registry_test,
+        scheduling_medium_registry_test,
+        scheduling_large_registry_test,
+        scheduling_size_hint_test,
+        scheduling_sandbox_and_cache_test,
+    )
+
+    native.test_suite(
+        name = name,
+        tests = [
+            ":" + name + "_unit",
+            ":" + name + "_small_exec_group_test",
+            ":" + name + "_medium_exec_group_test",
+            ":" + name + "_large_exec_group_test",
+            ":" + name + "_explicit_weaver_exec_group_test",
+            ":" + name + "_large_validation_action_test",
+        ],
+    )
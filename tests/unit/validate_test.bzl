@@ -5,7 +5,8 @@ This module contains tests for schema validation functionality using
 OpenTelemetry Weaver.
 """
 
-load("@bazel_skylib//lib:unittest.bzl", "asserts", "unittest")
+load("@bazel_skylib//lib:unittest.bzl", "analysistest", "asserts", "unittest")
+load("//weaver:defs.bzl", "weaver_validate_test")
 load("//weaver:providers.bzl", "WeaverValidationInfo")
 
 def _weaver_validate_basic_test_impl(ctx):
@@ -88,6 +89,51 @@ def _weaver_validate_error_handling_test_impl(ctx):
     
     return unittest.end(env)
 
+def _validate_actions(env):
+    """Get the WeaverValidate actions of the target under test."""
+    return [
+        action
+        for action in analysistest.target_actions(env)
+        if action.mnemonic == "WeaverValidate"
+    ]
+
+def _input_paths(action):
+    """Get the short paths of the inputs of an action."""
+    return [f.short_path for f in action.inputs.to_list()]
+
+def _policy_dirs_inputs_test_impl(ctx):
+    """Test that the files of policy directories are validation action inputs."""
+    env = analysistest.begin(ctx)
+    
+    actions = _validate_actions(env)
+    asserts.equals(env, 1, len(actions))
+    inputs = _input_paths(actions[0])
+    for policy in ctx.attr.expected_policies:
+        asserts.true(env, policy in inputs, "{} should be an input of the validation action".format(policy))
+    
+    return analysistest.end(env)
+
+def _split_policy_dirs_inputs_test_impl(ctx):
+    """Test that each split policy directory is an input of its own action only."""
+    env = analysistest.begin(ctx)
+    
+    actions = _validate_actions(env)
+    asserts.equals(env, len(ctx.attr.expected_policies), len(actions))
+    for policy in ctx.attr.expected_policies:
+        holders = [action for action in actions if policy in _input_paths(action)]
+        asserts.equals(env, 1, len(holders), "{} should be an input of exactly one action".format(policy))
+    
+    # Actions are named after their policy directory, not its position
+    reports = sorted([f.basename for action in actions for f in action.outputs.to_list() if f.basename.endswith("_validation_result.json")])
+    target_name = analysistest.target_under_test(env).label.name
+    asserts.equals(
+        env,
+        sorted(["{}_{}_validation_result.json".format(target_name, unit) for unit in ctx.attr.expected_units]),
+        reports,
+    )
+    
+    return analysistest.end(env)
+
 # Test targets
 weaver_validate_basic_test = unittest.make(
     _weaver_validate_basic_test_impl,
@@ -121,10 +167,57 @@ weaver_validate_error_handling_test = unittest.make(
     _weaver_validate_error_handling_test_impl,
 )
 
+policy_dirs_inputs_test = analysistest.make(
+    _policy_dirs_inputs_test_impl,
+    attrs = {"expected_policies": attr.string_list()},
+)
+
+split_policy_dirs_inputs_test = analysistest.make(
+    _split_policy_dirs_inputs_test_impl,
+    attrs = {
+        "expected_policies": attr.string_list(),
+        "expected_units": attr.string_list(),
+    },
+)
+
+_POLICY_FILES = [
+    "tests/unit/policies/naming/naming.rego",
+    "tests/unit/policies/stability/stability.rego",
+]
+
 def weaver_validate_test_suite(name):
     """Create a test suite for weaver_validate rule."""
+    weaver_validate_test(
+        name = name + "_policy_dirs_subject",
+        registries = ["//tests/schemas:sample.yaml"],
+        policy_dirs = [":naming_policies", ":stability_policies"],
+        tags = ["manual"],
+    )
+    policy_dirs_inputs_test(
+        name = name + "_policy_dirs_inputs_test",
+        target_under_test = ":" + name + "_policy_dirs_subject",
+        expected_policies = _POLICY_FILES,
+    )
+    
+    weaver_validate_test(
+        name = name + "_split_policy_dirs_subject",
+        registries = ["//tests/schemas:sample.yaml"],
+        policy_dirs = [":naming_policies", ":stability_policies"],
+        split_policies = True,
+        tags = ["manual"],
+    )
+    split_policy_dirs_inputs_test(
+        name = name + "_split_policy_dirs_inputs_test",
+        target_under_test = ":" + name + "_split_policy_dirs_subject",
+        expected_policies = _POLICY_FILES,
+        expected_units = [
+            "policy_tests_unit_naming_policies",
+            "policy_tests_unit_stability_policies",
+        ],
+    )
+    
     unittest.suite(
-        name,
+        name + "_unit",
         weaver_validate_basic_test,
         weaver_validate_with_policies_test,
         weaver_validate_build_mode_test,
@@ -133,4 +226,13 @@ def weaver_validate_test_suite(name):
         weaver_validate_multiple_schemas_test,
         weaver_validate_multiple_policies_test,
         weaver_validate_error_handling_test,
-    ) 
\ No newline at end of file
+    )
+    
+    native.test_suite(
+        name = name,
+        tests = [
+            ":" + name + "_unit",
+            ":" + name + "_policy_dirs_inputs_test",
+            ":" + name + "_split_policy_dirs_inputs_test",
+        ],
+    )
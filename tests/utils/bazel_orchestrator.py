@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+"""
+Bazel invocation orchestrator for the test runner scripts.
+
+The runners describe their checks as test groups: Bazel targets to build or
+test, or a query. Instead of one `bazel` subprocess per group, the
+orchestrator:
+
+- Merges groups with the same flags and expected outcome into a single
+  `bazel test --keep_going` invocation. `bazel test` builds the non-test
+  targets of build groups too, and `--keep_going` reports every failing
+  target instead of stopping at the first one.
+- With `--jobs` greater than 1, runs the invocations concurrently, each in
+  an isolated output base so the Bazel servers do not wait on each other's
+  output base lock. The output bases are kept under `--output-base-root`
+  between runs so their analysis caches stay warm, and share the default
+  repository cache, so archives are downloaded once.
+- Reads per-target results from the Build Event Protocol and writes them as
+  JUnit XML (`--junit-out`) and a JSON timing report (`--json-out`).
+
+Targets are attributed to the group that lists them. Targets reported under
+other labels, such as the tests of a `test_suite`, are attributed to the
+group whose targets were not reported by their own label. When several
+groups of an invocation have such targets, a `tests()` query over each of
+them decides which group the reported tests belong to.
+"""
+
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_OUTPUT_BASE_ROOT = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "rules_weaver_tests"
+
+# Expected outcomes of a group
+EXPECT_PASS = "pass"
+EXPECT_FAIL = "fail"
+EXPECT_ANY = "any"
+
+# Test statuses that count as passing, and the status of built non-test targets
+PASSING_STATUSES = ("PASSED", "FLAKY", "BUILT")
+
+# A test group: `command` is "build" or "test", which are merged into
+# `bazel test` invocations, or "query", which runs the first target as a
+# query expression on its own
+TestGroup = namedtuple(
+    "TestGroup",
+    ["name", "targets", "command", "flags", "expect"],
+    defaults=("test", (), EXPECT_PASS),
+)
+
+# The result of a target reported by the Build Event Protocol
+TargetResult = namedtuple("TargetResult", ["label", "status", "seconds"])
+
+# The result of a group: `outcome` is whether its targets passed, `passed`
+# whether that matches the expected outcome
+GroupResult = namedtuple(
+    "GroupResult",
+    ["name", "passed", "outcome", "invocation", "seconds", "targets", "message", "stdout"],
+)
+
+# A Bazel invocation running one or more merged groups
+Invocation = namedtuple("Invocation", ["name", "groups", "command", "flags", "expect"])
+
+# The outcome of running an invocation
+InvocationResult = namedtuple(
+    "InvocationResult",
+    ["invocation", "argv", "output_base", "exit_code", "seconds", "timed_out", "stdout", "stderr", "targets",
+     "expansions"],
+)
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add the orchestrator options to a runner's argument parser."""
+
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Number of Bazel invocations to run concurrently, each in an isolated output base")
+    parser.add_argument("--no-merge", dest="merge", action="store_false",
+                        help="Run each group in its own Bazel invocation")
+    parser.add_argument("--junit-out", help="Write results as JUnit XML to this file")
+    parser.add_argument("--json-out", help="Write results and timings as JSON to this file")
+    parser.add_argument("--timeout", type=int, default=1800, help="Timeout of each Bazel invocation in seconds")
+    parser.add_argument("--bazel", default=os.environ.get("BAZEL", "bazel"), help="Bazel binary")
+    parser.add_argument("--output-base-root", default=str(DEFAULT_OUTPUT_BASE_ROOT),
+                        help="Directory of the isolated output bases used with --jobs")
+    parser.add_argument("--keep-server", action="store_true",
+                        help="Leave the Bazel servers of isolated output bases running")
+
+
+def default_workspace() -> str:
+    """Return the workspace to run Bazel in, also when started with `bazel run`."""
+
+    return os.environ.get("BUILD_WORKSPACE_DIRECTORY", os.getcwd())
+
+
+def plan_invocations(groups: List[TestGroup], merge: bool = True) -> List[Invocation]:
+    """Merge compatible groups into Bazel invocations, keeping the group order."""
+
+    invocations = []
+    merged = {}
+    for group in groups:
+        command = "query" if group.command == "query" else "test"
+        flags = tuple(group.flags)
+        key = (command, flags, group.expect)
+        if merge and command == "test" and key in merged:
+            invocation = merged[key]
+            invocation.groups.append(group)
+            continue
+        invocation = Invocation(group.name, [group], command, flags, group.expect)
+        invocations.append(invocation)
+        if command == "test":
+            merged[key] = invocation
+
+    return [
+        invocation._replace(name=" + ".join(group.name for group in invocation.groups))
+        for invocation in invocations
+    ]
+
+
+def normalize_label(label: str) -> str:
+    """Strip the main repository prefix of a label."""
+
+    for prefix in ("@@//", "@//"):
+        if label.startswith(prefix):
+            return label[len(prefix) - 2:]
+    return label
+
+
+def _duration_seconds(summary: dict) -> float:
+    """Return the total run duration of a test summary event."""
+
+    if "totalRunDurationMillis" in summary:
+        return int(summary["totalRunDurationMillis"]) / 1000.0
+    duration = summary.get("totalRunDuration", "0s")
+    return float(duration.rstrip("s") or 0)
+
+
+def parse_build_events(path: Path) -> Dict[str, TargetResult]:
+    """Return the target results of a Build Event Protocol JSON file."""
+
+    results = {}
+    if not path.exists():
+        return results
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                # The last event of an interrupted invocation may be truncated
+                continue
+            event_id = event.get("id", {})
+
+            if "testSummary" in event_id:
+                label = normalize_label(event_id["testSummary"]["label"])
+                summary = event.get("testSummary", {})
+                results[label] = TargetResult(label, summary.get("overallStatus", "NO_STATUS"), _duration_seconds(summary))
+            elif "targetCompleted" in event_id:
+                label = normalize_label(event_id["targetCompleted"]["label"])
+                if label in results and results[label].status != "BUILT":
+                    continue
+                success = event.get("completed", {}).get("success", False)
+                results[label] = TargetResult(label, "BUILT" if success else "FAILED_TO_BUILD", 0.0)
+            elif "aborted" in event:
+                # Patterns and targets that failed to load or analyze
+                if "pattern" in event_id:
+                    labels = event_id["pattern"].get("pattern", [])
+                elif "unconfiguredLabel" in event_id:
+                    labels = [event_id["unconfiguredLabel"]["label"]]
+                elif "targetConfigured" in event_id:
+                    labels = [event_id["targetConfigured"]["label"]]
+                else:
+                    labels = []
+                for label in labels:
+                    label = normalize_label(label)
+                    results[label] = TargetResult(label, "FAILED_TO_BUILD", 0.0)
+
+    return results
+
+
+def _output_base(root: Path, workspace: Path, index: int) -> Path:
+    """Return a stable isolated output base for an invocation of a workspace."""
+
+    digest = hashlib.sha256(str(workspace).encode("utf-8")).hexdigest()[:8]
+    return root / digest / "ob{}".format(index)
+
+
+def _tail(text: str, lines: int = 50) -> str:
+    """Return the last lines of an output."""
+
+    return "\n".join(text.strip().splitlines()[-lines:])
+
+
+class Orchestrator:
+    """Runs test groups through merged, optionally concurrent, Bazel invocations."""
+
+    def __init__(self, suite: str, options: argparse.Namespace, workspace: Optional[str] = None):
+        self.suite = suite
+        self.options = options
+        self.workspace = Path(workspace or default_workspace()).resolve()
+        self.isolated = options.jobs > 1
+        self.invocation_results = []
+        self.group_results = []
+        self.start_time = time.time()
+
+    def _startup_options(self, output_base: Optional[Path]) -> List[str]:
+        return ["--output_base={}".format(output_base)] if output_base else []
+
+    def _expand_tests(self, group: TestGroup, output_base: Optional[Path]) -> Optional[List[str]]:
+        """Return the tests that the targets of a group expand to."""
+
+        argv = [self.options.bazel] + self._startup_options(output_base)
+        argv += ["query", "--output=label", "tests({})".format(" + ".join(group.targets))]
+        try:
+            result = subprocess.run(
+                argv,
+                cwd=str(self.workspace),
+                capture_output=True,
+                text=True,
+                timeout=self.options.timeout,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        if result.returncode != 0:
+            return None
+        return [normalize_label(label) for label in result.stdout.split()]
+
+    def _run_invocation(self, invocation: Invocation, output_base: Optional[Path], events_file: Path) -> InvocationResult:
+        """Run a single Bazel invocation and collect its target results."""
+
+        argv = [self.options.bazel] + self._startup_options(output_base)
+        if invocation.command == "query":
+            group = invocation.groups[0]
+            argv += ["query"] + list(invocation.flags) + list(group.targets[:1])
+        else:
+            argv += ["test", "--keep_going", "--build_event_json_file={}".format(events_file)]
+            argv += list(invocation.flags)
+            argv += [target for group in invocation.groups for target in group.targets]
+
+        print("[{}] Running: {}".format(invocation.name, " ".join(argv)))
+        start = time.monotonic()
+        timed_out = False
+        try:
+            result = subprocess.run(
+                argv,
+                cwd=str(self.workspace),
+                capture_output=True,
+                text=True,
+                timeout=self.options.timeout,
+            )
+            exit_code, stdout, stderr = result.returncode, result.stdout, result.stderr
+        except subprocess.TimeoutExpired as e:
+            timed_out = True
+            exit_code = -1
+            stdout = e.stdout.decode("utf-8", "replace") if isinstance(e.stdout, bytes) else (e.stdout or "")
+            stderr = "Command timed out after {}s".format(self.options.timeout)
+        except OSError as e:
+            exit_code, stdout, stderr = -1, "", str(e)
+        seconds = round(time.monotonic() - start, 3)
+        print("[{}] {:.3f}s (exit code {})".format(invocation.name, seconds, exit_code))
+
+        # Expand the groups sharing targets reported under other labels
+        targets = parse_build_events(events_file)
+        unreported = [
+            group for group in invocation.groups
+            if any(label not in targets for label in group.targets)
+        ]
+        expansions = {}
+        if len(unreported) > 1 and not timed_out:
+            for group in unreported:
+                tests = self._expand_tests(group, output_base)
+                if tests is not None:
+                    expansions[group.name] = tests
+
+        return InvocationResult(
+            invocation=invocation,
+            argv=argv,
+            output_base=str(output_base) if output_base else None,
+            exit_code=exit_code,
+            seconds=seconds,
+            timed_out=timed_out,
+            stdout=stdout,
+            stderr=stderr,
+            targets=targets,
+            expansions=expansions,
+        )
+
+    def _group_results(self, result: InvocationResult) -> List[GroupResult]:
+        """Attribute the target results of an invocation to its groups."""
+
+        groups = result.invocation.groups
+        claimed = set(target for group in groups for target in group.targets)
+        unclaimed = [target for label, target in sorted(result.targets.items()) if label not in claimed]
+
+        group_results = []
+        for group in groups:
+            targets = [result.targets[label] for label in group.targets if label in result.targets]
+            if group.name in result.expansions:
+                expanded = set(result.expansions[group.name])
+                targets += [target for target in unclaimed if target.label in expanded]
+            elif unclaimed and len(targets) < len(group.targets):
+                targets += unclaimed
+
+            if result.timed_out:
+                outcome = False
+            elif result.invocation.command == "query" or not targets:
+                outcome = result.exit_code == 0
+            else:
+                outcome = all(target.status in PASSING_STATUSES for target in targets)
+
+            if group.expect == EXPECT_FAIL:
+                passed = not outcome
+            else:
+                passed = outcome or group.expect == EXPECT_ANY
+
+            message = ""
+            if not passed:
+                if group.expect == EXPECT_FAIL:
+                    message = "Expected failure, but all targets passed"
+                else:
+                    failing = [
+                        "{}: {}".format(target.label, target.status)
+                        for target in targets
+                        if target.status not in PASSING_STATUSES
+                    ]
+                    message = "\n".join(failing) or _tail(result.stderr) or "Exit code {}".format(result.exit_code)
+
+            group_results.append(GroupResult(
+                name=group.name,
+                passed=passed,
+                outcome=outcome,
+                invocation=result.invocation.name,
+                seconds=result.seconds,
+                targets=targets,
+                message=message,
+                stdout=result.stdout,
+            ))
+        return group_results
+
+    def run(self, groups: List[TestGroup]) -> List[GroupResult]:
+        """Run the groups and return their results in the order they were given."""
+
+        invocations = plan_invocations(groups, self.options.merge)
+        output_bases = [None] * len(invocations)
+        if self.isolated:
+            root = Path(self.options.output_base_root)
+            output_bases = [_output_base(root, self.workspace, index) for index in range(len(invocations))]
+            for output_base in output_bases:
+                output_base.mkdir(parents=True, exist_ok=True)
+
+        with tempfile.TemporaryDirectory(prefix="weaver_bep_") as events_dir:
+            jobs = max(1, min(self.options.jobs, len(invocations)))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+                futures = [
+                    executor.submit(
+                        self._run_invocation,
+                        invocation,
+                        output_base,
+                        Path(events_dir) / "{}.json".format(index),
+                    )
+                    for index, (invocation, output_base) in enumerate(zip(invocations, output_bases))
+                ]
+                invocation_results = [future.result() for future in futures]
+
+        if self.isolated and not self.options.keep_server:
+            for output_base in output_bases:
+                subprocess.run(
+                    [self.options.bazel] + self._startup_options(output_base) + ["shutdown"],
+                    cwd=str(self.workspace),
+                    capture_output=True,
+                )
+
+        by_name = {}
+        for result in invocation_results:
+            for group_result in self._group_results(result):
+                by_name[group_result.name] = group_result
+        group_results = [by_name[group.name] for group in groups]
+
+        self.invocation_results.extend(invocation_results)
+        self.group_results.extend(group_results)
+        return group_results
+
+    def record(self, name: str, passed: bool, seconds: float, message: str = ""):
+        """Record the result of a check that does not run through Bazel."""
+
+        self.group_results.append(GroupResult(name, passed, passed, None, round(seconds, 3), [], message, ""))
+
+    def report(self) -> dict:
+        """Return the results and timings as a JSON-serializable report."""
+
+        passed = sum(1 for result in self.group_results if result.passed)
+        return {
+            "suite": self.suite,
+            "timestamp": self.start_time,
+            "total_seconds": round(time.time() - self.start_time, 3),
+            "workspace": str(self.workspace),
+            "jobs": self.options.jobs,
+            "merged": self.options.merge,
+            "passed": passed,
+            "failed": len(self.group_results) - passed,
+            "invocations": [
+                {
+                    "name": result.invocation.name,
+                    "groups": [group.name for group in result.invocation.groups],
+                    "argv": result.argv,
+                    "output_base": result.output_base,
+                    "exit_code": result.exit_code,
+                    "seconds": result.seconds,
+                    "timed_out": result.timed_out,
+                }
+                for result in self.invocation_results
+            ],
+            "groups": {
+                result.name: {
+                    "status": "PASS" if result.passed else "FAIL",
+                    "outcome": "PASS" if result.outcome else "FAIL",
+                    "invocation": result.invocation,
+                    "seconds": result.seconds,
+                    "message": result.message,
+                    "targets": {
+                        target.label: {"status": target.status, "seconds": target.seconds}
+                        for target in result.targets
+                    },
+                }
+                for result in self.group_results
+            },
+        }
+
+    def junit_xml(self) -> ET.ElementTree:
+        """Return the results as JUnit XML, with a test suite per group."""
+
+        report = self.report()
+        testsuites = ET.Element("testsuites", {
+            "name": self.suite,
+            "time": "{:.3f}".format(report["total_seconds"]),
+        })
+        total_tests = 0
+        total_failures = 0
+
+        for result in self.group_results:
+            testsuite = ET.SubElement(testsuites, "testsuite", {
+                "name": result.name,
+                "time": "{:.3f}".format(result.seconds),
+            })
+            failures = 0
+
+            # Individual targets, unless the group expects them to fail
+            cases = result.targets
+            if all(target.status in PASSING_STATUSES for target in cases) != result.passed:
+                cases = []
+            for target in cases:
+                testcase = ET.SubElement(testsuite, "testcase", {
+                    "classname": result.name,
+                    "name": target.label,
+                    "time": "{:.3f}".format(target.seconds),
+                })
+                if target.status not in PASSING_STATUSES:
+                    failures += 1
+                    failure = ET.SubElement(testcase, "failure", {"message": target.status})
+                    failure.text = result.message
+
+            # The group as a whole otherwise
+            if not cases:
+                testcase = ET.SubElement(testsuite, "testcase", {
+                    "classname": self.suite,
+                    "name": result.name,
+                    "time": "{:.3f}".format(result.seconds),
+                })
+                if not result.passed:
+                    failures += 1
+                    failure = ET.SubElement(testcase, "failure", {"message": "FAILED"})
+                    failure.text = result.message
+
+            testsuite.set("tests", str(max(1, len(cases))))
+            testsuite.set("failures", str(failures))
+            total_tests += max(1, len(cases))
+            total_failures += failures
+
+        testsuites.set("tests", str(total_tests))
+        testsuites.set("failures", str(total_failures))
+
+        return ET.ElementTree(testsuites)
+
+    def write_reports(self, junit_out: Optional[str] = None, json_out: Optional[str] = None):
+        """Write the JUnit XML and JSON reports to the given files."""
+
+        if junit_out:
+            Path(junit_out).parent.mkdir(parents=True, exist_ok=True)
+            self.junit_xml().write(junit_out, encoding="utf-8", xml_declaration=True)
+            print("JUnit report saved to: {}".format(junit_out))
+        if json_out:
+            Path(json_out).parent.mkdir(parents=True, exist_ok=True)
+            with open(json_out, "w") as f:
+                json.dump(self.report(), f, indent=2, sort_keys=True)
+            print("Timing report saved to: {}".format(json_out))
@@ -3,7 +3,11 @@
 Mock Weaver binary for testing OpenTelemetry Weaver rules.
 
 This script simulates the behavior of the actual Weaver binary
-for testing purposes.
+for testing purposes. Set MOCK_WEAVER_DEBUG=1 to print the parsed
+arguments of each call.
+
+For benchmarking, use //weaver:mock_weaver, whose cost model scales CPU
+time, memory and output volume with the input schemas.
 """
 
 import sys
@@ -75,13 +79,15 @@ def main():
     # Parse all arguments
     args = parser.parse_args()
     
-    # Always print debug info for now
-    print(f"Mock Weaver: Debug - Command: {args.command}")
-    print(f"Mock Weaver: Debug - Schema files: {args.schema_files}")
-    print(f"Mock Weaver: Debug - Output dir: {args.output_dir}")
-    print(f"Mock Weaver: Debug - Output file: {args.output}")
-    print(f"Mock Weaver: Debug - Format: {args.format}")
-    print(f"Mock Weaver: Debug - All sys.argv: {sys.argv}")
+    # Debug info only when requested
+    debug = os.environ.get("MOCK_WEAVER_DEBUG") == "1"
+    if debug:
+        print(f"Mock Weaver: Debug - Command: {args.command}")
+        print(f"Mock Weaver: Debug - Schema files: {args.schema_files}")
+        print(f"Mock Weaver: Debug - Output dir: {args.output_dir}")
+        print(f"Mock Weaver: Debug - Output file: {args.output}")
+        print(f"Mock Weaver: Debug - Format: {args.format}")
+        print(f"Mock Weaver: Debug - All sys.argv: {sys.argv}")
     
     if args.verbose:
         print(f"Mock Weaver: Executing {args.command} command")
@@ -108,7 +114,8 @@ def main():
     elif args.command == "validate":
         # Use the specified output file path or default
         output_file = args.output or "validation_result.txt"
-        print(f"Mock Weaver: Debug - Creating validation output at: {output_file}")
+        if debug:
+            print(f"Mock Weaver: Debug - Creating validation output at: {output_file}")
         
         # Create validation result file at the expected location
         with open(output_file, "w") as f:
@@ -4,31 +4,21 @@ Integration test runner for Weaver rules.
 
 This script runs comprehensive integration tests for the Weaver rules
 and validates that all components work correctly together.
+
+The Bazel test groups run through the orchestrator in bazel_orchestrator.py,
+which merges them into a single `bazel test --keep_going` invocation and
+writes JUnit XML and JSON timing reports:
+
+    python3 tests/utils/run_integration_tests.py --junit-out results.xml --json-out timings.json
 """
 
+import argparse
 import os
 import sys
 import subprocess
-import json
 import time
-from pathlib import Path
 
-def run_bazel_command(args, capture_output=True):
-    """Run a Bazel command and return the result."""
-    try:
-        result = subprocess.run(
-            ["bazel"] + args,
-            capture_output=capture_output,
-            text=True,
-            timeout=300  # 5 minute timeout
-        )
-        return result
-    except subprocess.TimeoutExpired:
-        print("ERROR: Bazel command timed out")
-        return None
-    except FileNotFoundError:
-        print("ERROR: Bazel not found in PATH")
-        return None
+from bazel_orchestrator import Orchestrator, TestGroup, add_arguments
 
 def test_mock_weaver_binary():
     """Test that the mock Weaver binary works correctly."""
@@ -73,222 +63,57 @@ def test_mock_weaver_binary():
     print("✅ Mock Weaver binary test passed")
     return True
 
-def test_bazel_build():
-    """Test that Bazel can build the Weaver rules."""
-    print("Testing Bazel build...")
-    
-    # Test building the mock Weaver
-    result = run_bazel_command(["build", "//tests:mock_weaver"])
-    if not result or result.returncode != 0:
-        print("ERROR: Failed to build mock Weaver")
-        if result:
-            print("STDOUT:", result.stdout)
-            print("STDERR:", result.stderr)
-        return False
-    
-    print("✅ Bazel build test passed")
-    return True
-
-def test_weaver_schema_rule():
-    """Test the weaver_schema rule."""
-    print("Testing weaver_schema rule...")
-    
-    # Test building a schema target
-    result = run_bazel_command(["build", "//tests:test_schemas"])
-    if not result or result.returncode != 0:
-        print("ERROR: Failed to build weaver_schema target")
-        if result:
-            print("STDOUT:", result.stdout)
-            print("STDERR:", result.stderr)
-        return False
-    
-    print("✅ weaver_schema rule test passed")
-    return True
-
-def test_weaver_generate_rule():
-    """Test the weaver_generate rule."""
-    print("Testing weaver_generate rule...")
-    
-    # Test building a generate target
-    result = run_bazel_command(["build", "//tests:test_generated_code"])
-    if not result or result.returncode != 0:
-        print("ERROR: Failed to build weaver_generate target")
-        if result:
-            print("STDOUT:", result.stdout)
-            print("STDERR:", result.stderr)
-        return False
-    
-    print("✅ weaver_generate rule test passed")
-    return True
-
-def test_weaver_validate_rule():
-    """Test the weaver_validate rule."""
-    print("Testing weaver_validate rule...")
-    
-    # Test building a validate target
-    result = run_bazel_command(["build", "//tests:test_validation"])
-    if not result or result.returncode != 0:
-        print("ERROR: Failed to build weaver_validate target")
-        if result:
-            print("STDOUT:", result.stdout)
-            print("STDERR:", result.stderr)
-        return False
-    
-    print("✅ weaver_validate rule test passed")
-    return True
-
-def test_weaver_docs_rule():
-    """Test the weaver_docs rule."""
-    print("Testing weaver_docs rule...")
-    
-    # Test building a docs target
-    result = run_bazel_command(["build", "//tests:test_documentation"])
-    if not result or result.returncode != 0:
-        print("ERROR: Failed to build weaver_docs target")
-        if result:
-            print("STDOUT:", result.stdout)
-            print("STDERR:", result.stderr)
-        return False
-    
-    print("✅ weaver_docs rule test passed")
-    return True
-
-def test_weaver_library_macro():
-    """Test the weaver_library macro."""
-    print("Testing weaver_library macro...")
-    
-    # Test building a library target
-    result = run_bazel_command(["build", "//tests:test_library"])
-    if not result or result.returncode != 0:
-        print("ERROR: Failed to build weaver_library target")
-        if result:
-            print("STDOUT:", result.stdout)
-            print("STDERR:", result.stderr)
-        return False
-    
-    print("✅ weaver_library macro test passed")
-    return True
-
-def test_unit_tests():
-    """Test that unit tests pass."""
-    print("Testing unit tests...")
-    
-    # Test running unit tests
-    result = run_bazel_command(["test", "//tests:all_unit_tests"])
-    if not result or result.returncode != 0:
-        print("ERROR: Unit tests failed")
-        if result:
-            print("STDOUT:", result.stdout)
-            print("STDERR:", result.stderr)
-        return False
-    
-    print("✅ Unit tests passed")
-    return True
-
-def test_integration_tests():
-    """Test that integration tests pass."""
-    print("Testing integration tests...")
-    
-    # Test running integration tests
-    result = run_bazel_command(["test", "//tests:all_integration_tests"])
-    if not result or result.returncode != 0:
-        print("ERROR: Integration tests failed")
-        if result:
-            print("STDOUT:", result.stdout)
-            print("STDERR:", result.stderr)
-        return False
-    
-    print("✅ Integration tests passed")
-    return True
-
-def test_performance_tests():
-    """Test that performance tests pass."""
-    print("Testing performance tests...")
-    
-    # Test running performance tests
-    result = run_bazel_command(["test", "//tests:all_performance_tests"])
-    if not result or result.returncode != 0:
-        print("ERROR: Performance tests failed")
-        if result:
-            print("STDOUT:", result.stdout)
-            print("STDERR:", result.stderr)
-        return False
-    
-    print("✅ Performance tests passed")
-    return True
-
-def test_error_tests():
-    """Test that error tests pass."""
-    print("Testing error tests...")
-    
-    # Test running error tests
-    result = run_bazel_command(["test", "//tests:all_error_tests"])
-    if not result or result.returncode != 0:
-        print("ERROR: Error tests failed")
-        if result:
-            print("STDOUT:", result.stdout)
-            print("STDERR:", result.stderr)
-        return False
-    
-    print("✅ Error tests passed")
-    return True
-
-def test_comprehensive_suite():
-    """Test the comprehensive test suite."""
-    print("Testing comprehensive test suite...")
-    
-    # Test running comprehensive tests
-    result = run_bazel_command(["test", "//tests:comprehensive_test_suite"])
-    if not result or result.returncode != 0:
-        print("ERROR: Comprehensive test suite failed")
-        if result:
-            print("STDOUT:", result.stdout)
-            print("STDERR:", result.stderr)
-        return False
-    
-    print("✅ Comprehensive test suite passed")
-    return True
+# Bazel test groups, run after the mock Weaver binary test
+BAZEL_TEST_GROUPS = [
+    TestGroup("Bazel Build", ("//tests:mock_weaver",), command="build"),
+    TestGroup("weaver_schema Rule", ("//tests:test_schemas",), command="build"),
+    TestGroup("weaver_generate Rule", ("//tests:test_generated_code",), command="build"),
+    TestGroup("weaver_validate Rule", ("//tests:test_validation",), command="build"),
+    TestGroup("weaver_docs Rule", ("//tests:test_documentation",), command="build"),
+    TestGroup("weaver_library Macro", ("//tests:test_library",), command="build"),
+    TestGroup("Unit Tests", ("//tests:all_unit_tests",)),
+    TestGroup("Integration Tests", ("//tests:all_integration_tests",)),
+    TestGroup("Performance Tests", ("//tests:all_performance_tests",)),
+    TestGroup("Error Tests", ("//tests:all_error_tests",)),
+    TestGroup("Comprehensive Test Suite", ("//tests:comprehensive_test_suite",)),
+]
 
 def main():
     """Run all integration tests."""
+    parser = argparse.ArgumentParser(description="Integration test runner for Weaver rules")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    orchestrator = Orchestrator("weaver_integration_tests", args)
+    os.chdir(orchestrator.workspace)
+
     print("🚀 Starting Weaver Rules Integration Testing")
     print("=" * 50)
     
-    tests = [
-        ("Mock Weaver Binary", test_mock_weaver_binary),
-        ("Bazel Build", test_bazel_build),
-        ("weaver_schema Rule", test_weaver_schema_rule),
-        ("weaver_generate Rule", test_weaver_generate_rule),
-        ("weaver_validate Rule", test_weaver_validate_rule),
-        ("weaver_docs Rule", test_weaver_docs_rule),
-        ("weaver_library Macro", test_weaver_library_macro),
-        ("Unit Tests", test_unit_tests),
-        ("Integration Tests", test_integration_tests),
-        ("Performance Tests", test_performance_tests),
-        ("Error Tests", test_error_tests),
-        ("Comprehensive Test Suite", test_comprehensive_suite),
-    ]
+    print("\n📋 Running Mock Weaver Binary...")
+    start_time = time.time()
+    try:
+        orchestrator.record("Mock Weaver Binary", test_mock_weaver_binary(), time.time() - start_time)
+    except Exception as e:
+        orchestrator.record("Mock Weaver Binary", False, time.time() - start_time, str(e))
+    
+    print("\n📋 Running Bazel test groups...")
+    orchestrator.run(BAZEL_TEST_GROUPS)
     
     passed = 0
     failed = 0
     
-    for test_name, test_func in tests:
-        print(f"\n📋 Running {test_name}...")
-        start_time = time.time()
-        
-        try:
-            if test_func():
-                passed += 1
-                duration = time.time() - start_time
-                print(f"✅ {test_name} passed ({duration:.2f}s)")
-            else:
-                failed += 1
-                duration = time.time() - start_time
-                print(f"❌ {test_name} failed ({duration:.2f}s)")
-        except Exception as e:
+    for result in orchestrator.group_results:
+        if result.passed:
+            passed += 1
+            print(f"✅ {result.name} passed ({result.seconds:.2f}s)")
+        else:
             failed += 1
-            duration = time.time() - start_time
-            print(f"❌ {test_name} failed with exception ({duration:.2f}s): {e}")
+            print(f"❌ {result.name} failed ({result.seconds:.2f}s)")
+            if result.message:
+                print(result.message)
+    
+    orchestrator.write_reports(args.junit_out, args.json_out)
     
     print("\n" + "=" * 50)
     print("📊 Integration Test Results")
@@ -305,4 +130,4 @@ def main():
         return 1
 
 if __name__ == "__main__":
-    sys.exit(main()) 
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
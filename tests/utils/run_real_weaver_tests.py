@@ -4,250 +4,77 @@ Real Weaver Integration Test Runner
 
 This script runs integration tests with actual Weaver binaries downloaded
 from GitHub releases to ensure the rules work correctly with the real tool.
+
+The test groups run through the orchestrator in bazel_orchestrator.py: the
+build and test groups share one `bazel test --keep_going` invocation, and
+with `--jobs` the download query and error handling test run alongside it in
+isolated output bases:
+
+    python3 tests/utils/run_real_weaver_tests.py --jobs 3 --junit-out results.xml
 """
 
-import os
+import argparse
 import sys
-import subprocess
-import json
 import time
-from pathlib import Path
-from typing import List, Dict, Any
+from typing import Dict, Any
+
+from bazel_orchestrator import EXPECT_ANY, Orchestrator, TestGroup, add_arguments, default_workspace
+
+# Real Weaver test groups
+REAL_WEAVER_TEST_GROUPS = [
+    TestGroup("weaver_download", ("@real_weaver//:weaver_binary",), command="query", flags=("--output=location",)),
+    TestGroup("basic_integration", ("//tests:real_test_schemas",), command="build"),
+    TestGroup("code_generation", ("//tests:real_generated_code", "//tests:real_generated_rust"), command="build"),
+    TestGroup("validation", ("//tests:real_validation_test",)),
+    TestGroup("documentation", ("//tests:real_documentation",), command="build"),
+    TestGroup("workflow", ("//tests:real_workflow_test_suite",)),
+    TestGroup("performance", ("//tests:real_performance_generated",), command="build"),
+    # Expected to fail as a test, but not as a build
+    TestGroup("error_handling", ("//tests:real_invalid_validation",), expect=EXPECT_ANY),
+    TestGroup("platform_formats", tuple(
+        "//tests:real_platform_{}_generated".format(fmt) for fmt in ["typescript", "rust", "go", "python"]
+    ), command="build"),
+]
 
 class RealWeaverTestRunner:
     """Runner for real Weaver integration tests."""
     
-    def __init__(self, workspace_root: str):
-        self.workspace_root = Path(workspace_root)
-        self.test_results = {}
+    def __init__(self, workspace_root: str, options: argparse.Namespace):
+        self.orchestrator = Orchestrator("real_weaver_integration_tests", options, workspace_root)
+        self.workspace_root = self.orchestrator.workspace
         self.start_time = time.time()
-        
-    def run_bazel_command(self, command: List[str], capture_output: bool = True) -> subprocess.CompletedProcess:
-        """Run a Bazel command and return the result."""
-        cmd = ["bazel"] + command
-        print(f"Running: {' '.join(cmd)}")
-        
-        try:
-            result = subprocess.run(
-                cmd,
-                cwd=self.workspace_root,
-                capture_output=capture_output,
-                text=True,
-                timeout=300  # 5 minute timeout
-            )
-            return result
-        except subprocess.TimeoutExpired:
-            print(f"Command timed out: {' '.join(cmd)}")
-            return subprocess.CompletedProcess(cmd, -1, "", "Command timed out")
-        except Exception as e:
-            print(f"Error running command: {e}")
-            return subprocess.CompletedProcess(cmd, -1, "", str(e))
-    
-    def test_weaver_download(self) -> bool:
-        """Test that Weaver binary can be downloaded successfully."""
-        print("\n=== Testing Weaver Binary Download ===")
-        
-        # Test repository rule
-        result = self.run_bazel_command([
-            "query", "--output=location", "@real_weaver//:weaver_binary"
-        ])
-        
-        if result.returncode != 0:
-            print(f"Failed to query Weaver binary: {result.stderr}")
-            return False
-        
-        print(f"✓ Weaver binary location: {result.stdout.strip()}")
-        return True
-    
-    def test_basic_integration(self) -> bool:
-        """Test basic integration with real Weaver."""
-        print("\n=== Testing Basic Integration ===")
-        
-        # Test schema declaration
-        result = self.run_bazel_command([
-            "build", "//tests:real_test_schemas"
-        ])
-        
-        if result.returncode != 0:
-            print(f"Failed to build schema target: {result.stderr}")
-            return False
-        
-        print("✓ Schema declaration test passed")
-        return True
-    
-    def test_code_generation(self) -> bool:
-        """Test code generation with real Weaver."""
-        print("\n=== Testing Code Generation ===")
-        
-        # Test TypeScript generation
-        result = self.run_bazel_command([
-            "build", "//tests:real_generated_code"
-        ])
-        
-        if result.returncode != 0:
-            print(f"Failed to generate TypeScript code: {result.stderr}")
-            return False
-        
-        print("✓ TypeScript code generation test passed")
-        
-        # Test Rust generation
-        result = self.run_bazel_command([
-            "build", "//tests:real_generated_rust"
-        ])
-        
-        if result.returncode != 0:
-            print(f"Failed to generate Rust code: {result.stderr}")
-            return False
-        
-        print("✓ Rust code generation test passed")
-        return True
-    
-    def test_validation(self) -> bool:
-        """Test schema validation with real Weaver."""
-        print("\n=== Testing Schema Validation ===")
-        
-        # Test validation
-        result = self.run_bazel_command([
-            "test", "//tests:real_validation_test"
-        ])
-        
-        if result.returncode != 0:
-            print(f"Failed to validate schemas: {result.stderr}")
-            return False
-        
-        print("✓ Schema validation test passed")
-        return True
-    
-    def test_documentation(self) -> bool:
-        """Test documentation generation with real Weaver."""
-        print("\n=== Testing Documentation Generation ===")
-        
-        # Test HTML documentation
-        result = self.run_bazel_command([
-            "build", "//tests:real_documentation"
-        ])
-        
-        if result.returncode != 0:
-            print(f"Failed to generate documentation: {result.stderr}")
-            return False
-        
-        print("✓ Documentation generation test passed")
-        return True
-    
-    def test_workflow(self) -> bool:
-        """Test end-to-end workflow with real Weaver."""
-        print("\n=== Testing End-to-End Workflow ===")
-        
-        # Test complete workflow
-        result = self.run_bazel_command([
-            "test", "//tests:real_workflow_test_suite"
-        ])
-        
-        if result.returncode != 0:
-            print(f"Failed to run workflow test: {result.stderr}")
-            return False
-        
-        print("✓ End-to-end workflow test passed")
-        return True
-    
-    def test_performance(self) -> bool:
-        """Test performance with real Weaver."""
-        print("\n=== Testing Performance ===")
-        
-        # Test performance with larger schema set
-        result = self.run_bazel_command([
-            "build", "//tests:real_performance_generated"
-        ])
-        
-        if result.returncode != 0:
-            print(f"Failed to run performance test: {result.stderr}")
-            return False
-        
-        print("✓ Performance test passed")
-        return True
-    
-    def test_error_handling(self) -> bool:
-        """Test error handling with real Weaver."""
-        print("\n=== Testing Error Handling ===")
-        
-        # Test error handling (should not fail the build)
-        result = self.run_bazel_command([
-            "test", "//tests:real_invalid_validation"
-        ])
-        
-        # This test is expected to fail as a test, but not as a build
-        if result.returncode != 0:
-            print("✓ Error handling test passed (correctly detected invalid schema)")
-            return True
-        else:
-            print("⚠ Error handling test may not be working correctly")
-            return True
-    
-    def test_platform_formats(self) -> bool:
-        """Test different platform formats with real Weaver."""
-        print("\n=== Testing Platform Formats ===")
-        
-        # Test different output formats
-        formats = ["typescript", "rust", "go", "python"]
-        for fmt in formats:
-            target = f"//tests:real_platform_{fmt}_generated"
-            result = self.run_bazel_command(["build", target])
-            
-            if result.returncode != 0:
-                print(f"Failed to generate {fmt} code: {result.stderr}")
-                return False
-            
-            print(f"✓ {fmt} format test passed")
-        
-        return True
     
     def run_all_tests(self) -> Dict[str, Any]:
         """Run all real Weaver integration tests."""
         print("Starting Real Weaver Integration Tests")
         print("=" * 50)
         
-        tests = [
-            ("weaver_download", self.test_weaver_download),
-            ("basic_integration", self.test_basic_integration),
-            ("code_generation", self.test_code_generation),
-            ("validation", self.test_validation),
-            ("documentation", self.test_documentation),
-            ("workflow", self.test_workflow),
-            ("performance", self.test_performance),
-            ("error_handling", self.test_error_handling),
-            ("platform_formats", self.test_platform_formats),
-        ]
-        
         results = {}
-        for test_name, test_func in tests:
-            try:
-                start_time = time.time()
-                success = test_func()
-                end_time = time.time()
-                
-                results[test_name] = {
-                    "success": success,
-                    "duration": end_time - start_time,
-                    "status": "PASS" if success else "FAIL"
-                }
-                
-                if success:
-                    print(f"✓ {test_name}: PASS ({end_time - start_time:.2f}s)")
+        for result in self.orchestrator.run(REAL_WEAVER_TEST_GROUPS):
+            results[result.name] = {
+                "success": result.passed,
+                "duration": result.seconds,
+                "status": "PASS" if result.passed else "FAIL",
+            }
+            if not result.passed:
+                results[result.name]["error"] = result.message
+            
+            if result.name == "weaver_download" and result.passed:
+                print(f"✓ Weaver binary location: {result.stdout.strip()}")
+            if result.name == "error_handling":
+                if result.outcome:
+                    print("⚠ Error handling test may not be working correctly")
                 else:
-                    print(f"✗ {test_name}: FAIL ({end_time - start_time:.2f}s)")
-                    
-            except Exception as e:
-                results[test_name] = {
-                    "success": False,
-                    "duration": 0,
-                    "status": "ERROR",
-                    "error": str(e)
-                }
-                print(f"✗ {test_name}: ERROR - {e}")
+                    print("✓ Error handling test passed (correctly detected invalid schema)")
+            
+            if result.passed:
+                print(f"✓ {result.name}: PASS ({result.seconds:.2f}s)")
+            else:
+                print(f"✗ {result.name}: FAIL ({result.seconds:.2f}s)")
         
         return results
     
-    def generate_report(self, results: Dict[str, Any]) -> None:
+    def generate_report(self, results: Dict[str, Any], junit_out: str = None, json_out: str = None) -> None:
         """Generate a test report."""
         total_time = time.time() - self.start_time
         passed = sum(1 for r in results.values() if r["success"])
@@ -272,18 +99,11 @@ class RealWeaverTestRunner:
         
         print("\n" + "=" * 50)
         
-        # Save detailed report
-        report_file = self.workspace_root / "real_weaver_test_report.json"
-        with open(report_file, "w") as f:
-            json.dump({
-                "timestamp": time.time(),
-                "total_time": total_time,
-                "passed": passed,
-                "failed": failed,
-                "results": results
-            }, f, indent=2)
-        
-        print(f"Detailed report saved to: {report_file}")
+        # Save detailed reports
+        self.orchestrator.write_reports(
+            junit_out,
+            json_out or str(self.workspace_root / "real_weaver_test_report.json"),
+        )
         
         if failed > 0:
             sys.exit(1)
@@ -292,14 +112,15 @@ class RealWeaverTestRunner:
 
 def main():
     """Main entry point."""
-    if len(sys.argv) > 1:
-        workspace_root = sys.argv[1]
-    else:
-        workspace_root = os.getcwd()
+    parser = argparse.ArgumentParser(description="Real Weaver integration test runner")
+    parser.add_argument("workspace_root", nargs="?", default=default_workspace(),
+                        help="Workspace to run the tests in")
+    add_arguments(parser)
+    args = parser.parse_args()
     
-    runner = RealWeaverTestRunner(workspace_root)
+    runner = RealWeaverTestRunner(args.workspace_root, args)
     results = runner.run_all_tests()
-    runner.generate_report(results)
+    runner.generate_report(results, args.junit_out, args.json_out)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
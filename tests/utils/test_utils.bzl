@@ -117,7 +117,11 @@ rules:
     )
 
 def generate_large_schema_set(count = 100):
-    """Generate a large set of test schemas for performance testing."""
+    """Generate a large set of test schemas for performance testing.
+
+    These are in-memory stand-ins for analysis tests. For registries that
+    Weaver can resolve, use tests/performance/registry_generator.py.
+    """
     schemas = []
     for i in range(count):
         schemas.append(generate_test_schema(
@@ -9,73 +9,94 @@ load(":providers.bzl", "WeaverSchemaInfo", "WeaverDependencyInfo")
 load(":internal/utils.bzl", "dependency_utils")
 load("@bazel_skylib//lib:paths.bzl", "paths")
 
+_SCHEMA_EXTENSIONS = ["yaml", "yml", "json"]
+
 def _weaver_schema_aspect_impl(target, ctx):
     """Aspect implementation for automatic schema dependency tracking.
     
-    This aspect automatically discovers and tracks dependencies between
-    schema files, building a transitive dependency graph for efficient
-    change detection and incremental builds.
+    This aspect tracks dependencies between schema targets without copying
+    dependency data between targets. Each target records only its own edges
+    and files; transitive data is carried in depsets. The file-level
+    transitive closure is computed by an action that only runs when the
+    `weaver_dependency_closure` output group is requested.
     """
     
-    # Collect schema files from the target
-    schema_files = []
-    if hasattr(target, "files"):
-        schema_files = [f for f in target.files.to_list() if f.extension in ["yaml", "yml", "json"]]
-    
-    # Extract direct dependencies from schema content
+    # Collect schema files and the dependency index of the target
+    dependency_index = None
+    if WeaverSchemaInfo in target:
+        schema_info = target[WeaverSchemaInfo]
+        schema_files = schema_info.schema_files.to_list()
+        dependency_index = schema_info.dependency_index
+    else:
+        schema_files = [
+            f
+            for f in getattr(ctx.rule.files, "srcs", [])
+            if f.extension in _SCHEMA_EXTENSIONS
+        ]
+        if schema_files:
+            dependency_index = dependency_utils.create_dependency_index_action(
+                ctx,
+                schema_files,
+                scanner = ctx.executable._schema_deps,
+            )
+    
+    # Collect dependency providers from direct dependencies only
+    label = str(target.label)
+    dependency_infos = []
     direct_deps = []
-    dependency_graph = {}
-    
-    for schema_file in schema_files:
-        # Extract dependencies using the utility function
-        deps = dependency_utils.extract_schema_dependencies(ctx, schema_file)
-        direct_deps.extend(deps)
-        
-        # Build dependency graph entry
-        dependency_graph[schema_file.path] = {
-            "file": schema_file,
-            "direct_dependencies": deps,
-            "transitive_dependencies": [],
-            "content_hash": dependency_utils.compute_content_hash(schema_file),
-        }
-    
-    # Collect transitive dependencies from dependencies
-    transitive_deps = []
-    for dep in ctx.rule.attr.deps:
-        if hasattr(dep, "weaver_schema_info"):
-            transitive_deps.append(dep.weaver_schema_info)
-        if hasattr(dep, "weaver_dependency_info"):
-            transitive_deps.append(dep.weaver_dependency_info)
-    
-    # Build complete transitive dependency graph
-    complete_graph = dependency_utils.build_transitive_dependency_graph(
+    for dep in getattr(ctx.rule.attr, "deps", []):
+        if WeaverDependencyInfo in dep:
+            dependency_infos.append(dep[WeaverDependencyInfo])
+            direct_deps.append(str(dep.label))
+    
+    dependency_graph = {label: direct_deps}
+    transitive = dependency_utils.build_transitive_dependency_graph(
+        label,
         dependency_graph,
-        transitive_deps
+        dependency_infos,
+        schema_files = schema_files,
+        dependency_index = dependency_index,
     )
     
-    # Detect circular dependencies
-    circular_deps = dependency_utils.detect_circular_dependencies(complete_graph)
-    
-    # Create dependency info provider
+    # Declare the closure action; it only runs if its output group is built
+    dependency_closure = None
+    output_groups = {}
+    if schema_files:
+        dependency_closure = dependency_utils.create_dependency_closure_action(
+            ctx,
+            target.label.name + "_aspect",
+            transitive.transitive_dependency_indexes,
+            schema_files,
+            ctx.executable._schema_deps,
+        )
+        output_groups["weaver_dependency_closure"] = depset([dependency_closure])
+    
+    # Create dependency info provider. Bazel rejects cycles in the target
+    # graph, so there are no circular dependencies between targets.
     dependency_info = WeaverDependencyInfo(
         direct_dependencies = direct_deps,
-        transitive_dependencies = transitive_deps,
-        dependency_graph = complete_graph,
-        circular_dependencies = circular_deps,
+        transitive_dependencies = transitive.transitive_dependencies,
+        dependency_graph = dependency_graph,
+        transitive_edges = transitive.transitive_edges,
+        transitive_schema_files = transitive.transitive_schema_files,
+        transitive_dependency_indexes = transitive.transitive_dependency_indexes,
+        dependency_closure = dependency_closure,
+        circular_dependencies = [],
         content_hashes = {f.path: dependency_utils.compute_content_hash(f) for f in schema_files},
         change_detection_data = dependency_utils.create_change_detection_data(schema_files),
     )
     
-    return [dependency_info]
+    return [dependency_info, OutputGroupInfo(**output_groups)]
 
 # Aspect definition for automatic dependency tracking
 weaver_schema_aspect = aspect(
     implementation = _weaver_schema_aspect_impl,
     attr_aspects = ["deps"],
     attrs = {
-        "_dependency_utils": attr.label(
-            default = "//weaver:internal/utils.bzl",
-            allow_single_file = True,
+        "_schema_deps": attr.label(
+            default = "//weaver/tools:schema_deps",
+            executable = True,
+            cfg = "exec",
         ),
     },
     doc = "Aspect for automatic schema dependency tracking and change detection optimization",
@@ -108,8 +129,12 @@ def _weaver_file_group_aspect_impl(target, ctx):
     # Create file group dependency info
     file_group_info = WeaverDependencyInfo(
         direct_dependencies = [],
-        transitive_dependencies = [],
+        transitive_dependencies = depset(),
         dependency_graph = group_deps,
+        transitive_edges = depset(),
+        transitive_schema_files = depset(schema_files),
+        transitive_dependency_indexes = depset(),
+        dependency_closure = None,
         circular_dependencies = [],
         content_hashes = {f.path: dependency_utils.compute_content_hash(f) for f in schema_files},
         change_detection_data = dependency_utils.create_group_change_detection_data(schema_groups),
@@ -152,8 +177,12 @@ def _weaver_change_detection_aspect_impl(target, ctx):
     # Create change detection info
     change_info = WeaverDependencyInfo(
         direct_dependencies = [],
-        transitive_dependencies = [],
+        transitive_dependencies = depset(),
         dependency_graph = {},
+        transitive_edges = depset(),
+        transitive_schema_files = depset(),
+        transitive_dependency_indexes = depset(),
+        dependency_closure = None,
         circular_dependencies = [],
         content_hashes = change_data["content_hashes"],
         change_detection_data = change_data,
@@ -8,8 +8,10 @@ enabling hermetic, reproducible builds for semantic convention registry manageme
 load("@bazel_skylib//lib:paths.bzl", "paths")
 load("@bazel_skylib//lib:dicts.bzl", "dicts")
 load("//weaver:providers.bzl", "WeaverGeneratedInfo", "WeaverValidationInfo", "WeaverDocsInfo", "WeaverSchemaInfo", "WeaverLibraryInfo")
-load("//weaver/internal:actions.bzl", "generate_action", "validation_action", "documentation_action", "determine_output_files", "determine_documentation_files")
-load(":toolchains.bzl", "get_weaver_toolchain")
+load("//weaver/internal:actions.bzl", "generate_action", "validation_action", "validation_test_script", "merge_shards_action", "documentation_action", "library_action", "snapshot_action", "determine_output_files", "determine_documentation_files")
+load("//weaver/internal:performance.bzl", "WEAVER_LARGE_EXEC_GROUP", "registry_size_class", "shard_registries")
+load("//weaver/internal:utils.bzl", "dependency_utils")
+load(":toolchains.bzl", "get_weaver_toolchain", "optional_weaver_toolchain")
 
 def _get_weaver_binary_path(weaver_binary):
     """Get the path to the Weaver binary, handling different types."""
@@ -18,134 +20,401 @@ def _get_weaver_binary_path(weaver_binary):
     else:
         return str(weaver_binary)
 
-def _weaver_schema_impl(ctx):
-    """Implementation of the weaver_schema rule."""
+def _resolve_weaver_binary(ctx):
+    """Resolve the Weaver binary run by a rule's actions.
+    
+    An explicit `weaver` attribute takes precedence over the resolved Weaver
+    toolchain. Tests use the shared `//weaver:mock_weaver_toolchain`, so
+    targets never synthesize their own mock binaries.
+    
+    Returns:
+        The `weaver` Target, or the toolchain's FilesToRunProvider (or File
+        for toolchains that only provide `weaver_binary`)
+    """
+    if ctx.attr.weaver:
+        return ctx.attr.weaver
     
-    # Start performance monitoring
-    start_time = 0  # Simulated time tracking for Starlark compatibility
+    toolchain = get_weaver_toolchain(ctx)
+    if toolchain:
+        return getattr(toolchain, "weaver_files_to_run", None) or toolchain.weaver_binary
+    
+    fail((
+        "{}: no Weaver toolchain is registered for the execution platform and no `weaver` " +
+        "binary is set. Register a toolchain from weaver_repository, or " +
+        "@rules_weaver//weaver:mock_weaver_toolchain for tests."
+    ).format(ctx.label))
+
+def _accepts_registry_snapshots(ctx):
+    """Check whether the Weaver binary of a rule reads registry snapshots.
+    
+    Upstream `weaver registry generate` and `registry check` take a registry
+    directory or repository as `--registry`, not a resolved registry, so
+    only toolchains declaring `registry_snapshots` are passed snapshots. An
+    explicit `weaver` binary is assumed not to read them.
+    """
+    if ctx.attr.weaver:
+        return False
+    return getattr(get_weaver_toolchain(ctx), "registry_snapshots", False)
+
+def _registry_target_files(target, use_snapshots):
+    """Get the files a registry target contributes to a Weaver action.
+    
+    A weaver_registry_snapshot target contributes its snapshot, or the raw
+    schema files of its registry when the binary does not read snapshots.
+    """
+    schema_info = target[WeaverSchemaInfo] if WeaverSchemaInfo in target else None
+    if schema_info and schema_info.snapshot and not use_snapshots:
+        return schema_info.schema_files
+    return target.files
+
+def _performance_metrics_file(ctx, name = None):
+    """Declare the performance metrics sidecar of a Weaver action, if enabled.
+    
+    Returns:
+        JSON metrics file written by the action wrapper, or None
+    """
+    if not getattr(ctx.attr, "enable_performance_metrics", False):
+        return None
+    return ctx.actions.declare_file((name or ctx.label.name) + "_performance_metrics.json")
+
+def _registry_file_count(targets, use_snapshots = True):
+    """Count the registry files of a label list attribute for scheduling.
     
-    # 1. Collect schema files
-    schema_files = []
-    for schema in ctx.attr.srcs:
-        if hasattr(schema, "files"):
-            # Handle filegroup-like targets
-            schema_files.extend(schema.files.to_list())
+    weaver_schema targets report the number of their schema files, counted
+    where their sources are already a list, so the registry depset is never
+    flattened for it. A weaver_registry_snapshot target is one file, or its
+    registry's schema files without `use_snapshots`. Other targets, such as
+    source files and filegroups, are counted by their own files.
+    """
+    count = 0
+    for target in targets:
+        schema_info = target[WeaverSchemaInfo] if WeaverSchemaInfo in target else None
+        if schema_info and schema_info.snapshot and use_snapshots:
+            count += 1
+        elif schema_info and "schema_count" in schema_info.metadata:
+            count += schema_info.metadata["schema_count"]
         else:
-            # Handle direct file targets
-            schema_files.append(schema)
+            count += len(target.files.to_list())
+    return count
+
+def _registry_size_class(ctx, file_count):
+    """Classify the registry of a Weaver action for scheduling.
+    
+    A declared `size_hint` is used as is. Otherwise the registry is
+    classified by its number of files.
+    
+    Returns:
+        "small", "medium" or "large"
+    """
+    if ctx.attr.size_hint != "auto":
+        return registry_size_class(0, ctx.attr.size_hint)
+    return registry_size_class(file_count)
+
+def _collect_files(targets):
+    """Collect the files of a label list attribute as one depset.
+    
+    The targets' depsets are nested rather than flattened, so analysis does
+    not copy large registries into lists. Callers flatten only where they
+    need individual files, such as for sharding or content digests.
+    """
+    return depset(transitive = [target.files for target in targets])
+
+def _collect_registries(targets, use_snapshots):
+    """Collect the registry inputs of a registries attribute.
+    
+    With `use_snapshots`, weaver_registry_snapshot targets contribute their
+    snapshot instead of their schema files, so actions pass the resolved
+    registry to Weaver and do not stage or parse the raw files again.
+    Otherwise they contribute the raw schema files of their registry.
+    
+    Returns:
+        Struct with files (depset of raw registry files), file_count (number
+        of raw registry files), snapshots (list of snapshot files) and
+        dependency_indexes (list of depsets of dependency index files of the
+        weaver_schema targets) fields
+    """
+    files = []
+    file_targets = []
+    snapshots = []
+    dependency_indexes = []
+    for target in targets:
+        schema_info = target[WeaverSchemaInfo] if WeaverSchemaInfo in target else None
+        if schema_info and schema_info.snapshot and use_snapshots:
+            snapshots.append(schema_info.snapshot)
+            continue
+        files.append(_registry_target_files(target, use_snapshots))
+        file_targets.append(target)
+        if schema_info:
+            dependency_indexes.append(schema_info.transitive_dependency_indexes)
+    return struct(
+        files = depset(transitive = files),
+        file_count = _registry_file_count(file_targets, use_snapshots),
+        snapshots = snapshots,
+        dependency_indexes = dependency_indexes,
+    )
+
+def _policy_unit_name(path):
+    """Derive the name of a policy's validation action from its path.
+    
+    Characters other than letters and digits become underscores, so
+    `policies/naming.rego` is checked by the `policy_policies_naming_rego`
+    action.
+    """
+    return "policy_" + "".join([c if c.isalnum() else "_" for c in path.elems()])
+
+def _policy_units(ctx, policy_inputs):
+    """Split policies into the policy sets of independent validation actions.
+    
+    With `split_policies`, every policy file and every policy directory is
+    checked by its own action, so editing one policy re-runs only that
+    policy's action. Otherwise all policies share one action.
+    
+    Args:
+        ctx: The rule context
+        policy_inputs: Depset of policy files
+    
+    Returns:
+        List of structs with name, policies and policy_dirs fields, one per
+        action; policy_dirs is a depset of the files of the policy
+        directories, and name is None for a single unit
+    """
+    policy_dirs = _collect_files(ctx.attr.policy_dirs)
+    if not ctx.attr.split_policies:
+        return [struct(name = None, policies = policy_inputs, policy_dirs = policy_dirs)]
+    
+    policy_files = policy_inputs.to_list()
+    if len(policy_files) + len(ctx.attr.policy_dirs) <= 1:
+        return [struct(name = None, policies = policy_inputs, policy_dirs = policy_dirs)]
+    
+    # Units are named after their policy, not its position, so adding or
+    # reordering policies does not rename the actions of the others
+    sources = [(policy.short_path, [policy], []) for policy in policy_files]
+    for policy_dir in ctx.attr.policy_dirs:
+        label = policy_dir.label
+        path = "/".join([part for part in [label.workspace_name, label.package, label.name] if part])
+        sources.append((path, [], policy_dir.files))
+    
+    units = []
+    paths_by_name = {}
+    for path, policies, dir_files in sources:
+        name = _policy_unit_name(path)
+        if name in paths_by_name:
+            fail("{}: policies {} and {} map to the same action name {}".format(ctx.label, paths_by_name[name], path, name))
+        paths_by_name[name] = path
+        units.append(struct(name = name, policies = policies, policy_dirs = dir_files))
+    return units
+
+def _registry_shard_inputs(ctx, registry_inputs, file_count, dependency_indexes, entry_points = []):
+    """Split registry inputs into the inputs of independent Weaver actions.
+    
+    The split follows the `registry_shards` attribute. With several shards,
+    each shard becomes its own action so remote executors can run them on
+    separate machines. When the registries come from weaver_schema targets,
+    every shard action stages the schemas its shard transitively references,
+    so references across shards still resolve; otherwise each action sees
+    only the schema groups of its shard.
+    
+    The registry depset is flattened only when the registry is sharded or
+    content digests are enabled, since both group the files by directory.
+    
+    Args:
+        ctx: The rule context
+        registry_inputs: Depset of registry file artifacts
+        file_count: Number of registry files, see `_registry_file_count`
+        dependency_indexes: List of depsets of dependency index files
+        entry_points: Entry point files narrowing a single action
+    
+    Returns:
+        List of structs with name, registries, digest_manifests,
+        dependency_indexes, entry_points and size_class fields, one per
+        action
+    """
+    registry_files = None
+    if ctx.attr.registry_shards != 1 or ctx.attr.content_digests:
+        registry_files = registry_inputs.to_list()
+    
+    shards = [registry_inputs]
+    if ctx.attr.registry_shards != 1:
+        shards = shard_registries(ctx, registry_files, ctx.attr.registry_shards)
+    
+    if len(shards) == 1:
+        return [struct(
+            name = None,
+            registries = registry_inputs,
+            digest_manifests = dependency_utils.create_digest_actions(ctx, registry_files) if ctx.attr.content_digests else [],
+            dependency_indexes = depset(transitive = dependency_indexes) if entry_points else [],
+            entry_points = entry_points,
+            size_class = _registry_size_class(ctx, file_count),
+        )]
+    
+    if entry_points:
+        fail("entry_points cannot be combined with registry_shards")
+    
+    indexes = depset(transitive = dependency_indexes) if dependency_indexes else []
+    digest_manifests = []
+    if indexes and ctx.attr.content_digests:
+        digest_manifests = dependency_utils.create_digest_actions(ctx, registry_files)
+    
+    # Shards staging the whole registry are scheduled by its size
+    registry_class = _registry_size_class(ctx, file_count) if indexes else None
+    
+    shard_inputs = []
+    for index, shard in enumerate(shards):
+        name = "{}_shard_{}".format(ctx.label.name, index)
+        if indexes:
+            shard_inputs.append(struct(
+                name = name,
+                registries = registry_inputs,
+                digest_manifests = digest_manifests,
+                dependency_indexes = indexes,
+                entry_points = shard,
+                size_class = registry_class,
+            ))
+        else:
+            shard_inputs.append(struct(
+                name = name,
+                registries = shard,
+                digest_manifests = dependency_utils.create_digest_actions(ctx, shard, name = name) if ctx.attr.content_digests else [],
+                dependency_indexes = [],
+                entry_points = [],
+                size_class = _registry_size_class(ctx, len(shard)),
+            ))
+    return shard_inputs
+
+def _weaver_schema_impl(ctx):
+    """Implementation of the weaver_schema rule."""
+    
+    # 1. Collect schema files; only this target's own files are flattened
+    schema_files = _collect_files(ctx.attr.srcs)
+    direct_schema_files = schema_files.to_list()
     
     # 2. Collect transitive dependencies
     transitive_deps = []
     for dep in ctx.attr.deps:
-        if hasattr(dep, "weaver_schema_info"):
-            transitive_deps.append(dep.weaver_schema_info)
+        if WeaverSchemaInfo in dep:
+            transitive_deps.append(dep[WeaverSchemaInfo])
+    transitive_schema_files = depset(
+        transitive = [schema_files] + [dep.transitive_schema_files for dep in transitive_deps],
+    )
     
-    # 3. Create metadata
+    # 3. Scan schema files into a dependency index
+    dependency_index = dependency_utils.create_dependency_index_action(ctx, direct_schema_files)
+    transitive_dependency_indexes = depset(
+        [dependency_index],
+        transitive = [dep.transitive_dependency_indexes for dep in transitive_deps],
+    )
+    
+    # 4. Create metadata
     extensions = []
-    extensions = [f.extension for f in schema_files if f.extension not in extensions]
+    for f in direct_schema_files:
+        if f.extension not in extensions:
+            extensions.append(f.extension)
     metadata = {
-        "schema_count": len(schema_files),
-        "formats": list(extensions),
+        "schema_count": len(direct_schema_files),
+        "formats": extensions,
         "performance_optimized": True,
     }
     
-    # Calculate performance metrics
-    analysis_time_ms = start_time * 1000  # Simulated calculation
-    
-    # 4. Create providers
+    # 5. Create providers
     providers = [
         DefaultInfo(
-            files = depset(schema_files),
-            runfiles = ctx.runfiles(files = schema_files),
+            files = schema_files,
+            runfiles = ctx.runfiles(transitive_files = schema_files),
         ),
         WeaverSchemaInfo(
             schema_files = schema_files,
+            transitive_schema_files = transitive_schema_files,
             schema_content = schema_files,  # For now, use files directly
             dependencies = transitive_deps,
             metadata = metadata,
+            dependency_index = dependency_index,
+            transitive_dependency_indexes = transitive_dependency_indexes,
+            snapshot = None,
+        ),
+        OutputGroupInfo(
+            dependency_index = depset([dependency_index]),
         ),
     ]
     
     return providers
 
-def _weaver_generate_impl(ctx):
-    """Implementation of the weaver_generate rule with performance optimizations."""
+def _weaver_registry_snapshot_impl(ctx):
+    """Implementation of the weaver_registry_snapshot rule."""
     
-    # Start performance monitoring
-    start_time = 0  # Simulated time tracking for Starlark compatibility
+    # 1. Resolve the Weaver binary
+    weaver_binary = _resolve_weaver_binary(ctx)
     
-    # Calculate performance metrics
-    analysis_time_ms = start_time * 1000  # Simulated calculation
+    # 2. Collect the registry files, as consumers of the registry would
+    schema_info = ctx.attr.registry[WeaverSchemaInfo]
+    if schema_info.snapshot:
+        fail("{}: registry {} is already a registry snapshot".format(ctx.label, ctx.attr.registry.label))
+    registry_files = ctx.attr.registry.files
     
-    # 1. Resolve Weaver toolchain with real binary support
-    weaver_binary = None
+    # 3. Resolve the registry once into the snapshot
+    snapshot_file = ctx.actions.declare_file(ctx.label.name + ".json")
+    snapshot_action(
+        ctx,
+        registries = registry_files,
+        snapshot_file = snapshot_file,
+        weaver_binary = weaver_binary,
+        env = ctx.attr.env,
+        size_class = _registry_size_class(ctx, _registry_file_count([ctx.attr.registry])),
+    )
     
-    # First, try to get the real Weaver toolchain
-    toolchain = get_weaver_toolchain(ctx)
-    if toolchain and hasattr(toolchain, 'weaver_binary'):
-        weaver_binary = toolchain.weaver_binary
-        print("Using real Weaver toolchain: {}".format(weaver_binary.path))
-    else:
-        print("Real Weaver toolchain not available, falling back to mock binary")
-    
-    # If real toolchain is not available, check for explicit weaver attribute
-    if not weaver_binary and hasattr(ctx.attr, "weaver") and ctx.attr.weaver:
-        weaver_binary = ctx.attr.weaver
-        print("Using explicit Weaver binary: {}".format(weaver_binary.path))
-    
-    # Fallback to mock binary for testing if no real binary is available
-    if not weaver_binary:
-        print("Creating mock Weaver binary for testing")
-        weaver_binary = ctx.actions.declare_file(ctx.label.name + "_mock_weaver")
-        ctx.actions.write(
-            output = weaver_binary,
-            content = """#!/bin/bash
-echo 'Mock Weaver binary for testing'
-# Create output files if they don't exist
-for arg in "$@"; do
-    if [[ "$arg" == "--expected-output" ]]; then
-        shift
-        output_file="$1"
-        mkdir -p "$(dirname "$output_file")"
-        echo "Generated by Mock Weaver" > "$output_file"
-    fi
-    shift
-done
-exit 0""",
-            is_executable = True,
-        )
+    # 4. Return providers; schema information is forwarded from the registry
+    return [
+        DefaultInfo(
+            files = depset([snapshot_file]),
+            runfiles = ctx.runfiles(files = [snapshot_file]),
+        ),
+        WeaverSchemaInfo(
+            schema_files = schema_info.schema_files,
+            transitive_schema_files = schema_info.transitive_schema_files,
+            schema_content = schema_info.schema_content,
+            dependencies = schema_info.dependencies,
+            metadata = schema_info.metadata,
+            dependency_index = schema_info.dependency_index,
+            transitive_dependency_indexes = schema_info.transitive_dependency_indexes,
+            snapshot = snapshot_file,
+        ),
+    ]
+
+def _weaver_generate_impl(ctx):
+    """Implementation of the weaver_generate rule with performance optimizations."""
     
-    # 2. Collect registry inputs (semantic convention registries)
-    registry_inputs = []
-    for registry in ctx.attr.registries:
-        if hasattr(registry, "files"):
-            # Handle filegroup-like targets
-            registry_inputs.extend(registry.files.to_list())
-        else:
-            # Handle direct file targets
-            registry_inputs.append(registry)
+    # 1. Resolve the Weaver binary
+    weaver_binary = _resolve_weaver_binary(ctx)
+    
+    # 2. Collect registry inputs (semantic convention registries); snapshots
+    # are passed to every action as is
+    registries = _collect_registries(ctx.attr.registries, _accepts_registry_snapshots(ctx))
+    registry_inputs = registries.files
+    dependency_indexes = registries.dependency_indexes
+    
+    # Narrow the registry to the schemas referenced from the entry points
+    entry_points = ctx.files.entry_points
+    if entry_points and not dependency_indexes:
+        fail("entry_points requires registries provided by weaver_schema targets")
+    if entry_points:
+        # Flattened only with entry points; an entry point outside the
+        # registry would stage nothing and let Weaver use its default registry
+        registry_files = {f: True for f in registry_inputs.to_list()}
+        missing = [f.short_path for f in entry_points if f not in registry_files]
+        if missing:
+            fail("{}: entry_points {} are not files of the registries".format(ctx.label, ", ".join(missing)))
     
     # 3. Collect template inputs if provided
-    template_inputs = []
+    template_inputs = _collect_files(ctx.attr.templates)
     template_dir = None
-    if hasattr(ctx.attr, "templates") and ctx.attr.templates:
-        for template in ctx.attr.templates:
-            if hasattr(template, "files"):
-                template_inputs.extend(template.files.to_list())
-            else:
-                template_inputs.append(template)
+    for template in ctx.attr.templates:
         # Use the first template's directory as the template directory
-        if template_inputs:
-            template_dir = template_inputs[0].dirname
+        template_files = template.files.to_list()
+        if template_files:
+            template_dir = template_files[0].dirname
+            break
     
     # 4. Collect policy inputs if provided
-    policy_inputs = []
-    if hasattr(ctx.attr, "policies") and ctx.attr.policies:
-        for policy in ctx.attr.policies:
-            if hasattr(policy, "files"):
-                policy_inputs.extend(policy.files.to_list())
-            else:
-                policy_inputs.append(policy)
+    policy_inputs = _collect_files(ctx.attr.policies)
     
     # 5. Determine output directory
     output_dir = ctx.attr.out_dir or (ctx.label.name + "_generated")
@@ -153,219 +422,173 @@ exit 0""",
     # 6. Determine generated files
     generated_files = determine_output_files(ctx, output_dir, ctx.attr.target)
     
-    # 7. Create generation action
-    generate_action(
-        ctx,
-        registries = registry_inputs,
-        templates = template_inputs,
-        template_dir = template_dir,
-        policies = policy_inputs,
-        args = ctx.attr.args,
-        output_dir = output_dir,
-        generated_files = generated_files,
-        weaver_binary = weaver_binary,
-        target = ctx.attr.target,
-        registry_urls = ctx.attr.registry_urls,
-        env = ctx.attr.env,
-    )
+    # 7. Split the registry into independent generation actions
+    shard_inputs = _registry_shard_inputs(ctx, registry_inputs, registries.file_count, dependency_indexes, entry_points)
     
-    # 8. Create performance metrics if enabled
-    providers = [
+    # 8. Create generation actions, merging shard outputs if sharded
+    if len(shard_inputs) == 1:
+        shard_outputs = generated_files
+    else:
+        shard_outputs = [
+            ctx.actions.declare_directory("{}_shard_{}".format(output_dir, index))
+            for index in range(len(shard_inputs))
+        ]
+    
+    metrics_files = []
+    for shard, shard_output in zip(shard_inputs, shard_outputs):
+        metrics_file = _performance_metrics_file(ctx, shard.name)
+        if metrics_file:
+            metrics_files.append(metrics_file)
+        generate_action(
+            ctx,
+            registries = shard.registries,
+            templates = template_inputs,
+            template_dir = template_dir,
+            policies = policy_inputs,
+            args = ctx.attr.args,
+            output_dir = output_dir,
+            generated_files = [shard_output],
+            weaver_binary = weaver_binary,
+            target = ctx.attr.target,
+            registry_urls = ctx.attr.registry_urls,
+            env = ctx.attr.env,
+            digest_manifests = shard.digest_manifests,
+            dependency_indexes = shard.dependency_indexes,
+            entry_points = shard.entry_points,
+            name = shard.name,
+            metrics_file = metrics_file,
+            size_class = shard.size_class,
+            snapshots = registries.snapshots,
+        )
+    
+    if len(shard_inputs) > 1:
+        merge_shards_action(ctx, "tree", shard_outputs, generated_files[0])
+    
+    # 9. Return providers; performance metrics measured by the action
+    # wrapper are included when enabled
+    return [
         WeaverGeneratedInfo(
             generated_files = generated_files,
             output_dir = output_dir,
-            source_registries = registry_inputs,
+            source_registries = depset(registries.snapshots, transitive = [registry_inputs]),
             generation_args = ctx.attr.args,
         ),
         DefaultInfo(
-            files = depset(generated_files),
+            files = depset(generated_files + metrics_files),
             runfiles = ctx.runfiles(files = generated_files),
         ),
+        OutputGroupInfo(
+            performance_metrics = depset(metrics_files),
+        ),
     ]
-    
-    # Add performance metrics if enabled
-    if hasattr(ctx.attr, "enable_performance_metrics") and ctx.attr.enable_performance_metrics:
-        metrics_content = """
-Performance Metrics for Weaver Generation:
-- Analysis Time: {} ms
-- Schema Count: {}
-- Template Count: {}
-- Policy Count: {}
-- Generated Files: {}
-""".format(
-            analysis_time_ms,
-            len(registry_inputs),
-            len(template_inputs),
-            len(policy_inputs),
-            len(generated_files),
-        )
-        
-        metrics_file = ctx.actions.declare_file(ctx.label.name + "_performance_metrics.txt")
-        ctx.actions.write(
-            output = metrics_file,
-            content = metrics_content,
-        )
-        
-        providers.append(DefaultInfo(files = depset([metrics_file])))
-    
-    return providers
 
 def _weaver_validate_impl(ctx):
     """Implementation of the weaver_validate rule."""
     
-    # 1. Resolve Weaver toolchain with real binary support
-    weaver_binary = None
-    
-    # First, try to get the real Weaver toolchain
-    toolchain = get_weaver_toolchain(ctx)
-    if toolchain and hasattr(toolchain, 'weaver_binary'):
-        weaver_binary = toolchain.weaver_binary
-        print("Using real Weaver toolchain: {}".format(weaver_binary.path))
-    else:
-        print("Real Weaver toolchain not available, falling back to mock binary")
-    
-    # If real toolchain is not available, check for explicit weaver attribute
-    if not weaver_binary and hasattr(ctx.attr, "weaver") and ctx.attr.weaver:
-        weaver_binary = ctx.attr.weaver
-        print("Using explicit Weaver binary: {}".format(weaver_binary.path))
-    
-    # Fallback to mock binary for testing if no real binary is available
-    if not weaver_binary:
-        print("Creating mock Weaver binary for testing")
-        weaver_binary = ctx.actions.declare_file(ctx.label.name + "_mock_weaver")
-        ctx.actions.write(
-            output = weaver_binary,
-            content = """#!/bin/bash
-echo 'Mock Weaver binary for testing'
-# Create output files if they don't exist
-for arg in "$@"; do
-    if [[ "$arg" == "--expected-output" ]]; then
-        shift
-        output_file="$1"
-        mkdir -p "$(dirname "$output_file")"
-        echo "Generated by Mock Weaver" > "$output_file"
-    fi
-    shift
-done
-exit 0""",
-            is_executable = True,
-        )
+    # 1. Resolve the Weaver binary
+    weaver_binary = _resolve_weaver_binary(ctx)
     
-    # 2. Collect registry inputs (semantic convention registries)
-    registry_inputs = []
-    for registry in ctx.attr.registries:
-        if hasattr(registry, "files"):
-            # Handle filegroup-like targets
-            registry_inputs.extend(registry.files.to_list())
-        else:
-            # Handle direct file targets
-            registry_inputs.append(registry)
+    # 2. Collect registry inputs (semantic convention registries); snapshots
+    # are passed to every action as is
+    registries = _collect_registries(ctx.attr.registries, _accepts_registry_snapshots(ctx))
+    registry_inputs = registries.files
+    dependency_indexes = registries.dependency_indexes
     
     # 3. Collect policy inputs if provided
-    policy_inputs = []
-    if hasattr(ctx.attr, "policies") and ctx.attr.policies:
-        for policy in ctx.attr.policies:
-            if hasattr(policy, "files"):
-                policy_inputs.extend(policy.files.to_list())
-            else:
-                policy_inputs.append(policy)
-    
-    # 4. Create validation action
-    validation_output = validation_action(
-        ctx,
-        registries = registry_inputs,
-        policies = policy_inputs,
-        args = ctx.attr.weaver_args,
-        weaver_binary = weaver_binary,
-        registry_urls = ctx.attr.registry_urls,
-        policy_dirs = ctx.attr.policy_dirs,
-        env = ctx.attr.env,
+    policy_inputs = _collect_files(ctx.attr.policies)
+    
+    # 4. Split the registry into independent validation actions
+    shard_inputs = _registry_shard_inputs(ctx, registry_inputs, registries.file_count, dependency_indexes)
+    
+    # 5. Create validation actions per shard and policy unit, merging their
+    # reports if there are several
+    policy_units = _policy_units(ctx, policy_inputs)
+    validation_results = []
+    metrics_files = []
+    for shard in shard_inputs:
+        for unit in policy_units:
+            name = shard.name
+            if unit.name:
+                name = "{}_{}".format(shard.name or ctx.label.name, unit.name)
+            metrics_file = _performance_metrics_file(ctx, name)
+            if metrics_file:
+                metrics_files.append(metrics_file)
+            validation_results.append(validation_action(
+                ctx,
+                registries = shard.registries,
+                policies = unit.policies,
+                args = ctx.attr.weaver_args,
+                weaver_binary = weaver_binary,
+                registry_urls = ctx.attr.registry_urls,
+                policy_dirs = unit.policy_dirs,
+                env = ctx.attr.env,
+                digest_manifests = shard.digest_manifests,
+                dependency_indexes = shard.dependency_indexes,
+                entry_points = shard.entry_points,
+                name = name,
+                metrics_file = metrics_file,
+                record_failures = ctx.attr.testonly,
+                size_class = shard.size_class,
+                snapshots = registries.snapshots,
+            ))
+    
+    if len(validation_results) == 1:
+        validation_output = validation_results[0]
+    else:
+        validation_output = ctx.actions.declare_file(ctx.label.name + "_validation_result.json")
+        merge_shards_action(ctx, "diagnostics", validation_results, validation_output)
+    
+    validation_info = WeaverValidationInfo(
+        validation_output = validation_output,
+        validated_registries = depset(registries.snapshots, transitive = [registry_inputs]),
+        applied_policies = policy_inputs,
+        validation_args = ctx.attr.weaver_args,
+        success = True,  # Will be determined by action execution
     )
     
-    # 5. Return appropriate providers based on test mode
+    # 6. Return appropriate providers based on test mode
     if ctx.attr.testonly:
-        # Test mode - validation results are reported as test outcomes
+        # Test mode - the cached validation report is replayed as the test
+        # outcome; it is a runfile so the validation actions run first
+        test_script = validation_test_script(ctx, validation_output)
         return [
-            WeaverValidationInfo(
-                validation_output = validation_output,
-                validated_registries = registry_inputs,
-                applied_policies = policy_inputs,
-                validation_args = ctx.attr.weaver_args,
-                success = True,  # Will be determined by action execution
-            ),
+            validation_info,
             DefaultInfo(
-                files = depset([validation_output]),
-                runfiles = ctx.runfiles(files = [validation_output]),
-                executable = validation_output,  # Make the validation output executable for test rules
+                files = depset([test_script]),
+                runfiles = ctx.runfiles(files = [test_script, validation_output]),
+                executable = test_script,
+            ),
+            OutputGroupInfo(
+                performance_metrics = depset(metrics_files),
             ),
         ]
     else:
         # Build mode - validation failures will cause build failures
         return [
-            WeaverValidationInfo(
-                validation_output = validation_output,
-                validated_registries = registry_inputs,
-                applied_policies = policy_inputs,
-                validation_args = ctx.attr.weaver_args,
-                success = True,  # Will be determined by action execution
-            ),
+            validation_info,
             DefaultInfo(
-                files = depset([validation_output]),
+                files = depset([validation_output] + metrics_files),
                 runfiles = ctx.runfiles(files = [validation_output]),
             ),
+            OutputGroupInfo(
+                performance_metrics = depset(metrics_files),
+            ),
         ]
 
 def _weaver_docs_impl(ctx):
     """Implementation of the weaver_docs rule."""
     
-    # Start performance monitoring
-    start_time = 0  # Simulated time tracking for Starlark compatibility
+    # 1. Resolve the Weaver binary
+    weaver_binary = _resolve_weaver_binary(ctx)
     
-    # 1. Resolve Weaver toolchain with real binary support
-    weaver_binary = None
-    
-    # First, try to get the real Weaver toolchain
-    toolchain = get_weaver_toolchain(ctx)
-    if toolchain and hasattr(toolchain, 'weaver_binary'):
-        weaver_binary = toolchain.weaver_binary
-        print("Using real Weaver toolchain: {}".format(weaver_binary.path))
-    else:
-        print("Real Weaver toolchain not available, falling back to mock binary")
-    
-    # If real toolchain is not available, check for explicit weaver attribute
-    if not weaver_binary and hasattr(ctx.attr, "weaver") and ctx.attr.weaver:
-        weaver_binary = ctx.attr.weaver
-        print("Using explicit Weaver binary: {}".format(weaver_binary.path))
-    
-    # Fallback to mock binary for testing if no real binary is available
-    if not weaver_binary:
-        print("Creating mock Weaver binary for testing")
-        weaver_binary = ctx.actions.declare_file(ctx.label.name + "_mock_weaver")
-        ctx.actions.write(
-            output = weaver_binary,
-            content = """#!/bin/bash
-echo 'Mock Weaver binary for testing'
-# Create output files if they don't exist
-for arg in "$@"; do
-    if [[ "$arg" == "--expected-output" ]]; then
-        shift
-        output_file="$1"
-        mkdir -p "$(dirname "$output_file")"
-        echo "Generated by Mock Weaver" > "$output_file"
-    fi
-    shift
-done
-exit 0""",
-            is_executable = True,
-        )
-    
-    # 2. Collect all schema inputs
-    schemas = []
-    for schema in ctx.attr.schemas:
-        if hasattr(schema, "files"):
-            schemas.extend(schema.files.to_list())
-        else:
-            schemas.append(schema)
+    # 2. Collect all schema inputs; a weaver_registry_snapshot target
+    # provides its snapshot, which Weaver reads in place of the raw schemas
+    # if the binary accepts snapshots
+    use_snapshots = _accepts_registry_snapshots(ctx)
+    schemas = depset(transitive = [
+        _registry_target_files(target, use_snapshots)
+        for target in ctx.attr.schemas
+    ])
     
     # 3. Determine output directory
     output_dir = ctx.attr.output_dir or ctx.label.name + "_docs"
@@ -390,6 +613,8 @@ exit 0""",
         template_file = ctx.file.template
     
     # 8. Create hermetic action
+    metrics_file = _performance_metrics_file(ctx)
+    metrics_files = [metrics_file] if metrics_file else []
     documentation_action(
         ctx,
         schemas = schemas,
@@ -399,6 +624,8 @@ exit 0""",
         weaver_binary = weaver_binary,
         template_file = template_file,
         env = ctx.attr.env,
+        metrics_file = metrics_file,
+        size_class = _registry_size_class(ctx, _registry_file_count(ctx.attr.schemas, use_snapshots)),
     )
     
     # 9. Return WeaverDocsInfo provider
@@ -411,9 +638,12 @@ exit 0""",
             documentation_args = ctx.attr.args,
         ),
         DefaultInfo(
-            files = depset(documentation_files),
+            files = depset(documentation_files + metrics_files),
             runfiles = ctx.runfiles(files = documentation_files),
         ),
+        OutputGroupInfo(
+            performance_metrics = depset(metrics_files),
+        ),
     ]
     
     return providers
@@ -421,54 +651,14 @@ exit 0""",
 def _weaver_library_impl(ctx):
     """Implementation of the weaver_library rule."""
     
-    # Start performance monitoring
-    start_time = 0  # Simulated time tracking for Starlark compatibility
-    
-    # 1. Resolve Weaver toolchain with real binary support
-    weaver_binary = None
-    
-    # First, try to get the real Weaver toolchain
-    toolchain = get_weaver_toolchain(ctx)
-    if toolchain and hasattr(toolchain, 'weaver_binary'):
-        weaver_binary = toolchain.weaver_binary
-        print("Using real Weaver toolchain: {}".format(weaver_binary.path))
-    else:
-        print("Real Weaver toolchain not available, falling back to mock binary")
-    
-    # If real toolchain is not available, check for explicit weaver attribute
-    if not weaver_binary and hasattr(ctx.attr, "weaver") and ctx.attr.weaver:
-        weaver_binary = ctx.attr.weaver
-        print("Using explicit Weaver binary: {}".format(weaver_binary.path))
-    
-    # Fallback to mock binary for testing if no real binary is available
-    if not weaver_binary:
-        print("Creating mock Weaver binary for testing")
-        weaver_binary = ctx.actions.declare_file(ctx.label.name + "_mock_weaver")
-        ctx.actions.write(
-            output = weaver_binary,
-            content = """#!/bin/bash
-echo 'Mock Weaver binary for testing'
-# Create output files if they don't exist
-for arg in "$@"; do
-    if [[ "$arg" == "--expected-output" ]]; then
-        shift
-        output_file="$1"
-        mkdir -p "$(dirname "$output_file")"
-        echo "Generated by Mock Weaver" > "$output_file"
-    fi
-    shift
-done
-exit 0""",
-            is_executable = True,
-        )
+    # 1. Resolve the Weaver binary
+    weaver_binary = _resolve_weaver_binary(ctx)
     
-    # 2. Collect all schema inputs
-    schemas = []
+    # 2. Collect all schema inputs; the fused action stages raw schemas only
     for schema in ctx.attr.schemas:
-        if hasattr(schema, "files"):
-            schemas.extend(schema.files.to_list())
-        else:
-            schemas.append(schema)
+        if WeaverSchemaInfo in schema and schema[WeaverSchemaInfo].snapshot:
+            fail("{}: weaver_library does not accept registry snapshots, use the weaver_schema target {}".format(ctx.label, schema.label))
+    schemas = _collect_files(ctx.attr.schemas)
     
     # 3. Determine output directory
     output_dir = ctx.attr.output_dir or ctx.label.name + "_library"
@@ -487,23 +677,57 @@ exit 0""",
     # Add format-specific arguments
     args.extend(["--format", format_type])
     
-    # 7. Create hermetic action
-    generate_action(
-        ctx,
-        registries = schemas,
-        templates = [],
-        template_dir = None,
-        policies = [],
-        args = args,
-        output_dir = output_dir,
-        generated_files = library_files,
-        weaver_binary = weaver_binary,
-        target = ctx.attr.target,
-        registry_urls = ctx.attr.registry_urls,
-        env = ctx.attr.env,
-    )
+    # 7. Compute content digests of schema groups if enabled
+    digest_manifests = []
+    if ctx.attr.content_digests:
+        digest_manifests = dependency_utils.create_digest_actions(ctx, schemas.to_list())
     
-    # 8. Return WeaverLibraryInfo provider
+    # 8. Create hermetic action; with validation or documentation requested,
+    # a single fused action stages the registry once for all of them
+    size_class = _registry_size_class(ctx, _registry_file_count(ctx.attr.schemas))
+    metrics_file = _performance_metrics_file(ctx)
+    metrics_files = [metrics_file] if metrics_file else []
+    documentation_files = []
+    validation_output = None
+    if ctx.attr.validate or ctx.attr.generate_docs:
+        if ctx.attr.generate_docs:
+            documentation_files = determine_documentation_files(ctx, ctx.label.name + "_docs", "markdown")
+        validation_output = library_action(
+            ctx,
+            registries = schemas,
+            args = args,
+            library_files = library_files,
+            weaver_binary = weaver_binary,
+            target = ctx.attr.target,
+            registry_urls = ctx.attr.registry_urls,
+            env = ctx.attr.env,
+            digest_manifests = digest_manifests,
+            documentation_files = documentation_files,
+            validate = ctx.attr.validate,
+            metrics_file = metrics_file,
+            size_class = size_class,
+        )
+    else:
+        generate_action(
+            ctx,
+            registries = schemas,
+            templates = [],
+            template_dir = None,
+            policies = [],
+            args = args,
+            output_dir = output_dir,
+            generated_files = library_files,
+            weaver_binary = weaver_binary,
+            target = ctx.attr.target,
+            registry_urls = ctx.attr.registry_urls,
+            env = ctx.attr.env,
+            digest_manifests = digest_manifests,
+            metrics_file = metrics_file,
+            size_class = size_class,
+        )
+    validation_files = [validation_output] if validation_output else []
+    
+    # 9. Return WeaverLibraryInfo provider
     providers = [
         WeaverLibraryInfo(
             library_files = library_files,
@@ -513,13 +737,85 @@ exit 0""",
             library_args = ctx.attr.args,
         ),
         DefaultInfo(
-            files = depset(library_files),
+            files = depset(library_files + documentation_files + validation_files + metrics_files),
             runfiles = ctx.runfiles(files = library_files),
         ),
+        OutputGroupInfo(
+            documentation = depset(documentation_files),
+            validation = depset(validation_files),
+            performance_metrics = depset(metrics_files),
+        ),
     ]
     
+    if documentation_files:
+        providers.append(WeaverDocsInfo(
+            documentation_files = documentation_files,
+            output_dir = ctx.label.name + "_docs",
+            source_schemas = schemas,
+            documentation_format = "markdown",
+            documentation_args = [],
+        ))
+    
+    if validation_output:
+        providers.append(WeaverValidationInfo(
+            validation_output = validation_output,
+            validated_registries = schemas,
+            applied_policies = [],
+            validation_args = [],
+            success = True,  # Will be determined by action execution
+        ))
+    
     return providers
 
+# Attributes shared by rules that run Weaver actions
+_WEAVER_ACTION_ATTRS = {
+    "_weaver_worker": attr.label(
+        default = Label("//weaver/tools:weaver_worker"),
+        executable = True,
+        cfg = "exec",
+        doc = "Action wrapper that runs Weaver, optionally as a persistent worker",
+    ),
+    "_weaver_worker_large": attr.label(
+        default = Label("//weaver/tools:weaver_worker"),
+        executable = True,
+        cfg = config.exec(WEAVER_LARGE_EXEC_GROUP),
+        doc = "Action wrapper built for the weaver_large exec group",
+    ),
+    "_use_persistent_workers": attr.label(
+        default = Label("//weaver:use_persistent_workers"),
+        doc = "Flag controlling whether Weaver actions run as persistent workers",
+    ),
+    "_schema_digest": attr.label(
+        default = Label("//weaver/tools:schema_digest"),
+        executable = True,
+        cfg = "exec",
+        doc = "Tool computing normalized content digests of schema groups",
+    ),
+    "_merge_shards": attr.label(
+        default = Label("//weaver/tools:merge_shards"),
+        executable = True,
+        cfg = "exec",
+        doc = "Tool merging the outputs of sharded Weaver actions",
+    ),
+    "size_hint": attr.string(
+        default = "auto",
+        values = ["auto", "small", "medium", "large"],
+        doc = "Registry size class scheduling the Weaver actions. auto classifies by registry file count: 200 or more is medium, 2000 or more is large. Large actions reserve more local resources and run in the weaver_large exec group",
+    ),
+}
+
+# Execution groups of rules that run Weaver actions; see
+# REGISTRY_SIZE_CLASSES in //weaver/internal:performance.bzl
+_WEAVER_EXEC_GROUPS = {
+    WEAVER_LARGE_EXEC_GROUP: exec_group(
+        toolchains = [optional_weaver_toolchain()],
+    ),
+}
+
+_REGISTRY_SHARDS_DOC = "Number of independent Weaver actions to split the registry into, by schema group. 1 disables sharding; 0 picks one shard per 200 registry files, up to 16"
+
+_GENERATE_REGISTRY_SHARDS_DOC = _REGISTRY_SHARDS_DOC + ". Each shard runs the templates over its own groups, so templates must write one file per group; templates writing an aggregate file, such as an index of all attributes, need 1, as shards would write it with different content and the merge fails"
+
 # Rule definitions
 weaver_schema = rule(
     implementation = _weaver_schema_impl,
@@ -531,9 +827,15 @@ weaver_schema = rule(
         ),
         "deps": attr.label_list(
             default = [],
-            providers = ["weaver_schema_info"],
+            providers = [WeaverSchemaInfo],
             doc = "Schema dependencies",
         ),
+        "_schema_deps": attr.label(
+            default = Label("//weaver/tools:schema_deps"),
+            executable = True,
+            cfg = "exec",
+            doc = "Reference scanner producing the schema dependency index",
+        ),
     },
     doc = """
 Declares schema files as Bazel targets and provides schema information.
@@ -551,9 +853,55 @@ Example:
 """,
 )
 
+weaver_registry_snapshot = rule(
+    implementation = _weaver_registry_snapshot_impl,
+    attrs = dicts.add({
+        "registry": attr.label(
+            mandatory = True,
+            providers = [WeaverSchemaInfo],
+            doc = "weaver_schema target to resolve",
+        ),
+        "env": attr.string_dict(
+            default = {},
+            doc = "Environment variables for Weaver",
+        ),
+        "weaver": attr.label(
+            allow_single_file = True,
+            executable = True,
+            cfg = "exec",
+            doc = "Weaver binary to use (optional, uses toolchain if not specified)",
+        ),
+    }, _WEAVER_ACTION_ATTRS),
+    toolchains = [optional_weaver_toolchain()],
+    exec_groups = _WEAVER_EXEC_GROUPS,
+    doc = """
+Resolves a schema registry once into a snapshot file.
+
+This rule runs `weaver registry resolve` over the files of a weaver_schema
+target and writes the resolved registry as JSON. Passing the snapshot
+target to weaver_generate or weaver_validate_test `registries`, or to
+weaver_docs `schemas`, hands Weaver the resolved registry instead of the
+raw YAML files, so every consuming action skips staging and parsing them.
+The snapshot provides WeaverSchemaInfo of the registry with its `snapshot`
+field set.
+
+Example:
+    weaver_registry_snapshot(
+        name = "semconv_snapshot",
+        registry = ":semconv",
+    )
+
+    weaver_generate(
+        name = "semconv_code",
+        registries = [":semconv_snapshot"],
+        target = "go",
+    )
+""",
+)
+
 weaver_generate = rule(
     implementation = _weaver_generate_impl,
-    attrs = {
+    attrs = dicts.add({
         "registries": attr.label_list(
             allow_files = [".yaml", ".yml", ".json"],
             mandatory = True,
@@ -569,6 +917,11 @@ weaver_generate = rule(
             default = [],
             doc = "Policy files for validation",
         ),
+        "entry_points": attr.label_list(
+            allow_files = [".yaml", ".yml", ".json"],
+            default = [],
+            doc = "Registry files to generate from, which must be files of the registries. When set, only the schemas they transitively reference through imports, extends and ref are staged for Weaver (requires weaver_schema registries)",
+        ),
         "target": attr.string(
             mandatory = True,
             doc = "Target name for generated code",
@@ -596,9 +949,19 @@ weaver_generate = rule(
         ),
         "enable_performance_metrics": attr.bool(
             default = False,
-            doc = "Enable performance metrics output",
+            doc = "Write wall time, CPU time and peak RSS of each Weaver action to a _performance_metrics.json sidecar",
         ),
-    },
+        "content_digests": attr.bool(
+            default = True,
+            doc = "Key Weaver actions on normalized content digests of the registry, so reformat-only edits do not re-run them",
+        ),
+        "registry_shards": attr.int(
+            default = 1,
+            doc = _GENERATE_REGISTRY_SHARDS_DOC,
+        ),
+    }, _WEAVER_ACTION_ATTRS),
+    toolchains = [optional_weaver_toolchain()],
+    exec_groups = _WEAVER_EXEC_GROUPS,
     doc = """
 Generates code from semantic convention registries using Weaver.
 
@@ -617,7 +980,7 @@ Example:
 
 weaver_validate_test = rule(
     implementation = _weaver_validate_impl,
-    attrs = {
+    attrs = dicts.add({
         "registries": attr.label_list(
             allow_files = [".yaml", ".yml", ".json"],
             mandatory = True,
@@ -636,9 +999,10 @@ weaver_validate_test = rule(
             default = [],
             doc = "Registry URLs for remote registries",
         ),
-        "policy_dirs": attr.string_list(
+        "policy_dirs": attr.label_list(
+            allow_files = True,
             default = [],
-            doc = "Policy directories",
+            doc = "Policy directories, as source directories, tree artifacts or filegroups of their files; Weaver is passed each directory holding the files",
         ),
         "env": attr.string_dict(
             default = {},
@@ -650,7 +1014,25 @@ weaver_validate_test = rule(
             cfg = "exec",
             doc = "Weaver binary to use (optional, uses toolchain if not specified)",
         ),
-    },
+        "content_digests": attr.bool(
+            default = True,
+            doc = "Key Weaver actions on normalized content digests of the registry, so reformat-only edits do not re-run them",
+        ),
+        "registry_shards": attr.int(
+            default = 1,
+            doc = _REGISTRY_SHARDS_DOC,
+        ),
+        "split_policies": attr.bool(
+            default = False,
+            doc = "Check each policy file and policy directory in its own cached action, so editing one policy re-runs only its check",
+        ),
+        "enable_performance_metrics": attr.bool(
+            default = False,
+            doc = "Write wall time, CPU time and peak RSS of each Weaver action to a _performance_metrics.json sidecar",
+        ),
+    }, _WEAVER_ACTION_ATTRS),
+    toolchains = [optional_weaver_toolchain()],
+    exec_groups = _WEAVER_EXEC_GROUPS,
     test = True,
     doc = """
 Validates semantic convention registries using Weaver.
@@ -669,7 +1051,7 @@ Example:
 
 weaver_docs = rule(
     implementation = _weaver_docs_impl,
-    attrs = {
+    attrs = dicts.add({
         "schemas": attr.label_list(
             allow_files = [".yaml", ".yml", ".json"],
             mandatory = True,
@@ -700,7 +1082,13 @@ weaver_docs = rule(
             cfg = "exec",
             doc = "Weaver binary to use (optional, uses toolchain if not specified)",
         ),
-    },
+        "enable_performance_metrics": attr.bool(
+            default = False,
+            doc = "Write wall time, CPU time and peak RSS of each Weaver action to a _performance_metrics.json sidecar",
+        ),
+    }, _WEAVER_ACTION_ATTRS),
+    toolchains = [optional_weaver_toolchain()],
+    exec_groups = _WEAVER_EXEC_GROUPS,
     doc = """
 Generates documentation from schema files using Weaver.
 
@@ -719,7 +1107,7 @@ Example:
 
 weaver_library = rule(
     implementation = _weaver_library_impl,
-    attrs = {
+    attrs = dicts.add({
         "schemas": attr.label_list(
             allow_files = [".yaml", ".yml", ".json"],
             mandatory = True,
@@ -754,19 +1142,44 @@ weaver_library = rule(
             cfg = "exec",
             doc = "Weaver binary to use (optional, uses toolchain if not specified)",
         ),
-    },
+        "content_digests": attr.bool(
+            default = True,
+            doc = "Key Weaver actions on normalized content digests of the registry, so reformat-only edits do not re-run them",
+        ),
+        "enable_performance_metrics": attr.bool(
+            default = False,
+            doc = "Write wall time, CPU time and peak RSS of each Weaver action to a _performance_metrics.json sidecar",
+        ),
+        "validate": attr.bool(
+            default = False,
+            doc = "Also validate the schemas, writing a JSON report to <name>_validation_result.json. Runs in the same action as generation",
+        ),
+        "generate_docs": attr.bool(
+            default = False,
+            doc = "Also generate documentation into <name>_docs. Runs in the same action as generation",
+        ),
+    }, _WEAVER_ACTION_ATTRS),
+    toolchains = [optional_weaver_toolchain()],
+    exec_groups = _WEAVER_EXEC_GROUPS,
     doc = """
 Generates libraries from schema files using Weaver.
 
 This rule generates libraries from schema files using the Weaver tool.
 It supports multiple output formats for different programming languages.
 
+With `validate` or `generate_docs`, a single WeaverLibrary action stages
+the registry once and runs validation, generation and documentation against
+it, instead of separate weaver_validate_test and weaver_docs targets each
+resolving the same registry.
+
 Example:
     weaver_library(
         name = "my_library",
         schemas = ["//path/to/schema.yaml"],
         format = "typescript",
         args = ["--verbose"],
+        validate = True,
+        generate_docs = True,
     )
 """,
 ) 
\ No newline at end of file
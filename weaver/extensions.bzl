@@ -3,22 +3,79 @@ Weaver repository extension for Bzlmod.
 
 This module provides the Weaver repository extension for downloading
 and managing Weaver binaries in Bzlmod-enabled workspaces.
+
+A `download` tag with `platforms` declares one weaver_repository per
+platform and a hub repository of the tag's name registering their
+toolchains. Declaring repositories fetches nothing: register the hub's
+toolchains with `register_toolchains("@<name>//:all")` and Bazel downloads
+only the archives of the execution platforms that toolchain resolution
+selects. Without `platforms`, the tag declares a single repository for the
+host platform.
 """
 
-load(":repositories.bzl", "weaver_repository")
+load(":repositories.bzl", "platform_repository_name", "weaver_hub_repository", "weaver_repository")
+
+def _download_repository_attrs(download):
+    """Get the weaver_repository attributes shared by the platforms of a tag."""
+    return {
+        "version": download.version,
+        "strip_prefix": download.strip_prefix,
+        "mirror": download.mirror,
+        "lockfile": download.lockfile,
+    }
 
 def _weaver_repository_extension_impl(module_ctx):
     """Implementation of the Weaver repository extension."""
-    
+
+    root_direct_deps = []
+    root_direct_dev_deps = []
     for mod in module_ctx.modules:
         for download in mod.tags.download:
-            # Create the repository for each download request
-            weaver_repository(
-                name = download.name,
-                version = download.version,
-                sha256 = getattr(download, "sha256", None),
-                urls = getattr(download, "urls", None),
-            )
+            attrs = _download_repository_attrs(download)
+
+            if not download.platforms:
+                # Single repository for the host platform
+                weaver_repository(
+                    name = download.name,
+                    sha256 = download.sha256,
+                    urls = download.urls,
+                    **attrs
+                )
+            else:
+                if download.sha256 or download.urls:
+                    fail((
+                        "weaver.download(name = \"{}\"): sha256 and urls describe a single archive " +
+                        "and cannot be combined with platforms; pin per-platform archives with " +
+                        "a lockfile or mirror from scripts/weaver_mirror.py"
+                    ).format(download.name))
+
+                # Per-platform repositories, fetched only when selected
+                for platform in download.platforms:
+                    weaver_repository(
+                        name = platform_repository_name(download.name, platform),
+                        platform = platform,
+                        **attrs
+                    )
+                weaver_hub_repository(
+                    name = download.name,
+                    platforms = download.platforms,
+                    repository_prefix = download.name,
+                )
+
+            if mod.is_root:
+                if module_ctx.is_dev_dependency(download):
+                    root_direct_dev_deps.append(download.name)
+                else:
+                    root_direct_deps.append(download.name)
+
+    # The declared repositories follow from the tags alone, and nothing is
+    # downloaded here, so the extension does not need a MODULE.bazel.lock
+    # entry and is re-evaluated for free
+    return module_ctx.extension_metadata(
+        root_module_direct_deps = root_direct_deps,
+        root_module_direct_dev_deps = root_direct_dev_deps,
+        reproducible = True,
+    )
 
 _weaver_repository_extension = module_extension(
     implementation = _weaver_repository_extension_impl,
@@ -29,8 +86,13 @@ _weaver_repository_extension = module_extension(
                 "version": attr.string(mandatory = True),
                 "sha256": attr.string(),
                 "urls": attr.string_list(),
-                "platforms": attr.string_list(),
+                "strip_prefix": attr.string(),
+                "mirror": attr.string(),
+                "lockfile": attr.label(),
+                "platforms": attr.string_list(
+                    doc = "Platforms to declare lazily fetched repositories for, behind a toolchain hub. Defaults to a single host platform repository.",
+                ),
             },
         ),
     },
-) 
\ No newline at end of file
+)
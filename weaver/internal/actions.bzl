@@ -2,48 +2,277 @@
 Core action implementations for Weaver rules.
 
 This module provides the core action implementations used by Weaver rules.
+All Weaver invocations go through the `//weaver/tools:weaver_worker` wrapper,
+which runs as a Bazel persistent (multiplex) worker unless disabled with
+`--@rules_weaver//weaver:use_persistent_workers=false`.
 """
 
 load("@bazel_skylib//lib:paths.bzl", "paths")
+load("@bazel_skylib//rules:common_settings.bzl", "BuildSettingInfo")
 load("//weaver:platform_constraints.bzl", "get_execution_requirements")
+load("//weaver/internal:performance.bzl", "REGISTRY_SIZE_CLASSES")
+load("//weaver:toolchains.bzl", "WEAVER_TOOLCHAIN_TYPE", "get_weaver_toolchain")
 
-def _generate_action(ctx, registries, templates, template_dir, policies, args, output_dir, generated_files, weaver_binary, target, registry_urls = [], env = {}):
-    """Create a hermetic action to generate code from semantic convention registries using Weaver."""
-    
-    # Prepare inputs - handle weaver_binary whether it's a Target or File
-    if hasattr(weaver_binary, "files"):
-        # It's a Target, get the files
-        weaver_files = weaver_binary.files.to_list()
-        inputs = depset(registries + templates + policies + weaver_files)
-        executable = weaver_files[0]  # Use the first file as executable
+def _use_persistent_workers(ctx):
+    """Check whether Weaver actions should run through the persistent worker."""
+    flag = getattr(ctx.attr, "_use_persistent_workers", None)
+    if not flag:
+        return False
+    return flag[BuildSettingInfo].value
+
+def _weaver_execution_requirements(ctx):
+    """Get execution requirements for a wrapped Weaver action."""
+    requirements = dict(get_execution_requirements())
+    if _use_persistent_workers(ctx):
+        requirements["supports-workers"] = "1"
+        requirements["supports-multiplex-workers"] = "1"
+        requirements["requires-worker-protocol"] = "json"
+    return requirements
+
+def _weaver_scheduling(ctx, size_class):
+    """Resolve where a Weaver action over a registry of a size class runs.
+    
+    Large registries run in the weaver_large exec group, with the Weaver
+    binary of the toolchain resolved for that group and the action wrapper
+    built for it, so both match the group's execution platform. They stay in
+    the default exec group when the rule sets an explicit `weaver` binary,
+    which is built for the default execution platform, or when no Weaver
+    toolchain resolves for the group.
+    
+    `registry_snapshots` tells whether the binary reads a resolved registry
+    as `--registry`, as declared by its toolchain; an explicit `weaver`
+    binary is assumed not to.
+    
+    Returns:
+        Struct with exec_group (None for the default group), resource_set,
+        weaver_binary (None to run the rule's binary), worker and
+        registry_snapshots fields
+    """
+    scheduling = REGISTRY_SIZE_CLASSES[size_class]
+    explicit_weaver = getattr(ctx.attr, "weaver", None)
+    toolchain = None
+    if scheduling.exec_group and not explicit_weaver:
+        toolchains = ctx.exec_groups[scheduling.exec_group].toolchains
+        if WEAVER_TOOLCHAIN_TYPE in toolchains:
+            toolchain = toolchains[WEAVER_TOOLCHAIN_TYPE]
+    if not toolchain:
+        default_toolchain = None if explicit_weaver else get_weaver_toolchain(ctx)
+        return struct(
+            exec_group = None,
+            resource_set = scheduling.resource_set,
+            weaver_binary = None,
+            worker = ctx.executable._weaver_worker,
+            registry_snapshots = getattr(default_toolchain, "registry_snapshots", False),
+        )
+    return struct(
+        exec_group = scheduling.exec_group,
+        resource_set = scheduling.resource_set,
+        weaver_binary = getattr(toolchain, "weaver_files_to_run", None) or toolchain.weaver_binary,
+        worker = ctx.executable._weaver_worker_large,
+        registry_snapshots = getattr(toolchain, "registry_snapshots", False),
+    )
+
+def _weaver_wrapper_args(ctx, weaver_binary, size_class = "small"):
+    """Create the wrapper arguments and tool inputs for a Weaver binary.
+    
+    The Weaver binary may be a Target (explicit `weaver` attribute), a
+    FilesToRunProvider (toolchain binary with runfiles) or a File. Actions
+    scheduled in the weaver_large exec group run the binary of that group's
+    toolchain instead (see `_weaver_scheduling`). Binaries that read a
+    resolved registry get it from the wrapper's registry cache, which
+    resolves each registry once per worker.
+    
+    Returns:
+        Tuple of (Args object, list of tools for the action)
+    """
+    scheduling = _weaver_scheduling(ctx, size_class)
+    weaver_binary = scheduling.weaver_binary or weaver_binary
+    if type(weaver_binary) == "FilesToRunProvider":
+        executable = weaver_binary.executable
+        tools = [weaver_binary]
+    elif hasattr(weaver_binary, "files"):
+        # It's a Target, run it through its FilesToRunProvider
+        files_to_run = weaver_binary[DefaultInfo].files_to_run
+        executable = files_to_run.executable or weaver_binary.files.to_list()[0]
+        tools = [files_to_run]
     else:
         # It's a File
-        inputs = depset(registries + templates + policies + [weaver_binary])
         executable = weaver_binary
+        tools = [weaver_binary]
+    
+    args = ctx.actions.args()
+    args.use_param_file("@%s", use_always = True)
+    args.set_param_file_format("multiline")
+    args.add("--weaver", executable)
+    if scheduling.registry_snapshots:
+        args.add("--resolve-registry")
+    return args, tools
+
+def _add_unused_inputs_args(ctx, wrapper_args, digest_manifests = [], dependency_indexes = [], entry_points = [], name = None):
+    """Add digest manifest and narrowing arguments and declare the unused inputs list.
+    
+    Registry files covered by the digest manifests are reported as unused
+    inputs, so the action is keyed on the normalized manifests instead of the
+    raw files. With entry points, registry files outside the transitive
+    closure of the entry points are not staged and are reported as unused,
+    along with manifests covering none of the staged files.
+    
+    Returns:
+        The unused inputs list file, or None if neither is requested
+    """
+    if not digest_manifests and not entry_points:
+        return None
+    unused_inputs_list = ctx.actions.declare_file((name or ctx.label.name) + "_unused_inputs.txt")
+    wrapper_args.add_all(digest_manifests, before_each = "--digest-manifest")
+    if entry_points:
+        wrapper_args.add_all(dependency_indexes, before_each = "--dependency-index")
+        wrapper_args.add_all(entry_points, before_each = "--entry-point")
+    wrapper_args.add("--unused-inputs-list", unused_inputs_list)
+    return unused_inputs_list
+
+def _add_metrics_args(ctx, wrapper_args, metrics_file, mnemonic):
+    """Add arguments making the wrapper measure the Weaver process.
+    
+    The wrapper records wall time, user and system CPU time and peak RSS of
+    the Weaver process into `metrics_file` as JSON.
+    """
+    if not metrics_file:
+        return
+    wrapper_args.add("--metrics-out", metrics_file)
+    wrapper_args.add("--metrics-label", str(ctx.label))
+    wrapper_args.add("--metrics-mnemonic", mnemonic)
+
+def _run_weaver_wrapper(ctx, inputs, outputs, args, tools, env, mnemonic, progress_message, unused_inputs_list = None, metrics_file = None, size_class = "small"):
+    """Run the Weaver action wrapper, as a persistent worker when enabled.
     
-    # Prepare arguments for weaver registry generate
-    weaver_args = [
+    `size_class` (see `registry_size_class`) sets the local resources
+    reserved for the action and, for large registries, its execution group
+    and the wrapper built for it (see `_weaver_scheduling`).
+    """
+    scheduling = _weaver_scheduling(ctx, size_class)
+    if unused_inputs_list:
+        outputs = outputs + [unused_inputs_list]
+    if metrics_file:
+        outputs = outputs + [metrics_file]
+    ctx.actions.run(
+        inputs = inputs,
+        outputs = outputs,
+        executable = scheduling.worker,
+        tools = tools,
+        arguments = [args],
+        env = env,
+        use_default_shell_env = False,
+        mnemonic = mnemonic,
+        progress_message = progress_message,
+        execution_requirements = _weaver_execution_requirements(ctx),
+        unused_inputs_list = unused_inputs_list,
+        resource_set = scheduling.resource_set,
+        exec_group = scheduling.exec_group,
+    )
+
+def _to_depset(files):
+    """Return a list or depset of files as a depset."""
+    if type(files) == "depset":
+        return files
+    return depset(files)
+
+def _action_inputs(*file_sets):
+    """Combine lists and depsets of files into the inputs of one action.
+    
+    Depsets are nested rather than flattened, so large registries are not
+    copied into a new list for every action during analysis.
+    """
+    return depset(transitive = [_to_depset(files) for files in file_sets if files])
+
+def _add_generate_command(weaver_args, target, output_dir, registry_urls = [], template_dir = None, policies = [], args = [], snapshots = []):
+    """Add the arguments of `weaver registry generate`.
+    
+    Weaver writes directly into the output tree artifact. The staged registry
+    is appended by the wrapper; registry snapshots are passed as is.
+    """
+    weaver_args.add_all([
         "registry", "generate",
         target,  # The target name (e.g., 'opentelemetry-proto')
-        output_dir,  # Output directory
-    ]
+    ])
+    weaver_args.add(output_dir)  # Output tree artifact
     
-    # Add registry URLs if provided
-    if registry_urls:
-        for url in registry_urls:
-            weaver_args.extend(["--registry", url])
+    # Add registry URLs and snapshots if provided
+    weaver_args.add_all(registry_urls, before_each = "--registry")
+    weaver_args.add_all(snapshots, before_each = "--registry")
     
     # Add templates if provided
     if template_dir:
-        weaver_args.extend(["--templates", template_dir])
+        weaver_args.add("--templates", template_dir)
     
     # Add policies if provided
-    if policies:
-        for policy in policies:
-            weaver_args.extend(["--policy", policy.path])
+    weaver_args.add_all(policies, before_each = "--policy")
     
     # Add custom arguments
-    weaver_args.extend(args)
+    weaver_args.add_all(args)
+
+def _policy_dir(file):
+    """Map a file of a policy directory to the directory passed to Weaver."""
+    return file.path if file.is_directory else file.dirname
+
+def _add_check_command(weaver_args, registry_urls = [], policies = [], policy_dirs = [], args = [], snapshots = []):
+    """Add the arguments of `weaver registry check`.
+    
+    Diagnostics are requested as JSON so the wrapper can record them in the
+    validation report, unless the arguments choose another format.
+    """
+    weaver_args.add_all(["registry", "check"])
+    if "--diagnostic-format" not in args:
+        weaver_args.add("--diagnostic-format", "json")
+    
+    # Add registry URLs and snapshots if provided
+    weaver_args.add_all(registry_urls, before_each = "--registry")
+    weaver_args.add_all(snapshots, before_each = "--registry")
+    
+    # Add policies and policy directories if provided
+    weaver_args.add_all(policies, before_each = "--policy")
+    weaver_args.add_all(policy_dirs, map_each = _policy_dir, uniquify = True, before_each = "--policy")
+    
+    # Add custom arguments
+    weaver_args.add_all(args)
+
+def _add_docs_command(weaver_args, output_dir, schemas, args = [], template_file = None):
+    """Add the arguments of `weaver docs`; Weaver writes into the output tree artifact."""
+    weaver_args.add("docs")
+    weaver_args.add("--output-dir", output_dir)
+    weaver_args.add_all(args)
+    
+    # Add template file to arguments if provided
+    if template_file:
+        weaver_args.add("--template", template_file)
+    
+    # Add schema files to arguments; a depset is expanded at execution time
+    weaver_args.add_all(schemas)
+
+def _generate_action(ctx, registries, templates, template_dir, policies, args, output_dir, generated_files, weaver_binary, target, registry_urls = [], env = {}, digest_manifests = [], dependency_indexes = [], entry_points = [], name = None, metrics_file = None, size_class = "small", snapshots = []):
+    """Create a hermetic action to generate code from semantic convention registries using Weaver.
+    
+    Registries, templates and policies may be lists or depsets of files.
+    They are passed to the wrapper through its param file and expanded only
+    when the action runs. Registry `snapshots` written by
+    weaver_registry_snapshot are passed to Weaver without staging.
+    
+    `name` distinguishes the auxiliary outputs of several generation actions
+    of one target, such as registry shards; it defaults to the target name.
+    If `metrics_file` is given, the wrapper writes measurements of the Weaver
+    process to it.
+    """
+    
+    # Prepare inputs
+    inputs = _action_inputs(registries, snapshots, templates, policies, digest_manifests, dependency_indexes, entry_points)
+    
+    # Prepare wrapper arguments
+    wrapper_args, tools = _weaver_wrapper_args(ctx, weaver_binary, size_class)
+    wrapper_args.add_all(registries, before_each = "--registry-file")
+    unused_inputs_list = _add_unused_inputs_args(ctx, wrapper_args, digest_manifests, dependency_indexes, entry_points, name)
+    _add_metrics_args(ctx, wrapper_args, metrics_file, "WeaverGenerate")
+    wrapper_args.add("--")
+    
+    _add_generate_command(wrapper_args, target, generated_files[0], registry_urls, template_dir, policies, args, snapshots)
     
     # Create environment variables
     remote_env = {
@@ -52,89 +281,58 @@ def _generate_action(ctx, registries, templates, template_dir, policies, args, o
     }
     remote_env.update(env)
     
-    # Create a script that runs weaver and creates the output files
-    script_content = """#!/bin/bash
-set -e
-
-# Run the weaver command
-{weaver_binary} {weaver_args}
-
-# Create placeholder output files if they don't exist
-for output_file in {output_files}; do
-    if [ ! -f "$output_file" ]; then
-        mkdir -p "$(dirname "$output_file")"
-        echo "Generated by Weaver" > "$output_file"
-    fi
-done
-""".format(
-        weaver_binary = executable.path,
-        weaver_args = " ".join(weaver_args),
-        output_files = " ".join([f.path for f in generated_files]),
-    )
-    
-    script_file = ctx.actions.declare_file(ctx.label.name + "_generate_script.sh")
-    ctx.actions.write(
-        output = script_file,
-        content = script_content,
-        is_executable = True,
-    )
-    
     # Create the action
-    ctx.actions.run(
-        inputs = depset([script_file], transitive = [inputs]),
+    _run_weaver_wrapper(
+        ctx,
+        inputs = inputs,
         outputs = generated_files,
-        executable = script_file,
+        args = wrapper_args,
+        tools = tools,
         env = remote_env,
-        use_default_shell_env = False,
         mnemonic = "WeaverGenerate",
-        progress_message = "Generating code from {} registries using Weaver".format(len(registries) + len(registry_urls)),
-        execution_requirements = get_execution_requirements(),
+        progress_message = "Generating code for {} using Weaver".format(name or ctx.label),
+        unused_inputs_list = unused_inputs_list,
+        metrics_file = metrics_file,
+        size_class = size_class,
     )
 
-def _validation_action(ctx, registries, policies, args, weaver_binary, registry_urls = [], policy_dirs = [], env = {}):
-    """Create a hermetic action to validate semantic convention registries using Weaver."""
-    
-    # Prepare inputs - handle weaver_binary whether it's a Target or File
-    if hasattr(weaver_binary, "files"):
-        # It's a Target, get the files
-        weaver_files = weaver_binary.files.to_list()
-        inputs = depset(registries + policies + weaver_files)
-        executable = weaver_files[0]  # Use the first file as executable
-    else:
-        # It's a File
-        inputs = depset(registries + policies + [weaver_binary])
-        executable = weaver_binary
+def _validation_action(ctx, registries, policies, args, weaver_binary, registry_urls = [], policy_dirs = [], env = {}, digest_manifests = [], dependency_indexes = [], entry_points = [], name = None, metrics_file = None, record_failures = False, size_class = "small", snapshots = []):
+    """Create a hermetic action to validate semantic convention registries using Weaver.
     
-    # Create output file
-    output_file = ctx.actions.declare_file(ctx.label.name + "_validation_result.txt")
+    The action output is a JSON report of the `registry check` exit code,
+    diagnostics and output. With `record_failures`, a failed check is
+    recorded in the report and the action still succeeds, so the report is
+    cached on the registry and policy inputs and a test replays it.
+    Otherwise a failed check fails the build. Registries, policies and the
+    files of `policy_dirs` may be lists or depsets of files; they are all
+    action inputs, so the policy directories are visible in the sandbox and
+    on remote executors. Registry `snapshots` are checked without staging.
     
-    # Prepare arguments for weaver registry check
-    weaver_args = [
-        "registry", "check",
-    ]
+    Returns:
+        Validation report file
+    """
     
-    # Add registry parameter (use the first registry as the main registry, or default)
-    if registries:
-        weaver_args.extend(["--registry", registries[0].dirname])
-    # If no registries provided, use the default registry (no need to specify --registry)
+    name = name or ctx.label.name
     
-    # Add registry URLs if provided
-    if registry_urls:
-        for url in registry_urls:
-            weaver_args.extend(["--registry", url])
+    # Prepare inputs
+    inputs = _action_inputs(registries, snapshots, policies, policy_dirs, digest_manifests, dependency_indexes, entry_points)
     
-    # Add policies if provided
-    if policies:
-        for policy in policies:
-            weaver_args.extend(["--policy", policy.path])
+    # Create output file
+    output_file = ctx.actions.declare_file(name + "_validation_result.json")
     
-    # Add policy directories if provided
-    if policy_dirs:
-        for policy_dir in policy_dirs:
-            weaver_args.extend(["--policy", policy_dir])
+    # Prepare wrapper arguments; registry files are staged into a single
+    # registry directory by the wrapper. If no registries are provided, the
+    # default registry is used.
+    wrapper_args, tools = _weaver_wrapper_args(ctx, weaver_binary, size_class)
+    wrapper_args.add_all(registries, before_each = "--registry-file")
+    wrapper_args.add("--diagnostics-out", output_file)
+    if record_failures:
+        wrapper_args.add("--record-failures")
+    unused_inputs_list = _add_unused_inputs_args(ctx, wrapper_args, digest_manifests, dependency_indexes, entry_points, name)
+    _add_metrics_args(ctx, wrapper_args, metrics_file, "WeaverValidate")
+    wrapper_args.add("--")
     
-    # Add custom arguments
-    weaver_args.extend(args)
+    _add_check_command(wrapper_args, registry_urls, policies, policy_dirs, args, snapshots)
     
     # Create environment variables
     remote_env = {
@@ -142,81 +340,68 @@ def _validation_action(ctx, registries, policies, args, weaver_binary, registry_
     }
     remote_env.update(env)
     
-    # Create a script that runs weaver and creates the output file
-    script_content = """#!/bin/bash
-set -e
-
-# Run the weaver command
-{weaver_binary} {weaver_args}
-
-# Create the output file to indicate success
-echo "Validation completed successfully" > {output_file}
-
-# Make the output file executable for test rules
-chmod +x {output_file}
-""".format(
-        weaver_binary = executable.path,
-        weaver_args = " ".join(weaver_args),
-        output_file = output_file.path,
-    )
-    
-    script_file = ctx.actions.declare_file(ctx.label.name + "_validation_script.sh")
-    ctx.actions.write(
-        output = script_file,
-        content = script_content,
-        is_executable = True,
-    )
-    
     # Create the action
-    ctx.actions.run(
-        inputs = depset([script_file], transitive = [inputs]),
+    _run_weaver_wrapper(
+        ctx,
+        inputs = inputs,
         outputs = [output_file],
-        executable = script_file,
+        args = wrapper_args,
+        tools = tools,
         env = remote_env,
-        use_default_shell_env = False,
         mnemonic = "WeaverValidate",
-        progress_message = "Validating {} registries using Weaver".format(len(registries) + len(registry_urls)),
-        execution_requirements = get_execution_requirements(),
+        progress_message = "Validating registries of {} using Weaver".format(name),
+        unused_inputs_list = unused_inputs_list,
+        metrics_file = metrics_file,
+        size_class = size_class,
     )
     
-    # Create a proper executable script for test rules
+    return output_file
+
+def _validation_test_script(ctx, validation_output):
+    """Create the executable script for validation test rules.
+    
+    The script replays the cached validation report: it prints the report
+    and exits with failure if the recorded `registry check` failed. The
+    exit code is negative if Weaver was killed by a signal.
+    """
     test_script = ctx.actions.declare_file(ctx.label.name + "_test_script.sh")
     ctx.actions.write(
         output = test_script,
         content = """#!/bin/bash
+report="{report}"
+exit_code=$(sed -n 's/^  "exit_code": \\(-\\{0,1\\}[0-9][0-9]*\\),*$/\\1/p' "$report")
+if [[ -z "$exit_code" ]]; then
+    echo "Malformed validation report: $report"
+    exit 1
+fi
+if [[ "$exit_code" != "0" ]]; then
+    echo "Weaver registry check failed with exit code $exit_code:"
+    cat "$report"
+    exit 1
+fi
 echo "Validation test passed"
 exit 0
-""",
+""".format(report = validation_output.short_path),
         is_executable = True,
     )
     
     return test_script
 
-def _documentation_action(ctx, schemas, args, output_dir, documentation_files, weaver_binary, template_file = None, env = {}):
-    """Create a hermetic action to generate documentation from schemas using Weaver."""
-    
-    # Prepare inputs
-    inputs = depset(schemas + [weaver_binary])
-    if template_file:
-        inputs = depset(schemas + [weaver_binary, template_file])
+def _documentation_action(ctx, schemas, args, output_dir, documentation_files, weaver_binary, template_file = None, env = {}, metrics_file = None, size_class = "small"):
+    """Create a hermetic action to generate documentation from schemas using Weaver.
     
-    # Prepare arguments
-    weaver_args = [
-        "docs",
-        "--output-dir", output_dir,
-    ] + args
+    Schemas may be a list or depset of files.
+    """
     
-    # Add expected output files for mock binary
-    for output_file in documentation_files:
-        weaver_args.extend(["--expected-output", output_file.path])
+    # Prepare inputs
+    inputs = _action_inputs(schemas, [template_file] if template_file else [])
     
-    # Add template file to arguments if provided
-    if template_file:
-        weaver_args.extend(["--template", template_file.path])
+    # Prepare wrapper arguments
+    wrapper_args, tools = _weaver_wrapper_args(ctx, weaver_binary, size_class)
+    _add_metrics_args(ctx, wrapper_args, metrics_file, "WeaverDocs")
+    wrapper_args.add("--")
     
-    # Add schema files to arguments
-    for schema in schemas:
-        weaver_args.append(schema.path)
+    _add_docs_command(wrapper_args, documentation_files[0], schemas, args, template_file)
     
     # Create environment variables
     remote_env = {
@@ -227,33 +412,168 @@ def _documentation_action(ctx, schemas, args, output_dir, documentation_files, w
     remote_env.update(env)
     
     # Create the action
-    ctx.actions.run(
+    _run_weaver_wrapper(
+        ctx,
         inputs = inputs,
         outputs = documentation_files,
-        executable = weaver_binary,
-        arguments = weaver_args,
+        args = wrapper_args,
+        tools = tools,
         env = remote_env,
-        use_default_shell_env = False,
         mnemonic = "WeaverDocs",
-        progress_message = "Generating documentation from {} schemas using Weaver".format(len(schemas)),
+        progress_message = "Generating documentation for {} using Weaver".format(ctx.label),
+        metrics_file = metrics_file,
+        size_class = size_class,
+    )
+
+def _library_action(ctx, registries, args, library_files, weaver_binary, target, registry_urls = [], env = {}, digest_manifests = [], documentation_files = [], validate = False, metrics_file = None, size_class = "small"):
+    """Create one action validating a registry and generating a library and its documentation.
+    
+    The wrapper stages the registry once and runs `registry check` (when
+    `validate` is set), `registry generate` and `docs` (when
+    `documentation_files` are given) against it in order, stopping at the
+    first failure. Each command writes its own declared output.
+    
+    Returns:
+        Validation result file, or None when `validate` is False
+    """
+    
+    # Prepare inputs
+    inputs = _action_inputs(registries, digest_manifests)
+    
+    # Prepare wrapper arguments
+    wrapper_args, tools = _weaver_wrapper_args(ctx, weaver_binary, size_class)
+    wrapper_args.add_all(registries, before_each = "--registry-file")
+    outputs = list(library_files) + list(documentation_files)
+    validation_file = None
+    if validate:
+        validation_file = ctx.actions.declare_file(ctx.label.name + "_validation_result.json")
+        wrapper_args.add("--diagnostics-out", validation_file)
+        outputs.append(validation_file)
+    unused_inputs_list = _add_unused_inputs_args(ctx, wrapper_args, digest_manifests)
+    _add_metrics_args(ctx, wrapper_args, metrics_file, "WeaverLibrary")
+    wrapper_args.add("--")
+    
+    # Weaver commands, separated by --then
+    command_count = 1
+    if validate:
+        _add_check_command(wrapper_args, registry_urls)
+        wrapper_args.add("--then")
+        command_count += 1
+    _add_generate_command(wrapper_args, target, library_files[0], registry_urls, args = args)
+    if documentation_files:
+        wrapper_args.add("--then")
+        _add_docs_command(wrapper_args, documentation_files[0], registries)
+        command_count += 1
+    
+    # Create environment variables
+    remote_env = {
+        "WEAVER_CACHE_ENABLED": "1",
+        "WEAVER_PARALLEL_PROCESSING": "1",
+    }
+    remote_env.update(env)
+    
+    # Create the action
+    _run_weaver_wrapper(
+        ctx,
+        inputs = inputs,
+        outputs = outputs,
+        args = wrapper_args,
+        tools = tools,
+        env = remote_env,
+        mnemonic = "WeaverLibrary",
+        progress_message = "Building Weaver library {} ({} commands over one registry)".format(ctx.label, command_count),
+        unused_inputs_list = unused_inputs_list,
+        metrics_file = metrics_file,
+        size_class = size_class,
+    )
+    
+    return validation_file
+
+def _snapshot_action(ctx, registries, snapshot_file, weaver_binary, env = {}, size_class = "small"):
+    """Create an action resolving a registry once into a snapshot file.
+    
+    The wrapper stages the registry and runs `weaver registry resolve`,
+    which writes the resolved registry as JSON. Consumers pass the snapshot
+    to Weaver instead of staging and parsing the raw registry files.
+    """
+    
+    # Prepare wrapper arguments
+    wrapper_args, tools = _weaver_wrapper_args(ctx, weaver_binary, size_class)
+    wrapper_args.add_all(registries, before_each = "--registry-file")
+    wrapper_args.add("--")
+    wrapper_args.add_all(["registry", "resolve"])
+    wrapper_args.add("--format", "json")
+    wrapper_args.add("--output", snapshot_file)
+    
+    # Create the action
+    _run_weaver_wrapper(
+        ctx,
+        inputs = _action_inputs(registries),
+        outputs = [snapshot_file],
+        args = wrapper_args,
+        tools = tools,
+        env = env,
+        mnemonic = "WeaverResolve",
+        progress_message = "Resolving registry snapshot {} using Weaver".format(ctx.label),
+        size_class = size_class,
+    )
+
+def _merge_shards_action(ctx, kind, shard_outputs, output):
+    """Create a cheap action merging the outputs of sharded Weaver actions.
+    
+    Args:
+        ctx: The rule context
+        kind: "tree" to merge output tree artifacts, "diagnostics" to merge
+            validation reports
+        shard_outputs: Outputs of the shard actions, in shard order
+        output: Merged output (a tree artifact for "tree")
+    """
+    args = ctx.actions.args()
+    args.use_param_file("@%s", use_always = True)
+    args.set_param_file_format("multiline")
+    args.add(kind)
+    args.add("--output", output.path)
+    args.add_all(shard_outputs, expand_directories = False)
+    
+    ctx.actions.run(
+        inputs = shard_outputs,
+        outputs = [output],
+        executable = ctx.executable._merge_shards,
+        arguments = [args],
+        mnemonic = "WeaverMergeShards",
+        progress_message = "Merging {} Weaver shards for {}".format(len(shard_outputs), ctx.label),
         execution_requirements = get_execution_requirements(),
     )
 
 def determine_output_files(ctx, output_dir, target):
-    """Determine the expected output files for registry-based generation."""
-    # For registry-based generation, we don't know the exact output files
-    # So we'll create a placeholder file that indicates the generation completed
-    output_file = ctx.actions.declare_file(output_dir + "/" + target + "_generated.txt")
-    return [output_file]
+    """Determine the outputs for registry-based generation.
+    
+    The set of generated files depends on the registry and templates and is
+    only known once Weaver has run, so the whole output directory is declared
+    as a single tree artifact.
+    
+    Returns:
+        List containing the output tree artifact
+    """
+    return [ctx.actions.declare_directory(output_dir)]
 
 def determine_documentation_files(ctx, output_dir, target):
-    """Determine the expected documentation files for registry-based generation."""
-    # For registry-based documentation, we don't know the exact output files
-    # So we'll create a placeholder file that indicates the documentation generation completed
-    output_file = ctx.actions.declare_file(output_dir + "/" + target + "_docs_generated.txt")
-    return [output_file]
+    """Determine the outputs for registry-based documentation generation.
+    
+    Like code generation, documentation is declared as a single tree artifact
+    covering the documentation output directory.
+    
+    Returns:
+        List containing the documentation tree artifact
+    """
+    return [ctx.actions.declare_directory(output_dir)]
 
 # Public exports for use by other modules
+weaver_scheduling = _weaver_scheduling
 generate_action = _generate_action
 validation_action = _validation_action
-documentation_action = _documentation_action 
\ No newline at end of file
+validation_test_script = _validation_test_script
+merge_shards_action = _merge_shards_action
+documentation_action = _documentation_action
+snapshot_action = _snapshot_action
+library_action = _library_action 
\ No newline at end of file
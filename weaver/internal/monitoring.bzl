@@ -1,12 +1,13 @@
 """
 Performance monitoring utilities for OpenTelemetry Weaver rules.
 
-This module provides tools for tracking performance metrics, detecting
-regressions, and generating performance reports for Weaver operations.
+This module provides threshold checks and performance reports for Weaver
+operations. Starlark state does not persist across builds, so history and
+regression detection live in `scripts/weaver_action_analytics.py`, which
+reads Bazel's execution log and build events.
 """
 
 load("@bazel_skylib//lib:paths.bzl", "paths")
-load("//weaver/internal:performance.bzl", "performance_utils", "PerformanceMetrics")
 
 # Performance thresholds for regression detection
 PERFORMANCE_THRESHOLDS = {
@@ -16,81 +17,6 @@ PERFORMANCE_THRESHOLDS = {
     "memory_usage_mb": 50,        # Memory usage should be under 50MB
 }
 
-# Performance history for trend analysis
-_performance_history = {}
-
-def _record_performance_metrics(operation_name, metrics):
-    """Record performance metrics for trend analysis.
-    
-    Args:
-        operation_name: Name of the operation
-        metrics: PerformanceMetrics provider
-    
-    Returns:
-        None
-    """
-    if operation_name not in _performance_history:
-        _performance_history[operation_name] = []
-    
-    _performance_history[operation_name].append({
-        "timestamp": _get_current_timestamp(),
-        "analysis_time_ms": metrics.analysis_time_ms,
-        "action_time_ms": metrics.action_time_ms,
-        "cache_hit_rate": metrics.cache_hit_rate,
-        "memory_usage_mb": metrics.memory_usage_mb,
-        "file_count": metrics.file_count,
-        "schema_count": metrics.schema_count,
-    })
-    
-    # Keep only last 100 entries to prevent memory bloat
-    if len(_performance_history[operation_name]) > 100:
-        _performance_history[operation_name] = _performance_history[operation_name][-100:]
-
-def _get_current_timestamp():
-    """Get current timestamp for performance tracking."""
-    import time
-    return time.time()
-
-def _detect_performance_regression(operation_name, metrics):
-    """Detect performance regression by comparing with historical data.
-    
-    Args:
-        operation_name: Name of the operation
-        metrics: PerformanceMetrics provider
-    
-    Returns:
-        List of regression warnings
-    """
-    warnings = []
-    
-    if operation_name not in _performance_history:
-        return warnings
-    
-    history = _performance_history[operation_name]
-    if len(history) < 5:  # Need at least 5 data points for trend analysis
-        return warnings
-    
-    # Calculate average performance from recent history
-    recent_history = history[-10:]  # Last 10 entries
-    avg_analysis_time = sum(h["analysis_time_ms"] for h in recent_history) / len(recent_history)
-    avg_action_time = sum(h["action_time_ms"] for h in recent_history) / len(recent_history)
-    avg_memory_usage = sum(h["memory_usage_mb"] for h in recent_history) / len(recent_history)
-    
-    # Check for regressions (20% degradation threshold)
-    if metrics.analysis_time_ms > avg_analysis_time * 1.2:
-        warnings.append("Analysis time regression: {}ms vs {}ms average".format(
-            metrics.analysis_time_ms, avg_analysis_time))
-    
-    if metrics.action_time_ms > avg_action_time * 1.2:
-        warnings.append("Action time regression: {}ms vs {}ms average".format(
-            metrics.action_time_ms, avg_action_time))
-    
-    if metrics.memory_usage_mb > avg_memory_usage * 1.2:
-        warnings.append("Memory usage regression: {}MB vs {}MB average".format(
-            metrics.memory_usage_mb, avg_memory_usage))
-    
-    return warnings
-
 def _check_performance_thresholds(metrics):
     """Check if performance metrics meet defined thresholds.
     
@@ -153,29 +79,11 @@ def _generate_performance_report(operation_name, metrics, include_history = True
     else:
         report_lines.append("## Threshold Status: All thresholds met\n")
     
-    # Check for regressions
-    regression_warnings = _detect_performance_regression(operation_name, metrics)
-    if regression_warnings:
-        report_lines.extend([
-            "## Performance Regressions",
-        ] + regression_warnings + [""])
-    else:
-        report_lines.append("## Regression Status: No regressions detected\n")
-    
-    # Include historical data if requested
-    if include_history and operation_name in _performance_history:
-        history = _performance_history[operation_name]
-        if history:
-            report_lines.extend([
-                "## Historical Data (Last 10 entries)",
-                "Average Analysis Time: {}ms".format(
-                    sum(h["analysis_time_ms"] for h in history[-10:]) / min(10, len(history))),
-                "Average Action Time: {}ms".format(
-                    sum(h["action_time_ms"] for h in history[-10:]) / min(10, len(history))),
-                "Average Memory Usage: {}MB".format(
-                    sum(h["memory_usage_mb"] for h in history[-10:]) / min(10, len(history))),
-                "",
-            ])
+    # History and regressions are tracked across builds outside Starlark
+    if include_history:
+        report_lines.append(
+            "## Regression Status: compare builds with scripts/weaver_action_analytics.py --baseline\n",
+        )
     
     return "\n".join(report_lines)
 
@@ -191,9 +99,6 @@ def _create_performance_monitoring_action(ctx, operation_name, metrics, output_f
     Returns:
         None
     """
-    # Record metrics for trend analysis
-    _record_performance_metrics(operation_name, metrics)
-    
     # Generate comprehensive report
     report_content = _generate_performance_report(operation_name, metrics)
     
@@ -203,43 +108,9 @@ def _create_performance_monitoring_action(ctx, operation_name, metrics, output_f
         content = report_content,
     )
 
-def _get_performance_summary():
-    """Get a summary of all recorded performance data.
-    
-    Returns:
-        Performance summary string
-    """
-    if not _performance_history:
-        return "No performance data recorded"
-    
-    summary_lines = ["# Performance Summary", ""]
-    
-    for operation_name, history in _performance_history.items():
-        if not history:
-            continue
-        
-        recent = history[-10:]  # Last 10 entries
-        avg_analysis = sum(h["analysis_time_ms"] for h in recent) / len(recent)
-        avg_action = sum(h["action_time_ms"] for h in recent) / len(recent)
-        avg_memory = sum(h["memory_usage_mb"] for h in recent) / len(recent)
-        
-        summary_lines.extend([
-            "## {}".format(operation_name),
-            "Average Analysis Time: {:.1f}ms".format(avg_analysis),
-            "Average Action Time: {:.1f}ms".format(avg_action),
-            "Average Memory Usage: {:.1f}MB".format(avg_memory),
-            "Data Points: {}".format(len(history)),
-            "",
-        ])
-    
-    return "\n".join(summary_lines)
-
 # Export monitoring utilities
 monitoring_utils = struct(
-    record_performance_metrics = _record_performance_metrics,
-    detect_performance_regression = _detect_performance_regression,
     check_performance_thresholds = _check_performance_thresholds,
     generate_performance_report = _generate_performance_report,
     create_performance_monitoring_action = _create_performance_monitoring_action,
-    get_performance_summary = _get_performance_summary,
 ) 
\ No newline at end of file
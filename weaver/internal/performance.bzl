@@ -6,29 +6,88 @@ including caching, parallel processing, and memory management.
 """
 
 load("@bazel_skylib//lib:paths.bzl", "paths")
+load("//weaver/internal:utils.bzl", "dependency_utils")
 
-def create_performance_metrics(ctx, start_time, file_count, registry_count):
-    """Create performance metrics for Weaver operations."""
+# Automatic sharding targets this many registry files per shard
+_AUTO_SHARD_FILES = 200
+
+# Upper bound on the number of shards chosen automatically
+_AUTO_SHARD_MAX = 16
+
+def create_performance_metrics(ctx, metrics_files, file_count, registry_count):
+    """Create performance metrics for Weaver operations.
+    
+    Nothing is estimated during analysis. Wall time, CPU time and peak RSS
+    are measured by the action wrapper at execution time and written to the
+    JSON sidecars in `metrics_files` (see `enable_performance_metrics`).
+    
+    Args:
+        ctx: The rule context
+        metrics_files: Performance metrics sidecar files of the target's actions
+        file_count: Number of input files
+        registry_count: Number of registry files
+    
+    Returns:
+        Dictionary of analysis-time counts and the measured metrics files
+    """
     return {
-        "analysis_time_ms": start_time * 1000,
         "file_count": file_count,
         "registry_count": registry_count,
-        "cache_hit_rate": 0.95,
-        "memory_usage_mb": 25,
-        "parallel_processing": True,
+        "metrics_files": metrics_files,
     }
 
 def optimize_for_large_registries(ctx, registries, max_parallel = 4):
-    """Optimize processing for large registries with parallel processing."""
-    if len(registries) > max_parallel:
-        # Split registries into chunks for parallel processing
-        chunk_size = (len(registries) + max_parallel - 1) // max_parallel
-        chunks = []
-        for i in range(0, len(registries), chunk_size):
-            chunks.append(registries[i:i + chunk_size])
-        return chunks
-    else:
+    """Split registries into shards that can be processed by independent actions.
+    
+    Registry files are grouped with `group_related_schemas`, and whole groups
+    are assigned to at most `max_parallel` shards, largest group first onto
+    the least loaded shard. Groups are never split, so schemas that refer to
+    each other through their directory layout stay in one shard.
+    
+    Args:
+        ctx: The rule context
+        registries: List of registry file artifacts
+        max_parallel: Maximum number of shards
+    
+    Returns:
+        List of shards, each a non-empty list of registry files
+    """
+    schema_groups = dependency_utils.group_related_schemas(registries)
+    if max_parallel <= 1 or len(schema_groups) <= 1:
         return [registries]
+    
+    # Largest groups first; ties broken by name so sharding is deterministic
+    ordered = sorted(
+        schema_groups.items(),
+        key = lambda item: (-len(item[1]), item[0]),
+    )
+    shards = [[] for _ in range(min(max_parallel, len(schema_groups)))]
+    for _, group_files in ordered:
+        lightest = 0
+        for index in range(1, len(shards)):
+            if len(shards[index]) < len(shards[lightest]):
+                lightest = index
+        shards[lightest].extend(group_files)
+    
+    return [shard for shard in shards if shard]
+
+def shard_registries(ctx, registries, shard_count):
+    """Shard registries for a rule's `registry_shards` setting.
+    
+    Args:
+        ctx: The rule context
+        registries: List of registry file artifacts
+        shard_count: Requested shard count; 1 disables sharding and 0 picks
+            one shard per 200 registry files, up to 16 shards
+    
+    Returns:
+        List of shards, each a non-empty list of registry files
+    """
+    if shard_count < 0:
+        fail("registry_shards must be 0 (automatic) or a positive shard count, got {}".format(shard_count))
+    if shard_count == 0:
+        shard_count = min(_AUTO_SHARD_MAX, (len(registries) + _AUTO_SHARD_FILES - 1) // _AUTO_SHARD_FILES)
+    return optimize_for_large_registries(ctx, registries, max_parallel = shard_count)
 
 def create_caching_strategy(ctx, registries):
     """Create caching strategy for registry processing."""
@@ -46,106 +105,65 @@ def create_caching_strategy(ctx, registries):
         "cache_enabled": True,
     }
 
-def get_optimized_execution_requirements(ctx, registry_count):
-    """Get optimized execution requirements based on registry count."""
-    base_requirements = {
-        "no-sandbox": "1",
-        "no-cache": "0",
-        "supports-workers": "1",
-        "requires-network": "0",
-    }
-    
-    if registry_count > 10:
-        # Large registry optimizations
-        base_requirements.update({
-            "cpu": "4",
-            "memory": "8g",
-            "disk": "10g",
-        })
-    elif registry_count > 5:
-        # Medium registry optimizations
-        base_requirements.update({
-            "cpu": "2",
-            "memory": "4g",
-            "disk": "5g",
-        })
-    
-    return base_requirements
+# Registry size classes by file count: a registry with at least `min_files`
+# files and fewer than the next class's falls into the class
+_MEDIUM_REGISTRY_FILES = 200
+_LARGE_REGISTRY_FILES = 2000
 
-def create_parallel_processing_script(ctx, registries, weaver_binary, command, args, output_dir):
-    """Create a script for parallel processing of registries."""
-    script_content = """#!/bin/bash
-set -e
+# Execution group of actions over large registries. Give it its own
+# exec_properties, e.g. `exec_properties = {"weaver_large.Pool": "highmem"}`
+# on the target or the execution platform, to route them to a bigger pool.
+WEAVER_LARGE_EXEC_GROUP = "weaver_large"
 
-# Parallel processing script for Weaver
-MAX_PARALLEL=4
-REGISTRIES=({registries})
-WEAVER_BINARY="{weaver_binary}"
-COMMAND="{command}"
-ARGS="{args}"
-OUTPUT_DIR="{output_dir}"
+def _small_registry_resources(os, inputs_size):
+    """Local resources of Weaver actions over small registries."""
+    return {"cpu": 1, "memory": 512}
 
-# Function to process a single registry
-process_registry() {{
-    local registry="$1"
-    echo "Processing registry: $registry"
-    "$WEAVER_BINARY" registry "$COMMAND" "$registry" "$OUTPUT_DIR" $ARGS
-}}
+def _medium_registry_resources(os, inputs_size):
+    """Local resources of Weaver actions over medium registries."""
+    return {"cpu": 2, "memory": 2048}
 
-# Process registries in parallel
-for registry in "${{REGISTRIES[@]}}"; do
-    process_registry "$registry" &
-    
-    # Limit parallel processes
-    if [[ $(jobs -r -p | wc -l) -ge $MAX_PARALLEL ]]; then
-        wait -n
-    fi
-done
+def _large_registry_resources(os, inputs_size):
+    """Local resources of Weaver actions over large registries."""
+    return {"cpu": 4, "memory": 8192}
 
-# Wait for all processes to complete
-wait
+# Scheduling properties per size class: `resource_set` callbacks reserve
+# local CPU and memory (MB) for the action, and `exec_group` selects the
+# remote execution group
+REGISTRY_SIZE_CLASSES = {
+    "small": struct(
+        min_files = 0,
+        resource_set = _small_registry_resources,
+        exec_group = None,
+    ),
+    "medium": struct(
+        min_files = _MEDIUM_REGISTRY_FILES,
+        resource_set = _medium_registry_resources,
+        exec_group = None,
+    ),
+    "large": struct(
+        min_files = _LARGE_REGISTRY_FILES,
+        resource_set = _large_registry_resources,
+        exec_group = WEAVER_LARGE_EXEC_GROUP,
+    ),
+}
 
-echo "All registries processed successfully"
-""".format(
-        registries = " ".join([f.path for f in registries]),
-        weaver_binary = weaver_binary.path,
-        command = command,
-        args = " ".join(args),
-        output_dir = output_dir,
-    )
-    
-    script_file = ctx.actions.declare_file(ctx.label.name + "_parallel_script.sh")
-    ctx.actions.write(
-        output = script_file,
-        content = script_content,
-        is_executable = True,
-    )
+def registry_size_class(file_count, size_hint = "auto"):
+    """Classify a registry for action scheduling.
     
-    return script_file
-
-def optimize_memory_usage(ctx, registries):
-    """Optimize memory usage for large registry processing."""
-    total_size = 0
-    for registry in registries:
-        if hasattr(registry, "size"):
-            total_size += registry.size
+    Args:
+        file_count: Number of registry files staged by the action
+        size_hint: Declared size class, or "auto" to classify by file count
     
-    # Calculate optimal memory allocation
-    if total_size > 100 * 1024 * 1024:  # > 100MB
-        return {
-            "memory_limit": "4g",
-            "gc_optimization": True,
-            "streaming_processing": True,
-        }
-    elif total_size > 50 * 1024 * 1024:  # > 50MB
-        return {
-            "memory_limit": "2g",
-            "gc_optimization": True,
-            "streaming_processing": False,
-        }
-    else:
-        return {
-            "memory_limit": "1g",
-            "gc_optimization": False,
-            "streaming_processing": False,
-        } 
\ No newline at end of file
+    Returns:
+        "small", "medium" or "large"
+    """
+    if size_hint != "auto":
+        if size_hint not in REGISTRY_SIZE_CLASSES:
+            fail("size_hint must be auto, small, medium or large, got {}".format(size_hint))
+        return size_hint
+    if file_count >= _LARGE_REGISTRY_FILES:
+        return "large"
+    if file_count >= _MEDIUM_REGISTRY_FILES:
+        return "medium"
+    return "small"
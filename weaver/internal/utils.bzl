@@ -12,18 +12,66 @@ load("//weaver:platform_constraints.bzl", "get_execution_requirements")
 _content_hash_cache = {}
 
 def _compute_content_hash(file_artifact):
-    """Compute a content hash for efficient change detection.
+    """Compute an identity hash for a file artifact.
+    
+    File contents cannot be read during analysis, so this hash only
+    identifies the artifact by path. Content changes are detected by the
+    digest manifests produced by `create_digest_actions`.
     
     Args:
         file_artifact: File artifact to hash
     
     Returns:
-        Content hash string
+        Identity hash string
     """
-    # Use file path and modification time as a simple hash
-    # In a real implementation, this would compute an actual content hash
     return str(hash(file_artifact.path + str(file_artifact.short_path)))
 
+def _create_digest_actions(ctx, schema_files, digest_tool = None, name = None):
+    """Create one content digest action per schema group.
+    
+    Each action streams the files of one group (see `group_related_schemas`)
+    through the schema digest tool and writes a compact JSON manifest of
+    normalized SHA-256 digests. Reformat-only edits, such as comment or
+    whitespace changes, leave the manifest byte-identical, so actions that
+    key on the manifests instead of the raw files are not re-run.
+    
+    Args:
+        ctx: The rule context
+        schema_files: List of schema file artifacts
+        digest_tool: Digest tool executable (defaults to ctx.executable._schema_digest)
+        name: Base name of the manifest directory (defaults to the target name)
+    
+    Returns:
+        List of digest manifest files, one per schema group
+    """
+    if not digest_tool:
+        digest_tool = ctx.executable._schema_digest
+    
+    schema_groups = _group_related_schemas(schema_files)
+    manifests = []
+    for index, group_name in enumerate(sorted(schema_groups.keys())):
+        group_files = schema_groups[group_name]
+        manifest = ctx.actions.declare_file("{}_digests/group_{}.json".format(name or ctx.label.name, index))
+        
+        args = ctx.actions.args()
+        args.use_param_file("@%s", use_always = True)
+        args.set_param_file_format("multiline")
+        args.add("--output", manifest)
+        args.add_all(group_files)
+        
+        ctx.actions.run(
+            inputs = group_files,
+            outputs = [manifest],
+            executable = digest_tool,
+            arguments = [args],
+            mnemonic = "WeaverDigest",
+            progress_message = "Computing content digests for {} schemas in {}".format(len(group_files), group_name or "."),
+            execution_requirements = get_execution_requirements(),
+        )
+        manifests.append(manifest)
+    
+    return manifests
+
 def _get_cached_content_hash(file_artifact):
     """Get cached content hash if available."""
     return _content_hash_cache.get(file_artifact.path)
@@ -35,60 +83,146 @@ def _cache_content_hash(file_artifact, content_hash):
 def _extract_schema_dependencies(ctx, schema_file):
     """Extract dependencies from schema files.
     
+    Schema content cannot be read during analysis. The `imports`, `extends`
+    and `ref` edges of a schema are extracted at execution time by the
+    dependency index action (see `create_dependency_index_action`), so no
+    dependencies are known here.
+    
     Args:
         ctx: The rule context
         schema_file: Schema file artifact
     
     Returns:
-        List of dependency file paths
+        Empty list of dependency file paths
     """
-    # This is a simplified implementation
-    # In practice, this would parse the schema content and extract imports/references
-    dependencies = []
+    return []
+
+def _create_dependency_index_action(ctx, schema_files, scanner = None):
+    """Create an action that scans schema files into a dependency index.
+    
+    The index records, per schema file, the ids it defines and the ids it
+    references through `imports`, `extends` and `ref`. Indexes of several
+    targets are merged to resolve references into file edges and compute the
+    transitive closure of the schemas an entry point actually uses.
+    
+    Args:
+        ctx: The rule context
+        schema_files: List of schema file artifacts
+        scanner: Scanner executable (defaults to ctx.executable._schema_deps)
     
-    # For now, return empty list - this would be implemented with actual schema parsing
-    return dependencies
+    Returns:
+        Dependency index file
+    """
+    if not scanner:
+        scanner = ctx.executable._schema_deps
+    
+    index = ctx.actions.declare_file(ctx.label.name + "_dependency_index.json")
+    
+    args = ctx.actions.args()
+    args.use_param_file("@%s", use_always = True)
+    args.set_param_file_format("multiline")
+    args.add("scan")
+    args.add("--output", index)
+    args.add_all(schema_files)
+    
+    ctx.actions.run(
+        inputs = schema_files,
+        outputs = [index],
+        executable = scanner,
+        arguments = [args],
+        mnemonic = "WeaverSchemaDeps",
+        progress_message = "Scanning {} schemas for references".format(len(schema_files)),
+        execution_requirements = get_execution_requirements(),
+    )
+    
+    return index
 
-def _build_transitive_dependency_graph(dependency_graph, transitive_deps):
-    """Build complete transitive dependency graph.
+def _build_transitive_dependency_graph(label, dependency_graph, dependency_infos, schema_files = [], dependency_index = None):
+    """Build the transitive dependency graph of a target from depsets.
+    
+    Only the target's own edges are materialized; everything transitive is a
+    depset over the dependencies' depsets, so each target adds work and
+    memory proportional to its direct edges and files. The transitive closure
+    of schema files is never computed during analysis; see
+    `create_dependency_closure_action`.
     
     Args:
-        dependency_graph: Direct dependency graph
-        transitive_deps: List of transitive dependency providers
+        label: Label string of the target
+        dependency_graph: Direct edges of the target, {label: [dependency labels]}
+        dependency_infos: WeaverDependencyInfo providers of the direct dependencies
+        schema_files: Schema file artifacts of the target
+        dependency_index: Dependency index file of the target, if any
     
     Returns:
-        Complete dependency graph with transitive dependencies
+        Struct of transitive_dependencies, transitive_edges,
+        transitive_schema_files and transitive_dependency_indexes depsets
     """
-    complete_graph = dependency_graph.copy()
+    direct_labels = dependency_graph.get(label, [])
+    
+    return struct(
+        transitive_dependencies = depset(
+            direct_labels,
+            transitive = [info.transitive_dependencies for info in dependency_infos],
+        ),
+        transitive_edges = depset(
+            [(label, dep_label) for dep_label in direct_labels],
+            transitive = [info.transitive_edges for info in dependency_infos],
+        ),
+        transitive_schema_files = depset(
+            schema_files,
+            transitive = [info.transitive_schema_files for info in dependency_infos],
+        ),
+        transitive_dependency_indexes = depset(
+            [dependency_index] if dependency_index else [],
+            transitive = [info.transitive_dependency_indexes for info in dependency_infos],
+        ),
+    )
+
+def _create_dependency_closure_action(ctx, name, dependency_indexes, entry_points, scanner):
+    """Create an action computing the transitive closure of entry point schemas.
     
-    # Add transitive dependencies to the graph
-    for dep_provider in transitive_deps:
-        if hasattr(dep_provider, "dependency_graph"):
-            complete_graph.update(dep_provider.dependency_graph)
+    The indexes are passed as a depset and only expanded at execution time,
+    so the closure costs nothing during analysis and is only computed when
+    its output is requested.
     
-    # Compute transitive closure for each node
-    for node_path, node_data in complete_graph.items():
-        transitive_deps = set()
-        visited = set()
-        
-        def _compute_transitive_closure(current_path):
-            if current_path in visited:
-                return
-            visited.add(current_path)
-            
-            if current_path in complete_graph:
-                for dep in complete_graph[current_path].get("direct_dependencies", []):
-                    transitive_deps.add(dep)
-                    _compute_transitive_closure(dep)
-        
-        _compute_transitive_closure(node_path)
-        node_data["transitive_dependencies"] = list(transitive_deps)
+    Args:
+        ctx: The rule or aspect context
+        name: Base name of the closure file
+        dependency_indexes: Depset of dependency index files
+        entry_points: Schema file artifacts to start from
+        scanner: Scanner executable (see //weaver/tools:schema_deps)
     
-    return complete_graph
+    Returns:
+        Closure file listing one schema file path per line
+    """
+    closure = ctx.actions.declare_file(name + "_dependency_closure.txt")
+    
+    args = ctx.actions.args()
+    args.use_param_file("@%s", use_always = True)
+    args.set_param_file_format("multiline")
+    args.add("closure")
+    args.add("--output", closure)
+    args.add_all(dependency_indexes, before_each = "--index")
+    args.add_all(entry_points, before_each = "--entry-point")
+    
+    ctx.actions.run(
+        inputs = dependency_indexes,
+        outputs = [closure],
+        executable = scanner,
+        arguments = [args],
+        mnemonic = "WeaverSchemaClosure",
+        progress_message = "Computing schema dependency closure for {}".format(name),
+        execution_requirements = get_execution_requirements(),
+    )
+    
+    return closure
 
 def _detect_circular_dependencies(dependency_graph):
     """Detect circular dependencies in the dependency graph.
     
+    Starlark has no recursion, so the depth-first search keeps its path on
+    an explicit stack.
+    
     Args:
         dependency_graph: Complete dependency graph
     
@@ -96,40 +230,49 @@ def _detect_circular_dependencies(dependency_graph):
         List of circular dependency cycles
     """
     circular_deps = []
-    visited = set()
-    recursion_stack = set()
-    
-    def _dfs_detect_cycles(node_path, path):
-        if node_path in recursion_stack:
-            # Found a cycle
-            cycle_start = path.index(node_path)
-            cycle = path[cycle_start:] + [node_path]
-            circular_deps.append(cycle)
-            return
-        
-        if node_path in visited:
-            return
+    visited = {}
+    edge_count = 0
+    for node in dependency_graph.values():
+        edge_count += len(node.get("direct_dependencies", []))
+    
+    for start in dependency_graph:
+        if start in visited:
+            continue
+        visited[start] = True
+        path = [start]
+        next_dependency = [0]
+        on_path = {start: True}
         
-        visited.add(node_path)
-        recursion_stack.add(node_path)
-        
-        if node_path in dependency_graph:
-            for dep in dependency_graph[node_path].get("direct_dependencies", []):
-                _dfs_detect_cycles(dep, path + [node_path])
-        
-        recursion_stack.remove(node_path)
-    
-    for node_path in dependency_graph:
-        if node_path not in visited:
-            _dfs_detect_cycles(node_path, [])
+        # Every node is pushed and popped and every edge followed at most once
+        for _ in range(3 * (len(dependency_graph) + edge_count) + 1):
+            if not path:
+                break
+            node_path = path[-1]
+            deps = dependency_graph[node_path].get("direct_dependencies", []) if node_path in dependency_graph else []
+            if next_dependency[-1] >= len(deps):
+                path.pop()
+                next_dependency.pop()
+                on_path.pop(node_path)
+                continue
+            dep = deps[next_dependency[-1]]
+            next_dependency[-1] += 1
+            if dep in on_path:
+                # Found a cycle
+                circular_deps.append(path[path.index(dep):] + [dep])
+            elif dep not in visited:
+                visited[dep] = True
+                path.append(dep)
+                next_dependency.append(0)
+                on_path[dep] = True
     
     return circular_deps
 
-def _create_change_detection_data(schema_files):
+def _create_change_detection_data(schema_files, digest_manifests = []):
     """Create optimized change detection data for schema files.
     
     Args:
         schema_files: List of schema file artifacts
+        digest_manifests: Digest manifests from `create_digest_actions`
     
     Returns:
         Change detection data structure
@@ -138,6 +281,7 @@ def _create_change_detection_data(schema_files):
         "content_hashes": {},
         "file_metadata": {},
         "dependency_hashes": {},
+        "digest_manifests": digest_manifests,
     }
     
     for schema_file in schema_files:
@@ -190,7 +334,10 @@ def _extract_group_dependencies(ctx, group_files):
     return list(set(group_deps))  # Remove duplicates
 
 def _compute_group_content_hash(group_files):
-    """Compute content hash for a group of files.
+    """Compute an identity hash for a group of files.
+    
+    Like `compute_content_hash`, this only identifies the group by its file
+    paths; `create_digest_actions` produces the group's content digest.
     
     Args:
         group_files: List of file artifacts in the group
@@ -233,13 +380,14 @@ def _create_group_change_detection_data(schema_groups):
     
     return group_change_data
 
-def _create_optimized_change_detection_data(ctx, all_files, target_label):
+def _create_optimized_change_detection_data(ctx, all_files, target_label, digest_manifests = []):
     """Create optimized change detection data for a target.
     
     Args:
         ctx: The rule context
         all_files: List of all file artifacts
         target_label: Target label
+        digest_manifests: Digest manifests from `create_digest_actions`
     
     Returns:
         Optimized change detection data
@@ -251,6 +399,7 @@ def _create_optimized_change_detection_data(ctx, all_files, target_label):
             "file_count": len(all_files),
         },
         "dependency_hashes": {},
+        "digest_manifests": digest_manifests,
         "incremental_build_data": {},
     }
     
@@ -271,8 +420,11 @@ def _create_optimized_change_detection_data(ctx, all_files, target_label):
 # Public API for dependency utilities
 dependency_utils = struct(
     compute_content_hash = _compute_content_hash,
+    create_digest_actions = _create_digest_actions,
     extract_schema_dependencies = _extract_schema_dependencies,
+    create_dependency_index_action = _create_dependency_index_action,
     build_transitive_dependency_graph = _build_transitive_dependency_graph,
+    create_dependency_closure_action = _create_dependency_closure_action,
     detect_circular_dependencies = _detect_circular_dependencies,
     create_change_detection_data = _create_change_detection_data,
     group_related_schemas = _group_related_schemas,
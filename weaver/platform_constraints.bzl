@@ -66,95 +66,17 @@ PLATFORM_ENV_VARS = {
     },
 }
 
-# Execution requirements for remote execution optimization
-REMOTE_EXECUTION_REQUIREMENTS = {
-    "no-sandbox": "1",           # Allow remote execution
-    "no-cache": "0",             # Allow caching for performance
-    "requires-network": "0",     # No network access required
-    "cpu-cores": "4",            # Request 4 CPU cores for parallel processing
-    "memory": "8g",              # Request 8GB memory for large schemas
-    "timeout": "300s",           # 5 minute timeout
-    "cache-remote": "1",         # Enable remote caching
-    "cache-local": "1",          # Enable local caching
-    "supports-multiplex-sandboxing": "1",  # Support multiplex sandboxing
-}
+# Execution requirements of Weaver actions. Actions stay sandboxed and
+# cacheable locally and remotely: Bazel honors tags such as `no-sandbox`,
+# `no-cache` and `requires-network` by their presence, whatever their value,
+# so none are set. Resources are reserved per action from the registry size
+# (see REGISTRY_SIZE_CLASSES in //weaver/internal:performance.bzl).
+REMOTE_EXECUTION_REQUIREMENTS = {}
 
 # Platform-specific execution requirements
 PLATFORM_EXECUTION_REQUIREMENTS = {
-    "linux-x86_64": {
-        "no-sandbox": "1",
-        "no-cache": "0",
-        "requires-network": "0",
-        "cpu-cores": "4",
-        "memory": "8g",
-        "timeout": "300s",
-        "cache-remote": "1",
-        "cache-local": "1",
-        "supports-multiplex-sandboxing": "1",
-        "platform": "linux-x86_64",
-    },
-    "linux-aarch64": {
-        "no-sandbox": "1",
-        "no-cache": "0",
-        "requires-network": "0",
-        "cpu-cores": "4",
-        "memory": "8g",
-        "timeout": "300s",
-        "cache-remote": "1",
-        "cache-local": "1",
-        "supports-multiplex-sandboxing": "1",
-        "platform": "linux-aarch64",
-    },
-    "darwin-x86_64": {
-        "no-sandbox": "1",
-        "no-cache": "0",
-        "requires-network": "0",
-        "cpu-cores": "4",
-        "memory": "8g",
-        "timeout": "300s",
-        "cache-remote": "1",
-        "cache-local": "1",
-        "supports-multiplex-sandboxing": "1",
-        "platform": "darwin-x86_64",
-    },
-    "darwin-aarch64": {
-        "no-sandbox": "1",
-        "no-cache": "0",
-        "requires-network": "0",
-        "cpu-cores": "4",
-        "memory": "8g",
-        "timeout": "300s",
-        "cache-remote": "1",
-        "cache-local": "1",
-        "supports-multiplex-sandboxing": "1",
-        "platform": "darwin-aarch64",
-    },
-    "windows-x86_64": {
-        "no-sandbox": "1",
-        "no-cache": "0",
-        "requires-network": "0",
-        "cpu-cores": "4",
-        "memory": "8g",
-        "timeout": "300s",
-        "cache-remote": "1",
-        "cache-local": "1",
-        "supports-multiplex-sandboxing": "1",
-        "platform": "windows-x86_64",
-        "windows-compatible": "1",  # Windows-specific flag
-    },
-    "windows-aarch64": {
-        "no-sandbox": "1",
-        "no-cache": "0",
-        "requires-network": "0",
-        "cpu-cores": "4",
-        "memory": "8g",
-        "timeout": "300s",
-        "cache-remote": "1",
-        "cache-local": "1",
-        "supports-multiplex-sandboxing": "1",
-        "platform": "windows-aarch64",
-        "windows-compatible": "1",  # Windows-specific flag
-    },
+    platform: REMOTE_EXECUTION_REQUIREMENTS
+    for platform in PLATFORM_CONSTRAINTS
 }
 
 def get_platform_constraint(platform):
@@ -185,7 +107,10 @@ def get_platform_env_vars(platform):
     return PLATFORM_ENV_VARS.get(os_name, {})
 
 def get_execution_requirements(platform = None):
-    """Get execution requirements for remote execution optimization."""
+    """Get execution requirements for sandboxed, cacheable Weaver actions.
+    
+    Callers copy the result before adding requirements of their own.
+    """
     if platform and platform in PLATFORM_EXECUTION_REQUIREMENTS:
         return PLATFORM_EXECUTION_REQUIREMENTS[platform]
     return REMOTE_EXECUTION_REQUIREMENTS
@@ -8,19 +8,39 @@ information between rules and to external consumers.
 WeaverSchemaInfo = provider(
     doc = "Information about Weaver schema files",
     fields = {
-        "schema_files": "List of schema file artifacts",
+        "schema_files": "Depset of this target's schema file artifacts",
+        "transitive_schema_files": "Depset of schema file artifacts of this target and its dependencies",
         "schema_content": "Parsed schema content for validation",
         "dependencies": "Transitive schema dependencies",
         "metadata": "Additional schema metadata",
+        "dependency_index": "Dependency index file of the ids defined and referenced by the schema files",
+        "transitive_dependency_indexes": "Depset of dependency index files of this target and its dependencies",
+        "snapshot": "Resolved registry file written by weaver_registry_snapshot, or None for raw schema sources",
+    },
+)
+
+WeaverDependencyInfo = provider(
+    doc = "Dependency tracking information collected by the Weaver aspects",
+    fields = {
+        "direct_dependencies": "List of labels of the target's direct schema dependencies",
+        "transitive_dependencies": "Depset of labels of all transitive schema dependencies",
+        "dependency_graph": "Direct edges of this target only, as a dict from label to a list of dependency labels",
+        "transitive_edges": "Depset of (label, dependency label) edges of this target and its dependencies",
+        "transitive_schema_files": "Depset of schema files of this target and its dependencies",
+        "transitive_dependency_indexes": "Depset of dependency index files of this target and its dependencies",
+        "dependency_closure": "File listing the schema files transitively referenced from this target's schemas, built on request",
+        "circular_dependencies": "List of circular dependency cycles",
+        "content_hashes": "Identity hashes of this target's schema files",
+        "change_detection_data": "Change detection data for this target's schema files",
     },
 )
 
 WeaverGeneratedInfo = provider(
     doc = "Information about Weaver-generated files",
     fields = {
-        "generated_files": "List of generated file artifacts",
+        "generated_files": "List of generated file artifacts (a single tree artifact holding the output directory)",
         "output_dir": "Output directory path",
-        "source_registries": "Source semantic convention registries",
+        "source_registries": "Depset of source semantic convention registry files",
         "generation_args": "Arguments used for generation",
     },
 )
@@ -29,8 +49,8 @@ WeaverValidationInfo = provider(
     doc = "Information about Weaver validation results",
     fields = {
         "validation_output": "Validation result file artifact",
-        "validated_registries": "List of validated registry files",
-        "applied_policies": "List of applied policy files",
+        "validated_registries": "Depset of validated registry files",
+        "applied_policies": "Depset of applied policy files",
         "validation_args": "Arguments used for validation",
         "success": "Whether validation was successful",
     },
@@ -39,9 +59,9 @@ WeaverValidationInfo = provider(
 WeaverDocsInfo = provider(
     doc = "Information about Weaver-generated documentation",
     fields = {
-        "documentation_files": "List of generated documentation file artifacts",
+        "documentation_files": "List of generated documentation file artifacts (a single tree artifact holding the output directory)",
         "output_dir": "Output directory path",
-        "source_schemas": "Source schema files",
+        "source_schemas": "Depset of source schema files",
         "documentation_format": "Format of generated documentation",
         "documentation_args": "Arguments used for documentation generation",
     },
@@ -50,9 +70,9 @@ WeaverDocsInfo = provider(
 WeaverLibraryInfo = provider(
     doc = "Information about Weaver-generated libraries",
     fields = {
-        "library_files": "List of generated library file artifacts",
+        "library_files": "List of generated library file artifacts (a single tree artifact holding the output directory)",
         "output_dir": "Output directory path",
-        "source_schemas": "Source schema files",
+        "source_schemas": "Depset of source schema files",
         "library_format": "Format of generated library",
         "library_args": "Arguments used for library generation",
     },
@@ -56,6 +56,31 @@ def _detect_platform(repository_ctx):
     else:
         fail("Unsupported operating system: {}".format(os_name))
 
+# Rust target triples used in Weaver release archive names
+_WEAVER_TARGET_TRIPLES = {
+    "linux-x86_64": "x86_64-unknown-linux-gnu",
+    "linux-aarch64": "aarch64-unknown-linux-gnu",  # Note: May not be available in all releases
+    "darwin-x86_64": "x86_64-apple-darwin",
+    "darwin-aarch64": "aarch64-apple-darwin",
+    "windows-x86_64": "x86_64-pc-windows-msvc",
+    "windows-aarch64": "aarch64-pc-windows-msvc",  # Note: May not be available in all releases
+}
+
+# Binary names looked up in extracted archives, in order of preference
+_WEAVER_BINARY_NAMES = ["weaver", "opentelemetry-weaver", "otlp-weaver"]
+
+# File suffixes that never name the Weaver binary
+_NON_BINARY_SUFFIXES = [".tar.xz", ".tar.gz", ".tgz", ".zip", ".sha256", ".txt", ".json", ".md"]
+
+# Directory levels indexed when looking up the binary
+_MAX_INDEX_DEPTH = 3
+
+# Lockfile written by scripts/weaver_mirror.py at the mirror root
+_MIRROR_LOCKFILE = "weaver.lock.json"
+
+# Archive types recognized from URL suffixes
+_ARCHIVE_TYPES = ["tar.xz", "tar.gz", "tgz", "zip"]
+
 def _get_download_urls(version, platform, urls = None):
     """Get download URLs for the specified version and platform with multi-platform optimization."""
     if urls:
@@ -65,17 +90,7 @@ def _get_download_urls(version, platform, urls = None):
     # Based on actual Weaver release structure from GitHub API
     base_url = "https://github.com/open-telemetry/weaver/releases/download"
     
-    # Map platform to actual Weaver binary names from releases
-    platform_map = {
-        "linux-x86_64": "x86_64-unknown-linux-gnu",
-        "linux-aarch64": "aarch64-unknown-linux-gnu",  # Note: May not be available in all releases
-        "darwin-x86_64": "x86_64-apple-darwin",
-        "darwin-aarch64": "aarch64-apple-darwin",
-        "windows-x86_64": "x86_64-pc-windows-msvc",
-        "windows-aarch64": "aarch64-pc-windows-msvc",  # Note: May not be available in all releases
-    }
-    
-    binary_suffix = platform_map.get(platform)
+    binary_suffix = _WEAVER_TARGET_TRIPLES.get(platform)
     if not binary_suffix:
         fail("Unsupported platform: {}".format(platform))
     
@@ -94,120 +109,140 @@ def _get_download_urls(version, platform, urls = None):
             ),
         ]
 
+def _get_strip_prefix(platform, strip_prefix = None, urls = None):
+    """Get the archive directory to strip during extraction.
+    
+    Release archives contain a single `weaver-<target triple>` directory.
+    Archives from custom URLs are extracted as-is unless a prefix is given.
+    """
+    if strip_prefix != None:
+        return strip_prefix
+    if urls:
+        return ""
+    return "weaver-" + _WEAVER_TARGET_TRIPLES[platform]
+
+def _get_mirror(repository_ctx):
+    """Get the mirror URL from the `mirror` attribute or `WEAVER_MIRROR`.
+    
+    Absolute paths are turned into `file://` URLs.
+    """
+    mirror = repository_ctx.attr.mirror or repository_ctx.os.environ.get("WEAVER_MIRROR", "")
+    if mirror.startswith("/"):
+        mirror = "file://" + mirror
+    return mirror.rstrip("/")
+
+def _read_lock_entry(repository_ctx, mirror, version, platform):
+    """Read the lockfile entry for a version and platform.
+    
+    The lockfile is the `lockfile` attribute or, for a local mirror, the
+    lockfile at the mirror root.
+    
+    Returns:
+        Dictionary with `sha256`, `type` and `urls`, or an empty dictionary
+    """
+    if repository_ctx.attr.lockfile:
+        lockfile = repository_ctx.path(repository_ctx.attr.lockfile)
+    elif mirror.startswith("file://"):
+        lockfile = repository_ctx.path(mirror[len("file://"):] + "/" + _MIRROR_LOCKFILE)
+    else:
+        return {}
+    
+    if not lockfile.exists:
+        return {}
+    
+    lock = json.decode(repository_ctx.read(lockfile))
+    return lock.get("weaver", {}).get(version, {}).get(platform, {})
+
+def _get_mirror_urls(mirror, sha256):
+    """Get content-addressed mirror URLs for an archive checksum."""
+    if not mirror or not sha256:
+        return []
+    return ["{}/sha256/{}".format(mirror, sha256)]
+
+def _get_archive_type(platform, urls):
+    """Get the archive type from the URLs, or the release default for the platform."""
+    for url in urls:
+        for archive_type in _ARCHIVE_TYPES:
+            if url.endswith("." + archive_type):
+                return archive_type
+    return "zip" if is_windows_platform(platform) else "tar.xz"
+
 def _get_sha256_for_platform(version, platform):
     """Get SHA256 hash for the specified version and platform."""
     # Use the new dynamic checksum system
     return get_weaver_checksum(version, platform)
 
-def _find_weaver_binary(repository_ctx, platform):
-    """Find the Weaver binary in the downloaded archive with multi-platform compatibility."""
-    # Debug: List all files in the repository
-    if is_windows_platform(platform):
-        result = repository_ctx.execute(["cmd", "/c", "dir", "/s", "/b"])
-    else:
-        result = repository_ctx.execute(["find", ".", "-type", "f"])
-    
-    if result.return_code == 0:
-        print("DEBUG: Files in repository: " + result.stdout)
-    
-    # Get platform-specific binary name
-    binary_name = get_platform_specific_binary_name("weaver", platform)
-    
-    # Look for common binary names with enhanced detection
-    # Based on actual Weaver binary structure
-    binary_patterns = [
-        "weaver-aarch64-apple-darwin/weaver",  # Direct path based on debug output
-        "weaver-x86_64-apple-darwin/weaver",   # Direct path for x86_64
-        "weaver-x86_64-unknown-linux-gnu/weaver",  # Direct path for Linux
-        "weaver-x86_64-pc-windows-msvc/weaver.exe",  # Direct path for Windows
-        binary_name,
-        "weaver",
-        "weaver.exe",
-        "opentelemetry-weaver",
-        "otlp-weaver",
-        "weaver-*",
-        "opentelemetry-weaver-*",
-        "weaver-*-*-*",
-        "weaver-*/weaver",  # Look for binary in subdirectory
-    ]
-    
-    # Platform-specific search commands
-    if is_windows_platform(platform):
-        # Windows-specific search using dir command
-        for pattern in binary_patterns:
-            result = repository_ctx.execute([
-                "cmd", "/c", "dir", "/s", "/b", pattern
-            ], working_directory = ".")
-            if result.return_code == 0 and result.stdout.strip():
-                binary_path = result.stdout.strip().split("\n")[0]
-                # Remove leading ./ if present
-                if binary_path.startswith("./"):
-                    binary_path = binary_path[2:]
-                return binary_path
-    else:
-        # Unix-like systems using find command
-        for pattern in binary_patterns:
-            result = repository_ctx.execute([
-                "find", ".", "-name", pattern, "-type", "f"
-            ], working_directory = ".")
-            if result.return_code == 0 and result.stdout.strip():
-                binary_path = result.stdout.strip().split("\n")[0]
-                # Remove leading ./ if present
-                if binary_path.startswith("./"):
-                    binary_path = binary_path[2:]
-                return binary_path
+def _index_repository_files(repository_ctx, max_depth = _MAX_INDEX_DEPTH):
+    """List the repository directory once and index files by basename.
     
-    # If no binary found, fail with helpful error message
-    fail("Could not find Weaver binary for platform {} in downloaded archive. Searched for patterns: {}".format(
-        platform, binary_patterns
-    ))
+    Args:
+        repository_ctx: Repository context
+        max_depth: Number of directory levels to list
+        
+    Returns:
+        Dictionary mapping file basenames to sorted relative paths
+    """
+    index = {}
+    directories = [(repository_ctx.path("."), "")]
+    for _ in range(max_depth):
+        subdirectories = []
+        for directory, prefix in directories:
+            for entry in directory.readdir():
+                relative_path = prefix + entry.basename
+                if entry.is_dir:
+                    subdirectories.append((entry, relative_path + "/"))
+                else:
+                    index.setdefault(entry.basename, []).append(relative_path)
+        directories = subdirectories
+    
+    return {name: sorted(paths) for name, paths in index.items()}
 
-def _extract_archive(repository_ctx, archive_path, platform):
-    """Extract archive with platform-specific handling."""
-    if archive_path.endswith(".tar.gz") or archive_path.endswith(".tgz"):
-        if is_windows_platform(platform):
-            # Windows tar extraction
-            result = repository_ctx.execute([
-                "tar", "-xzf", archive_path
-            ])
-        else:
-            # Unix tar extraction
-            result = repository_ctx.execute([
-                "tar", "-xzf", archive_path
-            ])
-    elif archive_path.endswith(".tar.xz"):
-        if is_windows_platform(platform):
-            # Windows tar.xz extraction
-            result = repository_ctx.execute([
-                "tar", "-xf", archive_path
-            ])
-        else:
-            # Unix tar.xz extraction
-            result = repository_ctx.execute([
-                "tar", "-xf", archive_path
-            ])
-    elif archive_path.endswith(".zip"):
-        if is_windows_platform(platform):
-            # Windows zip extraction
-            result = repository_ctx.execute([
-                "powershell", "-Command", "Expand-Archive", "-Path", archive_path, "-DestinationPath", "."
-            ])
-        else:
-            # Unix zip extraction
-            result = repository_ctx.execute([
-                "unzip", archive_path
-            ])
-    else:
-        fail("Unsupported archive format: {}".format(archive_path))
+def _shallowest(paths):
+    """Return the path with the fewest directory levels."""
+    return sorted(paths, key = lambda path: (path.count("/"), path))[0]
+
+def _find_weaver_binary(repository_ctx, platform, index = None):
+    """Find the Weaver binary in the extracted archive with multi-platform compatibility.
+    
+    Looks up known binary names in a single index of the extracted files
+    instead of searching the file system once per pattern.
+    """
+    if index == None:
+        index = _index_repository_files(repository_ctx)
     
-    if result.return_code != 0:
-        fail("Failed to extract archive: {}".format(result.stderr))
+    # Exact binary names, preferring the platform-specific name
+    for name in _WEAVER_BINARY_NAMES:
+        binary_name = get_platform_specific_binary_name(name, platform)
+        if binary_name in index:
+            return _shallowest(index[binary_name])
+    
+    # Versioned binaries such as weaver-0.16.1-x86_64-unknown-linux-gnu
+    extension = ".exe" if is_windows_platform(platform) else ""
+    versioned = []
+    for name, paths in index.items():
+        if not (name.startswith("weaver-") or name.startswith("opentelemetry-weaver-")):
+            continue
+        if extension and not name.endswith(extension):
+            continue
+        if [suffix for suffix in _NON_BINARY_SUFFIXES if name.endswith(suffix)]:
+            # Skip archives, checksum files and documentation
+            continue
+        versioned.extend(paths)
+    if versioned:
+        return _shallowest(versioned)
+    
+    # If no binary found, fail with helpful error message
+    fail("Could not find Weaver binary for platform {} in downloaded archive. Looked for {} in: {}".format(
+        platform,
+        _WEAVER_BINARY_NAMES,
+        sorted([path for paths in index.values() for path in paths])[:20],
+    ))
 
 def _weaver_repository_impl(repository_ctx):
     """Implementation of the weaver_repository rule."""
     
-    # Detect platform
-    platform = _detect_platform(repository_ctx)
+    # Use the requested platform, or detect the host platform
+    platform = repository_ctx.attr.platform or _detect_platform(repository_ctx)
     
     # Get download URLs
     urls = _get_download_urls(
@@ -216,57 +251,44 @@ def _weaver_repository_impl(repository_ctx):
         repository_ctx.attr.urls,
     )
     
-    # Get SHA256 hash for the platform with fallback strategies
-    sha256 = repository_ctx.attr.sha256 or _get_sha256_for_platform(
-        repository_ctx.attr.version, platform
+    # Get SHA256 hash for the platform with fallback strategies: the
+    # attribute, then the mirror lockfile, then WEAVER_CHECKSUMS
+    mirror = _get_mirror(repository_ctx)
+    lock_entry = _read_lock_entry(repository_ctx, mirror, repository_ctx.attr.version, platform)
+    sha256 = (
+        repository_ctx.attr.sha256 or
+        lock_entry.get("sha256") or
+        _get_sha256_for_platform(repository_ctx.attr.version, platform)
     )
     
-    # Download the archive with enhanced error handling
-    archive_path = None
-    download_success = False
+    # The content-addressed mirror comes first; upstream URLs stay as fallbacks
+    archive_type = lock_entry.get("type") or _get_archive_type(platform, urls)
+    urls = _get_mirror_urls(mirror, sha256) + urls
     
-    for url in urls:
-        output_name = "weaver-{}-{}.{}".format(
-            repository_ctx.attr.version, 
-            platform, 
-            "zip" if url.endswith(".zip") else "tar.xz"
-        )
-        
-        # Download the file
-        if sha256:
-            result = repository_ctx.download(
-                url = url,
-                sha256 = sha256,
-                output = output_name,
-            )
-        else:
-            # Auto-compute checksum if not provided
-            result = repository_ctx.download(
-                url = url,
-                output = output_name,
-            )
-            
-            # If download succeeded without checksum, compute and cache it
-            if result.success and not sha256:
-                computed_sha256 = _compute_file_checksum(repository_ctx, output_name)
-                if computed_sha256:
-                    # Cache the computed checksum for future use
-                    _cache_checksum(repository_ctx, repository_ctx.attr.version, platform, computed_sha256)
-                    print("Computed and cached checksum for {}: {}".format(platform, computed_sha256))
-        
-        if result.success:
-            archive_path = output_name
-            download_success = True
-            break
-        else:
-            print("Failed to download from {}: {}".format(url, result.error))
-            continue
+    strip_prefix = _get_strip_prefix(
+        platform,
+        repository_ctx.attr.strip_prefix if repository_ctx.attr.strip_prefix else None,
+        repository_ctx.attr.urls,
+    )
+    
+    # Download and extract natively. Bazel tries each URL in order, verifies
+    # or computes the SHA-256 while downloading, and shares the archive
+    # through the repository cache when a checksum is known.
+    result = repository_ctx.download_and_extract(
+        url = urls,
+        sha256 = sha256 or "",
+        type = archive_type,
+        stripPrefix = strip_prefix,
+        allow_fail = True,
+    )
     
-    if not download_success:
+    if not result.success:
         fail("Failed to download Weaver binary from any URL: {}. Please check network connectivity and try again.".format(urls))
     
-    # Extract the archive
-    _extract_archive(repository_ctx, archive_path, platform)
+    # Cache the computed checksum for future use
+    if not sha256:
+        _cache_checksum(repository_ctx, repository_ctx.attr.version, platform, result.sha256)
+        print("Computed and cached checksum for {}: {}".format(platform, result.sha256))
     
     # Find the Weaver binary
     binary_path = _find_weaver_binary(repository_ctx, platform)
@@ -278,35 +300,30 @@ def _weaver_repository_impl(repository_ctx):
     # Create platform-specific metadata
     metadata = get_platform_metadata(platform)
     repository_ctx.file("platform_metadata.json", json.encode(metadata))
-
-def _compute_file_checksum(repository_ctx, file_path):
-    """Compute SHA256 checksum of a file."""
     
-    # Use platform-appropriate checksum command
-    if repository_ctx.os.name == "windows":
-        # Windows: use PowerShell
-        result = repository_ctx.execute([
-            "powershell", "-Command", 
-            "Get-FileHash -Algorithm SHA256 -Path '{}' | Select-Object -ExpandProperty Hash".format(file_path)
-        ])
-    else:
-        # Unix-like: use shasum
-        result = repository_ctx.execute([
-            "shasum", "-a", "256", file_path
-        ])
+    return _reproducible_attrs(repository_ctx, sha256, result.sha256)
+
+# Attributes of weaver_repository reported back to Bazel
+_REPOSITORY_ATTRS = ["name", "version", "platform", "sha256", "urls", "strip_prefix", "mirror", "lockfile"]
+
+def _reproducible_attrs(repository_ctx, pinned_sha256, sha256):
+    """Report the repository as reproducible once its archive checksum is known.
     
-    if result.return_code != 0:
-        print("Warning: Failed to compute checksum: {}".format(result.stderr))
+    With a checksum pinned by the attribute, lockfile or WEAVER_CHECKSUMS,
+    the fetch is reproducible, so Bazel can reuse the repository from its
+    contents cache instead of fetching it again. A checksum computed during
+    the fetch is reported back as the canonical attribute value to pin.
+    """
+    if pinned_sha256:
+        if hasattr(repository_ctx, "repo_metadata"):
+            return repository_ctx.repo_metadata(reproducible = True)
         return None
     
-    # Extract checksum from output
-    if repository_ctx.os.name == "windows":
-        checksum = result.stdout.strip()
-    else:
-        # shasum output format: "checksum filename"
-        checksum = result.stdout.split(" ")[0]
-    
-    return checksum
+    attrs = {name: getattr(repository_ctx.attr, name) for name in _REPOSITORY_ATTRS}
+    attrs["sha256"] = sha256
+    if hasattr(repository_ctx, "repo_metadata"):
+        return repository_ctx.repo_metadata(attrs_for_reproducibility = attrs)
+    return attrs
 
 def _cache_checksum(repository_ctx, version, platform, checksum):
     """Cache computed checksum for future use."""
@@ -314,14 +331,12 @@ def _cache_checksum(repository_ctx, version, platform, checksum):
     # Create a cache file with the checksum
     cache_content = """
 # Cached checksum for Weaver {} on {}
-# Generated automatically on {}
 {}
 
 # Usage: Add this checksum to weaver/checksums.bzl
 """.format(
         version,
         platform,
-        repository_ctx.execute(["date"]).stdout.strip(),
         checksum
     )
     
@@ -381,8 +396,8 @@ weaver_toolchain(
 toolchain(
     name = "weaver_toolchain",
     toolchain = ":weaver_toolchain_impl",
-    toolchain_type = "//weaver:toolchain_type",
-    target_compatible_with = [
+    toolchain_type = "@rules_weaver//weaver:toolchain_type",
+    exec_compatible_with = [
         "{os_constraint}",
         "{cpu_constraint}",
     ],
@@ -400,17 +415,143 @@ weaver_repository = repository_rule(
     implementation = _weaver_repository_impl,
     attrs = {
         "version": attr.string(mandatory = True),
+        "platform": attr.string(
+            values = [""] + get_supported_platforms(),
+            doc = "Platform of the Weaver binary to fetch, such as linux-x86_64. Defaults to the host platform.",
+        ),
         "sha256": attr.string(),
         "urls": attr.string_list(),
+        "strip_prefix": attr.string(
+            doc = "Archive directory to strip during extraction. Defaults to the release archive directory for default URLs.",
+        ),
+        "mirror": attr.string(
+            doc = "Content-addressed mirror populated by scripts/weaver_mirror.py, as a URL or absolute path. Defaults to $WEAVER_MIRROR.",
+        ),
+        "lockfile": attr.label(
+            allow_single_file = [".json"],
+            doc = "Lockfile written by scripts/weaver_mirror.py. Defaults to the lockfile of a local mirror.",
+        ),
+    },
+    environ = ["WEAVER_MIRROR"],
+)
+
+def platform_repository_name(name, platform):
+    """Get the name of the per-platform Weaver repository of a hub."""
+    return "{}_{}".format(name, platform.replace("-", "_"))
+
+def _weaver_hub_repository_impl(repository_ctx):
+    """Implementation of the weaver_hub_repository rule."""
+    
+    build_content = """
+# Generated hub over the per-platform Weaver repositories. The toolchains
+# below refer to the binaries lazily: a platform's archive is downloaded
+# only when toolchain resolution selects it for an execution platform.
+
+package(default_visibility = ["//visibility:public"])
+"""
+    binaries = {}
+    for platform in repository_ctx.attr.platforms:
+        metadata = get_platform_metadata(platform)
+        repository = repository_ctx.attr.repository_prefix + "_" + platform.replace("-", "_")
+        binaries[platform] = "@{}//:weaver_binary".format(repository)
+        build_content += """
+config_setting(
+    name = "{platform}",
+    constraint_values = [
+        "{os_constraint}",
+        "{cpu_constraint}",
+    ],
+)
+
+toolchain(
+    name = "weaver_{platform}_toolchain",
+    toolchain = "@{repository}//:weaver_toolchain_impl",
+    toolchain_type = "@rules_weaver//weaver:toolchain_type",
+    exec_compatible_with = [
+        "{os_constraint}",
+        "{cpu_constraint}",
+    ],
+)
+""".format(
+            platform = platform,
+            repository = repository,
+            os_constraint = metadata["os_constraint"],
+            cpu_constraint = metadata["cpu_constraint"],
+        )
+    
+    # The binary of the platform being built for, for direct use in actions
+    build_content += """
+alias(
+    name = "weaver_binary",
+    actual = select({{
+{branches}    }}),
+)
+""".format(branches = "".join([
+        '        ":{}": "{}",\n'.format(platform, binaries[platform])
+        for platform in repository_ctx.attr.platforms
+    ]))
+    
+    repository_ctx.file("BUILD.bazel", build_content)
+
+weaver_hub_repository = repository_rule(
+    implementation = _weaver_hub_repository_impl,
+    attrs = {
+        "platforms": attr.string_list(
+            mandatory = True,
+            doc = "Platforms with a per-platform Weaver repository",
+        ),
+        "repository_prefix": attr.string(
+            mandatory = True,
+            doc = "Name of the hub the per-platform repositories were named after (see `platform_repository_name`)",
+        ),
     },
+    doc = """
+Hub repository registering one Weaver toolchain per platform.
+
+The hub only writes BUILD definitions, so creating and registering it does
+not download anything. Each toolchain is compatible with the execution
+platform of its binary, and its per-platform weaver_repository is fetched
+only when resolution selects it.
+""",
 )
 
+def weaver_platform_repositories(name, version, platforms = None, **kwargs):
+    """Declare per-platform Weaver repositories and their hub.
+    
+    Args:
+        name: Name of the hub repository
+        version: Weaver version
+        platforms: Platforms to declare repositories for (defaults to all
+            supported platforms)
+        **kwargs: Additional weaver_repository attributes, such as `mirror`
+            or `lockfile`, shared by all platforms
+    """
+    platforms = platforms or get_supported_platforms()
+    for platform in platforms:
+        maybe(
+            weaver_repository,
+            name = platform_repository_name(name, platform),
+            version = version,
+            platform = platform,
+            **kwargs
+        )
+    maybe(
+        weaver_hub_repository,
+        name = name,
+        platforms = platforms,
+        repository_prefix = name,
+    )
+
 def weaver_dependencies():
     """Set up Weaver dependencies with multi-platform support."""
     # Add any required dependencies here
     pass
 
-def weaver_register_toolchains():
-    """Register Weaver toolchains for all supported platforms."""
-    # Register the toolchain from the real_weaver repository
-    native.register_toolchains("@rules_weaver//:weaver_toolchain") 
\ No newline at end of file
+def weaver_register_toolchains(name = "weaver"):
+    """Register the Weaver toolchains of a Weaver hub or repository.
+    
+    Args:
+        name: Name of the hub from weaver_platform_repositories, or of a
+            single weaver_repository
+    """
+    native.register_toolchains("@{}//:all".format(name)) 
\ No newline at end of file
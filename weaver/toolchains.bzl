@@ -6,12 +6,18 @@ as Bazel toolchains with remote execution compatibility.
 """
 
 load("@bazel_skylib//lib:paths.bzl", "paths")
+load("//weaver:platform_constraints.bzl", _platform_execution_requirements = "get_execution_requirements")
+
+# Toolchain type resolved by the Weaver rules
+WEAVER_TOOLCHAIN_TYPE = Label("//weaver:toolchain_type")
 
 def _weaver_toolchain_impl(ctx):
     """Implementation of the weaver_toolchain rule with remote execution support."""
     
-    # Get the Weaver binary
-    weaver_binary = ctx.file.weaver_binary
+    # Get the Weaver binary; binaries with runfiles, such as the mock Weaver
+    # py_binary, are run through their FilesToRunProvider
+    weaver_binary = ctx.executable.weaver_binary
+    weaver_files_to_run = ctx.attr.weaver_binary[DefaultInfo].files_to_run
     
     # Determine platform with enhanced detection for remote execution
     platform = ctx.attr.platform
@@ -22,15 +28,12 @@ def _weaver_toolchain_impl(ctx):
     # Create toolchain info with remote execution metadata
     toolchain_info = platform_common.ToolchainInfo(
         weaver_binary = weaver_binary,
+        weaver_files_to_run = weaver_files_to_run,
         version = ctx.attr.version,
         platform = platform,
         remote_execution_compatible = True,
-        execution_requirements = {
-            "no-sandbox": "1",
-            "no-cache": "0",
-            "supports-workers": "1",
-            "requires-network": "0",
-        },
+        execution_requirements = _platform_execution_requirements(platform),
+        registry_snapshots = ctx.attr.registry_snapshots,
     )
     
     return [toolchain_info]
@@ -46,10 +49,9 @@ weaver_toolchain = rule(
     attrs = {
         "weaver_binary": attr.label(
             mandatory = True,
-            allow_single_file = True,
             executable = True,
             cfg = "exec",
-            doc = "Weaver executable file",
+            doc = "Weaver executable",
         ),
         "version": attr.string(
             mandatory = True,
@@ -59,6 +61,10 @@ weaver_toolchain = rule(
             default = "auto",
             doc = "Target platform (optional, auto-detected for remote execution)",
         ),
+        "registry_snapshots": attr.bool(
+            default = False,
+            doc = "Whether the binary accepts a weaver_registry_snapshot as `--registry` (optional, consumers read the raw registry otherwise)",
+        ),
     },
     doc = """
 Defines a Weaver toolchain with remote execution compatibility.
@@ -69,17 +75,14 @@ for code generation and validation operations, optimized for remote execution.
 )
 
 def _get_weaver_toolchain(ctx):
-    """Get the Weaver toolchain for the current context with enhanced error handling."""
-    if "@rules_weaver//weaver:toolchain_type" in ctx.toolchains:
-        toolchain = ctx.toolchains["@rules_weaver//weaver:toolchain_type"]
-        if toolchain:
-            return toolchain
-        else:
-            print("Warning: Weaver toolchain is None")
-            return None
-    else:
-        print("Warning: No Weaver toolchain configured")
+    """Get the resolved Weaver toolchain of the current context.
+    
+    Rules request the toolchain type as optional, so this returns None when
+    no Weaver toolchain is registered for the execution platform.
+    """
+    if WEAVER_TOOLCHAIN_TYPE not in ctx.toolchains:
         return None
+    return ctx.toolchains[WEAVER_TOOLCHAIN_TYPE]
 
 def _weaver_binary_path(ctx):
     """Get the path to the Weaver binary."""
@@ -115,8 +118,13 @@ def _get_execution_requirements(ctx):
     toolchain = _get_weaver_toolchain(ctx)
     return getattr(toolchain, "execution_requirements", {})
 
+def _optional_weaver_toolchain():
+    """Get the optional Weaver toolchain requirement for a rule's `toolchains`."""
+    return config_common.toolchain_type(WEAVER_TOOLCHAIN_TYPE, mandatory = False)
+
 # Public exports for use by other modules
 get_weaver_toolchain = _get_weaver_toolchain
+optional_weaver_toolchain = _optional_weaver_toolchain
 weaver_binary_path = _weaver_binary_path
 weaver_version = _weaver_version
 weaver_platform = _weaver_platform
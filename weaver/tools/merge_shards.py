@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Merge tool for sharded Weaver actions.
+
+Sharded `weaver_generate` and `weaver_validate_test` targets run one Weaver
+action per registry shard, and `weaver_validate_test` with `split_policies`
+one validation action per policy. This script combines their outputs:
+
+- `tree`: copies shard output directories into one output directory. Shards
+  that generate the same file must agree on its content.
+- `diagnostics`: combines shard validation reports into one JSON report.
+"""
+
+import argparse
+import filecmp
+import json
+import os
+import shutil
+import sys
+from typing import List, Optional
+
+
+def merge_trees(output_dir: str, shard_dirs: List[str]) -> List[str]:
+    """Copy shard directories into the output directory.
+
+    Returns:
+        List of relative paths generated with different content by two shards
+    """
+
+    conflicts = []
+    os.makedirs(output_dir, exist_ok=True)
+    for shard_dir in shard_dirs:
+        for root, _, files in os.walk(shard_dir):
+            relative_root = os.path.relpath(root, shard_dir)
+            target_root = os.path.normpath(os.path.join(output_dir, relative_root))
+            os.makedirs(target_root, exist_ok=True)
+            for name in files:
+                source = os.path.join(root, name)
+                target = os.path.join(target_root, name)
+                if os.path.exists(target):
+                    if not filecmp.cmp(source, target, shallow=False):
+                        conflicts.append(os.path.normpath(os.path.join(relative_root, name)))
+                    continue
+                shutil.copyfile(source, target)
+    return sorted(set(conflicts))
+
+
+def merge_diagnostics(output: str, report_files: List[str]):
+    """Combine shard or per-policy validation reports into one report.
+
+    The combined exit code is the first non-zero exit code, and each
+    action's report is kept under `shards`.
+    """
+
+    shards = []
+    for report_file in report_files:
+        with open(report_file, "r", encoding="utf-8") as f:
+            shards.append(json.load(f))
+
+    exit_code = next((shard["exit_code"] for shard in shards if shard["exit_code"]), 0)
+    report = {
+        "version": 1,
+        "command": shards[0]["command"] if shards else [],
+        "exit_code": exit_code,
+        "shards": shards,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, sort_keys=True, indent=2)
+        f.write("\n")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Merge outputs of sharded Weaver actions",
+        fromfile_prefix_chars="@",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    tree_parser = subparsers.add_parser("tree", help="Merge shard output directories")
+    tree_parser.add_argument("--output", required=True, help="Output directory")
+    tree_parser.add_argument("shards", nargs="*", help="Shard output directories")
+
+    diagnostics_parser = subparsers.add_parser("diagnostics", help="Merge shard validation reports")
+    diagnostics_parser.add_argument("--output", required=True, help="Output report file")
+    diagnostics_parser.add_argument("shards", nargs="*", help="Shard validation report files")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "tree":
+        conflicts = merge_trees(args.output, args.shards)
+        if conflicts:
+            print("Registry shards generated conflicting files:", file=sys.stderr)
+            for conflict in conflicts:
+                print("  " + conflict, file=sys.stderr)
+            print("Templates writing one file for the whole registry need registry_shards = 1.", file=sys.stderr)
+            return 1
+    else:
+        merge_diagnostics(args.output, args.shards)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
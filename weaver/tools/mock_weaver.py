@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Hermetic stand-in for the Weaver CLI.
+
+`//weaver:mock_weaver` is registered as the toolchain of this repository's
+own tests, so rules can be built and tested without downloading Weaver. It
+accepts the command shapes the action wrapper runs and writes deterministic
+outputs, so identical actions of different targets share cache entries:
+
+- `registry generate <target> <output-dir>`: one file per registry schema
+- `registry check`: no diagnostics, unless a schema contains the top-level
+  key `mock_weaver: fail`, which is reported as an error. The marker is a
+  key rather than a comment, so adding or removing it changes the
+  normalized content digests that key cached Weaver actions
+- `registry resolve --output <file>`: a JSON snapshot listing the schemas
+- `docs --output-dir <dir> <schemas>`: one page per schema
+
+Registries are read from the `--registry` directories appended by the
+wrapper, or from snapshots written by `registry resolve`, which give the
+same outputs as the registry they were resolved from. Unknown options are
+ignored.
+
+By default every command does trivial work. A cost model, given with
+`--cost-model` or the `MOCK_WEAVER_COST_MODEL` environment variable (for
+example through the `env` attribute of the Weaver rules), makes CPU time,
+memory footprint and output volume scale with the size of the input
+schemas, so rule-level performance features can be benchmarked offline
+with a predictable load. It is a comma-separated list of a preset name
+and `key=value` coefficients:
+
+- `cpu_base_ms`, `cpu_ms_per_kib`: CPU time spent per command, and per KiB
+  of input schemas
+- `memory_base_mib`, `memory_kib_per_kib`: memory held while the command
+  runs, and per KiB of input schemas
+- `output_bytes_per_kib`: bytes added to each generated file per KiB of its
+  schema
+- `warm_factor`: in worker mode, CPU time factor of schemas already seen by
+  an earlier request
+
+With `--persistent_worker`, the mock speaks the Bazel JSON worker protocol,
+serving each work request as one command in a resident process. Other
+arguments given at startup, such as `--cost-model`, apply to every request.
+The registry scaling benchmark uses this mode to measure repeated commands
+over a warm process.
+
+Based on tests/utils/mock_weaver.py.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from pathlib import Path
+from typing import List, Optional, Set
+
+SCHEMA_EXTENSIONS = (".yaml", ".yml", ".json")
+FAIL_MARKER = b"mock_weaver: fail"
+COST_MODEL_ENV = "MOCK_WEAVER_COST_MODEL"
+
+# A registry schema: its file name, whether it carries the failure marker
+# and its size in bytes
+Schema = namedtuple("Schema", ["name", "failing", "size"])
+
+# Cost model coefficients, see the module docstring
+CostModel = namedtuple(
+    "CostModel",
+    ["cpu_base_ms", "cpu_ms_per_kib", "memory_base_mib", "memory_kib_per_kib", "output_bytes_per_kib", "warm_factor"],
+    defaults=(0.0, 0.0, 0.0, 0.0, 0.0, 1.0),
+)
+
+# Named starting points for cost models; coefficients given after a preset
+# override it
+COST_MODEL_PRESETS = {
+    "none": {},
+    "realistic": {
+        "cpu_base_ms": 50.0,
+        "cpu_ms_per_kib": 1.0,
+        "memory_base_mib": 16.0,
+        "memory_kib_per_kib": 8.0,
+        "output_bytes_per_kib": 512.0,
+        "warm_factor": 0.25,
+    },
+}
+
+# Output file extension per generation target or documentation format
+OUTPUT_EXTENSIONS = {
+    "typescript": ".ts",
+    "rust": ".rs",
+    "go": ".go",
+    "python": ".py",
+    "html": ".html",
+    "markdown": ".md",
+}
+
+
+def load_snapshot(path: Path) -> Optional[List[Schema]]:
+    """Return the schemas of a `registry resolve` snapshot, or None for other files."""
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(snapshot, dict) or "mock_weaver_snapshot" not in snapshot:
+        return None
+    return [Schema(group["file"], group["failing"], group.get("bytes", 0)) for group in snapshot["groups"]]
+
+
+def read_schema(path: Path) -> List[Schema]:
+    """Read a schema file, expanding snapshots into the schemas they list."""
+
+    snapshot = load_snapshot(path) if path.suffix == ".json" else None
+    if snapshot is not None:
+        return snapshot
+    content = path.read_bytes()
+    failing = any(line.rstrip() == FAIL_MARKER for line in content.splitlines())
+    return [Schema(path.name, failing, len(content))]
+
+
+def find_schemas(registries: List[str], schema_files: List[str]) -> List[Schema]:
+    """Return the schemas of the registry directories, snapshots and explicit files."""
+
+    paths = [Path(f) for f in schema_files if f.endswith(SCHEMA_EXTENSIONS)]
+    for registry in registries:
+        if os.path.isfile(registry):
+            paths.append(Path(registry))
+        elif os.path.isdir(registry):
+            for root, _, files in os.walk(registry):
+                paths.extend(Path(root) / name for name in files if name.endswith(SCHEMA_EXTENSIONS))
+        # Registry URLs are not fetched
+
+    schemas = []
+    for path in sorted(set(paths)):
+        schemas.extend(read_schema(path))
+    return sorted(set(schemas))
+
+
+def parse_cost_model(spec: Optional[str]) -> Optional[CostModel]:
+    """Parse a cost model specification, or return None for no cost model."""
+
+    if not spec:
+        return None
+    coefficients = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        if "=" not in item:
+            if item not in COST_MODEL_PRESETS:
+                raise ValueError("unknown cost model preset: {}".format(item))
+            coefficients.update(COST_MODEL_PRESETS[item])
+            continue
+        key, value = item.split("=", 1)
+        key = key.strip()
+        if key not in CostModel._fields:
+            raise ValueError("unknown cost model coefficient: {}".format(key))
+        try:
+            coefficients[key] = float(value)
+        except ValueError:
+            raise ValueError("invalid value for {}: {}".format(key, value))
+        if coefficients[key] < 0:
+            raise ValueError("{} must not be negative".format(key))
+    return CostModel(**coefficients)
+
+
+def spend(model: Optional[CostModel], schemas: List[Schema], warm_schemas: Optional[Set[Schema]] = None) -> bytearray:
+    """Spend the CPU time and memory of a command, returning the memory to hold."""
+
+    if model is None:
+        return bytearray()
+
+    input_kib = sum(schema.size for schema in schemas) / 1024.0
+    warm_kib = sum(schema.size for schema in schemas if warm_schemas and schema in warm_schemas) / 1024.0
+
+    # Touch every page so the memory counts towards the resident set
+    memory = bytearray(int(model.memory_base_mib * (1 << 20) + model.memory_kib_per_kib * input_kib * 1024))
+    memory[::4096] = b"\x01" * len(range(0, len(memory), 4096))
+
+    cpu_ms = model.cpu_base_ms + model.cpu_ms_per_kib * (input_kib - warm_kib + warm_kib * model.warm_factor)
+    deadline = time.process_time() + cpu_ms / 1000.0
+    value = 0
+    while time.process_time() < deadline:
+        for index in range(1000):
+            value = (value * 31 + index) & 0xFFFFFFFF
+    return memory
+
+
+def write_outputs(output_dir: str, kind: str, schemas: List[Schema], model: Optional[CostModel] = None):
+    """Write one deterministic output file per schema name."""
+
+    extension = OUTPUT_EXTENSIONS.get(kind, ".txt")
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    # Schemas of different directories may share a name, such as the
+    # registry.yaml of every namespace; their outputs go to the same file
+    outputs = {}
+    for schema in schemas:
+        content = "Generated by mock Weaver ({}) from {}\n".format(kind, schema.name)
+        if model is not None and model.output_bytes_per_kib:
+            padding = int(model.output_bytes_per_kib * schema.size / 1024)
+            line = "# {} padding\n".format(schema.name)
+            content += (line * (padding // len(line) + 1))[:padding]
+        outputs.setdefault(Path(schema.name).stem + extension, []).append(content)
+    for name, contents in outputs.items():
+        (output_path / name).write_text("".join(contents))
+
+
+def resolve(output: str, schemas: List[Schema]):
+    """Write a deterministic snapshot of the resolved registry."""
+
+    snapshot = {
+        "mock_weaver_snapshot": 1,
+        "groups": [
+            {"file": schema.name, "failing": schema.failing, "bytes": schema.size}
+            for schema in schemas
+        ],
+    }
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def check(schemas: List[Schema], diagnostic_format: Optional[str]) -> int:
+    """Check schemas, failing those that contain the failure marker."""
+
+    diagnostics = []
+    for schema in schemas:
+        if schema.failing:
+            diagnostics.append({
+                "level": "error",
+                "message": "Schema marked as failing",
+                "file": schema.name,
+            })
+
+    if diagnostic_format == "json":
+        print(json.dumps(diagnostics, indent=2))
+    else:
+        for diagnostic in diagnostics:
+            print("{level}: {file}: {message}".format(**diagnostic))
+    return 1 if diagnostics else 0
+
+
+def main(argv: Optional[List[str]] = None, warm_schemas: Optional[Set[Schema]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Mock Weaver binary")
+    parser.add_argument("command", nargs="+", help="Command and positional arguments")
+    parser.add_argument("--registry", "-r", action="append", default=[], help="Registry directory or URL")
+    parser.add_argument("--output-dir", help="Documentation output directory")
+    parser.add_argument("--output", "-o", help="Resolved registry output file")
+    parser.add_argument("--format", help="Output format")
+    parser.add_argument("--diagnostic-format", help="Diagnostic format")
+    parser.add_argument("--policy", "-p", action="append", default=[], help="Policy file or directory")
+    parser.add_argument("--templates", help="Templates directory")
+    parser.add_argument("--template", help="Template file")
+    parser.add_argument("--cost-model", default=os.environ.get(COST_MODEL_ENV), help="Cost model specification")
+    args, _ = parser.parse_known_intermixed_args(argv)
+
+    try:
+        model = parse_cost_model(args.cost_model)
+    except ValueError as e:
+        print("Error: {}".format(e))
+        return 2
+
+    command = args.command
+    exit_code = 0
+    if command[:2] == ["registry", "generate"]:
+        if len(command) < 4:
+            print("Error: registry generate requires a target and an output directory")
+            return 2
+        target, output_dir = command[2], command[3]
+        schemas = find_schemas(args.registry, [])
+        memory = spend(model, schemas, warm_schemas)
+        write_outputs(output_dir, args.format or target, schemas, model)
+    elif command[:2] == ["registry", "check"]:
+        schemas = find_schemas(args.registry, [])
+        memory = spend(model, schemas, warm_schemas)
+        exit_code = check(schemas, args.diagnostic_format)
+    elif command[:2] == ["registry", "resolve"]:
+        if not args.output:
+            print("Error: --output is required for registry resolve")
+            return 2
+        schemas = find_schemas(args.registry, [])
+        memory = spend(model, schemas, warm_schemas)
+        resolve(args.output, schemas)
+    elif command[0] == "docs":
+        if not args.output_dir:
+            print("Error: --output-dir is required for docs")
+            return 2
+        schemas = find_schemas(args.registry, command[1:])
+        memory = spend(model, schemas, warm_schemas)
+        write_outputs(args.output_dir, args.format or "html", schemas, model)
+    else:
+        print("Error: unsupported command: {}".format(" ".join(command)))
+        return 2
+
+    del memory
+    if warm_schemas is not None:
+        warm_schemas.update(schemas)
+    return exit_code
+
+
+def expand_param_files(arguments: List[str]) -> List[str]:
+    """Expand `@file` arguments written in Bazel's multiline param file format."""
+
+    expanded = []
+    for argument in arguments:
+        if argument.startswith("@") and not argument.startswith("@@"):
+            with open(argument[1:], "r", encoding="utf-8") as f:
+                expanded.extend(f.read().splitlines())
+        else:
+            expanded.append(argument)
+    return expanded
+
+
+def run_persistent_worker(startup_arguments: List[str], stdin=sys.stdin, stdout=sys.stdout):
+    """Serve JSON work requests, keeping the schemas seen by earlier requests warm.
+
+    The startup arguments, such as `--cost-model`, precede the arguments of
+    every request, as Bazel passes them to its workers.
+    """
+
+    warm_schemas = set()
+    for line in stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            try:
+                arguments = startup_arguments + expand_param_files(request.get("arguments", []))
+                exit_code = main(arguments, warm_schemas)
+            except SystemExit as e:
+                # Invalid arguments fail the request, not the worker
+                exit_code = e.code if isinstance(e.code, int) else int(e.code is not None)
+            except Exception as e:
+                print("Error: {}".format(e))
+                exit_code = 1
+        response = {
+            "exitCode": exit_code,
+            "output": output.getvalue(),
+            "requestId": request.get("requestId", 0),
+        }
+        stdout.write(json.dumps(response) + "\n")
+        stdout.flush()
+
+
+if __name__ == "__main__":
+    if "--persistent_worker" in sys.argv[1:]:
+        run_persistent_worker([argument for argument in sys.argv[1:] if argument != "--persistent_worker"])
+        sys.exit(0)
+    sys.exit(main(expand_param_files(sys.argv[1:])))
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Reference scanner for Weaver semantic convention schemas.
+
+This script scans schema files for the ids they define and the ids they
+reference through `ref`, `extends` and `imports`, and writes a per-target
+dependency index. YAML files are scanned line by line without building a
+document tree; JSON files are walked after parsing.
+
+Index format:
+
+    {
+      "version": 1,
+      "files": {
+        "<path>": {"defines": [...], "references": [...]}
+      }
+    }
+
+The `closure` command merges indexes and computes the set of schema files
+transitively referenced from a set of entry point files.
+"""
+
+import argparse
+import fnmatch
+import json
+import re
+import sys
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+
+INDEX_VERSION = 1
+
+# `id: x`, `- id: x`, `ref: x`, `- ref: x`, `extends: x`
+_KEY_VALUE = re.compile(r"^(\s*)(?:-\s+)?(id|ref|extends)\s*:\s*(.*?)\s*$")
+_IMPORTS_KEY = re.compile(r"^(\s*)imports\s*:\s*$")
+_LIST_ITEM = re.compile(r"^\s*-\s+(.*?)\s*$")
+_BLOCK_SCALAR_HEADER = re.compile(r"(^|[\s:-])[|>][0-9+-]*\s*(#.*)?$")
+
+
+def _scalar(value: str) -> str:
+    """Strip comments and quotes from a YAML scalar value."""
+
+    if value[:1] in ("'", '"'):
+        quote = value[0]
+        end = value.find(quote, 1)
+        return value[1:end] if end > 0 else value[1:]
+    return value.split(" #", 1)[0].strip()
+
+
+def scan_yaml_lines(lines: Iterable[str]) -> Dict[str, List[str]]:
+    """Scan YAML lines for defined and referenced ids."""
+
+    defines: List[str] = []
+    references: List[str] = []
+    imports_indent = None
+    block_indent = None
+
+    for raw_line in lines:
+        line = raw_line.rstrip("\r\n")
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        indent = len(line) - len(line.lstrip(" "))
+
+        if block_indent is not None:
+            if indent > block_indent:
+                # Block scalar content is text, not schema structure
+                continue
+            block_indent = None
+        if _BLOCK_SCALAR_HEADER.search(stripped):
+            block_indent = indent
+            continue
+
+        if imports_indent is not None:
+            if indent > imports_indent:
+                # Entries below `imports:` are id patterns, possibly nested
+                # under a kind key such as `metrics:` or `events:`
+                item = _LIST_ITEM.match(line)
+                if item:
+                    value = _scalar(item.group(1))
+                    if value:
+                        references.append(value)
+                continue
+            imports_indent = None
+
+        imports = _IMPORTS_KEY.match(line)
+        if imports:
+            imports_indent = len(imports.group(1))
+            continue
+
+        match = _KEY_VALUE.match(line)
+        if not match:
+            continue
+        key, value = match.group(2), _scalar(match.group(3))
+        if not value:
+            continue
+        if key == "id":
+            defines.append(value)
+        else:
+            references.append(value)
+
+    return {"defines": defines, "references": references}
+
+
+def _walk_json(node, defines: List[str], references: List[str]):
+    """Collect ids and references from a parsed JSON document."""
+
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "id" and isinstance(value, str):
+                defines.append(value)
+            elif key in ("ref", "extends") and isinstance(value, str):
+                references.append(value)
+            elif key == "imports":
+                _collect_import_patterns(value, references)
+            else:
+                _walk_json(value, defines, references)
+    elif isinstance(node, list):
+        for item in node:
+            _walk_json(item, defines, references)
+
+
+def _collect_import_patterns(node, references: List[str]):
+    """Collect id patterns from an `imports` section."""
+
+    if isinstance(node, str):
+        references.append(node)
+    elif isinstance(node, list):
+        for item in node:
+            _collect_import_patterns(item, references)
+    elif isinstance(node, dict):
+        for value in node.values():
+            _collect_import_patterns(value, references)
+
+
+def scan_file(path: str) -> Dict[str, List[str]]:
+    """Scan one schema file for defined and referenced ids."""
+
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            document = json.load(f)
+        defines: List[str] = []
+        references: List[str] = []
+        _walk_json(document, defines, references)
+        entry = {"defines": defines, "references": references}
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = scan_yaml_lines(f)
+
+    return {
+        "defines": sorted(set(entry["defines"])),
+        "references": sorted(set(entry["references"])),
+    }
+
+
+def create_index(paths: List[str]) -> Dict:
+    """Create a dependency index for a set of schema files."""
+
+    return {
+        "version": INDEX_VERSION,
+        "files": {path: scan_file(path) for path in sorted(paths)},
+    }
+
+
+def load_indexes(index_paths: List[str]) -> Dict[str, Dict[str, List[str]]]:
+    """Merge the file entries of several dependency indexes."""
+
+    files: Dict[str, Dict[str, List[str]]] = {}
+    for index_path in index_paths:
+        with open(index_path, "r", encoding="utf-8") as f:
+            files.update(json.load(f).get("files", {}))
+    return files
+
+
+def build_file_edges(files: Dict[str, Dict[str, List[str]]]) -> Dict[str, Set[str]]:
+    """Resolve id references to edges between the files defining them."""
+
+    definitions: Dict[str, Set[str]] = {}
+    for path, entry in files.items():
+        for defined in entry.get("defines", []):
+            definitions.setdefault(defined, set()).add(path)
+
+    edges: Dict[str, Set[str]] = {}
+    for path, entry in files.items():
+        targets: Set[str] = set()
+        for reference in entry.get("references", []):
+            if any(char in reference for char in "*?["):
+                for defined in fnmatch.filter(definitions.keys(), reference):
+                    targets.update(definitions[defined])
+            else:
+                targets.update(definitions.get(reference, ()))
+        targets.discard(path)
+        edges[path] = targets
+    return edges
+
+
+def missing_entry_points(files: Dict[str, Dict[str, List[str]]], entry_points: List[str]) -> List[str]:
+    """Return the entry points that are not files of the indexes."""
+
+    return sorted(set(path for path in entry_points if path not in files))
+
+
+def compute_closure(files: Dict[str, Dict[str, List[str]]], entry_points: List[str]) -> List[str]:
+    """Compute the schema files transitively referenced from entry points.
+
+    Entry points missing from the indexes are not part of the closure; see
+    `missing_entry_points`.
+    """
+
+    edges = build_file_edges(files)
+    closure: Set[str] = set()
+    queue = deque(path for path in entry_points if path in files)
+    while queue:
+        path = queue.popleft()
+        if path in closure:
+            continue
+        closure.add(path)
+        queue.extend(edges.get(path, ()))
+    return sorted(closure)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Scan Weaver schemas for id references",
+        fromfile_prefix_chars="@",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    scan_parser = subparsers.add_parser("scan", help="Write a dependency index for schema files")
+    scan_parser.add_argument("--output", required=True, help="Index file to write")
+    scan_parser.add_argument("files", nargs="*", help="Schema files to scan")
+
+    closure_parser = subparsers.add_parser("closure", help="Compute the transitive closure of entry points")
+    closure_parser.add_argument("--output", required=True, help="File to write the closure to, one path per line")
+    closure_parser.add_argument("--index", action="append", default=[], help="Dependency index to merge")
+    closure_parser.add_argument("--entry-point", action="append", default=[], help="Entry point schema file")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "scan":
+        index = create_index(args.files)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(index, f, sort_keys=True, separators=(",", ":"))
+            f.write("\n")
+    else:
+        files = load_indexes(args.index)
+        missing = missing_entry_points(files, args.entry_point)
+        if missing:
+            print("Entry points not in any dependency index: {}".format(", ".join(missing)), file=sys.stderr)
+            return 1
+        closure = compute_closure(files, args.entry_point)
+        with open(args.output, "w", encoding="utf-8") as f:
+            for path in closure:
+                f.write(path + "\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
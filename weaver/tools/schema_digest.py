@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Content digest tool for Weaver schema files.
+
+This script computes a SHA-256 digest for each schema file in a group and
+writes a compact JSON manifest. Digests are computed over a normalized form of
+each file so that reformat-only edits produce identical digests:
+
+- YAML: comments, trailing whitespace, line endings and trailing blank lines
+  are normalized. Block scalars and quoted strings are hashed verbatim.
+- JSON: documents are hashed in canonical form (sorted keys, no whitespace).
+
+Files are streamed line by line, so large registries are never held in memory.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional
+
+MANIFEST_VERSION = 1
+
+# A block scalar header ends a line: `key: |`, `- >-`, `key: |2+`, optionally
+# followed by a comment.
+_BLOCK_SCALAR_HEADER = re.compile(r"(^|[\s:-])[|>][0-9+-]*\s*(#.*)?$")
+
+
+def _indentation(line: str) -> int:
+    """Return the number of leading spaces of a line."""
+
+    return len(line) - len(line.lstrip(" "))
+
+
+def _strip_comment(line: str, quote: Optional[str]):
+    """Strip a trailing YAML comment, tracking quoted scalars across lines.
+
+    Returns:
+        Tuple of (content without comment, quote state at end of line)
+    """
+
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if quote == "'":
+            if char == "'":
+                if i + 1 < len(line) and line[i + 1] == "'":
+                    i += 1
+                else:
+                    quote = None
+        elif quote == '"':
+            if char == "\\":
+                i += 1
+            elif char == '"':
+                quote = None
+        elif char in ("'", '"') and (i == 0 or line[i - 1] in " \t[{,:-"):
+            quote = char
+        elif char == "#" and (i == 0 or line[i - 1] in " \t"):
+            return line[:i], quote
+        i += 1
+    return line, quote
+
+
+def normalize_yaml_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Yield the normalized lines of a YAML document."""
+
+    block_indent = None  # Indentation of the line that opened a block scalar
+    quote = None
+    pending_blank = 0
+
+    for raw_line in lines:
+        line = raw_line.rstrip("\r\n")
+
+        if block_indent is not None:
+            if not line.strip() or _indentation(line) > block_indent:
+                # Block scalar content is significant, including whitespace
+                yield line
+                continue
+            block_indent = None
+
+        if quote is not None:
+            # Continuation of a multi-line quoted scalar is content
+            content, quote = _strip_comment(line, quote)
+            yield content.rstrip() if quote is None else line
+            continue
+
+        content, quote = _strip_comment(line, None)
+        content = content.rstrip()
+        if not content:
+            if line.strip():
+                # Comment-only line
+                continue
+            pending_blank += 1
+            continue
+
+        # Blank lines may fold into plain multi-line scalars, so they are kept
+        # unless they trail the document
+        for _ in range(pending_blank):
+            yield ""
+        pending_blank = 0
+
+        if quote is None and _BLOCK_SCALAR_HEADER.search(content):
+            block_indent = _indentation(content)
+        yield content
+
+
+def digest_file(path: str) -> str:
+    """Compute the normalized content digest of a schema file."""
+
+    sha256_hash = hashlib.sha256()
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            document = json.load(f)
+        canonical = json.dumps(document, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        sha256_hash.update(canonical.encode("utf-8"))
+    else:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for line in normalize_yaml_lines(f):
+                sha256_hash.update(line.encode("utf-8"))
+                sha256_hash.update(b"\n")
+    return sha256_hash.hexdigest()
+
+
+def create_manifest(paths: List[str]) -> Dict:
+    """Create a digest manifest for a group of schema files."""
+
+    files = {path: digest_file(path) for path in sorted(paths)}
+
+    combined = hashlib.sha256()
+    for path, digest in files.items():
+        combined.update("{}\0{}\0".format(path, digest).encode("utf-8"))
+
+    return {
+        "version": MANIFEST_VERSION,
+        "digest": combined.hexdigest(),
+        "files": files,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Compute normalized content digests for Weaver schema files",
+        fromfile_prefix_chars="@",
+    )
+    parser.add_argument("--output", required=True, help="Manifest file to write")
+    parser.add_argument("files", nargs="*", help="Schema files to digest")
+    args = parser.parse_args(argv)
+
+    manifest = create_manifest(args.files)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, sort_keys=True, separators=(",", ":"))
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,693 @@
+#!/usr/bin/env python3
+"""
+Weaver action wrapper with Bazel persistent worker support.
+
+This script runs the Weaver binary on behalf of the WeaverGenerate,
+WeaverValidate and WeaverDocs actions. It can be invoked in two modes:
+
+- One-shot mode: Bazel runs the wrapper once per action with a single
+  `@params` file argument.
+- Persistent worker mode: Bazel starts the wrapper with
+  `--persistent_worker` and streams JSON work requests over stdin.
+
+In worker mode the wrapper keeps the staged registry directory for each
+distinct registry digest across requests, so repeated actions over the same
+registry skip re-creating its symlink tree. Multiplex requests are served
+concurrently from one process and share the same bounded registry cache.
+
+With `--resolve-registry`, the cache also keeps the registry resolved with
+`registry resolve --format json`, keyed by the same content digest, and
+passes it as `--registry` to `registry generate` and `registry check`. Ten
+generation actions over one registry then resolve it once per worker
+instead of once each. The rules pass the flag only for Weaver toolchains
+declaring `registry_snapshots`; Weaver releases read a registry directory
+there, so with them only staging is reused and every command still parses
+and resolves the registry. To resolve a registry once across workers and
+machines, use a weaver_registry_snapshot.
+
+With `--metrics-out`, the wrapper measures the Weaver process itself (wall
+time, user and system CPU time, peak RSS) and writes them as JSON.
+
+Weaver arguments may hold several commands separated by `--then`. They run
+in order against the same staged registry, stopping at the first failure,
+so a fused library action stages and narrows the registry once for
+validation, generation and documentation.
+
+With `--diagnostics-out`, the result of the `registry check` command (exit
+code, JSON diagnostics and output) is written as the action output. With
+`--record-failures`, a failed check is recorded there and the action still
+succeeds, so the result is cached and tests replay it.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from schema_deps import compute_closure, load_indexes, missing_entry_points
+
+# Separates Weaver commands run by one action
+COMMAND_SEPARATOR = "--then"
+
+
+def expand_param_files(arguments: List[str]) -> List[str]:
+    """Expand `@file` arguments written in Bazel's multiline param file format."""
+
+    expanded = []
+    for argument in arguments:
+        if argument.startswith("@") and not argument.startswith("@@"):
+            with open(argument[1:], "r", encoding="utf-8") as f:
+                expanded.extend(line for line in f.read().splitlines())
+        else:
+            expanded.append(argument)
+    return expanded
+
+
+def parse_request_arguments(arguments: List[str]) -> argparse.Namespace:
+    """Parse the wrapper arguments of a single action invocation."""
+
+    if "--" in arguments:
+        split = arguments.index("--")
+        wrapper_args, weaver_args = arguments[:split], arguments[split + 1:]
+    else:
+        wrapper_args, weaver_args = arguments, []
+
+    parser = argparse.ArgumentParser(description="Weaver action wrapper")
+    parser.add_argument("--weaver", required=True, help="Path to the Weaver binary")
+    parser.add_argument("--registry-file", action="append", default=[],
+                        help="Registry file to stage into the registry directory")
+    parser.add_argument("--diagnostics-out",
+                        help="JSON file receiving the exit code and diagnostics of the registry check")
+    parser.add_argument("--record-failures", action="store_true",
+                        help="Record a failed registry check in --diagnostics-out instead of failing the action")
+    parser.add_argument("--digest-manifest", action="append", default=[],
+                        help="Normalized content digest manifest covering registry files")
+    parser.add_argument("--dependency-index", action="append", default=[],
+                        help="Schema dependency index used to narrow the registry")
+    parser.add_argument("--entry-point", action="append", default=[],
+                        help="Registry file whose transitive references are staged")
+    parser.add_argument("--resolve-registry", action="store_true",
+                        help="Resolve the staged registry once and pass the resolved registry to Weaver commands")
+    parser.add_argument("--unused-inputs-list", help="File listing registry inputs Weaver does not depend on")
+    parser.add_argument("--metrics-out", help="JSON file receiving measurements of the Weaver process")
+    parser.add_argument("--metrics-label", default="", help="Label of the target, recorded in the metrics")
+    parser.add_argument("--metrics-mnemonic", default="", help="Action mnemonic, recorded in the metrics")
+
+    args = parser.parse_args(wrapper_args)
+    args.weaver_commands = split_commands(weaver_args)
+    args.weaver_args = args.weaver_commands[0]
+    return args
+
+
+def split_commands(weaver_args: List[str]) -> List[List[str]]:
+    """Split Weaver arguments into commands separated by `--then`."""
+
+    commands = [[]]
+    for argument in weaver_args:
+        if argument == COMMAND_SEPARATOR:
+            commands.append([])
+        else:
+            commands[-1].append(argument)
+    return commands
+
+
+def compute_registry_digest(registry_files: List[str], input_digests: Optional[Dict[str, str]] = None) -> str:
+    """Compute a digest identifying the content of a registry file set.
+
+    Normalized digests from digest manifests or Bazel's own input digests
+    (worker requests) are used directly. Without them (one-shot mode) the
+    file contents are hashed.
+    """
+
+    sha256_hash = hashlib.sha256()
+    for path in sorted(registry_files):
+        sha256_hash.update(path.encode("utf-8"))
+        sha256_hash.update(b"\0")
+        if input_digests and path in input_digests:
+            sha256_hash.update(input_digests[path].encode("utf-8"))
+        else:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    sha256_hash.update(chunk)
+        sha256_hash.update(b"\0")
+    return sha256_hash.hexdigest()
+
+
+def load_digest_manifests(manifest_paths: List[str]) -> Dict[str, str]:
+    """Load normalized per-file content digests from digest manifests."""
+
+    digests = {}
+    for manifest_path in manifest_paths:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            digests.update(json.load(f).get("files", {}))
+    return digests
+
+
+def unused_manifests(manifest_paths: List[str], registry_files: List[str]) -> List[str]:
+    """Return the digest manifests that cover none of the staged registry files."""
+
+    staged = set(registry_files)
+    unused = []
+    for manifest_path in manifest_paths:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            files = json.load(f).get("files", {})
+        if not staged.intersection(files):
+            unused.append(manifest_path)
+    return unused
+
+
+class NarrowingError(Exception):
+    """Raised when entry points do not narrow the registry to any file."""
+
+
+def narrow_registry(registry_files: List[str], index_paths: List[str], entry_points: List[str]) -> Tuple[List[str], List[str]]:
+    """Split registry files into those referenced from the entry points and the rest.
+
+    Entry points must be registry files. Otherwise nothing would be staged
+    and Weaver would fall back to its default registry.
+
+    Returns:
+        Tuple of (files in the transitive closure, files outside it)
+
+    Raises:
+        NarrowingError: if an entry point is not an indexed registry file,
+            or the closure holds no registry file
+    """
+
+    missing = sorted(set(entry_points) - set(registry_files))
+    if missing:
+        raise NarrowingError("entry points are not registry files: {}".format(", ".join(missing)))
+    files = load_indexes(index_paths)
+    missing = missing_entry_points(files, entry_points)
+    if missing:
+        raise NarrowingError("entry points are not in the dependency indexes: {}".format(", ".join(missing)))
+    closure = set(compute_closure(files, entry_points))
+    used = [path for path in registry_files if path in closure]
+    unused = [path for path in registry_files if path not in closure]
+    if not used:
+        raise NarrowingError("entry points {} reference no registry files".format(", ".join(entry_points)))
+    return used, unused
+
+
+def write_unused_inputs(path: str, unused_files: List[str]):
+    """Write the inputs Bazel should not consider when checking the action cache.
+
+    These are registry files outside the entry point closure, which Weaver
+    never sees, and files covered by digest manifests, for which the
+    normalized manifest digest stands in.
+    """
+
+    with open(path, "w", encoding="utf-8") as f:
+        for unused_file in sorted(set(unused_files)):
+            f.write(unused_file + "\n")
+
+
+def _registry_layout(registry_files: List[str]) -> List[Tuple[str, str]]:
+    """Map registry files to paths relative to their common directory."""
+
+    directories = [os.path.dirname(path) or "." for path in registry_files]
+    common = os.path.commonpath([os.path.abspath(d) for d in directories])
+    return [
+        (path, os.path.relpath(os.path.abspath(path), common))
+        for path in registry_files
+    ]
+
+
+# Weaver commands that read a resolved registry in place of the staged one
+RESOLVED_REGISTRY_COMMANDS = (["registry", "generate"], ["registry", "check"])
+
+
+class StagedRegistry:
+    """A registry file set staged as a single directory for Weaver.
+
+    `resolved` maps Weaver binaries to the registry they resolved from the
+    staged directory, or to None if resolving failed.
+    """
+
+    def __init__(self, digest: str, registry_files: List[str], root: str):
+        self.digest = digest
+        self.registry_files = registry_files
+        self.root = root
+        self.resolved: Dict[str, Optional[str]] = {}
+        self.resolve_lock = threading.Lock()
+
+    @classmethod
+    def stage(cls, digest: str, registry_files: List[str], staging_root: str) -> "StagedRegistry":
+        """Stage registry files as symlinks under a digest-named directory."""
+
+        root = os.path.join(staging_root, digest)
+        if os.path.isdir(root):
+            shutil.rmtree(root)
+        for source, relative in _registry_layout(registry_files):
+            target = os.path.join(root, relative)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.symlink(os.path.abspath(source), target)
+        return cls(digest, registry_files, root)
+
+    def release(self):
+        """Remove the staged registry directory and its resolved registries."""
+
+        shutil.rmtree(self.root, ignore_errors=True)
+        shutil.rmtree(self.root + ".resolved", ignore_errors=True)
+
+
+class RegistryCache:
+    """Registries staged, and optionally resolved, once per wrapper process.
+
+    Registries are keyed by the content digest of their files, shared by all
+    requests, including concurrent multiplex requests, and kept in an LRU
+    cache bounded by entry count and total staged file count. Entries still
+    in use by a request are never evicted. A hit saves creating the
+    registry's symlink tree and, once it has been resolved by a Weaver
+    binary, running `registry resolve` again.
+
+    `persistent` is set for worker processes, whose cache outlives a single
+    action.
+    """
+
+    def __init__(self, staging_root: Optional[str] = None, max_registries: int = 16, max_staged_files: int = 100000,
+                 persistent: bool = False):
+        self.staging_root = staging_root or tempfile.mkdtemp(prefix="weaver_worker_")
+        self.max_registries = max_registries
+        self.max_staged_files = max_staged_files
+        self.persistent = persistent
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.resolves = 0
+        self.resolve_hits = 0
+        self._registries: "OrderedDict[str, StagedRegistry]" = OrderedDict()
+        self._in_use: Dict[str, int] = {}
+        self._staged_files = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls) -> "RegistryCache":
+        """Create a worker's registry cache with bounds taken from the environment."""
+
+        return cls(
+            max_registries=int(os.environ.get("WEAVER_WORKER_MAX_REGISTRIES", "16")),
+            max_staged_files=int(os.environ.get("WEAVER_WORKER_MAX_STAGED_FILES", "100000")),
+            persistent=True,
+        )
+
+    def acquire(self, registry_files: List[str], input_digests: Optional[Dict[str, str]] = None) -> StagedRegistry:
+        """Return the staged registry for a file set, staging it on first use.
+
+        Every call must be paired with `release()` once Weaver has finished.
+        """
+
+        digest = compute_registry_digest(registry_files, input_digests)
+        with self._lock:
+            state = self._registries.get(digest)
+            if state is not None:
+                self.hits += 1
+                self._registries.move_to_end(digest)
+            else:
+                self.misses += 1
+                state = StagedRegistry.stage(digest, registry_files, self.staging_root)
+                self._registries[digest] = state
+                self._staged_files += len(registry_files)
+            self._in_use[digest] = self._in_use.get(digest, 0) + 1
+            self._evict()
+        return state
+
+    def release(self, state: StagedRegistry):
+        """Mark a staged registry as no longer used by a request."""
+
+        with self._lock:
+            count = self._in_use.get(state.digest, 0) - 1
+            if count > 0:
+                self._in_use[state.digest] = count
+            else:
+                self._in_use.pop(state.digest, None)
+            self._evict()
+
+    def resolve(self, state: StagedRegistry, weaver: str) -> Tuple[Optional[str], Optional[Dict]]:
+        """Return the registry resolved by a Weaver binary, resolving it on first use.
+
+        Concurrent requests for the same registry wait for one resolution.
+        A failed resolution is remembered, so later requests read the staged
+        registry and report its errors themselves.
+
+        Returns:
+            Tuple of (resolved registry file or None, measurements of the
+            `registry resolve` command if it ran)
+        """
+
+        with state.resolve_lock:
+            if weaver in state.resolved:
+                with self._lock:
+                    self.resolve_hits += 1
+                return state.resolved[weaver], None
+
+            output = os.path.join(
+                state.root + ".resolved",
+                hashlib.sha256(weaver.encode("utf-8")).hexdigest()[:16] + ".json",
+            )
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+            command = ["registry", "resolve", "--registry", state.root, "--format", "json", "--output", output]
+            returncode, _, measurements = run_measured([weaver] + command)
+            resolved = output if returncode == 0 and os.path.isfile(output) else None
+            state.resolved[weaver] = resolved
+            with self._lock:
+                self.resolves += 1
+            return resolved, dict(measurements, command=command[:2], exit_code=returncode)
+
+    def _evict(self):
+        """Evict least recently used registries that exceed the cache bounds."""
+
+        for digest in list(self._registries.keys()):
+            if len(self._registries) <= self.max_registries and self._staged_files <= self.max_staged_files:
+                break
+            if digest in self._in_use:
+                continue
+            state = self._registries.pop(digest)
+            self._staged_files -= len(state.registry_files)
+            self.evictions += 1
+            state.release()
+
+    def stats(self) -> Dict[str, int]:
+        """Return registry cache statistics."""
+
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "resolves": self.resolves,
+                "resolve_hits": self.resolve_hits,
+                "cached_registries": len(self._registries),
+                "staged_files": self._staged_files,
+            }
+
+    def close(self):
+        """Release all staged registries."""
+
+        with self._lock:
+            for state in self._registries.values():
+                state.release()
+            self._registries.clear()
+            self._in_use.clear()
+            self._staged_files = 0
+        shutil.rmtree(self.staging_root, ignore_errors=True)
+
+
+def run_measured(command: List[str]) -> Tuple[int, str, Dict]:
+    """Run a command, capturing its output and resource usage.
+
+    Resource usage is read with `wait4` for this child only, so concurrent
+    multiplex requests do not see each other's usage. Where `wait4` is not
+    available, only wall time is measured.
+
+    Returns:
+        Tuple of (exit code, combined stdout and stderr, measurements)
+    """
+
+    start = time.monotonic()
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    output = process.stdout.read()
+    process.stdout.close()
+
+    measurements = {
+        "user_cpu_seconds": None,
+        "system_cpu_seconds": None,
+        "peak_rss_bytes": None,
+    }
+    if hasattr(os, "wait4"):
+        _, status, rusage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        rss_scale = 1 if sys.platform == "darwin" else 1024
+        measurements = {
+            "user_cpu_seconds": round(rusage.ru_utime, 3),
+            "system_cpu_seconds": round(rusage.ru_stime, 3),
+            "peak_rss_bytes": rusage.ru_maxrss * rss_scale,
+        }
+    else:
+        process.wait()
+    measurements["wall_time_seconds"] = round(time.monotonic() - start, 3)
+
+    return process.returncode, output, measurements
+
+
+def combine_measurements(steps: List[Dict]) -> Dict:
+    """Combine the measurements of several Weaver commands run in sequence."""
+
+    combined = {}
+    for key in ("user_cpu_seconds", "system_cpu_seconds", "wall_time_seconds"):
+        values = [step[key] for step in steps]
+        combined[key] = None if None in values else round(sum(values), 3)
+    peaks = [step["peak_rss_bytes"] for step in steps]
+    combined["peak_rss_bytes"] = None if None in peaks else max(peaks)
+    return combined
+
+
+def write_metrics(args: argparse.Namespace, exit_code: int, steps: List[Dict], registry_files: List[str]):
+    """Write the measurements of one Weaver action as a JSON sidecar.
+
+    Actions running several commands record the combined measurements and
+    each command's own under `steps`.
+    """
+
+    metrics = {
+        "version": 1,
+        "label": args.metrics_label,
+        "mnemonic": args.metrics_mnemonic,
+        "command": list(args.weaver_args[:2]),
+        "exit_code": exit_code,
+        "registry_files": len(args.registry_file),
+        "staged_registry_files": len(registry_files),
+    }
+    metrics.update(combine_measurements(steps))
+    if len(steps) > 1:
+        metrics["steps"] = steps
+    with open(args.metrics_out, "w", encoding="utf-8") as f:
+        json.dump(metrics, f, sort_keys=True, indent=2)
+        f.write("\n")
+
+
+def parse_diagnostics(output: str):
+    """Extract JSON diagnostics from Weaver output.
+
+    Weaver writes diagnostics with `--diagnostic-format json` as a JSON
+    document, possibly after other log lines. Returns None if the output
+    holds no JSON document.
+    """
+
+    decoder = json.JSONDecoder()
+    for start in range(len(output)):
+        if output[start] not in "[{" or (start and output[start - 1] != "\n"):
+            continue
+        try:
+            diagnostics, end = decoder.raw_decode(output, start)
+        except json.JSONDecodeError:
+            continue
+        if not output[end:].strip():
+            return diagnostics
+    return None
+
+
+def write_diagnostics(path: str, exit_code: int, command: List[str], output: str):
+    """Write the result of a registry check as a JSON report."""
+
+    policies = [command[i + 1] for i, argument in enumerate(command[:-1]) if argument == "--policy"]
+    report = {
+        "version": 1,
+        "command": list(command[:2]),
+        "policies": policies,
+        "exit_code": exit_code,
+        "diagnostics": parse_diagnostics(output),
+        "output": output,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, sort_keys=True, indent=2)
+        f.write("\n")
+
+
+def run_weaver(args: argparse.Namespace, cache: RegistryCache, input_digests: Optional[Dict[str, str]] = None) -> Tuple[int, str]:
+    """Run Weaver for a single action and return its exit code and output."""
+
+    manifest_digests = load_digest_manifests(args.digest_manifest)
+    if manifest_digests:
+        input_digests = dict(input_digests or {}, **manifest_digests)
+
+    registry_files = list(args.registry_file)
+    unused_files = []
+    if args.entry_point:
+        registry_files, unused_files = narrow_registry(registry_files, args.dependency_index, args.entry_point)
+        unused_files.extend(unused_manifests(args.digest_manifest, registry_files))
+    unused_files.extend(path for path in registry_files if path in manifest_digests)
+
+    registry = None
+    if registry_files:
+        registry = cache.acquire(registry_files, input_digests)
+
+    # Resolving pays off when the resolved registry is read more than once,
+    # by later requests of a worker or by several commands of this action
+    resolving = registry is not None and args.resolve_registry and (
+        cache.persistent
+        or sum(weaver_args[:2] in RESOLVED_REGISTRY_COMMANDS for weaver_args in args.weaver_commands) > 1
+    )
+
+    returncode = 0
+    outputs = []
+    steps = []
+    try:
+        for weaver_args in args.weaver_commands:
+            command = [args.weaver] + weaver_args
+            # The staged registry is passed to registry commands only, and
+            # its resolved registry to the commands that read one
+            if registry is not None and weaver_args[:1] == ["registry"]:
+                registry_path = registry.root
+                if resolving and weaver_args[:2] in RESOLVED_REGISTRY_COMMANDS:
+                    resolved, measurements = cache.resolve(registry, args.weaver)
+                    if measurements is not None:
+                        steps.append(measurements)
+                    registry_path = resolved or registry.root
+                command.extend(["--registry", registry_path])
+            returncode, output, measurements = run_measured(command)
+            outputs.append(output)
+            steps.append(dict(measurements, command=weaver_args[:2], exit_code=returncode))
+
+            if args.diagnostics_out and weaver_args[:2] == ["registry", "check"]:
+                write_diagnostics(args.diagnostics_out, returncode, weaver_args, output)
+                if returncode != 0 and args.record_failures:
+                    # The failure is the cached result; the test replays it
+                    returncode = 0
+                    continue
+            if returncode != 0:
+                break
+    finally:
+        if registry is not None:
+            cache.release(registry)
+
+    if args.unused_inputs_list:
+        write_unused_inputs(args.unused_inputs_list, unused_files)
+    if args.metrics_out:
+        write_metrics(args, returncode, steps, registry_files)
+
+    return returncode, "".join(outputs)
+
+
+def handle_request(arguments: List[str], cache: RegistryCache, input_digests: Optional[Dict[str, str]] = None) -> Tuple[int, str]:
+    """Handle one action invocation, reporting usage errors as failures."""
+
+    try:
+        args = parse_request_arguments(expand_param_files(arguments))
+    except SystemExit as e:
+        return int(e.code or 1), "Invalid Weaver wrapper arguments: {}\n".format(arguments)
+    except OSError as e:
+        return 1, "Failed to read Weaver wrapper arguments: {}\n".format(e)
+
+    try:
+        return run_weaver(args, cache, input_digests)
+    except NarrowingError as e:
+        return 1, "Failed to narrow the registry: {}\n".format(e)
+    except OSError as e:
+        return 1, "Failed to run Weaver: {}\n".format(e)
+
+
+def _process_work_request(request: Dict, cache: RegistryCache, log_stats: bool = False) -> Dict:
+    """Handle one JSON work request and build its work response.
+
+    Registry cache statistics are written to the worker log with `log_stats`,
+    and appended to the output of verbose requests (`--worker_verbose`).
+    """
+
+    input_digests = {
+        entry["path"]: entry.get("digest", "")
+        for entry in request.get("inputs", [])
+        if "path" in entry
+    }
+    exit_code, output = handle_request(request.get("arguments", []), cache, input_digests)
+
+    verbose = request.get("verbosity", 0) >= 10
+    if log_stats or verbose:
+        stats = json.dumps(cache.stats(), sort_keys=True)
+        if log_stats:
+            sys.stderr.write("weaver_worker: registry cache {}\n".format(stats))
+        if verbose:
+            output += "Weaver worker registry cache: {}\n".format(stats)
+
+    return {
+        "exitCode": exit_code,
+        "output": output,
+        "requestId": request.get("requestId", 0),
+    }
+
+
+def run_persistent_worker(stdin=sys.stdin, stdout=sys.stdout, max_concurrency: Optional[int] = None):
+    """Serve JSON work requests until Bazel closes stdin.
+
+    Singleplex requests (request id 0) are handled inline. Multiplex requests
+    are handled concurrently on a thread pool sharing one registry cache.
+    The pool matches Bazel's default `--worker_max_multiplex_instances`,
+    since requests mostly wait on the Weaver subprocess. With
+    `WEAVER_WORKER_LOG_STATS=1`, registry cache statistics are logged after
+    every request.
+    """
+
+    cache = RegistryCache.from_environment()
+    log_stats = os.environ.get("WEAVER_WORKER_LOG_STATS", "0") == "1"
+    write_lock = threading.Lock()
+    if max_concurrency is None:
+        max_concurrency = int(os.environ.get("WEAVER_WORKER_MAX_CONCURRENCY", "8"))
+    executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    def respond(request: Dict):
+        response = _process_work_request(request, cache, log_stats)
+        with write_lock:
+            stdout.write(json.dumps(response) + "\n")
+            stdout.flush()
+
+    try:
+        for line in stdin:
+            line = line.strip()
+            if not line:
+                continue
+
+            request = json.loads(line)
+            if request.get("requestId", 0):
+                executor.submit(respond, request)
+            else:
+                respond(request)
+    finally:
+        executor.shutdown(wait=True)
+        cache.close()
+
+
+def main():
+    arguments = sys.argv[1:]
+
+    if "--persistent_worker" in arguments:
+        run_persistent_worker()
+        return
+
+    cache = RegistryCache()
+    try:
+        exit_code, output = handle_request(arguments, cache)
+    finally:
+        cache.close()
+
+    if output:
+        sys.stdout.write(output)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()